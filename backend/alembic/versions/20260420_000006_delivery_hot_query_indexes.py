@@ -0,0 +1,87 @@
+"""Composite indexes for delivery hot queries.
+
+Covers the lookups delivery.services issues on every request/return/task read:
+- delivery_tasks by request_id / return_id ordered by created_at
+- task_status_history by task_id ordered by changed_at
+- book_requests by user_id ordered by requested_at
+- book_returns by (user_id, status)
+- staff lists: book_requests ordered by requested_at, book_returns by initiated_at
+
+The single-column user_id / task_id indexes are prefixes of the new composites,
+so they are dropped to avoid paying for redundant index maintenance on writes.
+
+Revision ID: 20260420_000006
+Revises: 20260413_000005
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20260420_000006"
+down_revision = "20260413_000005"
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns)
+NEW_INDEXES = (
+    ("ix_delivery_tasks_request_id_created_at", "delivery_tasks", ["request_id", "created_at"]),
+    ("ix_delivery_tasks_return_id_created_at", "delivery_tasks", ["return_id", "created_at"]),
+    ("ix_task_status_history_task_id_changed_at", "task_status_history", ["task_id", "changed_at"]),
+    ("ix_book_requests_user_id_requested_at", "book_requests", ["user_id", "requested_at"]),
+    ("ix_book_returns_user_id_status", "book_returns", ["user_id", "status"]),
+    ("ix_book_requests_requested_at", "book_requests", ["requested_at"]),
+    ("ix_book_returns_initiated_at", "book_returns", ["initiated_at"]),
+)
+
+# Superseded by the composites above (same leading column).
+REDUNDANT_INDEXES = (
+    ("ix_task_status_history_task_id", "task_status_history", ["task_id"]),
+    ("ix_book_requests_user_id", "book_requests", ["user_id"]),
+    ("ix_book_returns_user_id", "book_returns", ["user_id"]),
+)
+
+
+def upgrade() -> None:
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, table, columns in NEW_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                schema="app",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, table, _columns in REDUNDANT_INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                schema="app",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                schema="app",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, table, _columns in reversed(NEW_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                schema="app",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
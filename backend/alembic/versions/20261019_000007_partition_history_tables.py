@@ -0,0 +1,157 @@
+"""Monthly range partitions for task_status_history, robot_status_logs and audit_logs.
+
+Each table is rebuilt as a partitioned table (PARTITION BY RANGE on its timestamp):
+- the primary key becomes (id, <timestamp>), since a partitioned table's unique constraints
+  must include the partition column
+- one partition per month holding rows, through PREMAKE_MONTHS after the current month,
+  plus a DEFAULT partition as a safety net
+- existing rows are copied over and the indexes rebuilt on the partitioned table
+
+Afterwards shared/partitions.py (scripts/manage_partitions.py) keeps months pre-created and
+drops those past retention.
+
+The copy runs in the migration's transaction and holds an exclusive lock on each table until it
+commits. For a large table, run it in a maintenance window.
+
+Revision ID: 20261019_000007
+Revises: 20260420_000006
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "20261019_000007"
+down_revision = "20260420_000006"
+branch_labels = None
+depends_on = None
+
+PREMAKE_MONTHS = 3
+
+task_status_enum = postgresql.ENUM(name="task_status_enum", create_type=False)
+robot_status_enum = postgresql.ENUM(name="robot_status_enum", create_type=False)
+
+
+def _columns(table: str) -> list[sa.Column]:
+    if table == "task_status_history":
+        return [
+            sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column(
+                "task_id",
+                postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("app.delivery_tasks.id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("old_status", task_status_enum, nullable=True),
+            sa.Column("new_status", task_status_enum, nullable=False),
+            sa.Column("changed_by", postgresql.UUID(as_uuid=True), nullable=True),
+            sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+            sa.Column("reason", sa.Text(), nullable=True),
+        ]
+    if table == "robot_status_logs":
+        return [
+            sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column(
+                "robot_id",
+                postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("ops.robots.id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("status", robot_status_enum, nullable=False),
+            sa.Column("current_location", sa.String(length=120), nullable=True),
+            sa.Column("battery_level", sa.Float(), nullable=True),
+            sa.Column("sensor_data", sa.JSON(), nullable=True),
+            sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        ]
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("action", sa.String(length=150), nullable=False),
+        sa.Column("resource_type", sa.String(length=120), nullable=False),
+        sa.Column("resource_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("changes", sa.JSON(), nullable=True),
+        sa.Column("ip_address", sa.String(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+    ]
+
+
+# (schema, table, partition column, [(index name, columns)])
+TABLES = (
+    ("app", "task_status_history", "changed_at", [("ix_task_status_history_task_id_changed_at", ["task_id", "changed_at"])]),
+    ("ops", "robot_status_logs", "recorded_at", [("ix_robot_status_logs_robot_id", ["robot_id"])]),
+    ("ops", "audit_logs", "created_at", [("ix_audit_logs_user_id", ["user_id"]), ("ix_audit_logs_action", ["action"])]),
+)
+
+
+def _add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def _copy(schema: str, source: str, target: str, table: str) -> None:
+    names = ", ".join(column.name for column in _columns(table))
+    op.execute(f"INSERT INTO {schema}.{target} ({names}) SELECT {names} FROM {schema}.{source}")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    now = datetime.now(timezone.utc)
+    for schema, table, column, indexes in TABLES:
+        old = f"{table}_unpartitioned"
+        op.rename_table(table, old, schema=schema)
+        op.execute(f"ALTER TABLE {schema}.{old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey")
+        for name, _columns_ in indexes:
+            op.drop_index(name, table_name=old, schema=schema, if_exists=True)
+
+        op.create_table(
+            table,
+            *_columns(table),
+            sa.PrimaryKeyConstraint("id", column, name=f"{table}_pkey"),
+            schema=schema,
+            postgresql_partition_by=f"RANGE ({column})",
+        )
+        op.execute(f"CREATE TABLE {schema}.{table}_default PARTITION OF {schema}.{table} DEFAULT")
+
+        oldest = bind.scalar(sa.text(f"SELECT min({column}) FROM {schema}.{old}"))
+        month = _month_start(oldest) if oldest is not None else _month_start(now)
+        last = _add_months(_month_start(now), PREMAKE_MONTHS)
+        while month <= last:
+            upper = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {schema}.{table}_p{month:%Y%m} PARTITION OF {schema}.{table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+            month = upper
+
+        _copy(schema, old, table, table)
+        op.drop_table(old, schema=schema)
+        for name, columns in indexes:
+            op.create_index(name, table, columns, unique=False, schema=schema)
+        op.execute(f"ANALYZE {schema}.{table}")
+
+
+def downgrade() -> None:
+    for schema, table, column, indexes in reversed(TABLES):
+        partitioned = f"{table}_partitioned"
+        op.rename_table(table, partitioned, schema=schema)
+        op.execute(f"ALTER TABLE {schema}.{partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey")
+        op.create_table(
+            table,
+            *_columns(table),
+            sa.PrimaryKeyConstraint("id", name=f"{table}_pkey"),
+            schema=schema,
+        )
+        _copy(schema, partitioned, table, table)
+        # Dropping the parent drops its partitions (and their indexes) with it.
+        op.drop_table(partitioned, schema=schema)
+        for name, columns in indexes:
+            op.create_index(name, table, columns, unique=False, schema=schema)
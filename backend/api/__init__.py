@@ -0,0 +1,3 @@
+# Combined API
+# Base paths: every service's (/api/v1/auth, books, requests, returns, deliveries, robot, notifications)
+# Responsibilities: serve all routers from one process per worker (Render API_MODE=combined)
@@ -0,0 +1,59 @@
+"""
+LUNA combined API - every service's routers in one FastAPI application.
+
+The default Render layout runs one uvicorn process per service under supervisord
+(docker/supervisord.render.conf), each with its own DB pools, Redis client and copy of the
+imported dependencies. Here one process per worker serves all routes with one set of each.
+Render selects it with API_MODE=combined (docker/entrypoint-render.sh); API_WORKERS sets the
+uvicorn worker count. benchmarks/deployment_modes.py compares memory and latency of both layouts.
+"""
+from shared.env_bootstrap import load_env
+
+load_env()
+
+from fastapi import FastAPI
+
+from auth.main import lifespan, redis_ready
+from auth.routes import router as auth_router
+from book.routes import router as book_router
+from delivery.routes import deliveries_router, requests_router, returns_router
+from notification.routes import router as notification_router
+from robot.routes import router as robot_router
+from shared.compression import add_compression
+from shared.cors import add_cors
+from shared.db_stats import add_db_debug_headers, add_db_pool_status
+from shared.http_metrics import add_metrics
+from shared.readiness import add_readiness, database_check
+
+app = FastAPI(
+    title="LUNA API",
+    description="Auth, book, delivery, robot and notification routes in one process",
+    version="0.1.0",
+    # Auth's configuration checks cover every service; Redis and the database are on /ready.
+    lifespan=lifespan,
+)
+
+add_cors(app)
+add_compression(app)
+add_metrics(app)
+add_db_pool_status(app)
+add_db_debug_headers(app)
+add_readiness(app, {"redis": redis_ready, "database": database_check})
+
+app.include_router(auth_router)
+app.include_router(book_router)
+app.include_router(requests_router)
+app.include_router(returns_router)
+app.include_router(deliveries_router)
+app.include_router(robot_router)
+app.include_router(notification_router)
+
+
+@app.get("/")
+def root():
+    return {"service": "api", "status": "running"}
+
+
+@app.get("/health")
+def health():
+    return {"status": "healthy"}
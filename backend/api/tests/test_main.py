@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from api.main import app
+from auth.main import app as auth_app
+from book.main import app as book_app
+from delivery.main import app as delivery_app
+from notification.main import app as notification_app
+from robot.main import app as robot_app
+
+
+def _api_operations(application) -> set[tuple[str, str]]:
+    return {
+        (method, path)
+        for path, item in application.openapi()["paths"].items()
+        if path.startswith("/api/")
+        for method in item
+    }
+
+
+def test_combined_app_serves_every_service_route():
+    services = set().union(
+        *(_api_operations(a) for a in (auth_app, book_app, delivery_app, notification_app, robot_app))
+    )
+    assert _api_operations(app) == services
+
+
+def test_service_health_paths_resolve():
+    client = TestClient(app)
+    for service in ("auth", "books", "robot", "notifications"):
+        assert client.get(f"/api/v1/{service}/health").status_code == 200
+    assert client.get("/api/v1/deliveries/tasks").status_code == 401
@@ -3,25 +3,29 @@ LUNA Auth Service - FastAPI application.
 Base path: /api/v1/auth
 """
 import os
-import time
 from contextlib import asynccontextmanager
-from pathlib import Path
 
 # Load .env FIRST, before any other imports that use env vars
-from dotenv import load_dotenv
-_env_path = Path(__file__).resolve().parent.parent / ".env"
-load_dotenv(_env_path, override=False)
+from shared.env_bootstrap import BACKEND_ENV_PATH, ensure_local_jwt_secret, load_env
+
+load_env()
 
 from fastapi import FastAPI
 
 from auth.routes import router as auth_router
 from shared.cors import add_cors
-from shared.env_bootstrap import ensure_local_jwt_secret
+from shared.http_metrics import add_metrics
+from shared.db_stats import add_db_pool_status
+from shared.readiness import add_readiness, database_check, redis_check
 
 
 def _validate_startup():
-    """Validate required env and services at startup. Raises clear errors."""
-    ensure_local_jwt_secret(_env_path)
+    """Validate required configuration at startup. Raises clear errors.
+
+    Connectivity (Redis, database) is not checked here: it is a readiness check (GET /ready),
+    retried in the background so the service starts serving without waiting for it.
+    """
+    ensure_local_jwt_secret(BACKEND_ENV_PATH)
 
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
@@ -29,23 +33,17 @@ def _validate_startup():
         raise RuntimeError(
             "SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set in .env"
         )
-    # Retry: on container restart, Docker DNS may not resolve `redis` for a short window.
-    from shared.redis_client import get_redis, reset_redis_client
-
-    last_err: Exception | None = None
-    for attempt in range(30):
-        try:
-            get_redis().ping()
-            return
-        except Exception as e:
-            last_err = e
-            reset_redis_client()
-            if attempt < 29:
-                time.sleep(0.5)
-    raise RuntimeError(
-        "Redis is not reachable at REDIS_URL. In Docker use redis://redis:6379/0, "
-        "then: cd backend/docker && docker compose up -d && docker compose restart auth-service"
-    ) from last_err
+
+
+def redis_ready() -> None:
+    """Readiness check: auth stores refresh tokens in Redis."""
+    try:
+        redis_check()
+    except Exception as e:
+        raise RuntimeError(
+            f"Redis is not reachable at REDIS_URL ({e}). In Docker use redis://redis:6379/0, "
+            "then: cd backend/docker && docker compose up -d && docker compose restart auth-service"
+        ) from e
 
 
 @asynccontextmanager
@@ -62,6 +60,9 @@ app = FastAPI(
 )
 
 add_cors(app)
+add_metrics(app)
+add_db_pool_status(app)
+add_readiness(app, {"redis": redis_ready, "database": database_check})
 
 app.include_router(auth_router)
 
@@ -78,12 +79,6 @@ def health():
     return {"status": "healthy"}
 
 
-@app.get("/api/v1/auth/health")
-def auth_health():
-    """Auth API path health check."""
-    return {"status": "healthy"}
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
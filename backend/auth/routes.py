@@ -8,7 +8,7 @@ from datetime import datetime, timezone
 import os
 from typing import Any
 
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 
 from auth.schemas import (
     ChangePasswordRequest,
@@ -31,7 +31,9 @@ from auth.services import (
     refresh_tokens,
     register_user,
     update_user_profile,
+    verify_access_token,
 )
+from book.generation import get_catalog_generation
 from shared.auth_dependencies import get_access_token, get_current_user_dep
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
@@ -85,6 +87,12 @@ def _extract_deleted_user_id(payload: dict[str, Any]) -> str | None:
     return None
 
 
+@router.get("/health")
+def auth_health():
+    """Auth API path health check."""
+    return {"status": "healthy"}
+
+
 @router.post("/register")
 def register(req: RegisterRequest):
     """Register new user account."""
@@ -234,6 +242,31 @@ def get_me(user: UserResponse = Depends(get_current_user_dep)):
     return _success({"user": user.model_dump(mode="json")})
 
 
+@router.get("/verify", include_in_schema=False)
+def verify(token: str = Depends(get_access_token)):
+    """
+    nginx auth_request target for the catalog microcache: 200 (empty) with the caller's role and
+    the catalog generation, which together with the URI form the gateway cache key; 401 otherwise.
+    Only checks the token (verify_access_token): no Supabase call per request, no profile sync.
+    """
+    try:
+        user_id, role = verify_access_token(token)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return Response(
+        status_code=status.HTTP_200_OK,
+        headers={
+            "X-User-Id": str(user_id),
+            "X-User-Role": role.value,
+            "X-Catalog-Generation": get_catalog_generation() or "none",
+        },
+    )
+
+
 @router.put("/me")
 def update_me(
     req: UpdateProfileRequest,
@@ -1,11 +1,14 @@
 """
 Auth business logic using Supabase Auth.
 """
+import hashlib
 import logging
 import os
+import threading
+import time
 from uuid import UUID
 
-from supabase import create_client
+from jose import JWTError, jwt
 
 from auth.supabase_client import get_supabase
 from auth.schemas import UserRole, UserResponse
@@ -26,6 +29,25 @@ from shared.redis_client import (
 
 logger = logging.getLogger(__name__)
 
+# Load testing without Supabase: with AUTH_STUB_MODE=true, bearer tokens of the form
+# "stub:<email>" resolve to that local user profile. Ignored when ENVIRONMENT=production.
+STUB_TOKEN_PREFIX = "stub:"
+AUTH_STUB_MODE = os.getenv("AUTH_STUB_MODE", "false").lower() in ("1", "true", "yes")
+if AUTH_STUB_MODE and os.getenv("ENVIRONMENT", "development").strip().lower() == "production":
+    logger.error("AUTH_STUB_MODE is ignored in production")
+    AUTH_STUB_MODE = False
+_stub_users: dict[str, UserResponse] = {}
+
+# Token checks for the gateway (verify_access_token). With SUPABASE_JWT_SECRET (Supabase
+# Dashboard > Project Settings > API > JWT secret) tokens are checked locally; without it, a
+# Supabase lookup is cached per token for up to VERIFY_CACHE_SECONDS.
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "").strip()
+SUPABASE_JWT_AUDIENCE = "authenticated"
+VERIFY_CACHE_SECONDS = float(os.getenv("AUTH_VERIFY_CACHE_SECONDS", "60"))
+VERIFY_CACHE_MAX = 10_000
+_verified: dict[str, tuple[float, UUID, UserRole]] = {}
+_verified_lock = threading.Lock()
+
 
 def _signup_error_message_for_user(exc: BaseException) -> str:
     """Map Supabase / network errors to a safe, user-facing registration message."""
@@ -63,6 +85,8 @@ def _get_fresh_supabase_service_client():
     key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
     if not url or not key:
         raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+    from supabase import create_client
+
     return create_client(url, key)
 
 
@@ -306,8 +330,35 @@ def delete_user_account(user_id: str) -> None:
     invalidate_refresh_token(user_id)
 
 
+def _get_stub_user(access_token: str) -> UserResponse:
+    """Resolve a "stub:<email>" token to the local profile (AUTH_STUB_MODE only; cached per process)."""
+    email = access_token[len(STUB_TOKEN_PREFIX) :].strip().lower()
+    cached = _stub_users.get(email)
+    if cached is not None:
+        return cached
+    db = SessionLocal()
+    try:
+        profile = db.query(UserProfile).filter(UserProfile.email == email).one_or_none()
+    finally:
+        db.close()
+    if profile is None or not profile.is_active:
+        raise ValueError("Invalid or expired token")
+    user = UserResponse(
+        id=profile.id,
+        email=profile.email,
+        first_name=profile.first_name or "",
+        last_name=profile.last_name or "",
+        role=UserRole(profile.role.value),
+        phone_number=profile.phone_number,
+    )
+    _stub_users[email] = user
+    return user
+
+
 def get_current_user(access_token: str) -> UserResponse:
     """Get user from access token."""
+    if AUTH_STUB_MODE and access_token.startswith(STUB_TOKEN_PREFIX):
+        return _get_stub_user(access_token)
     supabase = get_supabase()
     response = supabase.auth.get_user(access_token)
     if not response or not response.user:
@@ -317,6 +368,46 @@ def get_current_user(access_token: str) -> UserResponse:
     return user_response
 
 
+def verify_access_token(access_token: str) -> tuple[UUID, UserRole]:
+    """
+    (user id, role) for a valid access token, without the profile sync get_current_user does.
+    Raises ValueError for an invalid or expired token.
+    """
+    if AUTH_STUB_MODE and access_token.startswith(STUB_TOKEN_PREFIX):
+        user = _get_stub_user(access_token)
+        return user.id, user.role
+    if SUPABASE_JWT_SECRET:
+        try:
+            claims = jwt.decode(
+                access_token, SUPABASE_JWT_SECRET, algorithms=["HS256"], audience=SUPABASE_JWT_AUDIENCE
+            )
+            return UUID(claims["sub"]), _user_metadata_to_role(claims.get("user_metadata"))
+        except (JWTError, KeyError, ValueError):
+            raise ValueError("Invalid or expired token")
+
+    key = hashlib.sha256(access_token.encode()).hexdigest()
+    now = time.monotonic()
+    cached = _verified.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1], cached[2]
+    response = get_supabase().auth.get_user(access_token)
+    if not response or not response.user:
+        raise ValueError("Invalid or expired token")
+    user = _supabase_user_to_response(response.user)
+    ttl = VERIFY_CACHE_SECONDS
+    try:
+        # Never cache past the token's own expiry.
+        ttl = min(ttl, jwt.get_unverified_claims(access_token)["exp"] - time.time())
+    except (JWTError, KeyError, TypeError):
+        pass
+    if ttl > 0:
+        with _verified_lock:
+            if len(_verified) >= VERIFY_CACHE_MAX:
+                _verified.clear()
+            _verified[key] = (now + ttl, user.id, user.role)
+    return user.id, user.role
+
+
 def update_user_profile(access_token: str, first_name: str | None, last_name: str | None, phone_number: str | None):
     """Update user profile via Supabase Admin API."""
     supabase = get_supabase()
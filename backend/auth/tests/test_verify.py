@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import time
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from jose import jwt
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from auth import routes as auth_routes
+from auth import services as auth_services
+from auth.main import app
+
+SECRET = "test-jwt-secret"
+
+
+def _token(user_id, role: str = "LIBRARIAN", *, secret: str = SECRET, expires_in: int = 60) -> str:
+    return jwt.encode(
+        {
+            "sub": str(user_id),
+            "aud": "authenticated",
+            "exp": int(time.time()) + expires_in,
+            "user_metadata": {"role": role},
+        },
+        secret,
+        algorithm="HS256",
+    )
+
+
+def _no_supabase():
+    raise AssertionError("verify must not call Supabase")
+
+
+def test_verify_checks_the_token_locally(monkeypatch):
+    monkeypatch.setattr(auth_services, "SUPABASE_JWT_SECRET", SECRET)
+    monkeypatch.setattr(auth_services, "get_supabase", _no_supabase)
+    monkeypatch.setattr(auth_services, "_sync_user_profile", lambda user: _no_supabase())
+    monkeypatch.setattr(auth_routes, "get_catalog_generation", lambda: "7")
+    client = TestClient(app)
+    user_id = uuid4()
+
+    res = client.get("/api/v1/auth/verify", headers={"Authorization": f"Bearer {_token(user_id)}"})
+    assert res.status_code == 200
+    assert res.headers["X-User-Id"] == str(user_id)
+    assert res.headers["X-User-Role"] == "LIBRARIAN"
+    assert res.headers["X-Catalog-Generation"] == "7"
+
+    for bad in (_token(user_id, secret="other"), _token(user_id, expires_in=-10), "not-a-jwt"):
+        assert client.get("/api/v1/auth/verify", headers={"Authorization": f"Bearer {bad}"}).status_code == 401
+    assert client.get("/api/v1/auth/verify").status_code == 401
+
+
+def test_verify_without_jwt_secret_caches_the_supabase_lookup(monkeypatch):
+    user_id = uuid4()
+    lookups = []
+
+    class _Auth:
+        def get_user(self, token):
+            lookups.append(token)
+            user = {"id": str(user_id), "email": "s@luna.dev", "user_metadata": {"role": "STUDENT"}}
+            return type("R", (), {"user": user})()
+
+    monkeypatch.setattr(auth_services, "SUPABASE_JWT_SECRET", "")
+    monkeypatch.setattr(auth_services, "_verified", {})
+    monkeypatch.setattr(auth_services, "get_supabase", lambda: type("S", (), {"auth": _Auth()})())
+    monkeypatch.setattr(auth_services, "_sync_user_profile", lambda user: _no_supabase())
+    token = _token(user_id, "STUDENT", secret="unknown-to-us")
+
+    assert auth_services.verify_access_token(token) == (user_id, auth_services.UserRole.STUDENT)
+    assert auth_services.verify_access_token(token) == (user_id, auth_services.UserRole.STUDENT)
+    assert lookups == [token]
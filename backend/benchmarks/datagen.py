@@ -0,0 +1,600 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for scale testing the app schema (shared.models).
+
+Creates books, users, and request / return / delivery task / task status history graphs that
+follow the state machines in delivery.services:
+
+  request:  PENDING -> APPROVED -> IN_PROGRESS (task PENDING -> QUEUED on book placed
+            -> IN_PROGRESS -> COMPLETED | FAILED) -> COMPLETED (student confirmed or auto-closed);
+            PENDING / APPROVED -> CANCELLED
+  return:   PENDING -> PICKUP_SCHEDULED (outbound leg QUEUED -> IN_PROGRESS -> COMPLETED)
+            -> AWAITING_STUDENT_LOAD -> READY_FOR_RETURN_LEG (return leg QUEUED -> IN_PROGRESS)
+            -> RETURN_IN_TRANSIT -> AWAITING_ADMIN_CONFIRM -> COMPLETED; PENDING -> CANCELLED
+
+Each graph stops at a random stage, so the tables hold the mix of in-flight and finished work
+a real semester leaves behind. Book status follows the graphs (checked out while a delivered
+book has not been returned). Author and publisher popularity is Zipf-like and publication
+years skew recent.
+
+Rows are written with COPY (several times faster than batched INSERTs), and output is
+deterministic for a given --seed and --anchor. Rows use the benchmark tags
+(benchmarks/seed.py), so ``--reset`` or ``run_benchmarks.py --reset`` removes them again.
+
+Usage (from backend/; schema migrated):
+  python3 benchmarks/datagen.py --books 200000 --students 20000 --requests 1000000 --seed 42
+  python3 benchmarks/datagen.py --database-url postgresql://... --reset --books 50000
+
+Requires: psycopg2 (requirements.txt).
+"""
+from __future__ import annotations
+
+import argparse
+import enum
+import io
+import json
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.engine import Connection
+
+from shared.models import (
+    Book,
+    BookRequest,
+    BookReturn,
+    BookStatus,
+    DeliveryTask,
+    Notification,
+    NotificationType,
+    RequestStatus,
+    ReturnStatus,
+    TaskPriority,
+    TaskStatus,
+    TaskStatusHistory,
+    TaskType,
+    UserProfile,
+    UserRole,
+)
+
+BENCH_ISBN_PREFIX = "BENCH-"
+BENCH_EMAIL_DOMAIN = "@bench.invalid"
+
+# Graphs started within this window of --anchor may stop mid-workflow; older ones are settled.
+IN_FLIGHT_WINDOW = timedelta(days=2)
+# Rows buffered per COPY statement.
+COPY_CHUNK_ROWS = 50_000
+
+_FIRST = (
+    "Ada Alan Grace Edsger Barbara Donald Margaret Ken Dennis Radia Frances John Mary Toni Chinua "
+    "Haruki Zadie Jorge Octavia Gabriel Ursula Italo Wisława Orhan Chimamanda Kazuo Elena Ngũgĩ"
+).split()
+_LAST = (
+    "Lovelace Turing Hopper Dijkstra Liskov Knuth Hamilton Thompson Ritchie Perlman Allen Morrison "
+    "Achebe Murakami Smith Borges Butler Márquez LeGuin Calvino Szymborska Pamuk Adichie Ishiguro"
+).split()
+_TITLE_WORDS = (
+    "river night garden stone winter light empire shadow ocean silver machine forest city history "
+    "science moon glass fire quiet letters journey secret modern theory island song house memory "
+    "atlas storm orchard signal harbor engine kingdom mirror archive mountain thread lantern"
+).split()
+_PUBLISHER_STEMS = (
+    "Harbor Beacon Meridian Northwind Copper Lantern Atlas Pillar Quarry Juniper Cobalt Summit "
+    "Willow Granite Ember Falcon Orchard Tidewater Keystone Aurora"
+).split()
+_LOCATIONS = [f"Study Room {n}" for n in range(1, 41)] + [f"Desk {n}" for n in range(1, 21)]
+_SHELF_SECTIONS = "ABCDEFGHJKLMNP"
+
+
+# --- COPY ---
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, enum.Enum):
+        value = value.value
+    elif isinstance(value, bool):
+        value = "t" if value else "f"
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, dict):
+        value = json.dumps(value, separators=(",", ":"))
+    text = str(value)
+    return (
+        text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def copy_rows(conn: Connection, model, rows: list[dict]) -> int:
+    """COPY ``rows`` (dicts keyed by column attribute name) into ``model``'s table."""
+    if not rows:
+        return 0
+    table = model.__table__
+    mapper_cols = {attr.key: attr.columns[0].name for attr in model.__mapper__.column_attrs}
+    keys = list(rows[0].keys())
+    columns = ", ".join(f'"{mapper_cols[k]}"' for k in keys)
+    target = f"{table.schema}.{table.name}" if table.schema else table.name
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        for start in range(0, len(rows), COPY_CHUNK_ROWS):
+            buf = io.StringIO()
+            for row in rows[start : start + COPY_CHUNK_ROWS]:
+                buf.write("\t".join(_copy_value(row[k]) for k in keys))
+                buf.write("\n")
+            buf.seek(0)
+            cursor.copy_expert(f"COPY {target} ({columns}) FROM STDIN", buf)
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+# --- Generation ---
+
+
+@dataclass
+class GenConfig:
+    books: int = 50_000
+    students: int = 5_000
+    librarians: int = 20
+    admins: int = 2
+    requests: int = 200_000
+    # Share of delivered requests whose book comes back through the robot workflow; the rest are
+    # returned at the desk.
+    return_rate: float = 0.6
+    history_days: int = 365
+    seed: int = 42
+    anchor: datetime = field(
+        default_factory=lambda: datetime.combine(date.today(), dt_time.min, tzinfo=timezone.utc)
+    )
+
+
+@dataclass
+class Generated:
+    users: list[dict] = field(default_factory=list)
+    books: list[dict] = field(default_factory=list)
+    requests: list[dict] = field(default_factory=list)
+    returns: list[dict] = field(default_factory=list)
+    tasks: list[dict] = field(default_factory=list)
+    history: list[dict] = field(default_factory=list)
+    notifications: list[dict] = field(default_factory=list)
+
+
+class _Generator:
+    def __init__(self, cfg: GenConfig):
+        self.cfg = cfg
+        self.rng = random.Random(cfg.seed)
+        self.out = Generated()
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def zipf_weights(self, n: int, s: float = 1.1) -> list[float]:
+        return [1.0 / (rank**s) for rank in range(1, n + 1)]
+
+    def created_before_history(self) -> datetime:
+        origin = self.cfg.anchor - timedelta(days=self.cfg.history_days)
+        return origin - timedelta(days=self.rng.uniform(1, 4 * 365))
+
+    # Users / books
+
+    def users(self) -> tuple[list[uuid.UUID], list[uuid.UUID]]:
+        students, staff = [], []
+        for role, count, bucket in (
+            (UserRole.STUDENT, self.cfg.students, students),
+            (UserRole.LIBRARIAN, self.cfg.librarians, staff),
+            (UserRole.ADMIN, self.cfg.admins, staff),
+        ):
+            for n in range(count):
+                uid = self.uuid()
+                bucket.append(uid)
+                created = self.created_before_history()
+                self.out.users.append(
+                    {
+                        "id": uid,
+                        "email": f"{role.value.lower()}{n}{BENCH_EMAIL_DOMAIN}",
+                        "first_name": self.rng.choice(_FIRST),
+                        "last_name": self.rng.choice(_LAST),
+                        "role": role,
+                        "phone_number": None,
+                        "is_active": self.rng.random() > 0.02,
+                        "created_at": created,
+                        "updated_at": created,
+                    }
+                )
+        return students, staff
+
+    def books(self) -> list[dict]:
+        rng = self.rng
+        n_authors = max(10, self.cfg.books // 6)
+        authors = [f"{rng.choice(_FIRST)} {rng.choice(_LAST)}" for _ in range(n_authors)]
+        author_weights = self.zipf_weights(n_authors)
+        publishers = [
+            f"{stem} {suffix}" for stem in _PUBLISHER_STEMS for suffix in ("Press", "Books", "House")
+        ]
+        publisher_weights = self.zipf_weights(len(publishers), s=1.3)
+        chosen_authors = rng.choices(authors, weights=author_weights, k=self.cfg.books)
+        chosen_publishers = rng.choices(publishers, weights=publisher_weights, k=self.cfg.books)
+        for n in range(self.cfg.books):
+            title = " ".join(rng.sample(_TITLE_WORDS, rng.choice((1, 2, 2, 3, 3, 4)))).title()
+            # Recent-heavy: most of the collection is from the last few decades.
+            year = min(2025, int(rng.triangular(1900, 2026, 2018)))
+            created = self.created_before_history()
+            self.out.books.append(
+                {
+                    "id": self.uuid(),
+                    "isbn": f"{BENCH_ISBN_PREFIX}{n:09d}",
+                    "title": title,
+                    "author": chosen_authors[n],
+                    "publisher": chosen_publishers[n] if rng.random() > 0.05 else None,
+                    "publication_year": year if rng.random() > 0.08 else None,
+                    "description": f"{title}. A novel by {chosen_authors[n]}." if rng.random() > 0.3 else None,
+                    "cover_image_url": None if rng.random() < 0.25 else f"https://covers.invalid/{n}.jpg",
+                    "status": BookStatus.AVAILABLE if rng.random() > 0.01 else BookStatus.UNAVAILABLE,
+                    "shelf_location": f"{rng.choice(_SHELF_SECTIONS)}-{rng.randint(1, 60)}",
+                    "created_at": created,
+                    "updated_at": created,
+                }
+            )
+        return self.out.books
+
+    # Task helpers
+
+    def task(self, *, request_id=None, return_id=None, task_type: TaskType, created_at: datetime,
+             source: str, destination: str, meta: dict) -> dict:
+        row = {
+            "id": self.uuid(),
+            "request_id": request_id,
+            "return_id": return_id,
+            "task_type": task_type,
+            "priority": self.rng.choices(
+                (TaskPriority.NORMAL, TaskPriority.HIGH, TaskPriority.LOW, TaskPriority.URGENT),
+                weights=(85, 8, 5, 2),
+            )[0],
+            "status": TaskStatus.PENDING,
+            "source_location": source,
+            "destination_location": destination,
+            "created_at": created_at,
+            "started_at": None,
+            "completed_at": None,
+            "task_metadata": meta,
+        }
+        self.out.tasks.append(row)
+        return row
+
+    def transition(self, task: dict, new_status: TaskStatus, at: datetime, by, reason: str | None) -> None:
+        self.out.history.append(
+            {
+                "id": self.uuid(),
+                "task_id": task["id"],
+                "old_status": task["status"] if task.get("_started") else None,
+                "new_status": new_status,
+                "changed_by": by,
+                "changed_at": at,
+                "reason": reason,
+            }
+        )
+        task["_started"] = True
+        task["status"] = new_status
+        if new_status == TaskStatus.IN_PROGRESS:
+            task["started_at"] = at
+        if new_status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
+            task["completed_at"] = at
+
+    def minutes(self, lo: float, hi: float) -> timedelta:
+        return timedelta(minutes=self.rng.uniform(lo, hi))
+
+    # Graphs
+
+    def request_graph(self, student, book: dict, staff: list, requested_at: datetime) -> bool:
+        """One request; True if the book ended up with the student (delivered and confirmed)."""
+        rng = self.rng
+        librarian = rng.choice(staff)
+        req = {
+            "id": self.uuid(),
+            "user_id": student,
+            "book_id": book["id"],
+            "request_location": rng.choice(_LOCATIONS),
+            "status": RequestStatus.PENDING,
+            "requested_at": requested_at,
+            "approved_at": None,
+            "in_progress_at": None,
+            "completed_at": None,
+            "student_confirmed_at": None,
+            "auto_closed_without_confirm_at": None,
+            "notes": None,
+        }
+        self.out.requests.append(req)
+        age = self.cfg.anchor - requested_at
+        stop, in_flight = rng.random(), age < IN_FLIGHT_WINDOW
+        if in_flight and stop < 0.03:
+            return False
+        if rng.random() < 0.03:
+            req["status"] = RequestStatus.CANCELLED
+            req["completed_at"] = requested_at + self.minutes(1, 120)
+            return False
+        t = requested_at + self.minutes(2, 90)
+        req["status"], req["approved_at"] = RequestStatus.APPROVED, t
+        if in_flight and stop < 0.08:
+            return False
+        if rng.random() < 0.01:
+            req["status"] = RequestStatus.CANCELLED
+            req["completed_at"] = t + self.minutes(1, 60)
+            return False
+
+        t += self.minutes(1, 30)
+        task = self.task(
+            request_id=req["id"],
+            task_type=TaskType.STUDENT_DELIVERY,
+            created_at=t,
+            source=book["shelf_location"] or "Stacks",
+            destination=req["request_location"],
+            meta={"book_placed": False},
+        )
+        self.transition(task, TaskStatus.PENDING, t, librarian, "task_created")
+        req["status"], req["in_progress_at"] = RequestStatus.IN_PROGRESS, t
+        if in_flight and stop < 0.11:
+            return False
+        t += self.minutes(2, 45)
+        task["task_metadata"] = {"book_placed": True, "book_placed_at": t.isoformat()}
+        self.transition(task, TaskStatus.QUEUED, t, librarian, "book_placed")
+        if in_flight and stop < 0.13:
+            return False
+        t += self.minutes(1, 20)
+        self.transition(task, TaskStatus.IN_PROGRESS, t, None, "robot_dispatched")
+        if in_flight and stop < 0.14:
+            return False
+        t += self.minutes(3, 12)
+        if rng.random() < 0.02:
+            self.transition(task, TaskStatus.FAILED, t, None, "navigation_failed")
+            req["status"], req["completed_at"] = RequestStatus.CANCELLED, t
+            return False
+        self.transition(task, TaskStatus.COMPLETED, t, None, "completed_ok")
+        if in_flight and stop < 0.15:
+            return False
+        if rng.random() < 0.07:
+            req["status"] = RequestStatus.COMPLETED
+            req["completed_at"] = req["auto_closed_without_confirm_at"] = t + timedelta(minutes=5)
+            return False
+        confirmed = t + self.minutes(0.2, 4.5)
+        req["status"] = RequestStatus.COMPLETED
+        req["completed_at"] = req["student_confirmed_at"] = confirmed
+        return True
+
+    def return_graph(self, student, book: dict, staff: list, initiated_at: datetime) -> bool:
+        """One two-leg robot return; True if the book made it back to the desk."""
+        rng = self.rng
+        librarian = rng.choice(staff)
+        ret = {
+            "id": self.uuid(),
+            "user_id": student,
+            "book_id": book["id"],
+            "pickup_location": rng.choice(_LOCATIONS),
+            "status": ReturnStatus.PENDING,
+            "initiated_at": initiated_at,
+            "picked_up_at": None,
+            "completed_at": None,
+            "student_confirmed_at": None,
+            "auto_closed_without_confirm_at": None,
+            "student_book_loaded_at": None,
+            "admin_receipt_confirmed_at": None,
+        }
+        self.out.returns.append(ret)
+        age = self.cfg.anchor - initiated_at
+        stop, in_flight = rng.random(), age < IN_FLIGHT_WINDOW
+        if in_flight and stop < 0.03:
+            return False
+        if rng.random() < 0.02:
+            ret["status"], ret["completed_at"] = ReturnStatus.CANCELLED, initiated_at + self.minutes(1, 120)
+            return False
+        t = initiated_at + self.minutes(2, 90)
+        ret["status"] = ReturnStatus.PICKUP_SCHEDULED
+        if in_flight and stop < 0.07:
+            return False
+        t += self.minutes(1, 20)
+        outbound = self.task(
+            return_id=ret["id"],
+            task_type=TaskType.RETURN_PICKUP,
+            created_at=t,
+            source=ret["pickup_location"],
+            destination="Circulation returns",
+            meta={"book_placed": False, "return_pickup_leg": "outbound"},
+        )
+        self.transition(outbound, TaskStatus.QUEUED, t, librarian, "return_task_created")
+        if in_flight and stop < 0.09:
+            return False
+        t += self.minutes(1, 15)
+        self.transition(outbound, TaskStatus.IN_PROGRESS, t, None, "robot_dispatched")
+        t += self.minutes(3, 12)
+        self.transition(outbound, TaskStatus.COMPLETED, t, None, "arrived_at_pickup")
+        ret["status"] = ReturnStatus.AWAITING_STUDENT_LOAD
+        if in_flight and stop < 0.1:
+            return False
+        if rng.random() < 0.05:
+            ret["status"] = ReturnStatus.CANCELLED
+            ret["completed_at"] = ret["auto_closed_without_confirm_at"] = t + timedelta(minutes=5)
+            return False
+        t += self.minutes(0.2, 4.5)
+        ret["student_book_loaded_at"] = ret["picked_up_at"] = t
+        ret["status"] = ReturnStatus.READY_FOR_RETURN_LEG
+        leg = self.task(
+            return_id=ret["id"],
+            task_type=TaskType.RETURN_PICKUP,
+            created_at=t,
+            source=ret["pickup_location"],
+            destination="Circulation returns",
+            meta={"book_placed": True, "return_pickup_leg": "return", "student_book_loaded_at": t.isoformat()},
+        )
+        self.transition(leg, TaskStatus.QUEUED, t, student, "return_leg_task_created")
+        if in_flight and stop < 0.11:
+            return False
+        t += self.minutes(1, 10)
+        self.transition(leg, TaskStatus.IN_PROGRESS, t, None, "robot_dispatched")
+        ret["status"] = ReturnStatus.RETURN_IN_TRANSIT
+        if in_flight and stop < 0.12:
+            return False
+        t += self.minutes(3, 12)
+        self.transition(leg, TaskStatus.COMPLETED, t, None, "completed_ok")
+        ret["status"] = ReturnStatus.AWAITING_ADMIN_CONFIRM
+        if in_flight and stop < 0.14:
+            return False
+        t += self.minutes(1, 240)
+        ret["status"] = ReturnStatus.COMPLETED
+        ret["completed_at"] = ret["admin_receipt_confirmed_at"] = t
+        read = rng.random() < 0.7
+        self.out.notifications.append(
+            {
+                "id": self.uuid(),
+                "user_id": student,
+                "notification_type": NotificationType.DELIVERY_UPDATE,
+                "title": "Return received",
+                "message": "Your book return was received at the circulation desk.",
+                "payload": {"return_id": str(ret["id"]), "book_id": str(book["id"])},
+                "is_read": read,
+                "created_at": t,
+                "read_at": t + self.minutes(5, 600) if read else None,
+            }
+        )
+        return True
+
+    def run(self) -> Generated:
+        rng = self.rng
+        students, staff = self.users()
+        books = self.books()
+        circulating = [b for b in books if b["status"] == BookStatus.AVAILABLE]
+        book_weights = self.zipf_weights(len(circulating), s=0.8)
+        student_weights = self.zipf_weights(len(students), s=0.6)
+        span = timedelta(days=self.cfg.history_days).total_seconds()
+        # Chronological, so a book is only requested again once it has come back.
+        starts = sorted(rng.random() * span for _ in range(self.cfg.requests))
+        picks = rng.choices(range(len(circulating)), weights=book_weights, k=self.cfg.requests)
+        borrowers = rng.choices(students, weights=student_weights, k=self.cfg.requests)
+        on_loan: dict[int, datetime] = {}
+        origin = self.cfg.anchor - timedelta(days=self.cfg.history_days)
+        for offset, idx, student in zip(starts, picks, borrowers):
+            requested_at = origin + timedelta(seconds=offset)
+            # Popular title out on loan: the student settles for another book, if one is free.
+            for _ in range(5):
+                if on_loan.get(idx, requested_at) <= requested_at:
+                    break
+                idx = rng.randrange(len(circulating))
+            else:
+                continue
+            on_loan.pop(idx, None)
+            book = circulating[idx]
+            if not self.request_graph(student, book, staff, requested_at):
+                continue
+            book["status"] = BookStatus.CHECKED_OUT
+            returned_at = requested_at + timedelta(days=rng.uniform(3, 28))
+            if returned_at >= self.cfg.anchor:
+                on_loan[idx] = self.cfg.anchor + timedelta(days=1)
+                continue
+            if rng.random() >= self.cfg.return_rate:
+                # Handed back at the desk: no return row, the copy is simply available again.
+                book["status"] = BookStatus.AVAILABLE
+                on_loan[idx] = returned_at
+                continue
+            if self.return_graph(student, book, staff, returned_at):
+                book["status"] = BookStatus.AVAILABLE
+                on_loan[idx] = returned_at + timedelta(days=1)
+            else:
+                on_loan[idx] = self.cfg.anchor + timedelta(days=1)
+        for task in self.out.tasks:
+            task.pop("_started", None)
+        return self.out
+
+
+def generate(cfg: GenConfig) -> Generated:
+    return _Generator(cfg).run()
+
+
+def write(conn: Connection, data: Generated) -> dict[str, int]:
+    """COPY the generated graph in foreign-key order; returns rows written per table."""
+    counts = {}
+    for name, model, rows in (
+        ("user_profiles", UserProfile, data.users),
+        ("books", Book, data.books),
+        ("book_requests", BookRequest, data.requests),
+        ("book_returns", BookReturn, data.returns),
+        ("delivery_tasks", DeliveryTask, data.tasks),
+        ("task_status_history", TaskStatusHistory, data.history),
+        ("notifications", Notification, data.notifications),
+    ):
+        counts[name] = copy_rows(conn, model, rows)
+    return counts
+
+
+def tagged_rows_exist(conn: Connection) -> bool:
+    users = select(UserProfile.id).where(UserProfile.email.endswith(BENCH_EMAIL_DOMAIN)).limit(1)
+    books = select(Book.id).where(Book.isbn.startswith(BENCH_ISBN_PREFIX)).limit(1)
+    return conn.scalar(users) is not None or conn.scalar(books) is not None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate production-scale synthetic library data via COPY.")
+    parser.add_argument("--database-url", default=None, help="Postgres URL (default: DATABASE_URL_SYNC from .env).")
+    parser.add_argument("--reset", action="store_true", help="Delete previously generated (tagged) rows first.")
+    parser.add_argument("--books", type=int, default=GenConfig.books)
+    parser.add_argument("--students", type=int, default=GenConfig.students)
+    parser.add_argument("--librarians", type=int, default=GenConfig.librarians)
+    parser.add_argument("--requests", type=int, default=GenConfig.requests, help="Book requests (fewer when every pick is out on loan).")
+    parser.add_argument("--return-rate", type=float, default=GenConfig.return_rate)
+    parser.add_argument("--history-days", type=int, default=GenConfig.history_days)
+    parser.add_argument("--seed", type=int, default=GenConfig.seed)
+    parser.add_argument(
+        "--anchor",
+        type=date.fromisoformat,
+        default=None,
+        help="End of the generated history (YYYY-MM-DD, default today). Fix it for byte-identical reruns.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    from benchmarks.seed import reset
+    from shared import db as shared_db
+
+    engine = create_engine(args.database_url) if args.database_url else shared_db.engine
+
+    cfg = GenConfig(
+        books=args.books,
+        students=args.students,
+        librarians=args.librarians,
+        requests=args.requests,
+        return_rate=args.return_rate,
+        history_days=args.history_days,
+        seed=args.seed,
+    )
+    if args.anchor is not None:
+        cfg.anchor = datetime.combine(args.anchor, dt_time.min, tzinfo=timezone.utc)
+
+    if args.reset:
+        reset(engine)
+    with engine.connect() as conn:
+        if tagged_rows_exist(conn):
+            print("error: generated rows already exist; rerun with --reset", file=sys.stderr)
+            return 1
+
+    start = time.perf_counter()
+    data = generate(cfg)
+    generated_s = time.perf_counter() - start
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        counts = write(conn, data)
+    copy_s = time.perf_counter() - start
+    for table, rows in counts.items():
+        print(f"DATAGEN table={table} rows={rows}")
+    print(f"DATAGEN seed={cfg.seed} generate_s={generated_s:.1f} copy_s={copy_s:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Memory footprint and latency of the two Render layouts, on the same machine and data.
+
+  services:  one uvicorn process per service (auth, book, delivery, robot, notification), as
+             in docker/supervisord.render.conf
+  combined:  api.main (every router in one app) with --workers uvicorn workers, as in
+             docker/supervisord.render.combined.conf
+
+Each layout is started from this backend/, warmed up and driven by the same closed-loop load
+(scripts/load_test_async.py) over a mix of authenticated reads spread across the services.
+The client routes each path to its service's port directly, so neither layout pays for nginx.
+Memory is summed over the layout's whole process tree (uvicorn workers included): RSS, and PSS,
+which splits pages shared between forked workers instead of counting them once per process.
+It is sampled idle (after startup) and after the load.
+
+Auth: the default token is "stub:librarian0@bench.invalid", which needs AUTH_STUB_MODE=true and
+the bench users (benchmarks/seed.py or benchmarks/datagen.py); pass --token for real auth.
+--no-lifespan starts uvicorn with ``--lifespan off``, skipping auth's startup checks (Supabase
+settings) on a machine without them; both layouts then run the same way.
+
+Usage (from backend/; Postgres reachable via DATABASE_URL / DATABASE_URL_SYNC):
+  AUTH_STUB_MODE=true python3 benchmarks/deployment_modes.py --duration 60 --concurrency 50
+  AUTH_STUB_MODE=true python3 benchmarks/deployment_modes.py --mode combined --workers 1 --workers 2
+
+Linux only (reads /proc).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BACKEND_DIR))
+sys.path.append(str(BACKEND_DIR / "scripts"))
+
+from load_test_async import LoadResult, run_load  # noqa: E402
+
+# service -> (ASGI app, path prefixes it serves)
+SERVICES: dict[str, tuple[str, tuple[str, ...]]] = {
+    "auth": ("auth.main:app", ("/api/v1/auth",)),
+    "book": ("book.main:app", ("/api/v1/books",)),
+    "delivery": ("delivery.main:app", ("/api/v1/requests", "/api/v1/returns", "/api/v1/deliveries")),
+    "robot": ("robot.main:app", ("/api/v1/robot",)),
+    "notification": ("notification.main:app", ("/api/v1/notifications",)),
+}
+COMBINED_APP = "api.main:app"
+
+DEFAULT_PATHS = (
+    "/api/v1/auth/me",
+    "/api/v1/books/?limit=20",
+    "/api/v1/books/?q=city&limit=20",
+    "/api/v1/books/stats",
+    "/api/v1/requests/?limit=20",
+    "/api/v1/deliveries/tasks?limit=20",
+    "/api/v1/robot/dispatch/queue",
+    "/api/v1/notifications/health",
+)
+
+
+@dataclass
+class Memory:
+    processes: int = 0
+    rss_kb: int = 0
+    pss_kb: int = 0
+
+
+@dataclass
+class Layout:
+    name: str
+    # (uvicorn app, port, workers)
+    apps: list[tuple[str, int, int]]
+    route: dict[str, int] = field(default_factory=dict)  # path prefix -> port
+    procs: list[subprocess.Popen] = field(default_factory=list)
+
+    def url(self, path: str) -> str:
+        for prefix, port in self.route.items():
+            if path.startswith(prefix):
+                return f"http://127.0.0.1:{port}{path}"
+        raise ValueError(f"No service serves {path}")
+
+
+def services_layout(base_port: int) -> Layout:
+    layout = Layout("services", [])
+    for offset, (app, prefixes) in enumerate(SERVICES.values(), start=1):
+        port = base_port + offset
+        layout.apps.append((app, port, 1))
+        layout.route.update({prefix: port for prefix in prefixes})
+    return layout
+
+
+def combined_layout(base_port: int, workers: int) -> Layout:
+    port = base_port + 10
+    layout = Layout(f"combined[{workers}w]", [(COMBINED_APP, port, workers)])
+    layout.route = {prefix: port for _, prefixes in SERVICES.values() for prefix in prefixes}
+    return layout
+
+
+def start(layout: Layout, *, lifespan: bool, verbose: bool) -> None:
+    out = None if verbose else subprocess.DEVNULL
+    for app, port, workers in layout.apps:
+        cmd = [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port)]
+        if workers > 1:
+            cmd += ["--workers", str(workers)]
+        if not lifespan:
+            cmd += ["--lifespan", "off"]
+        layout.procs.append(
+            subprocess.Popen(cmd, cwd=BACKEND_DIR, stdout=out, stderr=out, env={**os.environ, "PYTHONUNBUFFERED": "1"})
+        )
+
+
+def wait_ready(layout: Layout, timeout_s: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    for _, port, _ in layout.apps:
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline or any(p.poll() is not None for p in layout.procs):
+                raise RuntimeError(f"{layout.name}: port {port} did not become healthy (rerun with --verbose)")
+            time.sleep(0.2)
+
+
+def stop(layout: Layout) -> None:
+    for proc in layout.procs:
+        proc.terminate()
+    for proc in layout.procs:
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def _children(pid: int) -> list[int]:
+    found = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            found += [int(c) for c in (task / "children").read_text().split()]
+        except OSError:
+            pass
+    return found
+
+
+def measure_memory(layout: Layout) -> Memory:
+    mem = Memory()
+    pending = [p.pid for p in layout.procs]
+    while pending:
+        pid = pending.pop()
+        pending += _children(pid)
+        try:
+            rollup = Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()
+        except OSError:
+            continue
+        mem.processes += 1
+        for line in rollup:
+            key, _, value = line.partition(":")
+            if key == "Rss":
+                mem.rss_kb += int(value.split()[0])
+            elif key == "Pss":
+                mem.pss_kb += int(value.split()[0])
+    return mem
+
+
+def _mb(kb: int) -> str:
+    return f"{kb / 1024:.1f}"
+
+
+def run_layout(layout: Layout, args: argparse.Namespace) -> tuple[Memory, Memory, LoadResult]:
+    start(layout, lifespan=not args.no_lifespan, verbose=args.verbose)
+    try:
+        wait_ready(layout)
+        time.sleep(1.0)
+        idle = measure_memory(layout)
+        result = asyncio.run(
+            run_load(
+                "",
+                [layout.url(p) for p in args.path or DEFAULT_PATHS],
+                concurrency=args.concurrency,
+                duration_s=args.duration,
+                token=args.token,
+                warmup_s=args.warmup,
+            )
+        )
+        loaded = measure_memory(layout)
+    finally:
+        stop(layout)
+    return idle, loaded, result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare the per-service and combined API layouts.")
+    parser.add_argument("--mode", choices=("services", "combined", "both"), default="both")
+    parser.add_argument(
+        "--workers", type=int, action="append", default=None, help="Combined-mode workers; repeat to sweep (default 2)."
+    )
+    parser.add_argument("--path", action="append", default=None, help="GET path (repeatable). Default: a cross-service mix.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per layout.")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before each run.")
+    parser.add_argument("--token", default=os.getenv("LUNA_LOAD_TEST_TOKEN", "stub:librarian0@bench.invalid"))
+    parser.add_argument("--base-port", type=int, default=18000, help="Services use base+1..5, combined base+10.")
+    parser.add_argument("--no-lifespan", action="store_true", help="Start uvicorn with --lifespan off.")
+    parser.add_argument("--verbose", action="store_true", help="Show the services' output.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    layouts = []
+    if args.mode in ("services", "both"):
+        layouts.append(services_layout(args.base_port))
+    if args.mode in ("combined", "both"):
+        layouts += [combined_layout(args.base_port, w) for w in args.workers or [2]]
+
+    for layout in layouts:
+        idle, loaded, r = run_layout(layout, args)
+        ok = len(r.latencies_ms)
+        print(
+            "DEPLOY_MODE "
+            f"layout={layout.name} "
+            f"processes={loaded.processes} "
+            f"idle_rss_mb={_mb(idle.rss_kb)} "
+            f"idle_pss_mb={_mb(idle.pss_kb)} "
+            f"loaded_rss_mb={_mb(loaded.rss_kb)} "
+            f"loaded_pss_mb={_mb(loaded.pss_kb)} "
+            f"concurrency={r.concurrency} "
+            f"requests={r.requests} "
+            f"errors={r.errors} "
+            f"rps={ok / r.duration_s:.1f} "
+            f"p50_ms={r.percentile(50):.1f} "
+            f"p95_ms={r.percentile(95):.1f} "
+            f"p99_ms={r.percentile(99):.1f} "
+            f"mean_ms={statistics.fmean(r.latencies_ms) if ok else 0.0:.1f}",
+            flush=True,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,263 @@
+"""
+Synthetic catalog and request history for the benchmark suite.
+
+Everything seeded here is tagged (ISBNs start with BENCH_ISBN_PREFIX, users use the
+@bench.invalid email domain; the same tags benchmarks/datagen.py uses) so it can be found
+again on the next run and removed with ``--reset`` without touching real rows. Seeding is
+additive: a run at a larger scale only COPYs in the missing rows.
+"""
+from __future__ import annotations
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.engine import Engine
+
+from benchmarks.datagen import BENCH_EMAIL_DOMAIN, BENCH_ISBN_PREFIX, copy_rows
+from shared.models import (
+    Book,
+    BookRequest,
+    BookReturn,
+    BookStatus,
+    DeliveryTask,
+    Notification,
+    RequestStatus,
+    ReturnStatus,
+    TaskPriority,
+    TaskStatus,
+    TaskStatusHistory,
+    TaskType,
+    UserProfile,
+    UserRole,
+)
+
+
+_WORDS = (
+    "river night garden stone winter light empire shadow ocean silver machine forest city "
+    "history science moon glass fire quiet letters journey secret modern theory island song"
+).split()
+_FIRST = "Ada Alan Grace Edsger Barbara Donald Margaret Ken Dennis Radia Frances John Mary".split()
+_LAST = "Lovelace Turing Hopper Dijkstra Liskov Knuth Hamilton Thompson Ritchie Perlman Allen".split()
+_PUBLISHERS = [f"{w.title()} Press" for w in _WORDS[:12]]
+_LOCATIONS = [f"Study Room {n}" for n in range(1, 21)] + [f"Desk {n}" for n in range(1, 11)]
+
+
+@dataclass
+class Scale:
+    books: int = 10_000
+    students: int = 200
+    staff: int = 5
+    requests: int = 20_000
+    returns: int = 2_000
+
+
+@dataclass
+class SeedInfo:
+    student_ids: list[uuid.UUID] = field(default_factory=list)
+    staff_ids: list[uuid.UUID] = field(default_factory=list)
+    book_ids: list[uuid.UUID] = field(default_factory=list)
+    task_ids: list[uuid.UUID] = field(default_factory=list)
+    search_terms: list[str] = field(default_factory=list)
+
+
+def _bench_users(conn, role: UserRole) -> list[uuid.UUID]:
+    return list(
+        conn.scalars(
+            select(UserProfile.id)
+            .where(UserProfile.email.endswith(BENCH_EMAIL_DOMAIN), UserProfile.role == role)
+            .order_by(UserProfile.email)
+        )
+    )
+
+
+def _seed_users(conn, role: UserRole, want: int, rng: random.Random) -> list[uuid.UUID]:
+    have = _bench_users(conn, role)
+    prefix = role.value.lower()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "email": f"{prefix}{n}{BENCH_EMAIL_DOMAIN}",
+            "first_name": rng.choice(_FIRST),
+            "last_name": rng.choice(_LAST),
+            "role": role,
+            "is_active": True,
+        }
+        for n in range(len(have), want)
+    ]
+    copy_rows(conn, UserProfile, rows)
+    return have + [r["id"] for r in rows]
+
+
+def _seed_books(conn, want: int, rng: random.Random) -> list[uuid.UUID]:
+    have = conn.scalar(
+        select(func.count()).select_from(Book).where(Book.isbn.startswith(BENCH_ISBN_PREFIX))
+    )
+    authors = [f"{first} {last}" for first in _FIRST for last in _LAST]
+    rows = []
+    for n in range(have, want):
+        title = " ".join(rng.sample(_WORDS, rng.randint(2, 4))).title()
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                "isbn": f"{BENCH_ISBN_PREFIX}{n:09d}",
+                "title": title,
+                "author": rng.choice(authors),
+                "publisher": rng.choice(_PUBLISHERS),
+                "publication_year": rng.randint(1950, 2025),
+                "description": f"A synthetic book about {title.lower()}.",
+                "cover_image_url": None if rng.random() < 0.2 else f"https://covers.invalid/{n}.jpg",
+                "status": BookStatus.AVAILABLE,
+                "shelf_location": f"{rng.choice('ABCDEFGH')}-{rng.randint(1, 40)}",
+            }
+        )
+    copy_rows(conn, Book, rows)
+    return list(
+        conn.scalars(select(Book.id).where(Book.isbn.startswith(BENCH_ISBN_PREFIX)).order_by(Book.isbn))
+    )
+
+
+def _seed_history(
+    conn,
+    *,
+    want_requests: int,
+    want_returns: int,
+    students: list[uuid.UUID],
+    staff: list[uuid.UUID],
+    books: list[uuid.UUID],
+    rng: random.Random,
+) -> None:
+    have = conn.scalar(
+        select(func.count()).select_from(BookRequest).where(BookRequest.user_id.in_(students))
+    )
+    now = datetime.now(timezone.utc)
+    requests, tasks, history = [], [], []
+    for _ in range(have, want_requests):
+        requested_at = now - timedelta(minutes=rng.randint(1, 60 * 24 * 365))
+        status = rng.choices(
+            (RequestStatus.COMPLETED, RequestStatus.CANCELLED, RequestStatus.PENDING, RequestStatus.IN_PROGRESS),
+            weights=(80, 8, 7, 5),
+        )[0]
+        request_id = uuid.uuid4()
+        requests.append(
+            {
+                "id": request_id,
+                "user_id": rng.choice(students),
+                "book_id": rng.choice(books),
+                "request_location": rng.choice(_LOCATIONS),
+                "status": status,
+                "requested_at": requested_at,
+                "approved_at": requested_at + timedelta(minutes=5) if status != RequestStatus.PENDING else None,
+                "completed_at": requested_at + timedelta(minutes=30) if status == RequestStatus.COMPLETED else None,
+            }
+        )
+        if status not in (RequestStatus.COMPLETED, RequestStatus.IN_PROGRESS):
+            continue
+        task_id = uuid.uuid4()
+        task_status = TaskStatus.COMPLETED if status == RequestStatus.COMPLETED else TaskStatus.QUEUED
+        tasks.append(
+            {
+                "id": task_id,
+                "request_id": request_id,
+                "return_id": None,
+                "task_type": TaskType.STUDENT_DELIVERY,
+                "priority": TaskPriority.NORMAL,
+                "status": task_status,
+                "source_location": "Stacks",
+                "destination_location": requests[-1]["request_location"],
+                "created_at": requested_at + timedelta(minutes=6),
+                "completed_at": requested_at + timedelta(minutes=25) if task_status == TaskStatus.COMPLETED else None,
+                "task_metadata": {"book_placed": True},
+            }
+        )
+        steps = [TaskStatus.PENDING, TaskStatus.QUEUED]
+        if task_status == TaskStatus.COMPLETED:
+            steps += [TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED]
+        for i, new_status in enumerate(steps):
+            history.append(
+                {
+                    "id": uuid.uuid4(),
+                    "task_id": task_id,
+                    "old_status": steps[i - 1] if i else None,
+                    "new_status": new_status,
+                    "changed_by": rng.choice(staff),
+                    "changed_at": requested_at + timedelta(minutes=6 + 4 * i),
+                }
+            )
+
+    have_returns = conn.scalar(
+        select(func.count()).select_from(BookReturn).where(BookReturn.user_id.in_(students))
+    )
+    returns = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": rng.choice(students),
+            "book_id": rng.choice(books),
+            "pickup_location": rng.choice(_LOCATIONS),
+            "status": rng.choice((ReturnStatus.COMPLETED, ReturnStatus.PENDING)),
+            "initiated_at": now - timedelta(minutes=rng.randint(1, 60 * 24 * 365)),
+        }
+        for _ in range(have_returns, want_returns)
+    ]
+    copy_rows(conn, BookRequest, requests)
+    copy_rows(conn, DeliveryTask, tasks)
+    copy_rows(conn, TaskStatusHistory, history)
+    copy_rows(conn, BookReturn, returns)
+
+
+def seed(engine: Engine, scale: Scale, *, rng_seed: int = 7) -> SeedInfo:
+    """Bring the tagged synthetic data up to ``scale``; returns ids the scenarios pick from."""
+    rng = random.Random(rng_seed)
+    with engine.begin() as conn:
+        students = _seed_users(conn, UserRole.STUDENT, scale.students, rng)
+        staff = _seed_users(conn, UserRole.LIBRARIAN, scale.staff, rng)
+        books = _seed_books(conn, scale.books, rng)
+        _seed_history(
+            conn,
+            want_requests=scale.requests,
+            want_returns=scale.returns,
+            students=students,
+            staff=staff,
+            books=books,
+            rng=rng,
+        )
+        task_ids = list(
+            conn.scalars(
+                select(DeliveryTask.id)
+                .join(BookRequest, BookRequest.id == DeliveryTask.request_id)
+                .where(BookRequest.user_id.in_(students))
+                .limit(1000)
+            )
+        )
+    return SeedInfo(
+        student_ids=students[: scale.students],
+        staff_ids=staff[: scale.staff],
+        book_ids=books[: scale.books],
+        task_ids=task_ids,
+        search_terms=list(_WORDS),
+    )
+
+
+def reset(engine: Engine) -> None:
+    """Delete every tagged benchmark row (children first)."""
+    with engine.begin() as conn:
+        students = select(UserProfile.id).where(UserProfile.email.endswith(BENCH_EMAIL_DOMAIN))
+        bench_books = select(Book.id).where(Book.isbn.startswith(BENCH_ISBN_PREFIX))
+        requests = select(BookRequest.id).where(
+            or_(BookRequest.user_id.in_(students), BookRequest.book_id.in_(bench_books))
+        )
+        returns = select(BookReturn.id).where(
+            or_(BookReturn.user_id.in_(students), BookReturn.book_id.in_(bench_books))
+        )
+        tasks = select(DeliveryTask.id).where(
+            or_(DeliveryTask.request_id.in_(requests), DeliveryTask.return_id.in_(returns))
+        )
+        conn.execute(delete(Notification).where(Notification.user_id.in_(students)))
+        conn.execute(delete(TaskStatusHistory).where(TaskStatusHistory.task_id.in_(tasks)))
+        conn.execute(delete(DeliveryTask).where(DeliveryTask.id.in_(tasks)))
+        conn.execute(delete(BookRequest).where(BookRequest.id.in_(requests)))
+        conn.execute(delete(BookReturn).where(BookReturn.id.in_(returns)))
+        conn.execute(delete(Book).where(Book.id.in_(bench_books)))
+        conn.execute(delete(UserProfile).where(UserProfile.id.in_(students)))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Response serialization cost for a 100-item list page: the default FastAPI path vs shared.fast_json.
+
+  default: BookResponse.model_validate(row).model_dump(mode="json") per item, the _success
+           envelope, then jsonable_encoder + json.dumps (what FastAPI does with a returned dict)
+  fast:    rows_to_dicts(rows, BookResponse) (or the service's models as-is), the envelope, then
+           FastJSONResponse (orjson)
+
+No database: rows are transient ORM objects shaped like the catalog. Both paths must produce the
+same JSON, and the script checks that before timing. The end-to-end effect is in
+run_benchmarks.py (books.list_page100, deliveries.list_page100).
+
+Usage (from backend/):
+  python3 benchmarks/serialization.py --items 100 --repeat 2000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.encoders import jsonable_encoder
+
+from book.schemas import BookResponse
+from delivery.services import task_to_response
+from shared.fast_json import FastJSONResponse, rows_to_dicts
+from shared.models import Book, BookStatus, DeliveryTask, TaskStatus, TaskType
+
+
+def _envelope(data: dict) -> dict:
+    return {"success": True, "data": data, "meta": {"timestamp": "2026-01-01T00:00:00+00:00", "request_id": "bench"}}
+
+
+def _default_render(content: dict) -> bytes:
+    # starlette.responses.JSONResponse.render after FastAPI's jsonable_encoder.
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _books(n: int) -> list[Book]:
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        Book(
+            id=uuid.UUID(int=i + 1),
+            isbn=f"978{i:010d}",
+            title=f"A Synthetic Title Number {i}",
+            author="Ursula LeGuin",
+            publisher="Harbor Press",
+            publication_year=1990 + i % 30,
+            description="A synthetic description long enough to look like a real blurb. " * 3,
+            cover_image_url=f"https://covers.invalid/{i}.jpg",
+            status=BookStatus.AVAILABLE,
+            shelf_location=f"A-{i % 40}",
+            created_at=now - timedelta(days=i),
+            updated_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def _tasks(n: int) -> list[DeliveryTask]:
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        DeliveryTask(
+            id=uuid.UUID(int=i + 1),
+            request_id=uuid.UUID(int=10_000 + i),
+            return_id=None,
+            task_type=TaskType.STUDENT_DELIVERY,
+            status=TaskStatus.QUEUED,
+            source_location="Stacks",
+            destination_location="Study Room 3",
+            created_at=now - timedelta(minutes=i),
+            started_at=None,
+            completed_at=None,
+            task_metadata={"book_placed": True, "book_placed_at": now.isoformat()},
+        )
+        for i in range(n)
+    ]
+
+
+def _time(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100, help="Items per page.")
+    parser.add_argument("--repeat", type=int, default=1000, help="Pages serialized per measurement.")
+    args = parser.parse_args()
+
+    books = _books(args.items)
+    tasks = [task_to_response(t, None) for t in _tasks(args.items)]
+    pagination = {"page": 1, "limit": args.items, "total": 10 * args.items}
+    cases = {
+        "books.list": (
+            lambda: _default_render(
+                _envelope(
+                    {
+                        "items": [BookResponse.model_validate(b).model_dump(mode="json") for b in books],
+                        "pagination": pagination,
+                    }
+                )
+            ),
+            lambda: FastJSONResponse(
+                _envelope({"items": rows_to_dicts(books, BookResponse), "pagination": pagination})
+            ).body,
+        ),
+        "deliveries.tasks": (
+            lambda: _default_render(
+                _envelope({"items": [t.model_dump(mode="json") for t in tasks], "pagination": pagination})
+            ),
+            lambda: FastJSONResponse(_envelope({"items": tasks, "pagination": pagination})).body,
+        ),
+    }
+    for name, (default, fast) in cases.items():
+        if json.loads(default()) != json.loads(fast()):
+            print(f"error: {name}: fast path output differs from the default path", file=sys.stderr)
+            return 1
+        default_us, fast_us = _time(default, args.repeat), _time(fast, args.repeat)
+        print(
+            f"SERIALIZATION case={name} items={args.items} default_us={default_us:.0f} "
+            f"fast_us={fast_us:.0f} speedup={default_us / fast_us:.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Cold-start profile of the API processes: import-time breakdown and time to first request.
+
+Import time: each app module is imported once in a fresh interpreter under ``-X importtime``.
+The self time of every imported module is summed per top-level package (fastapi, sqlalchemy,
+supabase, first-party packages, ...), so the report shows where the import phase goes.
+--modules also lists the slowest individual modules by cumulative time.
+
+Time to first request: uvicorn is started for the app and polled until ``GET /health`` answers
+(the process can serve), then until ``GET /ready`` answers 200 (startup dependencies
+connected; shared/readiness.py). Both times run from process spawn; the median of --runs
+starts is reported. --target-ms fails the run (exit 1) when the median time to /health is over
+it for any app. The target (--target-ms default) is 2500 ms on one CPU, for every app including
+the combined api.main, which imports all services. Measured on one CPU with the database up and
+Redis down:
+  book.main:  2.8 s before lazy imports, 1.7 s after
+  api.main:   2.4 s (before: no requests served until Redis answered; startup failed after 15 s)
+
+Usage (from backend/; Postgres / Redis as configured in .env):
+  python3 benchmarks/startup_profile.py
+  python3 benchmarks/startup_profile.py --app api.main:app --runs 5 --modules 15
+
+Output: STARTUP_IMPORT / STARTUP_PACKAGE / STARTUP_MODULE / STARTUP_READY lines.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+DEFAULT_APPS = (
+    "auth.main:app",
+    "book.main:app",
+    "delivery.main:app",
+    "robot.main:app",
+    "notification.main:app",
+    "api.main:app",
+)
+
+
+def import_profile(module: str) -> tuple[float, dict[str, float], list[tuple[str, float]]]:
+    """(total ms, self ms per top-level package, [(module, cumulative ms)])."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    per_package: dict[str, float] = defaultdict(float)
+    modules: list[tuple[str, float]] = []
+    total_ms = 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        per_package[name.split(".")[0]] += int(self_us) / 1000
+        modules.append((name, int(cumulative_us) / 1000))
+        if name == module:
+            total_ms = int(cumulative_us) / 1000
+    return total_ms, dict(per_package), modules
+
+
+def _wait_for(url: str, deadline: float, proc: subprocess.Popen, *, status: int = 200) -> float | None:
+    while time.perf_counter() < deadline and proc.poll() is None:
+        try:
+            if httpx.get(url, timeout=0.5).status_code == status:
+                return time.perf_counter()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def time_to_first_request(app: str, port: int, timeout_s: float) -> tuple[float | None, float | None]:
+    """(ms until /health answers, ms until /ready is 200) from process spawn; None if not reached."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    try:
+        deadline = start + timeout_s
+        served = _wait_for(f"http://127.0.0.1:{port}/health", deadline, proc)
+        ready = _wait_for(f"http://127.0.0.1:{port}/ready", deadline, proc) if served else None
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    to_ms = lambda t: round((t - start) * 1000, 1) if t is not None else None  # noqa: E731
+    return to_ms(served), to_ms(ready)
+
+
+def _median(values: list[float | None]) -> str:
+    reached = [v for v in values if v is not None]
+    if len(reached) < len(values):
+        return "timeout"
+    return f"{statistics.median(reached):.0f}"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import-time breakdown and time to first request per app.")
+    parser.add_argument("--app", action="append", default=None, help="uvicorn app (repeatable). Default: all.")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts per app (median reported).")
+    parser.add_argument("--packages", type=int, default=8, help="Top-level packages listed per app.")
+    parser.add_argument("--modules", type=int, default=0, help="Slowest modules (cumulative) listed per app.")
+    parser.add_argument("--port", type=int, default=18100)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for /health and /ready.")
+    parser.add_argument("--target-ms", type=float, default=2500.0, help="Max median time to /health.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    over_target = False
+    for app in args.app or DEFAULT_APPS:
+        module = app.partition(":")[0]
+        total_ms, per_package, modules = import_profile(module)
+        print(f"STARTUP_IMPORT app={app} import_ms={total_ms:.0f}")
+        for package, ms in sorted(per_package.items(), key=lambda kv: -kv[1])[: args.packages]:
+            print(f"STARTUP_PACKAGE app={app} package={package} self_ms={ms:.1f}")
+        for name, ms in sorted(modules, key=lambda kv: -kv[1])[: args.modules]:
+            print(f"STARTUP_MODULE app={app} module={name} cumulative_ms={ms:.1f}")
+
+        runs = [time_to_first_request(app, args.port, args.timeout) for _ in range(args.runs)]
+        served = _median([r[0] for r in runs])
+        ready = _median([r[1] for r in runs])
+        print(f"STARTUP_READY app={app} runs={args.runs} first_request_ms={served} ready_ms={ready}", flush=True)
+        if served == "timeout" or float(served) > args.target_ms:
+            over_target = True
+    return 1 if over_target else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Sustained robot telemetry load against the robot service: --robots robots each sending --hz
+heartbeat frames per second, --frames-per-request frames per POST (1 = one request per frame,
+the worst case).
+
+The robots (bench-robot-NNN) are created in ops.robots if missing. robot.main is started under
+uvicorn with a generated ROBOT_TELEMETRY_TOKEN. The load is open-loop: every robot keeps its
+schedule regardless of response times, and requests that start late count as lag. After the run
+it waits for the last flush and reports:
+- request latency
+- frames accepted, and rows actually written to robot_status_logs
+- flush count and mean flush time (from /metrics)
+- CPU used by the service process
+
+Usage (from backend/; Postgres from DATABASE_URL / DATABASE_URL_SYNC):
+  python3 benchmarks/telemetry_load.py --robots 50 --hz 10 --duration 30
+  python3 benchmarks/telemetry_load.py --frames-per-request 10
+
+Output: one TELEMETRY_LOAD line. The written bench log rows are deleted afterwards.
+
+Measured (1 CPU shared by client, service and Postgres 16; 50 robots x 10 Hz, 20 s):
+  10 frames/request  499 frames/s, p50 4.3 ms, p95 14 ms, every frame written, ~1 flush/s
+                     (mean 216 ms), service CPU 22%
+  5 frames/request   498 frames/s, p50 3.8 ms, p95 22 ms, service CPU 28%
+  1 frame/request    the load generator itself saturates the CPU at ~170 requests/s
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BACKEND_DIR))
+
+from sqlalchemy import delete, func, select  # noqa: E402
+
+from shared.db import SessionLocal  # noqa: E402
+from shared.models import Robot, RobotStatus, RobotStatusLog  # noqa: E402
+
+LOCATIONS = ("A-1", "A-2", "B-1", "B-2", "Desk 1", "Desk 2")
+
+
+def ensure_robots(count: int) -> list:
+    names = [f"bench-robot-{i:03d}" for i in range(count)]
+    with SessionLocal() as db:
+        existing = set(db.scalars(select(Robot.robot_name).where(Robot.robot_name.in_(names))).all())
+        db.add_all(Robot(robot_name=n, status=RobotStatus.IDLE, battery_level=100.0) for n in names if n not in existing)
+        db.commit()
+        return list(db.scalars(select(Robot.id).where(Robot.robot_name.in_(names)).order_by(Robot.robot_name)).all())
+
+
+def _cpu_seconds(pid: int) -> float:
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _metric(text: str, name: str) -> float:
+    total = 0.0
+    for line in text.splitlines():
+        if line.startswith(name + " ") or line.startswith(name + "{"):
+            total += float(line.rsplit(" ", 1)[1])
+    return total
+
+
+async def robot_loop(client, url, robot_index, args, deadline, latencies, lags, counters):
+    interval = args.frames_per_request / args.hz
+    # Spread robots over the first interval so they do not all fire at once.
+    next_at = time.perf_counter() + interval * robot_index / args.robots
+    battery = 100.0
+    while next_at < deadline:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            lags.append(-delay * 1000)
+        now = datetime.now(timezone.utc)
+        frames = []
+        for k in range(args.frames_per_request):
+            battery = max(5.0, battery - 0.001)
+            frames.append(
+                {
+                    "status": "BUSY",
+                    "recorded_at": (now - timedelta(seconds=(args.frames_per_request - 1 - k) / args.hz)).isoformat(),
+                    "current_location": LOCATIONS[(robot_index + k) % len(LOCATIONS)],
+                    "battery_level": round(battery, 3),
+                    "sensor_data": {"speed": 0.8, "obstacle": False},
+                }
+            )
+        start = time.perf_counter()
+        try:
+            res = await client.post(url, json={"frames": frames})
+            if res.status_code == 202:
+                counters["frames"] += len(frames)
+            else:
+                counters["errors"] += 1
+        except httpx.HTTPError:
+            counters["errors"] += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+        counters["requests"] += 1
+        next_at += interval
+
+
+async def run(args, robot_ids, base_url, token) -> tuple[list[float], list[float], dict]:
+    latencies: list[float] = []
+    lags: list[float] = []
+    counters = {"requests": 0, "frames": 0, "errors": 0}
+    limits = httpx.Limits(max_connections=args.robots, max_keepalive_connections=args.robots)
+    async with httpx.AsyncClient(headers={"X-Robot-Token": token}, limits=limits, timeout=10.0) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            *(
+                robot_loop(client, f"{base_url}/api/v1/robot/robots/{rid}/telemetry", i, args, deadline, latencies, lags, counters)
+                for i, rid in enumerate(robot_ids)
+            )
+        )
+    return latencies, lags, counters
+
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sustained robot telemetry ingestion load.")
+    parser.add_argument("--robots", type=int, default=50)
+    parser.add_argument("--hz", type=float, default=10.0, help="Frames per second per robot.")
+    parser.add_argument("--frames-per-request", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load.")
+    parser.add_argument("--port", type=int, default=18200)
+    parser.add_argument("--verbose", action="store_true", help="Show the service's output.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    robot_ids = ensure_robots(args.robots)
+    token = secrets.token_urlsafe(16)
+    base_url = f"http://127.0.0.1:{args.port}"
+    out = None if args.verbose else subprocess.DEVNULL
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "robot.main:app", "--host", "127.0.0.1", "--port", str(args.port)],
+        cwd=BACKEND_DIR,
+        stdout=out,
+        stderr=out,
+        env={**os.environ, "ROBOT_TELEMETRY_TOKEN": token, "PYTHONUNBUFFERED": "1"},
+    )
+    started = datetime.now(timezone.utc)
+    try:
+        for _ in range(300):
+            try:
+                if httpx.get(f"{base_url}/health", timeout=0.5).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        cpu_before = _cpu_seconds(proc.pid)
+        wall = time.perf_counter()
+        latencies, lags, counters = asyncio.run(run(args, robot_ids, base_url, token))
+        elapsed = time.perf_counter() - wall
+        cpu = _cpu_seconds(proc.pid) - cpu_before
+        time.sleep(2.5)  # last flush
+        metrics = httpx.get(f"{base_url}/metrics", timeout=5.0).text
+    finally:
+        proc.terminate()
+        proc.wait(timeout=15)
+
+    with SessionLocal() as db:
+        in_run = (RobotStatusLog.robot_id.in_(robot_ids), RobotStatusLog.recorded_at >= started - timedelta(seconds=60))
+        written = db.scalar(select(func.count()).select_from(RobotStatusLog).where(*in_run))
+        db.execute(delete(RobotStatusLog).where(*in_run))
+        db.commit()
+
+    flushes = _metric(metrics, "robot_telemetry_flush_duration_seconds_count")
+    flush_sum = _metric(metrics, "robot_telemetry_flush_duration_seconds_sum")
+    print(
+        "TELEMETRY_LOAD "
+        f"robots={args.robots} hz={args.hz:g} frames_per_request={args.frames_per_request} "
+        f"duration_s={elapsed:.1f} requests={counters['requests']} errors={counters['errors']} "
+        f"frames_accepted={counters['frames']} frames_per_s={counters['frames'] / elapsed:.0f} "
+        f"rows_written={written} "
+        f"p50_ms={_pct(latencies, 50):.1f} p95_ms={_pct(latencies, 95):.1f} p99_ms={_pct(latencies, 99):.1f} "
+        f"late_sends={len(lags)} max_lag_ms={max(lags, default=0.0):.0f} "
+        f"flushes={flushes:.0f} mean_flush_ms={(flush_sum / flushes * 1000) if flushes else 0.0:.1f} "
+        f"service_cpu_pct={cpu / elapsed * 100:.0f} "
+        f"mean_ms={statistics.fmean(latencies) if latencies else 0.0:.1f}",
+        flush=True,
+    )
+    return 0 if counters["errors"] == 0 and written == counters["frames"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
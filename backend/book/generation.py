@@ -0,0 +1,69 @@
+"""
+Catalog generation: a Redis counter that changes whenever the books table does.
+
+Any session commit that inserted, updated or deleted a Book (book service edits, imports, and
+the delivery service checking books out / back in) bumps it after the commit, and
+``invalidate_book_caches`` bumps it for bulk statements the session cannot see. Aggregate caches
+are keyed by it (a bump orphans them; they expire by TTL) and aggregate endpoints use it as
+their ETag, so a conditional GET can be answered without touching the database.
+
+The counter is seeded from the clock, so a Redis flush never hands out a generation that
+clients may still hold. While Redis is unavailable the generation is None: aggregate caching
+and their ETags are skipped, responses are computed in full.
+"""
+from __future__ import annotations
+
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from shared.db import RoutingSession
+from shared.models import Book
+from shared.redis_client import CACHE_PREFIX, guarded_call
+
+GENERATION_KEY = f"{CACHE_PREFIX}catalog:generation"
+_CATALOG_CHANGED = "catalog_changed"
+
+
+def _seed() -> int:
+    return int(time.time() * 1000)
+
+
+def get_catalog_generation() -> str | None:
+    def _op(r) -> str:
+        value = r.get(GENERATION_KEY)
+        if value is None:
+            r.set(GENERATION_KEY, _seed(), nx=True)
+            value = r.get(GENERATION_KEY)
+        return str(value)
+
+    return guarded_call(_op, None)
+
+
+def bump_catalog_generation() -> None:
+    def _op(r) -> None:
+        pipe = r.pipeline(transaction=False)
+        pipe.set(GENERATION_KEY, _seed(), nx=True)
+        pipe.incr(GENERATION_KEY)
+        pipe.execute()
+
+    guarded_call(_op, None)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _note_catalog_write(session: Session, _flush_context) -> None:
+    # new / dirty / deleted still describe what this flush wrote.
+    if any(isinstance(obj, Book) for objs in (session.new, session.dirty, session.deleted) for obj in objs):
+        session.info[_CATALOG_CHANGED] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _bump_after_catalog_commit(session: Session) -> None:
+    if session.info.pop(_CATALOG_CHANGED, False):
+        bump_catalog_generation()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_catalog_write(session: Session) -> None:
+    session.info.pop(_CATALOG_CHANGED, None)
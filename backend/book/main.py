@@ -5,7 +5,11 @@ Base path: /api/v1/books
 from fastapi import FastAPI
 
 from book.routes import router as book_router
+from shared.compression import add_compression
 from shared.cors import add_cors
+from shared.http_metrics import add_metrics
+from shared.readiness import add_readiness, database_check
+from shared.db_stats import add_db_debug_headers, add_db_pool_status
 
 app = FastAPI(
     title="LUNA Book Service",
@@ -14,6 +18,11 @@ app = FastAPI(
 )
 
 add_cors(app)
+add_compression(app)
+add_metrics(app)
+add_db_pool_status(app)
+add_db_debug_headers(app)
+add_readiness(app, {"database": database_check})
 
 app.include_router(book_router)
 
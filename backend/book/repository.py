@@ -7,8 +7,10 @@ from typing import Sequence
 from uuid import UUID
 
 from sqlalchemy import Select, func, or_, select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
 
+from book import generation as _generation  # noqa: F401  (registers the catalog commit hook)
 from shared.models import Book, BookRequest, BookReturn, BookStatus
 
 SORT_FIELDS = {
@@ -51,6 +53,38 @@ def _apply_filters(
     return stmt
 
 
+def _list_books_statements(
+    *,
+    page: int,
+    limit: int,
+    sort: str,
+    order: str,
+    status: BookStatus | None,
+    author: str | None,
+    publisher: str | None,
+    year: int | None,
+    q: str | None,
+    columns: Sequence[str] | None = None,
+) -> tuple[Select, Select]:
+    """(page query, count query) for the filtered catalog list.
+
+    ``columns`` limits the loaded Book attributes (sparse fieldsets); the rest stay unloaded.
+    """
+    filters = dict(status=status, author=author, publisher=publisher, year=year, q=q)
+    count_stmt = _apply_filters(select(func.count()).select_from(Book), **filters)
+    sort_column = SORT_FIELDS[sort]
+    ordered = sort_column.desc() if order == "desc" else sort_column.asc()
+    stmt = (
+        _apply_filters(select(Book), **filters)
+        .order_by(ordered)
+        .limit(limit)
+        .offset((page - 1) * limit)
+    )
+    if columns is not None:
+        stmt = stmt.options(load_only(*(getattr(Book, name) for name in columns)))
+    return stmt, count_stmt
+
+
 def list_books(
     db: Session,
     *,
@@ -63,30 +97,53 @@ def list_books(
     publisher: str | None,
     year: int | None,
     q: str | None,
+    columns: Sequence[str] | None = None,
 ) -> tuple[Sequence[Book], int]:
-    base_stmt = _apply_filters(
-        select(Book),
+    stmt, count_stmt = _list_books_statements(
+        page=page,
+        limit=limit,
+        sort=sort,
+        order=order,
         status=status,
         author=author,
         publisher=publisher,
         year=year,
         q=q,
+        columns=columns,
     )
+    total = db.scalar(count_stmt) or 0
+    items = db.scalars(stmt).all()
+    return items, total
 
-    count_stmt = _apply_filters(
-        select(func.count()).select_from(Book),
+
+async def list_books_async(
+    db: AsyncSession,
+    *,
+    page: int,
+    limit: int,
+    sort: str,
+    order: str,
+    status: BookStatus | None,
+    author: str | None,
+    publisher: str | None,
+    year: int | None,
+    q: str | None,
+    columns: Sequence[str] | None = None,
+) -> tuple[Sequence[Book], int]:
+    stmt, count_stmt = _list_books_statements(
+        page=page,
+        limit=limit,
+        sort=sort,
+        order=order,
         status=status,
         author=author,
         publisher=publisher,
         year=year,
         q=q,
+        columns=columns,
     )
-    total = db.scalar(count_stmt) or 0
-
-    sort_column = SORT_FIELDS[sort]
-    ordered = sort_column.desc() if order == "desc" else sort_column.asc()
-    stmt = base_stmt.order_by(ordered).limit(limit).offset((page - 1) * limit)
-    items = db.scalars(stmt).all()
+    total = await db.scalar(count_stmt) or 0
+    items = (await db.scalars(stmt)).all()
     return items, total
 
 
@@ -94,6 +151,10 @@ def get_book_by_id(db: Session, book_id: UUID) -> Book | None:
     return db.get(Book, book_id)
 
 
+async def get_book_by_id_async(db: AsyncSession, book_id: UUID) -> Book | None:
+    return await db.get(Book, book_id)
+
+
 def get_book_by_isbn(db: Session, isbn: str) -> Book | None:
     stmt = select(Book).where(Book.isbn == isbn)
     return db.scalar(stmt)
@@ -203,13 +264,8 @@ def get_catalog_stats(db: Session) -> dict[str, int]:
     }
 
 
-def get_related_books(
-    db: Session,
-    *,
-    book: Book,
-    limit: int,
-) -> Sequence[Book]:
-    stmt = (
+def _related_books_statement(book: Book, limit: int) -> Select:
+    return (
         select(Book)
         .where(Book.id != book.id)
         .where(
@@ -221,7 +277,24 @@ def get_related_books(
         .order_by(Book.updated_at.desc())
         .limit(limit)
     )
-    return db.scalars(stmt).all()
+
+
+def get_related_books(
+    db: Session,
+    *,
+    book: Book,
+    limit: int,
+) -> Sequence[Book]:
+    return db.scalars(_related_books_statement(book, limit)).all()
+
+
+async def get_related_books_async(
+    db: AsyncSession,
+    *,
+    book: Book,
+    limit: int,
+) -> Sequence[Book]:
+    return (await db.scalars(_related_books_statement(book, limit))).all()
 
 
 def get_random_available_books(db: Session, *, limit: int) -> Sequence[Book]:
@@ -8,9 +8,11 @@ from datetime import datetime, timezone
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
 
 from auth.schemas import UserResponse
+from book.generation import get_catalog_generation
 from book.import_openlibrary import DEFAULT_SUBJECTS
 from book.schemas import (
     AuthorCountResponse,
@@ -33,15 +35,16 @@ from book.schemas import (
     SearchSuggestionResponse,
 )
 from book.services import (
+    AuditEntry,
     BookConflictError,
     BookNotFoundError,
     BookServiceError,
     create_book,
     delete_book,
-    get_author_image_url,
+    get_author_image_urls,
     get_coverage,
     get_filter_options,
-    get_book,
+    get_book_async,
     get_book_by_isbn,
     get_book_catalog_stats,
     get_random_discovery_books,
@@ -49,10 +52,10 @@ from book.services import (
     get_top_authors,
     get_top_publication_years,
     get_top_publishers,
-    get_related_books,
+    get_related_books_async,
     import_books_from_open_library,
     invalidate_book_caches,
-    list_books,
+    list_books_async,
     log_audit_event,
     normalize_catalog_isbns,
     run_perf_baseline,
@@ -60,10 +63,35 @@ from book.services import (
     update_book_status,
 )
 from shared.auth_dependencies import RequireLibrarianOrAdmin, get_current_user_dep
+from shared.db import SessionLocal, bind_session_user, use_replica_for_reads
+from shared.fast_json import FastJSONResponse, rows_to_dicts
+from shared.fieldsets import InvalidFieldsError, parse_fields, with_required
+from shared.http_cache import etag_matches, not_modified, set_cache_headers, strong_etag
 
 router = APIRouter(prefix="/api/v1/books", tags=["books"])
 
 
+def get_db(user: UserResponse = Depends(get_current_user_dep)):
+    # One session per request; rows stay readable after the service commits, so building the
+    # response does not check out a second connection just to refresh them.
+    db = SessionLocal(expire_on_commit=False)
+    bind_session_user(db, user.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(user: UserResponse = Depends(get_current_user_dep)):
+    """Session for read-only catalog routes: served by the read replica when one is configured."""
+    db = SessionLocal(expire_on_commit=False)
+    use_replica_for_reads(db, user_id=user.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def _success(data: dict) -> dict:
     return {
         "success": True,
@@ -75,15 +103,42 @@ def _success(data: dict) -> dict:
     }
 
 
+def _fast_success(data: dict) -> FastJSONResponse:
+    """``_success`` for list pages: orjson-encoded, skipping jsonable_encoder (shared.fast_json)."""
+    return FastJSONResponse(_success(data))
+
+
+def _book_etag(book) -> str:
+    return strong_etag("book", book.id, book.updated_at.isoformat())
+
+
+def _generation_etag(generation: str | None, *parts) -> str | None:
+    """ETag for an aggregate read: changes with the catalog generation (None when Redis is down)."""
+    return strong_etag(*parts, generation) if generation is not None else None
+
+
+IfNoneMatch = Annotated[str | None, Header()]
+
+
 @router.get("/health")
 def books_health():
     return {"status": "healthy"}
 
 
 @router.get("/stats")
-def get_catalog_stats_route(_user: UserResponse = Depends(get_current_user_dep)):
-    stats = get_book_catalog_stats()
+def get_catalog_stats_route(
+    response: Response,
+    if_none_match: IfNoneMatch = None,
+    _user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_read_db),
+):
+    generation = get_catalog_generation()
+    etag = _generation_etag(generation, "stats")
+    if etag is not None and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    stats = get_book_catalog_stats(db, generation=generation)
     payload = CatalogStatsResponse(**stats).model_dump(mode="json")
+    set_cache_headers(response, etag)
     return _success({"stats": payload})
 
 
@@ -91,8 +146,9 @@ def get_catalog_stats_route(_user: UserResponse = Depends(get_current_user_dep))
 def get_random_discovery_books_route(
     limit: Annotated[int, Query(ge=1, le=40)] = 12,
     _user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_read_db),
 ):
-    items = get_random_discovery_books(limit=limit)
+    items = get_random_discovery_books(db, limit=limit)
     return _success(
         {
             "items": [BookResponse.model_validate(book).model_dump(mode="json") for book in items],
@@ -103,57 +159,73 @@ def get_random_discovery_books_route(
 
 @router.get("/authors/top")
 def get_top_authors_route(
+    response: Response,
     limit: Annotated[int, Query(ge=1, le=50)] = 10,
     _user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_read_db),
 ):
-    authors_with_counts = get_top_authors(limit=limit)
+    authors_with_counts = get_top_authors(db, limit=limit, generation=get_catalog_generation())
+    images = get_author_image_urls([author for author, _ in authors_with_counts])
     items = [
         AuthorCountResponse(
             author=author,
             count=count,
-            author_image_url=get_author_image_url(author),
+            author_image_url=images.get(author),
         ).model_dump(mode="json")
         for author, count in authors_with_counts
     ]
+    set_cache_headers(response, None)
     return _success({"items": items, "count": len(items)})
 
 
 @router.get("/publishers/top")
 def get_top_publishers_route(
+    response: Response,
     limit: Annotated[int, Query(ge=1, le=50)] = 10,
     _user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_read_db),
 ):
     items = [
         PublisherCountResponse(publisher=publisher, count=count).model_dump(mode="json")
-        for publisher, count in get_top_publishers(limit=limit)
+        for publisher, count in get_top_publishers(db, limit=limit, generation=get_catalog_generation())
     ]
+    set_cache_headers(response, None)
     return _success({"items": items, "count": len(items)})
 
 
 @router.get("/years/top")
 def get_top_publication_years_route(
+    response: Response,
     limit: Annotated[int, Query(ge=1, le=50)] = 10,
     _user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_read_db),
 ):
     items = [
         PublicationYearCountResponse(year=year, count=count).model_dump(mode="json")
-        for year, count in get_top_publication_years(limit=limit)
+        for year, count in get_top_publication_years(db, limit=limit, generation=get_catalog_generation())
     ]
+    set_cache_headers(response, None)
     return _success({"items": items, "count": len(items)})
 
 
 @router.get("/discover/overview")
 def get_discovery_overview_route(
+    response: Response,
     books_limit: Annotated[int, Query(ge=1, le=40)] = 12,
     top_limit: Annotated[int, Query(ge=1, le=20)] = 5,
     _user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_read_db),
 ):
-    random_books = get_random_discovery_books(limit=books_limit)
-    top_authors = get_top_authors(limit=top_limit)
-    top_publishers = get_top_publishers(limit=top_limit)
-    top_years = get_top_publication_years(limit=top_limit)
-    stats = get_book_catalog_stats()
-
+    # One generation read for the four cached aggregates below.
+    generation = get_catalog_generation()
+    random_books = get_random_discovery_books(db, limit=books_limit)
+    top_authors = get_top_authors(db, limit=top_limit, generation=generation)
+    top_publishers = get_top_publishers(db, limit=top_limit, generation=generation)
+    top_years = get_top_publication_years(db, limit=top_limit, generation=generation)
+    stats = get_book_catalog_stats(db, generation=generation)
+    images = get_author_image_urls([author for author, _ in top_authors])
+
+    set_cache_headers(response, None)
     return _success(
         {
             "random_books": [
@@ -164,7 +236,7 @@ def get_discovery_overview_route(
                 AuthorCountResponse(
                     author=author,
                     count=count,
-                    author_image_url=get_author_image_url(author),
+                    author_image_url=images.get(author),
                 ).model_dump(mode="json")
                 for author, count in top_authors
             ],
@@ -187,30 +259,44 @@ def get_discovery_overview_route(
 
 @router.get("/search/suggestions")
 def get_search_suggestions_route(
+    response: Response,
     q: str = Query(..., min_length=1),
     limit: Annotated[int, Query(ge=1, le=25)] = 10,
     _user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_read_db),
 ):
     items = [
         SearchSuggestionResponse(label=label, type=item_type).model_dump(mode="json")
-        for label, item_type in get_search_suggestions(q=q, limit=limit)
+        for label, item_type in get_search_suggestions(db, q=q, limit=limit)
     ]
+    set_cache_headers(response, None)
     return _success({"items": items, "count": len(items)})
 
 
 @router.get("/filters/options")
 def get_filter_options_route(
+    response: Response,
     limit: Annotated[int, Query(ge=1, le=500)] = 100,
+    if_none_match: IfNoneMatch = None,
     _user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_read_db),
 ):
-    options = get_filter_options(limit=limit)
+    generation = get_catalog_generation()
+    etag = _generation_etag(generation, "filter_options", limit)
+    if etag is not None and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    options = get_filter_options(db, limit=limit, generation=generation)
     payload = FilterOptionsResponse(**options).model_dump(mode="json")
+    set_cache_headers(response, etag)
     return _success({"options": payload})
 
 
 @router.get("/coverage")
-def get_coverage_route(_user: UserResponse = Depends(get_current_user_dep)):
-    payload = CoverageResponse(**get_coverage()).model_dump(mode="json")
+def get_coverage_route(
+    _user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_read_db),
+):
+    payload = CoverageResponse(**get_coverage(db, generation=get_catalog_generation())).model_dump(mode="json")
     return _success({"coverage": payload})
 
 
@@ -219,17 +305,16 @@ def normalize_isbns_route(
     dry_run: bool = True,
     limit: Annotated[int, Query(ge=1, le=20000)] = 5000,
     user: UserResponse = RequireLibrarianOrAdmin,
+    db: Session = Depends(get_db),
 ):
-    result = normalize_catalog_isbns(dry_run=dry_run, limit=limit)
+    result = normalize_catalog_isbns(
+        db,
+        dry_run=dry_run,
+        limit=limit,
+        audit=AuditEntry(actor_user_id=user.id, action="book.normalize_isbns", resource_type="book_catalog"),
+    )
     if not dry_run and result.get("updated", 0) > 0:
         invalidate_book_caches()
-    log_audit_event(
-        actor_user_id=user.id,
-        action="book.normalize_isbns",
-        resource_type="book_catalog",
-        resource_id=None,
-        changes=result,
-    )
     payload = IsbnNormalizationResponse(**result).model_dump(mode="json")
     return _success({"normalization": payload})
 
@@ -239,14 +324,15 @@ def perf_baseline_route(
     iterations: Annotated[int, Query(ge=1, le=30)] = 5,
     limit: Annotated[int, Query(ge=1, le=100)] = 20,
     _user: UserResponse = RequireLibrarianOrAdmin,
+    db: Session = Depends(get_db),
 ):
-    result = run_perf_baseline(iterations=iterations, limit=limit)
+    result = run_perf_baseline(db, iterations=iterations, limit=limit)
     payload = PerfBaselineResponse(**result.__dict__).model_dump(mode="json")
     return _success({"perf": payload})
 
 
 @router.get("/")
-def list_books_route(
+async def list_books_route(
     page: Annotated[int, Query(ge=1)] = 1,
     limit: Annotated[int, Query(ge=1, le=100)] = 20,
     sort: Annotated[str, Query()] = "title",
@@ -256,9 +342,15 @@ def list_books_route(
     publisher: str | None = None,
     year: int | None = None,
     q: str | None = None,
+    fields: Annotated[
+        str | None,
+        Query(description="Comma-separated item fields to return (default: all), e.g. id,title,status."),
+    ] = None,
+    if_none_match: IfNoneMatch = None,
     _user: UserResponse = Depends(get_current_user_dep),
 ):
     try:
+        item_fields = parse_fields(fields, BookResponse)
         parsed = BookListQuery(
             page=page,
             limit=limit,
@@ -270,7 +362,8 @@ def list_books_route(
             year=year,
             q=q,
         )
-        result = list_books(
+        result = await list_books_async(
+            user_id=_user.id,
             page=parsed.page,
             limit=parsed.limit,
             sort=parsed.sort,
@@ -280,11 +373,24 @@ def list_books_route(
             publisher=parsed.publisher,
             year=parsed.year,
             q=parsed.q,
+            # id and updated_at are always loaded: the ETag is built from them.
+            columns=with_required(item_fields, ("id", "updated_at")),
+        )
+        # The page is fully described by its rows' versions, the fieldset and the pagination numbers.
+        etag = strong_etag(
+            "books",
+            parsed.page,
+            parsed.limit,
+            ",".join(item_fields or ()),
+            result.total,
+            *(f"{b.id}@{b.updated_at.isoformat()}" for b in result.items),
         )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
         total_pages = (result.total + parsed.limit - 1) // parsed.limit if result.total else 0
-        return _success(
+        res = _fast_success(
             {
-                "items": [BookResponse.model_validate(b).model_dump(mode="json") for b in result.items],
+                "items": rows_to_dicts(result.items, BookResponse, item_fields),
                 "pagination": PaginationResponse(
                     page=parsed.page,
                     limit=parsed.limit,
@@ -293,14 +399,25 @@ def list_books_route(
                 ).model_dump(mode="json"),
             }
         )
-    except BookServiceError as e:
+        set_cache_headers(res, etag)
+        return res
+    except (BookServiceError, InvalidFieldsError) as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get("/{book_id}")
-def get_book_route(book_id: UUID, _user: UserResponse = Depends(get_current_user_dep)):
+async def get_book_route(
+    book_id: UUID,
+    response: Response,
+    if_none_match: IfNoneMatch = None,
+    _user: UserResponse = Depends(get_current_user_dep),
+):
     try:
-        book = get_book(book_id)
+        book = await get_book_async(book_id)
+        etag = _book_etag(book)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
         return _success({"book": BookResponse.model_validate(book).model_dump(mode="json")})
     except BookNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -309,29 +426,33 @@ def get_book_route(book_id: UUID, _user: UserResponse = Depends(get_current_user
 @router.get("/isbn/{isbn}")
 def get_book_by_isbn_route(
     isbn: str,
+    response: Response,
+    if_none_match: IfNoneMatch = None,
     _user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_db),
 ):
     try:
-        book = get_book_by_isbn(isbn)
+        book = get_book_by_isbn(db, isbn)
+        etag = _book_etag(book)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
         return _success({"book": BookResponse.model_validate(book).model_dump(mode="json")})
     except BookNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
 @router.get("/{book_id}/related")
-def get_related_books_route(
+async def get_related_books_route(
     book_id: UUID,
     limit: Annotated[int, Query(ge=1, le=20)] = 10,
     _user: UserResponse = Depends(get_current_user_dep),
 ):
     try:
-        items = get_related_books(book_id=book_id, limit=limit)
-        return _success(
+        items = await get_related_books_async(book_id=book_id, limit=limit)
+        return _fast_success(
             {
-                "items": [
-                    BookResponse.model_validate(book).model_dump(mode="json")
-                    for book in items
-                ],
+                "items": rows_to_dicts(items, BookResponse),
                 "count": len(items),
             }
         )
@@ -343,17 +464,20 @@ def get_related_books_route(
 def create_book_route(
     req: BookCreateRequest,
     user: UserResponse = RequireLibrarianOrAdmin,
+    db: Session = Depends(get_db),
 ):
     try:
-        book = create_book(**req.model_dump())
-        invalidate_book_caches()
-        log_audit_event(
-            actor_user_id=user.id,
-            action="book.create",
-            resource_type="book",
-            resource_id=book.id,
-            changes=req.model_dump(mode="json"),
+        book = create_book(
+            db,
+            **req.model_dump(),
+            audit=AuditEntry(
+                actor_user_id=user.id,
+                action="book.create",
+                resource_type="book",
+                changes=req.model_dump(mode="json"),
+            ),
         )
+        invalidate_book_caches()
         return _success({"book": BookResponse.model_validate(book).model_dump(mode="json")})
     except BookConflictError as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
@@ -366,17 +490,21 @@ def update_book_route(
     book_id: UUID,
     req: BookUpdateRequest,
     user: UserResponse = RequireLibrarianOrAdmin,
+    db: Session = Depends(get_db),
 ):
     try:
-        book = update_book(book_id=book_id, **req.model_dump())
-        invalidate_book_caches()
-        log_audit_event(
-            actor_user_id=user.id,
-            action="book.update",
-            resource_type="book",
-            resource_id=book.id,
-            changes=req.model_dump(mode="json"),
+        book = update_book(
+            db,
+            book_id=book_id,
+            **req.model_dump(),
+            audit=AuditEntry(
+                actor_user_id=user.id,
+                action="book.update",
+                resource_type="book",
+                changes=req.model_dump(mode="json"),
+            ),
         )
+        invalidate_book_caches()
         return _success({"book": BookResponse.model_validate(book).model_dump(mode="json")})
     except BookNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -391,34 +519,44 @@ def update_book_status_route(
     book_id: UUID,
     req: BookStatusUpdateRequest,
     user: UserResponse = RequireLibrarianOrAdmin,
+    db: Session = Depends(get_db),
 ):
     try:
-        book = update_book_status(book_id=book_id, status=req.status)
-        invalidate_book_caches()
-        log_audit_event(
-            actor_user_id=user.id,
-            action="book.update_status",
-            resource_type="book",
-            resource_id=book.id,
-            changes={"status": req.status.value},
+        book = update_book_status(
+            db,
+            book_id=book_id,
+            status=req.status,
+            audit=AuditEntry(
+                actor_user_id=user.id,
+                action="book.update_status",
+                resource_type="book",
+                changes={"status": req.status.value},
+            ),
         )
+        invalidate_book_caches()
         return _success({"book": BookResponse.model_validate(book).model_dump(mode="json")})
     except BookNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
 @router.delete("/{book_id}")
-def delete_book_route(book_id: UUID, user: UserResponse = RequireLibrarianOrAdmin):
+def delete_book_route(
+    book_id: UUID,
+    user: UserResponse = RequireLibrarianOrAdmin,
+    db: Session = Depends(get_db),
+):
     try:
-        delete_book(book_id=book_id)
-        invalidate_book_caches()
-        log_audit_event(
-            actor_user_id=user.id,
-            action="book.delete",
-            resource_type="book",
-            resource_id=book_id,
-            changes={"deleted": True},
+        delete_book(
+            db,
+            book_id=book_id,
+            audit=AuditEntry(
+                actor_user_id=user.id,
+                action="book.delete",
+                resource_type="book",
+                changes={"deleted": True},
+            ),
         )
+        invalidate_book_caches()
         return _success({"message": "Book deleted"})
     except BookNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -1,22 +1,30 @@
 """
 Business logic layer for Book Service.
+
+Sync functions run on the caller's request-scoped Session (book.routes.get_db); write
+functions commit it, together with their audit row.
 """
 from __future__ import annotations
 
 import json
 import logging
 import time
-from dataclasses import dataclass
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
 from datetime import datetime
 from urllib.parse import urlencode
 from urllib.request import urlopen
 from uuid import UUID
 
-from shared.db import SessionLocal
+from sqlalchemy.orm import Session
+
+from shared.audit_writer import enqueue_audit
+from shared.db import AsyncSessionLocal, use_replica_for_reads_async
 from shared.models import AuditLog, Book, BookStatus
-from shared.redis_client import cache_delete_prefix, cache_get, cache_set
+from shared.redis_client import cache_get, cache_mget, cache_mset, cache_set
 
 from book import repository
+from book.generation import bump_catalog_generation
 from book.import_openlibrary import (
     DEFAULT_SUBJECTS,
     ImportStats,
@@ -47,6 +55,17 @@ class BookListResult:
     limit: int
 
 
+@dataclass
+class AuditEntry:
+    """Audit row to write in the same transaction as the change it describes."""
+
+    actor_user_id: UUID | None
+    action: str
+    resource_type: str
+    changes: dict | None = None
+    ip_address: str | None = None
+
+
 @dataclass
 class PerfBaselineResult:
     iterations: int
@@ -57,8 +76,12 @@ class PerfBaselineResult:
     p95_ms: float
 
 
-def _book_cache_get(key: str):
-    raw = cache_get(f"book:{key}")
+def _book_cache_get(generation: str | None, key: str):
+    # Keyed by catalog generation: any catalog write orphans every cached aggregate. Callers read
+    # the generation once per request (book.generation.get_catalog_generation) and pass it in.
+    if generation is None:
+        return None
+    raw = cache_get(f"book:{generation}:{key}")
     if not raw:
         return None
     try:
@@ -67,21 +90,38 @@ def _book_cache_get(key: str):
         return None
 
 
-def _book_cache_set(key: str, value, ttl_seconds: int) -> None:
+def _book_cache_set(generation: str | None, key: str, value, ttl_seconds: int) -> None:
+    if generation is None:
+        return
     try:
-        cache_set(f"book:{key}", json.dumps(value), ttl_seconds)
+        cache_set(f"book:{generation}:{key}", json.dumps(value), ttl_seconds)
     except Exception:
         logger.exception("Book cache set failed for key=%s", key)
 
 
 def invalidate_book_caches() -> None:
-    """Best-effort cache invalidation for book-domain reads."""
+    """Best-effort cache invalidation for book-domain reads (bumps the catalog generation)."""
     try:
-        cache_delete_prefix("book:")
+        bump_catalog_generation()
     except Exception:
         logger.exception("Book cache invalidation failed")
 
 
+def _stage_audit(db: Session, audit: AuditEntry | None, *, resource_id: UUID | None) -> None:
+    if audit is None:
+        return
+    db.add(
+        AuditLog(
+            user_id=audit.actor_user_id,
+            action=audit.action,
+            resource_type=audit.resource_type,
+            resource_id=resource_id,
+            changes=audit.changes,
+            ip_address=audit.ip_address,
+        )
+    )
+
+
 def log_audit_event(
     *,
     actor_user_id: UUID | None,
@@ -92,32 +132,19 @@ def log_audit_event(
     ip_address: str | None = None,
 ) -> None:
     """
-    Best-effort audit logging for book-domain write/maintenance actions.
-    Failures are logged but do not fail the caller operation.
+    Audit an action whose work is not in a request transaction (e.g. the Open Library import).
+    The row is queued for the buffered writer (shared.audit_writer); nothing touches the
+    database on the caller's path. Changes made through this module's write functions pass
+    ``audit=`` instead, so the row commits with the change.
     """
-    db = SessionLocal()
-    try:
-        db.add(
-            AuditLog(
-                user_id=actor_user_id,
-                action=action,
-                resource_type=resource_type,
-                resource_id=resource_id,
-                changes=changes,
-                ip_address=ip_address,
-            )
-        )
-        db.commit()
-    except Exception:
-        db.rollback()
-        logger.exception(
-            "Audit log write failed action=%s resource_type=%s resource_id=%s",
-            action,
-            resource_type,
-            resource_id,
-        )
-    finally:
-        db.close()
+    enqueue_audit(
+        actor_user_id=actor_user_id,
+        action=action,
+        resource_type=resource_type,
+        resource_id=resource_id,
+        changes=changes,
+        ip_address=ip_address,
+    )
 
 
 def _validate_publication_year(year: int | None) -> None:
@@ -129,6 +156,7 @@ def _validate_publication_year(year: int | None) -> None:
 
 
 def list_books(
+    db: Session,
     *,
     page: int,
     limit: int,
@@ -141,9 +169,44 @@ def list_books(
     q: str | None,
 ) -> BookListResult:
     _validate_publication_year(year)
-    db = SessionLocal()
-    try:
-        items, total = repository.list_books(
+    items, total = repository.list_books(
+        db,
+        page=page,
+        limit=limit,
+        sort=sort,
+        order=order,
+        status=status,
+        author=author,
+        publisher=publisher,
+        year=year,
+        q=q,
+    )
+    return BookListResult(items=list(items), total=total, page=page, limit=limit)
+
+
+async def list_books_async(
+    *,
+    user_id: UUID | None = None,
+    page: int,
+    limit: int,
+    sort: str,
+    order: str,
+    status: BookStatus | None,
+    author: str | None,
+    publisher: str | None,
+    year: int | None,
+    q: str | None,
+    columns: Sequence[str] | None = None,
+) -> BookListResult:
+    """Same as list_books, on the asyncpg engine (the catalog list is the hottest read).
+
+    Served by the read replica when one is configured, unless ``user_id`` wrote recently.
+    ``columns`` loads only those Book attributes (``fields=`` on the list endpoint).
+    """
+    _validate_publication_year(year)
+    async with AsyncSessionLocal() as db:
+        await use_replica_for_reads_async(db, user_id=user_id)
+        items, total = await repository.list_books_async(
             db,
             page=page,
             limit=limit,
@@ -154,35 +217,35 @@ def list_books(
             publisher=publisher,
             year=year,
             q=q,
+            columns=columns,
         )
         return BookListResult(items=list(items), total=total, page=page, limit=limit)
-    finally:
-        db.close()
 
 
-def get_book(book_id: UUID):
-    db = SessionLocal()
-    try:
-        book = repository.get_book_by_id(db, book_id)
-        if not book:
-            raise BookNotFoundError("Book not found")
-        return book
-    finally:
-        db.close()
+def get_book(db: Session, book_id: UUID):
+    book = repository.get_book_by_id(db, book_id)
+    if not book:
+        raise BookNotFoundError("Book not found")
+    return book
 
 
-def get_book_by_isbn(isbn: str):
-    db = SessionLocal()
-    try:
-        book = repository.get_book_by_isbn(db, isbn)
+async def get_book_async(book_id: UUID):
+    async with AsyncSessionLocal() as db:
+        book = await repository.get_book_by_id_async(db, book_id)
         if not book:
             raise BookNotFoundError("Book not found")
         return book
-    finally:
-        db.close()
+
+
+def get_book_by_isbn(db: Session, isbn: str):
+    book = repository.get_book_by_isbn(db, isbn)
+    if not book:
+        raise BookNotFoundError("Book not found")
+    return book
 
 
 def create_book(
+    db: Session,
     *,
     isbn: str,
     title: str,
@@ -193,36 +256,32 @@ def create_book(
     cover_image_url: str | None,
     status: BookStatus,
     shelf_location: str | None,
+    audit: AuditEntry | None = None,
 ):
     _validate_publication_year(publication_year)
-    db = SessionLocal()
-    try:
-        existing = repository.get_book_by_isbn(db, isbn)
-        if existing:
-            raise BookConflictError("A book with this ISBN already exists")
-
-        book = repository.create_book(
-            db,
-            isbn=isbn,
-            title=title,
-            author=author,
-            publisher=publisher,
-            publication_year=publication_year,
-            description=description,
-            cover_image_url=cover_image_url,
-            status=status,
-            shelf_location=shelf_location,
-        )
-        db.commit()
-        return book
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+    existing = repository.get_book_by_isbn(db, isbn)
+    if existing:
+        raise BookConflictError("A book with this ISBN already exists")
+
+    book = repository.create_book(
+        db,
+        isbn=isbn,
+        title=title,
+        author=author,
+        publisher=publisher,
+        publication_year=publication_year,
+        description=description,
+        cover_image_url=cover_image_url,
+        status=status,
+        shelf_location=shelf_location,
+    )
+    _stage_audit(db, audit, resource_id=book.id)
+    db.commit()
+    return book
 
 
 def update_book(
+    db: Session,
     *,
     book_id: UUID,
     isbn: str,
@@ -234,72 +293,61 @@ def update_book(
     cover_image_url: str | None,
     status: BookStatus,
     shelf_location: str | None,
+    audit: AuditEntry | None = None,
 ):
     _validate_publication_year(publication_year)
-    db = SessionLocal()
-    try:
-        book = repository.get_book_by_id(db, book_id)
-        if not book:
-            raise BookNotFoundError("Book not found")
-
-        conflict = repository.get_book_by_isbn(db, isbn)
-        if conflict and conflict.id != book.id:
-            raise BookConflictError("A book with this ISBN already exists")
-
-        updated = repository.update_book(
-            db,
-            book=book,
-            isbn=isbn,
-            title=title,
-            author=author,
-            publisher=publisher,
-            publication_year=publication_year,
-            description=description,
-            cover_image_url=cover_image_url,
-            status=status,
-            shelf_location=shelf_location,
-        )
-        db.commit()
-        return updated
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
-
-
-def update_book_status(*, book_id: UUID, status: BookStatus):
-    db = SessionLocal()
-    try:
-        book = repository.get_book_by_id(db, book_id)
-        if not book:
-            raise BookNotFoundError("Book not found")
-        updated = repository.update_book_status(db, book=book, status=status)
-        db.commit()
-        return updated
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+    book = repository.get_book_by_id(db, book_id)
+    if not book:
+        raise BookNotFoundError("Book not found")
+
+    conflict = repository.get_book_by_isbn(db, isbn)
+    if conflict and conflict.id != book.id:
+        raise BookConflictError("A book with this ISBN already exists")
+
+    updated = repository.update_book(
+        db,
+        book=book,
+        isbn=isbn,
+        title=title,
+        author=author,
+        publisher=publisher,
+        publication_year=publication_year,
+        description=description,
+        cover_image_url=cover_image_url,
+        status=status,
+        shelf_location=shelf_location,
+    )
+    _stage_audit(db, audit, resource_id=updated.id)
+    db.commit()
+    return updated
 
 
-def delete_book(*, book_id: UUID):
-    db = SessionLocal()
-    try:
-        book = repository.get_book_by_id(db, book_id)
-        if not book:
-            raise BookNotFoundError("Book not found")
-        refs = repository.count_book_references(db, book_id=book_id)
-        if refs > 0:
-            raise BookConflictError("Book cannot be deleted because it has related requests/returns")
-        repository.delete_book(db, book=book)
-        db.commit()
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+def update_book_status(
+    db: Session,
+    *,
+    book_id: UUID,
+    status: BookStatus,
+    audit: AuditEntry | None = None,
+):
+    book = repository.get_book_by_id(db, book_id)
+    if not book:
+        raise BookNotFoundError("Book not found")
+    updated = repository.update_book_status(db, book=book, status=status)
+    _stage_audit(db, audit, resource_id=updated.id)
+    db.commit()
+    return updated
+
+
+def delete_book(db: Session, *, book_id: UUID, audit: AuditEntry | None = None) -> None:
+    book = repository.get_book_by_id(db, book_id)
+    if not book:
+        raise BookNotFoundError("Book not found")
+    refs = repository.count_book_references(db, book_id=book_id)
+    if refs > 0:
+        raise BookConflictError("Book cannot be deleted because it has related requests/returns")
+    repository.delete_book(db, book=book)
+    _stage_audit(db, audit, resource_id=book_id)
+    db.commit()
 
 
 def import_books_from_open_library(
@@ -328,36 +376,32 @@ def import_books_from_open_library(
         raise BookServiceError(f"Open Library import failed: {exc}") from exc
 
 
-def get_book_catalog_stats() -> dict[str, int]:
-    cached = _book_cache_get("catalog_stats")
+def get_book_catalog_stats(db: Session, *, generation: str | None) -> dict[str, int]:
+    cached = _book_cache_get(generation, "catalog_stats")
     if cached is not None:
         return cached
-    db = SessionLocal()
-    try:
-        value = repository.get_catalog_stats(db)
-        _book_cache_set("catalog_stats", value, ttl_seconds=120)
-        return value
-    finally:
-        db.close()
+    value = repository.get_catalog_stats(db)
+    _book_cache_set(generation, "catalog_stats", value, ttl_seconds=120)
+    return value
 
 
-def get_related_books(*, book_id: UUID, limit: int):
-    db = SessionLocal()
-    try:
-        book = repository.get_book_by_id(db, book_id)
+def get_related_books(db: Session, *, book_id: UUID, limit: int):
+    book = repository.get_book_by_id(db, book_id)
+    if not book:
+        raise BookNotFoundError("Book not found")
+    return list(repository.get_related_books(db, book=book, limit=limit))
+
+
+async def get_related_books_async(*, book_id: UUID, limit: int):
+    async with AsyncSessionLocal() as db:
+        book = await repository.get_book_by_id_async(db, book_id)
         if not book:
             raise BookNotFoundError("Book not found")
-        return list(repository.get_related_books(db, book=book, limit=limit))
-    finally:
-        db.close()
+        return list(await repository.get_related_books_async(db, book=book, limit=limit))
 
 
-def get_random_discovery_books(*, limit: int):
-    db = SessionLocal()
-    try:
-        return list(repository.get_random_available_books(db, limit=limit))
-    finally:
-        db.close()
+def get_random_discovery_books(db: Session, *, limit: int):
+    return list(repository.get_random_available_books(db, limit=limit))
 
 
 OPEN_LIBRARY_AUTHOR_SEARCH = "https://openlibrary.org/search/authors.json"
@@ -365,15 +409,12 @@ OPEN_LIBRARY_AUTHOR_IMAGE_BASE = "https://covers.openlibrary.org/a/olid"
 AUTHOR_IMAGE_CACHE_TTL = 7 * 24 * 3600  # 7 days
 
 
-def get_author_image_url(author_name: str) -> str | None:
-    """Resolve Open Library author photo URL by name. Cached in Redis. Returns None on miss or error."""
-    if not (author_name or "").strip():
-        return None
-    key_normalized = author_name.strip().lower()[:100].replace(" ", "_")
-    cache_key = f"author_img:{key_normalized}"
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached if cached else None
+def _author_image_cache_key(author_name: str) -> str:
+    return f"author_img:{author_name.strip().lower()[:100].replace(' ', '_')}"
+
+
+def _lookup_author_image(author_name: str) -> tuple[str, int]:
+    """Open Library lookup: (image URL or "" for none, TTL to cache the answer for)."""
     try:
         q = urlencode({"q": author_name.strip(), "limit": 1})
         url = f"{OPEN_LIBRARY_AUTHOR_SEARCH}?{q}"
@@ -381,98 +422,105 @@ def get_author_image_url(author_name: str) -> str | None:
             data = json.loads(resp.read().decode("utf-8"))
         docs = data.get("docs") or []
         if not docs:
-            cache_set(cache_key, "", ttl_seconds=AUTHOR_IMAGE_CACHE_TTL)
-            return None
+            return "", AUTHOR_IMAGE_CACHE_TTL
         olid = docs[0].get("key")
         if not olid or not isinstance(olid, str):
-            cache_set(cache_key, "", ttl_seconds=AUTHOR_IMAGE_CACHE_TTL)
-            return None
+            return "", AUTHOR_IMAGE_CACHE_TTL
         olid = olid.replace("/authors/", "").strip()
-        image_url = f"{OPEN_LIBRARY_AUTHOR_IMAGE_BASE}/{olid}-M.jpg"
-        cache_set(cache_key, image_url, ttl_seconds=AUTHOR_IMAGE_CACHE_TTL)
-        return image_url
+        return f"{OPEN_LIBRARY_AUTHOR_IMAGE_BASE}/{olid}-M.jpg", AUTHOR_IMAGE_CACHE_TTL
     except Exception as e:
         logger.debug("Open Library author image lookup failed for %r: %s", author_name, e)
-        cache_set(cache_key, "", ttl_seconds=3600)
+        return "", 3600
+
+
+def get_author_image_url(author_name: str) -> str | None:
+    """Resolve Open Library author photo URL by name. Cached in Redis. Returns None on miss or error."""
+    if not (author_name or "").strip():
         return None
+    cache_key = _author_image_cache_key(author_name)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached if cached else None
+    image_url, ttl = _lookup_author_image(author_name)
+    cache_set(cache_key, image_url, ttl_seconds=ttl)
+    return image_url or None
 
 
-def get_top_authors(*, limit: int) -> list[tuple[str, int]]:
+def get_author_image_urls(author_names: list[str]) -> dict[str, str | None]:
+    """
+    Batch form of get_author_image_url: one MGET for all names and one pipelined write for the
+    misses, instead of a Redis round trip per author.
+    """
+    names = [n for n in dict.fromkeys(author_names) if (n or "").strip()]
+    result: dict[str, str | None] = {n: None for n in author_names}
+    if not names:
+        return result
+    cached = cache_mget([_author_image_cache_key(n) for n in names])
+    misses: dict[int, dict[str, str]] = {}
+    for name, value in zip(names, cached):
+        if value is not None:
+            result[name] = value or None
+            continue
+        image_url, ttl = _lookup_author_image(name)
+        misses.setdefault(ttl, {})[_author_image_cache_key(name)] = image_url
+        result[name] = image_url or None
+    for ttl, values in misses.items():
+        cache_mset(values, ttl_seconds=ttl)
+    return result
+
+
+def get_top_authors(db: Session, *, limit: int, generation: str | None) -> list[tuple[str, int]]:
     cache_key = f"top_authors:{limit}"
-    cached = _book_cache_get(cache_key)
+    cached = _book_cache_get(generation, cache_key)
     if cached is not None:
         return [(item[0], int(item[1])) for item in cached]
-    db = SessionLocal()
-    try:
-        value = repository.get_top_authors(db, limit=limit)
-        _book_cache_set(cache_key, value, ttl_seconds=300)
-        return value
-    finally:
-        db.close()
+    value = repository.get_top_authors(db, limit=limit)
+    _book_cache_set(generation, cache_key, value, ttl_seconds=300)
+    return value
 
 
-def get_top_publishers(*, limit: int) -> list[tuple[str, int]]:
+def get_top_publishers(db: Session, *, limit: int, generation: str | None) -> list[tuple[str, int]]:
     cache_key = f"top_publishers:{limit}"
-    cached = _book_cache_get(cache_key)
+    cached = _book_cache_get(generation, cache_key)
     if cached is not None:
         return [(item[0], int(item[1])) for item in cached]
-    db = SessionLocal()
-    try:
-        value = repository.get_top_publishers(db, limit=limit)
-        _book_cache_set(cache_key, value, ttl_seconds=300)
-        return value
-    finally:
-        db.close()
+    value = repository.get_top_publishers(db, limit=limit)
+    _book_cache_set(generation, cache_key, value, ttl_seconds=300)
+    return value
 
 
-def get_top_publication_years(*, limit: int) -> list[tuple[int, int]]:
+def get_top_publication_years(db: Session, *, limit: int, generation: str | None) -> list[tuple[int, int]]:
     cache_key = f"top_years:{limit}"
-    cached = _book_cache_get(cache_key)
+    cached = _book_cache_get(generation, cache_key)
     if cached is not None:
         return [(int(item[0]), int(item[1])) for item in cached]
-    db = SessionLocal()
-    try:
-        value = repository.get_top_publication_years(db, limit=limit)
-        _book_cache_set(cache_key, value, ttl_seconds=300)
-        return value
-    finally:
-        db.close()
+    value = repository.get_top_publication_years(db, limit=limit)
+    _book_cache_set(generation, cache_key, value, ttl_seconds=300)
+    return value
 
 
-def get_search_suggestions(*, q: str, limit: int) -> list[tuple[str, str]]:
-    db = SessionLocal()
-    try:
-        clean_q = q.strip()
-        if not clean_q:
-            return []
-        return repository.get_search_suggestions(db, q=clean_q, limit=limit)
-    finally:
-        db.close()
+def get_search_suggestions(db: Session, *, q: str, limit: int) -> list[tuple[str, str]]:
+    clean_q = q.strip()
+    if not clean_q:
+        return []
+    return repository.get_search_suggestions(db, q=clean_q, limit=limit)
 
 
-def get_filter_options(*, limit: int) -> dict[str, list]:
+def get_filter_options(db: Session, *, limit: int, generation: str | None) -> dict[str, list]:
     cache_key = f"filter_options:{limit}"
-    cached = _book_cache_get(cache_key)
+    cached = _book_cache_get(generation, cache_key)
     if cached is not None:
         return cached
-    db = SessionLocal()
-    try:
-        value = repository.get_filter_options(db, limit=limit)
-        _book_cache_set(cache_key, value, ttl_seconds=300)
-        return value
-    finally:
-        db.close()
+    value = repository.get_filter_options(db, limit=limit)
+    _book_cache_set(generation, cache_key, value, ttl_seconds=300)
+    return value
 
 
-def get_coverage() -> dict[str, float | int]:
-    cached = _book_cache_get("coverage")
+def get_coverage(db: Session, *, generation: str | None) -> dict[str, float | int]:
+    cached = _book_cache_get(generation, "coverage")
     if cached is not None:
         return cached
-    db = SessionLocal()
-    try:
-        counts = repository.get_coverage_stats(db)
-    finally:
-        db.close()
+    counts = repository.get_coverage_stats(db)
 
     total = counts["total_books"] or 0
     if total == 0:
@@ -493,64 +541,62 @@ def get_coverage() -> dict[str, float | int]:
             (counts["with_description_count"] / total) * 100, 2
         ),
     }
-    _book_cache_set("coverage", value, ttl_seconds=120)
+    _book_cache_set(generation, "coverage", value, ttl_seconds=120)
     return value
 
 
 def normalize_catalog_isbns(
+    db: Session,
     *,
     dry_run: bool,
     limit: int,
+    audit: AuditEntry | None = None,
 ) -> dict[str, int | bool]:
-    db = SessionLocal()
+    """Normalize stored ISBNs; the audit row (changes = the result counts) commits with the fix-ups."""
     scanned = 0
     updated = 0
     skipped_invalid = 0
     skipped_conflict = 0
-    try:
-        books = db.query(Book).order_by(Book.updated_at.desc()).limit(limit).all()
-        for book in books:
-            scanned += 1
-            normalized = normalize_isbn(book.isbn)
-            if not normalized:
-                skipped_invalid += 1
-                continue
-            if normalized == book.isbn:
-                continue
-
-            conflict = repository.get_book_by_isbn(db, normalized)
-            if conflict and conflict.id != book.id:
-                skipped_conflict += 1
-                continue
-
-            if not dry_run:
-                book.isbn = normalized
-            updated += 1
+    books = db.query(Book).order_by(Book.updated_at.desc()).limit(limit).all()
+    for book in books:
+        scanned += 1
+        normalized = normalize_isbn(book.isbn)
+        if not normalized:
+            skipped_invalid += 1
+            continue
+        if normalized == book.isbn:
+            continue
+
+        conflict = repository.get_book_by_isbn(db, normalized)
+        if conflict and conflict.id != book.id:
+            skipped_conflict += 1
+            continue
 
         if not dry_run:
-            db.commit()
-    except Exception:
-        if not dry_run:
-            db.rollback()
-        raise
-    finally:
-        db.close()
+            book.isbn = normalized
+        updated += 1
 
-    return {
+    result = {
         "scanned": scanned,
         "updated": updated,
         "skipped_invalid": skipped_invalid,
         "skipped_conflict": skipped_conflict,
         "dry_run": dry_run,
     }
+    if audit is not None:
+        _stage_audit(db, replace(audit, changes=audit.changes or result), resource_id=None)
+    if not dry_run or audit is not None:
+        db.commit()
+    return result
 
 
-def run_perf_baseline(*, iterations: int, limit: int) -> PerfBaselineResult:
+def run_perf_baseline(db: Session, *, iterations: int, limit: int) -> PerfBaselineResult:
     """Measure list query latency (ms) under current dataset/indexes."""
     timings_ms: list[float] = []
     for _ in range(iterations):
         start = time.perf_counter()
         list_books(
+            db,
             page=1,
             limit=limit,
             sort="title",
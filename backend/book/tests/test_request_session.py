@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from book import services
+from shared.db_stats import _CheckoutCounterMiddleware, instrument_engine
+from shared.models import AuditLog, BookStatus
+
+
+def _counting_app() -> FastAPI:
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    instrument_engine(engine)
+    Session = sessionmaker(bind=engine)
+    app = FastAPI()
+    app.add_middleware(_CheckoutCounterMiddleware)
+
+    @app.get("/shared")
+    def shared_session():
+        db = Session()
+        try:
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 2"))
+        finally:
+            db.close()
+        return {}
+
+    @app.get("/per-call")
+    def session_per_call():
+        for stmt in ("SELECT 1", "SELECT 2"):
+            db = Session()
+            try:
+                db.execute(text(stmt))
+            finally:
+                db.close()
+        return {}
+
+    return app
+
+
+def test_checkout_header_counts_per_request():
+    client = TestClient(_counting_app())
+    assert client.get("/shared").headers["x-db-checkouts"] == "1"
+    assert client.get("/per-call").headers["x-db-checkouts"] == "2"
+
+
+def test_create_book_commits_audit_with_book(monkeypatch):
+    book_id = uuid4()
+    monkeypatch.setattr(services.repository, "get_book_by_isbn", lambda db, isbn: None)
+    monkeypatch.setattr(services.repository, "create_book", lambda db, **_: SimpleNamespace(id=book_id))
+    db = MagicMock()
+    actor = uuid4()
+
+    services.create_book(
+        db,
+        isbn="9780439554930",
+        title="T",
+        author="A",
+        publisher=None,
+        publication_year=None,
+        description=None,
+        cover_image_url=None,
+        status=BookStatus.AVAILABLE,
+        shelf_location=None,
+        audit=services.AuditEntry(actor_user_id=actor, action="book.create", resource_type="book"),
+    )
+
+    (audit_row,), _ = db.add.call_args
+    assert isinstance(audit_row, AuditLog)
+    assert audit_row.resource_id == book_id and audit_row.user_id == actor
+    db.commit.assert_called_once()
+
+
+def test_log_audit_event_is_queued_off_the_request_path(monkeypatch):
+    queued = []
+    monkeypatch.setattr(services, "enqueue_audit", lambda **row: queued.append(row))
+
+    services.log_audit_event(
+        actor_user_id=uuid4(),
+        action="book.import_open_library",
+        resource_type="book_catalog",
+        resource_id=None,
+        changes={"inserted": 3},
+    )
+
+    assert queued[0]["action"] == "book.import_open_library" and queued[0]["changes"] == {"inserted": 3}
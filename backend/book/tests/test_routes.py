@@ -6,6 +6,8 @@ import sys
 from types import SimpleNamespace
 from uuid import uuid4
 
+from unittest.mock import MagicMock
+
 from fastapi.testclient import TestClient
 
 # Ensure imports like "auth.schemas" resolve when running pytest from backend/.
@@ -13,7 +15,7 @@ sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 from auth.schemas import UserResponse, UserRole
 from book.main import app
-from book.routes import BookConflictError, BookNotFoundError
+from book.routes import BookConflictError, BookNotFoundError, get_db
 from shared.auth_dependencies import get_current_user_dep
 from shared.models import BookStatus
 
@@ -48,8 +50,13 @@ def _book_obj(**overrides):
     return SimpleNamespace(**base)
 
 
+def _mock_db_override():
+    yield MagicMock()
+
+
 def _auth_client() -> TestClient:
     app.dependency_overrides[get_current_user_dep] = lambda: _mock_user()
+    app.dependency_overrides[get_db] = _mock_db_override
     return TestClient(app)
 
 
@@ -60,11 +67,10 @@ def _clear_overrides() -> None:
 def test_list_books_success(monkeypatch):
     from book import routes as routes_module
 
-    monkeypatch.setattr(
-        routes_module,
-        "list_books",
-        lambda **_: SimpleNamespace(items=[_book_obj()], total=1, page=1, limit=20),
-    )
+    async def _list(**_):
+        return SimpleNamespace(items=[_book_obj()], total=1, page=1, limit=20)
+
+    monkeypatch.setattr(routes_module, "list_books_async", _list)
     client = _auth_client()
     try:
         res = client.get("/api/v1/books/")
@@ -80,10 +86,10 @@ def test_list_books_success(monkeypatch):
 def test_get_book_not_found(monkeypatch):
     from book import routes as routes_module
 
-    def _raise_not_found(_book_id):
+    async def _raise_not_found(_book_id):
         raise BookNotFoundError("Book not found")
 
-    monkeypatch.setattr(routes_module, "get_book", _raise_not_found)
+    monkeypatch.setattr(routes_module, "get_book_async", _raise_not_found)
     client = _auth_client()
     try:
         res = client.get(f"/api/v1/books/{uuid4()}")
@@ -92,10 +98,65 @@ def test_get_book_not_found(monkeypatch):
         _clear_overrides()
 
 
+def test_get_book_conditional_get(monkeypatch):
+    from book import routes as routes_module
+
+    book = _book_obj()
+
+    async def _get(_book_id):
+        return book
+
+    monkeypatch.setattr(routes_module, "get_book_async", _get)
+    client = _auth_client()
+    try:
+        res = client.get(f"/api/v1/books/{book.id}")
+        etag = res.headers["etag"]
+        assert res.status_code == 200 and res.headers["cache-control"] == "private, no-cache"
+
+        res = client.get(f"/api/v1/books/{book.id}", headers={"If-None-Match": f"W/{etag}"})
+        assert res.status_code == 304 and res.content == b"" and res.headers["etag"] == etag
+
+        book.updated_at = datetime.now(timezone.utc)
+        res = client.get(f"/api/v1/books/{book.id}", headers={"If-None-Match": etag})
+        assert res.status_code == 200 and res.headers["etag"] != etag
+    finally:
+        _clear_overrides()
+
+
+def test_stats_not_modified_skips_the_query(monkeypatch):
+    from book import routes as routes_module
+
+    calls = []
+    monkeypatch.setattr(routes_module, "get_catalog_generation", lambda: "7")
+    monkeypatch.setattr(
+        routes_module,
+        "get_book_catalog_stats",
+        lambda _db, generation: calls.append(1) or {
+            "total_books": 1,
+            "available_books": 1,
+            "checked_out_books": 0,
+            "reserved_books": 0,
+            "unavailable_books": 0,
+            "missing_cover_count": 0,
+            "missing_publication_year_count": 0,
+        },
+    )
+    client = _auth_client()
+    try:
+        etag = client.get("/api/v1/books/stats").headers["etag"]
+        res = client.get("/api/v1/books/stats", headers={"If-None-Match": etag})
+        assert res.status_code == 304 and len(calls) == 1
+
+        monkeypatch.setattr(routes_module, "get_catalog_generation", lambda: "8")
+        assert client.get("/api/v1/books/stats", headers={"If-None-Match": etag}).status_code == 200
+    finally:
+        _clear_overrides()
+
+
 def test_create_book_conflict(monkeypatch):
     from book import routes as routes_module
 
-    def _raise_conflict(**_kwargs):
+    def _raise_conflict(_db, **_kwargs):
         raise BookConflictError("A book with this ISBN already exists")
 
     monkeypatch.setattr(routes_module, "create_book", _raise_conflict)
@@ -126,7 +187,7 @@ def test_search_suggestions_success(monkeypatch):
     monkeypatch.setattr(
         routes_module,
         "get_search_suggestions",
-        lambda q, limit: [("Harry Potter", "title"), ("9780439554930", "isbn")],
+        lambda _db, q, limit: [("Harry Potter", "title"), ("9780439554930", "isbn")],
     )
     client = _auth_client()
     try:
@@ -141,14 +202,15 @@ def test_search_suggestions_success(monkeypatch):
 def test_discovery_overview_success(monkeypatch):
     from book import routes as routes_module
 
-    monkeypatch.setattr(routes_module, "get_random_discovery_books", lambda limit: [_book_obj()])
-    monkeypatch.setattr(routes_module, "get_top_authors", lambda limit: [("Author", 10)])
-    monkeypatch.setattr(routes_module, "get_top_publishers", lambda limit: [("Publisher", 8)])
-    monkeypatch.setattr(routes_module, "get_top_publication_years", lambda limit: [(2020, 7)])
+    monkeypatch.setattr(routes_module, "get_random_discovery_books", lambda _db, limit: [_book_obj()])
+    monkeypatch.setattr(routes_module, "get_top_authors", lambda _db, limit, generation: [("Author", 10)])
+    monkeypatch.setattr(routes_module, "get_author_image_urls", lambda names: {n: None for n in names})
+    monkeypatch.setattr(routes_module, "get_top_publishers", lambda _db, limit, generation: [("Publisher", 8)])
+    monkeypatch.setattr(routes_module, "get_top_publication_years", lambda _db, limit, generation: [(2020, 7)])
     monkeypatch.setattr(
         routes_module,
         "get_book_catalog_stats",
-        lambda: {
+        lambda _db, generation: {
             "total_books": 100,
             "available_books": 80,
             "checked_out_books": 10,
@@ -169,8 +231,88 @@ def test_discovery_overview_success(monkeypatch):
         _clear_overrides()
 
 
+def test_discovery_overview_reads_the_catalog_generation_once(monkeypatch):
+    import json
+
+    from book import routes as routes_module
+    from book import services as services_module
+
+    reads = []
+    keys = []
+    cached = {
+        "top_authors": [["Author", 10]],
+        "top_publishers": [["Publisher", 8]],
+        "top_years": [[2020, 7]],
+        "catalog_stats": {
+            "total_books": 100,
+            "available_books": 80,
+            "checked_out_books": 10,
+            "reserved_books": 5,
+            "unavailable_books": 5,
+            "missing_cover_count": 20,
+            "missing_publication_year_count": 15,
+        },
+    }
+
+    def _cache_get(key):
+        keys.append(key)
+        return json.dumps(cached[key.split(":")[2]])
+
+    monkeypatch.setattr(routes_module, "get_catalog_generation", lambda: reads.append(1) or "42")
+    monkeypatch.setattr(services_module, "cache_get", _cache_get)
+    monkeypatch.setattr(routes_module, "get_random_discovery_books", lambda _db, limit: [])
+    monkeypatch.setattr(routes_module, "get_author_image_urls", lambda names: {n: None for n in names})
+    client = _auth_client()
+    try:
+        res = client.get("/api/v1/books/discover/overview")
+        assert res.status_code == 200
+        assert res.json()["data"]["stats"]["total_books"] == 100
+        assert reads == [1]
+        assert len(keys) == 4 and all(key.startswith("book:42:") for key in keys)
+    finally:
+        _clear_overrides()
+
+
 def test_requires_auth_for_books_list():
     client = TestClient(app)
     res = client.get("/api/v1/books/")
     assert res.status_code == 401
 
+
+
+def test_aggregates_opt_into_gateway_microcache(monkeypatch):
+    from book import routes as routes_module
+
+    monkeypatch.setattr(routes_module, "get_top_authors", lambda _db, limit, generation: [("Author", 10)])
+    monkeypatch.setattr(routes_module, "get_author_image_urls", lambda names: {n: None for n in names})
+    client = _auth_client()
+    try:
+        res = client.get("/api/v1/books/authors/top")
+        assert res.status_code == 200
+        assert res.headers["x-accel-expires"] == "2"
+        assert res.headers["cache-control"] == "private, no-cache"
+    finally:
+        _clear_overrides()
+
+
+def test_list_books_sparse_fieldset(monkeypatch):
+    from book import routes as routes_module
+
+    seen = {}
+
+    async def _list(**kwargs):
+        seen.update(kwargs)
+        return SimpleNamespace(items=[_book_obj()], total=1, page=1, limit=20)
+
+    monkeypatch.setattr(routes_module, "list_books_async", _list)
+    client = _auth_client()
+    try:
+        res = client.get("/api/v1/books/?fields=title,status")
+        assert res.status_code == 200
+        assert list(res.json()["data"]["items"][0]) == ["title", "status"]
+        assert seen["columns"] == ("title", "status", "id", "updated_at")
+        assert res.headers["etag"] != client.get("/api/v1/books/").headers["etag"]
+
+        assert client.get("/api/v1/books/?fields=title,password").status_code == 400
+    finally:
+        _clear_overrides()
@@ -0,0 +1,278 @@
+"""
+Delivery task status events (push channel for task timelines).
+
+Every TaskStatusHistory row appended by delivery.services is also queued on the session (stamped
+with the row's own ``changed_at`` once it is flushed) and, once the transaction commits,
+published to Redis:
+
+- XADD to a capped stream (``TASK_EVENTS_STREAM``) so reconnecting clients can resume from the
+  last event id they saw, then
+- PUBLISH on ``TASK_EVENTS_CHANNEL`` for live fan-out.
+
+Each delivery-service process keeps a single pub/sub subscription (``TaskEventHub``) and fans
+messages out to per-connection asyncio queues, so N websocket clients cost one Redis connection.
+Publishing is best-effort and goes through the Redis circuit breaker (shared.redis_client
+.guarded_call): a Redis outage never fails, or stalls, the write that produced the event.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from auth.schemas import UserResponse, UserRole
+from shared.models import BookRequest, BookReturn, DeliveryTask, TaskStatusHistory
+from shared.redis_client import get_async_redis, guarded_call
+
+logger = logging.getLogger(__name__)
+
+TASK_EVENTS_CHANNEL = "delivery:task_events"
+TASK_EVENTS_STREAM = "delivery:task_events:log"
+TASK_EVENTS_STREAM_MAXLEN = int(os.getenv("DELIVERY_EVENTS_STREAM_MAXLEN", "10000"))
+# Upper bound on events replayed for one resume; older clients should refetch the task instead.
+TASK_EVENTS_REPLAY_LIMIT = 500
+SUBSCRIBER_QUEUE_SIZE = 256
+# How long a new subscriber waits for the process's Redis subscription to be confirmed.
+SUBSCRIBE_TIMEOUT_SECONDS = 5.0
+
+_PENDING_KEY = "delivery_task_events"
+_OWNERS_KEY = "delivery_task_owners"
+
+
+def _task_owner_id(db: Session, task: DeliveryTask) -> UUID | None:
+    """Student who owns the request/return behind the task (rows are usually already in the identity map)."""
+    if task.request_id is not None:
+        br = db.get(BookRequest, task.request_id)
+        return br.user_id if br is not None else None
+    if task.return_id is not None:
+        ret = db.get(BookReturn, task.return_id)
+        return ret.user_id if ret is not None else None
+    return None
+
+
+def queue_task_event(db: Session, task: DeliveryTask, history: TaskStatusHistory) -> None:
+    """Stage the event for a history row on the session; it is published only if the session commits."""
+    owners = db.info.setdefault(_OWNERS_KEY, {})
+    if task.id not in owners:
+        owners[task.id] = _task_owner_id(db, task)
+    owner_id = owners[task.id]
+    payload = {
+        "task_id": str(task.id),
+        "request_id": str(task.request_id) if task.request_id else None,
+        "return_id": str(task.return_id) if task.return_id else None,
+        "owner_id": str(owner_id) if owner_id else None,
+        "old_status": history.old_status.value if history.old_status is not None else None,
+        "new_status": history.new_status.value,
+        "changed_by": str(history.changed_by) if history.changed_by else None,
+        "reason": history.reason,
+        # Set from the flushed row (server default), so it matches the history clients replay.
+        "changed_at": None,
+    }
+    db.info.setdefault(_PENDING_KEY, []).append((payload, history))
+
+
+def _publish(events: list[dict[str, Any]]) -> bool:
+    def op(r) -> bool:
+        pipe = r.pipeline(transaction=False)
+        for ev in events:
+            pipe.xadd(
+                TASK_EVENTS_STREAM,
+                {"data": json.dumps(ev)},
+                maxlen=TASK_EVENTS_STREAM_MAXLEN,
+                approximate=True,
+            )
+        ids = pipe.execute()
+        pipe = r.pipeline(transaction=False)
+        for event_id, ev in zip(ids, events):
+            pipe.publish(TASK_EVENTS_CHANNEL, json.dumps({"id": event_id, "data": ev}))
+        pipe.execute()
+        return True
+
+    return guarded_call(op, False)
+
+
+def publish_task_events(events: list[dict[str, Any]]) -> None:
+    """Append events to the replay stream, then publish them (with their stream ids) for live fan-out."""
+    if events and not _publish(events):
+        logger.warning("Delivery task events not published (Redis unavailable): %d dropped", len(events))
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _stamp_pending_task_events(session: Session, _flush_context) -> None:
+    for payload, history in session.info.get(_PENDING_KEY, ()):
+        if payload["changed_at"] is None and history.changed_at is not None:
+            payload["changed_at"] = history.changed_at.isoformat()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_task_events(session: Session) -> None:
+    session.info.pop(_OWNERS_KEY, None)
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        publish_task_events([payload for payload, _history in pending])
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_task_events(session: Session) -> None:
+    session.info.pop(_OWNERS_KEY, None)
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _parse_event_id(event_id: str) -> tuple[int, int]:
+    ms, _, seq = event_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def is_valid_event_id(event_id: str) -> bool:
+    try:
+        _parse_event_id(event_id)
+    except ValueError:
+        return False
+    return True
+
+
+def event_id_after(event_id: str, last_event_id: str | None) -> bool:
+    """True if ``event_id`` is newer than ``last_event_id`` (Redis stream ids are ms-seq pairs)."""
+    if last_event_id is None:
+        return True
+    return _parse_event_id(event_id) > _parse_event_id(last_event_id)
+
+
+async def latest_task_event_id() -> str:
+    """Id of the newest event in the stream ("0-0" if empty): the resume point for a fresh subscriber."""
+    r = get_async_redis()
+    rows = await r.xrevrange(TASK_EVENTS_STREAM, count=1)
+    return rows[0][0] if rows else "0-0"
+
+
+async def replay_task_events(
+    last_event_id: str,
+    predicate: Callable[[dict[str, Any]], bool],
+) -> list[tuple[str, dict[str, Any]]]:
+    """Events after ``last_event_id`` still in the capped stream, filtered for one subscriber."""
+    r = get_async_redis()
+    rows = await r.xrange(TASK_EVENTS_STREAM, min=f"({last_event_id}", count=TASK_EVENTS_REPLAY_LIMIT)
+    out: list[tuple[str, dict[str, Any]]] = []
+    for event_id, fields in rows:
+        try:
+            data = json.loads(fields["data"])
+        except (KeyError, ValueError):
+            continue
+        if predicate(data):
+            out.append((event_id, data))
+    return out
+
+
+def task_event_filter(user: UserResponse, task_id: UUID | None = None) -> Callable[[dict[str, Any]], bool]:
+    """Students only see events for their own tasks; staff see everything (optionally one task)."""
+    wanted_task = str(task_id) if task_id is not None else None
+    owner = str(user.id) if user.role == UserRole.STUDENT else None
+
+    def _match(data: dict[str, Any]) -> bool:
+        if wanted_task is not None and data.get("task_id") != wanted_task:
+            return False
+        if owner is not None and data.get("owner_id") != owner:
+            return False
+        return True
+
+    return _match
+
+
+@dataclass(eq=False)
+class TaskEventSubscription:
+    predicate: Callable[[dict[str, Any]], bool]
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+    # Set when the subscriber fell too far behind; the connection should close so the client resumes.
+    overflowed: bool = False
+
+
+class TaskEventHub:
+    """One Redis pub/sub subscription per process, fanned out to in-process subscribers."""
+
+    def __init__(self) -> None:
+        self._subscribers: set[TaskEventSubscription] = set()
+        self._listener: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Set while the Redis SUBSCRIBE is confirmed, i.e. while published events reach dispatch().
+        self._subscribed: asyncio.Event | None = None
+
+    async def subscribe(
+        self,
+        predicate: Callable[[dict[str, Any]], bool],
+        *,
+        timeout: float = SUBSCRIBE_TIMEOUT_SECONDS,
+    ) -> TaskEventSubscription:
+        """
+        Register a subscriber and return once the Redis subscription is live, so anything
+        published after this returns is delivered to it. Raises RedisError if Redis does not
+        confirm the subscription within ``timeout``.
+        """
+        sub = TaskEventSubscription(predicate=predicate)
+        self._subscribers.add(sub)
+        loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.done() or self._loop is not loop:
+            self._loop = loop
+            self._subscribed = asyncio.Event()
+            self._listener = loop.create_task(self._listen(self._subscribed))
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout)
+        except asyncio.TimeoutError:
+            self.unsubscribe(sub)
+            raise RedisError("Delivery task event subscription is not available") from None
+        return sub
+
+    def unsubscribe(self, sub: TaskEventSubscription) -> None:
+        self._subscribers.discard(sub)
+
+    def dispatch(self, event_id: str, data: dict[str, Any]) -> None:
+        for sub in list(self._subscribers):
+            if sub.overflowed or not sub.predicate(data):
+                continue
+            try:
+                sub.queue.put_nowait((event_id, data))
+            except asyncio.QueueFull:
+                sub.overflowed = True
+
+    async def _listen(self, subscribed: asyncio.Event) -> None:
+        backoff = 0.5
+        while self._subscribers:
+            try:
+                pubsub = get_async_redis().pubsub()
+                await pubsub.subscribe(TASK_EVENTS_CHANNEL)
+                backoff = 0.5
+                try:
+                    while self._subscribers:
+                        message = await pubsub.get_message(timeout=1.0)
+                        if message is None:
+                            continue
+                        if message["type"] == "subscribe":
+                            # Redis confirmed the SUBSCRIBE: every later PUBLISH reaches this connection.
+                            subscribed.set()
+                            continue
+                        if message["type"] != "message":
+                            continue
+                        try:
+                            envelope = json.loads(message["data"])
+                            self.dispatch(envelope["id"], envelope["data"])
+                        except (KeyError, TypeError, ValueError):
+                            logger.warning("Ignoring malformed delivery task event: %r", message.get("data"))
+                finally:
+                    subscribed.clear()
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError):
+                logger.exception("Delivery task event subscription dropped; retrying in %.1fs", backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+
+
+task_event_hub = TaskEventHub()
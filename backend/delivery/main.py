@@ -2,17 +2,18 @@
 LUNA Delivery Service - FastAPI application.
 Base path: /api/v1/requests, /api/v1/returns, /api/v1/deliveries
 """
-from pathlib import Path
+from shared.env_bootstrap import load_env
 
-from dotenv import load_dotenv
-
-_env_path = Path(__file__).resolve().parent.parent / ".env"
-load_dotenv(_env_path, override=False)
+load_env()
 
 from fastapi import FastAPI
 
 from delivery.routes import deliveries_router, requests_router, returns_router
+from shared.compression import add_compression
 from shared.cors import add_cors
+from shared.http_metrics import add_metrics
+from shared.readiness import add_readiness, database_check
+from shared.db_stats import add_db_debug_headers, add_db_pool_status
 
 
 app = FastAPI(
@@ -22,6 +23,11 @@ app = FastAPI(
 )
 
 add_cors(app)
+add_compression(app)
+add_metrics(app)
+add_db_pool_status(app)
+add_db_debug_headers(app)
+add_readiness(app, {"database": database_check})
 
 app.include_router(requests_router)
 app.include_router(returns_router)
@@ -3,23 +3,38 @@ Delivery service HTTP routes (book requests + delivery tasks).
 """
 from __future__ import annotations
 
+import asyncio
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from book.schemas import BookResponse
 from delivery.schemas import (
     BookRequestCreate,
     BookRequestListResponse,
+    BookRequestResponse,
     BookReturnCreate,
     BookReturnListResponse,
+    BookReturnResponse,
     DeliveryTaskCreate,
     DeliveryTaskListResponse,
+    DeliveryTaskResponse,
     DeliveryTaskStatusUpdate,
 )
-from auth.schemas import UserResponse
+from auth.schemas import UserResponse, UserRole
+from delivery.events import (
+    event_id_after,
+    is_valid_event_id,
+    latest_task_event_id,
+    replay_task_events,
+    task_event_filter,
+    task_event_hub,
+)
 from delivery.services import (
     DeliveryError,
     approve_book_request,
@@ -39,30 +54,51 @@ from delivery.services import (
     get_book_request,
     get_book_return,
     get_delivery_task,
+    get_delivery_task_async,
     get_request_activity,
     get_return_activity,
     is_dispatchable,
     list_book_requests,
     list_book_returns,
-    list_delivery_tasks,
+    list_delivery_task_fields_async,
+    list_delivery_tasks_async,
     list_returnable_books_for_student,
+    list_task_history,
+    list_task_history_async,
     start_simulated_robot_delivery,
     task_to_response,
     update_delivery_task_status,
 )
-from shared.auth_dependencies import get_current_user_dep
-from shared.db import SessionLocal
-from shared.models import TaskStatusHistory
+from shared.auth_dependencies import get_current_user_dep, get_websocket_user
+from shared.db import AsyncSessionLocal, SessionLocal, bind_session_user, use_replica_for_reads
+from shared.fast_json import FastJSONResponse, rows_to_dicts
+from shared.fieldsets import InvalidFieldsError, parse_fields
 
 
-def get_db():
+def get_db(user: UserResponse = Depends(get_current_user_dep)):
     db = SessionLocal()
+    bind_session_user(db, user.id)
     try:
         yield db
     finally:
         db.close()
 
 
+def get_websocket_db(user: UserResponse = Depends(get_websocket_user)):
+    """``get_db`` for websocket routes: HTTP bearer auth cannot run on a websocket handshake."""
+    db = SessionLocal()
+    bind_session_user(db, user.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def _success(data: dict) -> dict:
     return {
         "success": True,
@@ -74,10 +110,37 @@ def _success(data: dict) -> dict:
     }
 
 
+def _fast_success(data: dict) -> FastJSONResponse:
+    """``_success`` for list pages: orjson-encoded, skipping jsonable_encoder (shared.fast_json)."""
+    return FastJSONResponse(_success(data))
+
+
 def _handle_delivery_error(exc: DeliveryError) -> HTTPException:
     return HTTPException(status_code=exc.status_code, detail=str(exc))
 
 
+FIELDS_DESCRIPTION = "Comma-separated item fields to return (default: all)."
+
+
+def _item_fields(raw: str | None, schema) -> tuple[str, ...] | None:
+    try:
+        return parse_fields(raw, schema)
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+
+def _sparse(items: list, fields: tuple[str, ...] | None) -> list:
+    """Response models cut down to ``fields`` (python mode; FastJSONResponse encodes the rest)."""
+    if fields is None:
+        return items
+    include = set(fields)
+    return [item.model_dump(include=include) for item in items]
+
+
+# Idle websocket connections get a ping this often (also how dead clients are noticed).
+TASK_EVENTS_HEARTBEAT_SECONDS = 25.0
+
+
 requests_router = APIRouter(prefix="/api/v1/requests", tags=["requests"])
 returns_router = APIRouter(prefix="/api/v1/returns", tags=["returns"])
 deliveries_router = APIRouter(prefix="/api/v1/deliveries", tags=["deliveries"])
@@ -113,14 +176,21 @@ def create_request(
 def list_requests(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
     user: UserResponse = Depends(get_current_user_dep),
     db: Session = Depends(get_db),
 ):
+    item_fields = _item_fields(fields, BookRequestResponse)
     try:
-        out: BookRequestListResponse = list_book_requests(db, user=user, page=page, limit=limit)
-        return _success(
+        if user.role != UserRole.STUDENT:
+            # Staff queue views tolerate replica lag; students read their own requests from the primary.
+            use_replica_for_reads(db, user_id=user.id)
+        out: BookRequestListResponse = list_book_requests(
+            db, user=user, page=page, limit=limit, fields=item_fields
+        )
+        return _fast_success(
             {
-                "items": [i.model_dump(mode="json") for i in out.items],
+                "items": _sparse(out.items, item_fields),
                 "pagination": {"page": out.page, "limit": out.limit, "total": out.total},
             }
         )
@@ -232,14 +302,18 @@ def create_return(
 def list_returns(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
     user: UserResponse = Depends(get_current_user_dep),
     db: Session = Depends(get_db),
 ):
+    item_fields = _item_fields(fields, BookReturnResponse)
     try:
-        out: BookReturnListResponse = list_book_returns(db, user=user, page=page, limit=limit)
-        return _success(
+        out: BookReturnListResponse = list_book_returns(
+            db, user=user, page=page, limit=limit, fields=item_fields
+        )
+        return _fast_success(
             {
-                "items": [i.model_dump(mode="json") for i in out.items],
+                "items": _sparse(out.items, item_fields),
                 "pagination": {"page": out.page, "limit": out.limit, "total": out.total},
             }
         )
@@ -249,15 +323,17 @@ def list_returns(
 
 @returns_router.get("/returnable-books")
 def list_returnable_books_route(
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
     user: UserResponse = Depends(get_current_user_dep),
     db: Session = Depends(get_db),
 ):
     """Checked-out titles the student received (confirmed delivery) and may start a return for."""
+    item_fields = _item_fields(fields, BookResponse)
     try:
         books = list_returnable_books_for_student(db, user=user)
-        return _success(
+        return _fast_success(
             {
-                "items": [BookResponse.model_validate(b).model_dump(mode="json") for b in books],
+                "items": rows_to_dicts(books, BookResponse, item_fields),
                 "count": len(books),
             }
         )
@@ -376,23 +452,32 @@ def post_delivery_task(
 
 
 @deliveries_router.get("/tasks")
-def get_delivery_tasks(
+async def get_delivery_tasks(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     dispatchable_only: bool = Query(
         False,
         description="If true, only return tasks that are dispatchable for robot/bridge (status and book_placed).",
     ),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
     user: UserResponse = Depends(get_current_user_dep),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
+    item_fields = _item_fields(fields, DeliveryTaskResponse)
     try:
-        out: DeliveryTaskListResponse = list_delivery_tasks(db, user=user, page=page, limit=limit)
+        if item_fields is not None and not dispatchable_only:
+            items, total = await list_delivery_task_fields_async(
+                db, user=user, fields=item_fields, page=page, limit=limit
+            )
+            return _fast_success(
+                {"items": items, "pagination": {"page": page, "limit": limit, "total": total}}
+            )
+        out: DeliveryTaskListResponse = await list_delivery_tasks_async(db, user=user, page=page, limit=limit)
         if dispatchable_only:
             dispatchable_items = [i for i in out.items if is_dispatchable(i)]  # type: ignore[arg-type]
-            return _success(
+            return _fast_success(
                 {
-                    "items": [i.model_dump(mode="json") for i in dispatchable_items],
+                    "items": _sparse(dispatchable_items, item_fields),
                     "pagination": {
                         "page": out.page,
                         "limit": out.limit,
@@ -400,9 +485,9 @@ def get_delivery_tasks(
                     },
                 }
             )
-        return _success(
+        return _fast_success(
             {
-                "items": [i.model_dump(mode="json") for i in out.items],
+                "items": out.items,
                 "pagination": {"page": out.page, "limit": out.limit, "total": out.total},
             }
         )
@@ -410,20 +495,75 @@ def get_delivery_tasks(
         raise _handle_delivery_error(e) from e
 
 
+@deliveries_router.websocket("/tasks/events")
+async def task_events_stream(
+    websocket: WebSocket,
+    task_id: uuid.UUID | None = Query(None, description="Only stream events for this task."),
+    last_event_id: str | None = Query(None, description="Resume after this event id (from a previous message)."),
+    user: UserResponse = Depends(get_websocket_user),
+    db: Session = Depends(get_websocket_db),
+):
+    """
+    Push channel for task status changes (replaces polling GET /tasks/{task_id}).
+
+    Students receive events for their own tasks, librarians/admins for all tasks. Messages are
+    {"type": "task_status", "id": <event id>, "data": {...}}; reconnect with ?last_event_id=<id>
+    to replay what was missed while disconnected.
+    """
+    if last_event_id is not None and not is_valid_event_id(last_event_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid last_event_id")
+        return
+    if task_id is not None:
+        try:
+            await run_in_threadpool(get_delivery_task, db, user=user, task_id=task_id)
+        except DeliveryError as e:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e))
+            return
+    # Authorization is the only DB work; don't hold a pooled connection for the socket lifetime.
+    db.close()
+
+    predicate = task_event_filter(user, task_id)
+    await websocket.accept()
+    sub = None
+    try:
+        # subscribe() returns once Redis confirmed the subscription; only then read the stream
+        # cursor and replay, so nothing published in between is lost.
+        sub = await task_event_hub.subscribe(predicate)
+        cursor = last_event_id or await latest_task_event_id()
+        for event_id, data in await replay_task_events(cursor, predicate):
+            await websocket.send_json({"type": "task_status", "id": event_id, "data": data})
+            cursor = event_id
+        while True:
+            if sub.overflowed and sub.queue.empty():
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Subscriber fell behind")
+                return
+            try:
+                event_id, data = await asyncio.wait_for(sub.queue.get(), timeout=TASK_EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                await websocket.send_json({"type": "ping"})
+                continue
+            if not event_id_after(event_id, cursor):
+                continue
+            await websocket.send_json({"type": "task_status", "id": event_id, "data": data})
+            cursor = event_id
+    except WebSocketDisconnect:
+        pass
+    except RedisError:
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR, reason="Event stream unavailable")
+    finally:
+        if sub is not None:
+            task_event_hub.unsubscribe(sub)
+
+
 @deliveries_router.get("/tasks/{task_id}")
-def get_task(
+async def get_task(
     task_id: uuid.UUID,
     user: UserResponse = Depends(get_current_user_dep),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        task = get_delivery_task(db, user=user, task_id=task_id)
-        hist = (
-            db.query(TaskStatusHistory)
-            .filter(TaskStatusHistory.task_id == task.id)
-            .order_by(TaskStatusHistory.changed_at.asc())
-            .all()
-        )
+        task = await get_delivery_task_async(db, user=user, task_id=task_id)
+        hist = await list_task_history_async(db, task)
         return _success({"task": task_to_response(task, hist).model_dump(mode="json")})
     except DeliveryError as e:
         raise _handle_delivery_error(e) from e
@@ -451,12 +591,7 @@ def post_simulate_robot_run(
     """Start a robot pickup+delivery run (~4 minutes), then mark the task completed."""
     try:
         task = start_simulated_robot_delivery(db, user=user, task_id=task_id)
-        hist = (
-            db.query(TaskStatusHistory)
-            .filter(TaskStatusHistory.task_id == task.id)
-            .order_by(TaskStatusHistory.changed_at.asc())
-            .all()
-        )
+        hist = list_task_history(db, task)
         return _success({"task": task_to_response(task, hist).model_dump(mode="json")})
     except DeliveryError as e:
         raise _handle_delivery_error(e) from e
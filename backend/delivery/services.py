@@ -1,15 +1,21 @@
 """Book request & delivery task persistence and state transitions."""
 from __future__ import annotations
 
+import os
 import threading
+from collections.abc import Callable, Sequence
 from datetime import datetime, timedelta, timezone
+from operator import attrgetter
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
 
 from auth.schemas import UserResponse, UserRole
 from book.repository import get_book_by_id
+from delivery.events import queue_task_event
 from delivery.schemas import (
     BookRequestListResponse,
     BookRequestResponse,
@@ -30,6 +36,8 @@ from shared.models import (
     NotificationType,
     RequestStatus,
     ReturnStatus,
+    Robot,
+    RobotStatus,
     TaskStatus,
     TaskStatusHistory,
     TaskType,
@@ -37,8 +45,9 @@ from shared.models import (
 )
 
 
-# Robot pickup + delivery duration used when starting a demo delivery run from the dashboard.
-SIMULATED_DELIVERY_SECONDS = 240
+# Robot pickup + delivery duration used when starting a demo delivery run from the dashboard
+# (load tests shorten it so students can confirm within the run).
+SIMULATED_DELIVERY_SECONDS = int(os.getenv("SIMULATED_DELIVERY_SECONDS", "240"))
 # After robot delivery completes, the student must confirm within this window or the request auto-closes.
 STUDENT_CONFIRM_MINUTES = 5
 
@@ -149,53 +158,111 @@ def _primary_return_task(db: Session, return_id: UUID) -> DeliveryTask | None:
     return tasks[0]
 
 
+def _task_meta(task: DeliveryTask) -> dict:
+    return task.task_metadata or {}
+
+
+# DeliveryTaskResponse field -> (DeliveryTask columns it reads, how it is computed); everything
+# but status_history. Sparse list pages (``fields=``) load and compute only the requested ones.
+_TASK_FIELDS: dict[str, tuple[tuple[str, ...], Callable[[DeliveryTask], Any]]] = {
+    **{
+        name: ((name,), attrgetter(name))
+        for name in (
+            "id",
+            "request_id",
+            "return_id",
+            "task_type",
+            "status",
+            "source_location",
+            "destination_location",
+            "created_at",
+            "started_at",
+            "completed_at",
+        )
+    },
+    "book_placed": (("task_metadata",), lambda t: bool(_task_meta(t).get("book_placed"))),
+    "book_placed_at": (("task_metadata",), lambda t: _metadata_datetime(_task_meta(t), "book_placed_at")),
+    "delivery_eta_at": (
+        ("task_metadata",),
+        lambda t: _metadata_datetime(_task_meta(t), "delivery_eta_at")
+        or _metadata_datetime(_task_meta(t), "simulated_eta_at"),
+    ),
+    "student_confirm_deadline_at": (
+        ("status", "completed_at", "return_id", "task_metadata"),
+        _student_confirm_deadline_at,
+    ),
+    "return_pickup_leg": (("task_metadata",), _return_pickup_leg),
+}
+
+
 def task_to_response(
     task: DeliveryTask,
     history: list[TaskStatusHistory] | None = None,
 ) -> DeliveryTaskResponse:
-    meta = task.task_metadata or {}
     hist_models = [
         TaskStatusEventResponse.model_validate(h) for h in (history or [])
     ]
     return DeliveryTaskResponse(
-        id=task.id,
-        request_id=task.request_id,
-        return_id=task.return_id,
-        task_type=task.task_type,
-        status=task.status,
-        source_location=task.source_location,
-        destination_location=task.destination_location,
-        created_at=task.created_at,
-        started_at=task.started_at,
-        completed_at=task.completed_at,
-        book_placed=bool(meta.get("book_placed")),
-        book_placed_at=_metadata_datetime(meta, "book_placed_at"),
-        delivery_eta_at=_metadata_datetime(meta, "delivery_eta_at")
-        or _metadata_datetime(meta, "simulated_eta_at"),
-        student_confirm_deadline_at=_student_confirm_deadline_at(task),
-        return_pickup_leg=_return_pickup_leg(task),
+        **{name: compute(task) for name, (_, compute) in _TASK_FIELDS.items()},
         status_history=hist_models,
     )
 
 
-def _append_task_history(
+def task_to_fields(task: DeliveryTask, fields: Sequence[str]) -> dict[str, Any]:
+    """Only ``fields`` of the task's response (list pages carry no status history)."""
+    return {name: _TASK_FIELDS[name][1](task) if name in _TASK_FIELDS else [] for name in fields}
+
+
+def _task_columns(fields: Sequence[str]) -> list:
+    names = dict.fromkeys(
+        ["id", *(column for name in fields if name in _TASK_FIELDS for column in _TASK_FIELDS[name][0])]
+    )
+    return [getattr(DeliveryTask, name) for name in names]
+
+
+def append_task_history(
     db: Session,
     *,
-    task_id: UUID,
+    task: DeliveryTask,
     old_status: TaskStatus | None,
     new_status: TaskStatus,
     changed_by: UUID | None,
     reason: str | None = None,
 ) -> None:
-    db.add(
-        TaskStatusHistory(
-            task_id=task_id,
-            old_status=old_status,
-            new_status=new_status,
-            changed_by=changed_by,
-            reason=reason,
+    """Record a task status change (history row + pushed task event). Shared with robot dispatch."""
+    history = TaskStatusHistory(
+        task_id=task.id,
+        old_status=old_status,
+        new_status=new_status,
+        changed_by=changed_by,
+        reason=reason,
+    )
+    db.add(history)
+    queue_task_event(db, task, history)
+
+
+def _release_assigned_robot(db: Session, task: DeliveryTask) -> None:
+    """The dispatched robot is done with a terminal task: back to IDLE (at the drop-off if it delivered)."""
+    if task.assigned_robot_id is None:
+        return
+    robot = db.get(Robot, task.assigned_robot_id)
+    if robot is None or robot.status != RobotStatus.BUSY:
+        return
+    # Multi-stop runs: the robot stays busy until its last active task finishes.
+    still_active = (
+        db.query(DeliveryTask.id)
+        .filter(
+            DeliveryTask.assigned_robot_id == robot.id,
+            DeliveryTask.id != task.id,
+            DeliveryTask.status.in_((TaskStatus.ASSIGNED, TaskStatus.IN_PROGRESS)),
         )
+        .first()
     )
+    if still_active is not None:
+        return
+    robot.status = RobotStatus.IDLE
+    if task.status == TaskStatus.COMPLETED and task.destination_location:
+        robot.current_location = task.destination_location
 
 
 def _apply_auto_close_if_confirm_deadline_passed(db: Session, br: BookRequest, task: DeliveryTask) -> bool:
@@ -294,14 +361,24 @@ def ensure_book_return_auto_closed_if_stale(db: Session, ret: BookReturn) -> Boo
     return ret
 
 
-def book_return_to_response(db: Session, ret: BookReturn, viewer: UserResponse) -> BookReturnResponse:
+def _wants(fields: Sequence[str] | None, *names: str) -> bool:
+    return fields is None or any(name in fields for name in names)
+
+
+def book_return_to_response(
+    db: Session, ret: BookReturn, viewer: UserResponse, fields: Sequence[str] | None = None
+) -> BookReturnResponse:
+    """Serialize a book return; enrich with student + book labels for staff views.
+
+    With ``fields`` (sparse list pages) labels outside it are not looked up.
+    """
     ret = ensure_book_return_auto_closed_if_stale(db, ret)
     base = BookReturnResponse.model_validate(ret)
     data = base.model_dump()
-    book = get_book_by_id(db, ret.book_id)
+    book = get_book_by_id(db, ret.book_id) if _wants(fields, "book_title") else None
     if book:
         data["book_title"] = book.title
-    if viewer.role != UserRole.STUDENT:
+    if viewer.role != UserRole.STUDENT and _wants(fields, "student_email", "student_display_name"):
         prof = db.get(UserProfile, ret.user_id)
         if prof:
             data["student_email"] = prof.email
@@ -309,15 +386,20 @@ def book_return_to_response(db: Session, ret: BookReturn, viewer: UserResponse)
     return BookReturnResponse(**data)
 
 
-def book_request_to_response(db: Session, br: BookRequest, viewer: UserResponse) -> BookRequestResponse:
-    """Serialize a book request; enrich with student + book labels for staff views."""
+def book_request_to_response(
+    db: Session, br: BookRequest, viewer: UserResponse, fields: Sequence[str] | None = None
+) -> BookRequestResponse:
+    """Serialize a book request; enrich with student + book labels for staff views.
+
+    With ``fields`` (sparse list pages) labels outside it are not looked up.
+    """
     br = ensure_book_request_auto_closed_if_stale(db, br)
     base = BookRequestResponse.model_validate(br)
     data = base.model_dump()
-    book = get_book_by_id(db, br.book_id)
+    book = get_book_by_id(db, br.book_id) if _wants(fields, "book_title") else None
     if book:
         data["book_title"] = book.title
-    if viewer.role != UserRole.STUDENT:
+    if viewer.role != UserRole.STUDENT and _wants(fields, "student_email", "student_display_name"):
         prof = db.get(UserProfile, br.user_id)
         if prof:
             data["student_email"] = prof.email
@@ -377,6 +459,7 @@ def list_book_requests(
     user: UserResponse,
     page: int = 1,
     limit: int = 20,
+    fields: Sequence[str] | None = None,
 ) -> BookRequestListResponse:
     limit = min(max(limit, 1), 100)
     page = max(page, 1)
@@ -394,7 +477,7 @@ def list_book_requests(
     )
 
     return BookRequestListResponse(
-        items=[book_request_to_response(db, r, user) for r in rows],
+        items=[book_request_to_response(db, r, user, fields) for r in rows],
         page=page,
         limit=limit,
         total=total,
@@ -488,9 +571,9 @@ def create_delivery_task_from_request(
     )
     db.add(task)
     db.flush()
-    _append_task_history(
+    append_task_history(
         db,
-        task_id=task.id,
+        task=task,
         old_status=None,
         new_status=TaskStatus.PENDING,
         changed_by=user.id,
@@ -523,17 +606,66 @@ def get_request_activity(
     )
     if task is None:
         return br, None
-    hist = (
-        db.query(TaskStatusHistory)
-        .filter(TaskStatusHistory.task_id == task.id)
-        .order_by(TaskStatusHistory.changed_at.asc())
-        .all()
-    )
+    hist = list_task_history(db, task)
     return br, task_to_response(task, hist)
 
 
-def list_delivery_tasks(
-    db: Session,
+def _task_owner_ref(task: DeliveryTask) -> tuple[type[BookRequest] | type[BookReturn], UUID] | None:
+    """The student-owned row a task belongs to (request or return), used for view checks."""
+    if task.request_id is not None:
+        return BookRequest, task.request_id
+    if task.return_id is not None:
+        return BookReturn, task.return_id
+    return None
+
+
+def get_delivery_task(db: Session, *, user: UserResponse, task_id: UUID) -> DeliveryTask:
+    task = db.get(DeliveryTask, task_id)
+    if task is None:
+        raise DeliveryError("Task not found.", status_code=404)
+
+    if user.role == UserRole.STUDENT:
+        ref = _task_owner_ref(task)
+        owner = db.get(*ref) if ref is not None else None
+        if owner is None or owner.user_id != user.id:
+            raise DeliveryError("Not allowed to view this task.", status_code=403)
+
+    return task
+
+
+# --- Async read paths (asyncpg) for the task list / detail endpoints the dashboard and bridge poll ---
+
+
+def _task_list_statements(*, user: UserResponse, page: int, limit: int) -> tuple[Select, Select]:
+    """(page query, count query) for the task list ``user`` may see."""
+    conds = []
+    if user.role == UserRole.STUDENT:
+        # Ownership as a subquery: one round trip instead of fetching request/return ids first.
+        # A UNION of the two joins, not OR-ed IN filters: each branch walks the student's rows
+        # through ix_delivery_tasks_{request,return}_id_created_at, where an OR can only filter
+        # a scan of every task.
+        owned = union_all(
+            select(DeliveryTask.id)
+            .join(BookRequest, DeliveryTask.request_id == BookRequest.id)
+            .where(BookRequest.user_id == user.id),
+            select(DeliveryTask.id)
+            .join(BookReturn, DeliveryTask.return_id == BookReturn.id)
+            .where(BookReturn.user_id == user.id),
+        )
+        conds.append(DeliveryTask.id.in_(owned))
+    count_stmt = select(func.count()).select_from(DeliveryTask).where(*conds)
+    stmt = (
+        select(DeliveryTask)
+        .where(*conds)
+        .order_by(DeliveryTask.created_at.desc())
+        .offset((page - 1) * limit)
+        .limit(limit)
+    )
+    return stmt, count_stmt
+
+
+async def list_delivery_tasks_async(
+    db: AsyncSession,
     *,
     user: UserResponse,
     page: int = 1,
@@ -542,31 +674,9 @@ def list_delivery_tasks(
     limit = min(max(limit, 1), 100)
     page = max(page, 1)
 
-    q = db.query(DeliveryTask)
-    if user.role == UserRole.STUDENT:
-        req_ids = [r for (r,) in db.query(BookRequest.id).filter(BookRequest.user_id == user.id).all()]
-        ret_ids = [r for (r,) in db.query(BookReturn.id).filter(BookReturn.user_id == user.id).all()]
-        if not req_ids and not ret_ids:
-            return DeliveryTaskListResponse(
-                items=[],
-                page=page,
-                limit=limit,
-                total=0,
-            )
-        conds = []
-        if req_ids:
-            conds.append(DeliveryTask.request_id.in_(req_ids))
-        if ret_ids:
-            conds.append(DeliveryTask.return_id.in_(ret_ids))
-        q = q.filter(or_(*conds))
-
-    total = q.count()
-    rows: list[DeliveryTask] = (
-        q.order_by(DeliveryTask.created_at.desc())
-        .offset((page - 1) * limit)
-        .limit(limit)
-        .all()
-    )
+    stmt, count_stmt = _task_list_statements(user=user, page=page, limit=limit)
+    total = await db.scalar(count_stmt) or 0
+    rows = (await db.scalars(stmt)).all()
 
     return DeliveryTaskListResponse(
         items=[task_to_response(t, None) for t in rows],
@@ -576,26 +686,57 @@ def list_delivery_tasks(
     )
 
 
-def get_delivery_task(db: Session, *, user: UserResponse, task_id: UUID) -> DeliveryTask:
-    task = db.get(DeliveryTask, task_id)
+async def list_delivery_task_fields_async(
+    db: AsyncSession,
+    *,
+    user: UserResponse,
+    fields: Sequence[str],
+    page: int = 1,
+    limit: int = 20,
+) -> tuple[list[dict[str, Any]], int]:
+    """The task list with only ``fields`` per item, loading only the columns they read."""
+    limit = min(max(limit, 1), 100)
+    page = max(page, 1)
+
+    stmt, count_stmt = _task_list_statements(user=user, page=page, limit=limit)
+    total = await db.scalar(count_stmt) or 0
+    rows = (await db.scalars(stmt.options(load_only(*_task_columns(fields))))).all()
+    return [task_to_fields(t, fields) for t in rows], total
+
+
+async def get_delivery_task_async(db: AsyncSession, *, user: UserResponse, task_id: UUID) -> DeliveryTask:
+    task = await db.get(DeliveryTask, task_id)
     if task is None:
         raise DeliveryError("Task not found.", status_code=404)
 
     if user.role == UserRole.STUDENT:
-        if task.request_id is not None:
-            br = db.get(BookRequest, task.request_id)
-            if br is None or br.user_id != user.id:
-                raise DeliveryError("Not allowed to view this task.", status_code=403)
-        elif task.return_id is not None:
-            ret = db.get(BookReturn, task.return_id)
-            if ret is None or ret.user_id != user.id:
-                raise DeliveryError("Not allowed to view this task.", status_code=403)
-        else:
+        ref = _task_owner_ref(task)
+        owner = await db.get(*ref) if ref is not None else None
+        if owner is None or owner.user_id != user.id:
             raise DeliveryError("Not allowed to view this task.", status_code=403)
 
     return task
 
 
+def _task_history_statement(task: DeliveryTask) -> Select:
+    # History is written at or after the task's creation. Bounding changed_at by it lets
+    # Postgres skip the monthly partitions (shared/partitions.py) from before the task existed.
+    return (
+        select(TaskStatusHistory)
+        .where(TaskStatusHistory.task_id == task.id, TaskStatusHistory.changed_at >= task.created_at)
+        .order_by(TaskStatusHistory.changed_at.asc())
+    )
+
+
+def list_task_history(db: Session, task: DeliveryTask) -> list[TaskStatusHistory]:
+    return list(db.scalars(_task_history_statement(task)).all())
+
+
+async def list_task_history_async(db: AsyncSession, task: DeliveryTask) -> list[TaskStatusHistory]:
+    rows = await db.scalars(_task_history_statement(task))
+    return list(rows.all())
+
+
 def confirm_book_placed(db: Session, *, user: UserResponse, task_id: UUID) -> DeliveryTask:
     if user.role not in (UserRole.LIBRARIAN, UserRole.ADMIN):
         raise DeliveryError("Only librarians can confirm book placement.")
@@ -621,9 +762,9 @@ def confirm_book_placed(db: Session, *, user: UserResponse, task_id: UUID) -> De
 
     if task.status == TaskStatus.PENDING:
         task.status = TaskStatus.QUEUED
-        _append_task_history(
+        append_task_history(
             db,
-            task_id=task.id,
+            task=task,
             old_status=old_status,
             new_status=TaskStatus.QUEUED,
             changed_by=user.id,
@@ -635,66 +776,85 @@ def confirm_book_placed(db: Session, *, user: UserResponse, task_id: UUID) -> De
     return task
 
 
-def update_delivery_task_status(
+_ALLOWED_NEXT_STATUS: dict[TaskStatus, set[TaskStatus]] = {
+    TaskStatus.PENDING: {TaskStatus.CANCELLED, TaskStatus.FAILED},
+    TaskStatus.QUEUED: {TaskStatus.IN_PROGRESS, TaskStatus.CANCELLED, TaskStatus.FAILED},
+    TaskStatus.ASSIGNED: {TaskStatus.IN_PROGRESS, TaskStatus.CANCELLED, TaskStatus.FAILED},
+    TaskStatus.IN_PROGRESS: {TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED},
+}
+
+
+def apply_task_status(
     db: Session,
+    task: DeliveryTask,
     *,
-    user: UserResponse,
-    task_id: UUID,
     new_status: TaskStatus,
+    changed_by: UUID | None,
     reason: str | None = None,
-) -> DeliveryTask:
+) -> bool:
     """
-    Update a delivery task status while enforcing legal transitions and recording history.
-
-    This is intended for bridge/robot and operator flows once a task is dispatchable.
+    Move ``task`` to ``new_status`` (legal transitions only) and record history, without
+    committing, so callers can change several tasks in one transaction. Returns False when the
+    task already has that status. Call ``task_status_committed`` after the commit.
     """
-    task = get_delivery_task(db, user=user, task_id=task_id)
-
     # Do not allow any changes once the task is terminal.
     if task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
         raise DeliveryError("Cannot change status of a terminal task.", status_code=400)
 
     current = task.status
-    allowed_next: dict[TaskStatus, set[TaskStatus]] = {
-        TaskStatus.PENDING: {TaskStatus.CANCELLED, TaskStatus.FAILED},
-        TaskStatus.QUEUED: {TaskStatus.IN_PROGRESS, TaskStatus.CANCELLED, TaskStatus.FAILED},
-        TaskStatus.ASSIGNED: {TaskStatus.IN_PROGRESS, TaskStatus.CANCELLED, TaskStatus.FAILED},
-        TaskStatus.IN_PROGRESS: {TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED},
-    }
-
     if new_status == current:
-        # Idempotent no-op; just refresh and return.
-        db.refresh(task)
-        return task
-
-    allowed = allowed_next.get(current, set())
-    if new_status not in allowed:
+        return False
+    if new_status not in _ALLOWED_NEXT_STATUS.get(current, set()):
         raise DeliveryError(
             f"Illegal status transition: {current.value} -> {new_status.value}", status_code=400
         )
 
-    old_status = task.status
     task.status = new_status
-
     now = datetime.now(timezone.utc)
     if new_status == TaskStatus.IN_PROGRESS and task.started_at is None:
         task.started_at = now
     if new_status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
         task.completed_at = now
+        _release_assigned_robot(db, task)
 
-    _append_task_history(
+    append_task_history(
         db,
-        task_id=task.id,
-        old_status=old_status,
+        task=task,
+        old_status=current,
         new_status=new_status,
-        changed_by=user.id,
+        changed_by=changed_by,
         reason=reason,
     )
+    return True
+
 
+def task_status_committed(task: DeliveryTask) -> None:
+    """Follow-up work once a status change from ``apply_task_status`` is committed."""
+    if task.status == TaskStatus.COMPLETED:
+        _schedule_student_confirm_deadline_timer(task.id)
+
+
+def update_delivery_task_status(
+    db: Session,
+    *,
+    user: UserResponse,
+    task_id: UUID,
+    new_status: TaskStatus,
+    reason: str | None = None,
+) -> DeliveryTask:
+    """
+    Update a delivery task status while enforcing legal transitions and recording history.
+
+    This is intended for bridge/robot and operator flows once a task is dispatchable.
+    """
+    task = get_delivery_task(db, user=user, task_id=task_id)
+    if not apply_task_status(db, task, new_status=new_status, changed_by=user.id, reason=reason):
+        # Idempotent no-op; just refresh and return.
+        db.refresh(task)
+        return task
     db.commit()
     db.refresh(task)
-    if new_status == TaskStatus.COMPLETED:
-        _schedule_student_confirm_deadline_timer(task.id)
+    task_status_committed(task)
     return task
 
 
@@ -715,9 +875,10 @@ def _complete_timed_delivery_task(task_id: UUID) -> None:
         task.status = TaskStatus.COMPLETED
         now = datetime.now(timezone.utc)
         task.completed_at = now
-        _append_task_history(
+        _release_assigned_robot(db, task)
+        append_task_history(
             db,
-            task_id=task.id,
+            task=task,
             old_status=old_status,
             new_status=TaskStatus.COMPLETED,
             changed_by=None,
@@ -803,14 +964,17 @@ def _schedule_timed_delivery_completion(task_id: UUID) -> None:
 
 
 def start_simulated_robot_delivery(db: Session, *, user: UserResponse, task_id: UUID) -> DeliveryTask:
-    """Move a queued, dispatchable task to IN_PROGRESS and complete it after SIMULATED_DELIVERY_SECONDS."""
+    """
+    Move a queued (or robot-assigned) dispatchable task to IN_PROGRESS and complete it after
+    SIMULATED_DELIVERY_SECONDS. ASSIGNED tasks were already checked by the robot dispatcher.
+    """
     if user.role not in (UserRole.LIBRARIAN, UserRole.ADMIN):
         raise DeliveryError("Only librarians can start robot delivery.")
 
     task = get_delivery_task(db, user=user, task_id=task_id)
-    if task.status != TaskStatus.QUEUED:
-        raise DeliveryError("Only queued tasks can start delivery.")
-    if not is_dispatchable(task):
+    if task.status not in (TaskStatus.QUEUED, TaskStatus.ASSIGNED):
+        raise DeliveryError("Only queued or assigned tasks can start delivery.")
+    if task.status == TaskStatus.QUEUED and not is_dispatchable(task):
         if task.task_type == TaskType.RETURN_PICKUP and _return_pickup_leg(task) == RETURN_PICKUP_LEG_OUTBOUND:
             raise DeliveryError("This outbound return task is not ready to start.", status_code=400)
         raise DeliveryError("Book must be placed on the robot before starting delivery.", status_code=400)
@@ -826,9 +990,9 @@ def start_simulated_robot_delivery(db: Session, *, user: UserResponse, task_id:
     task.status = TaskStatus.IN_PROGRESS
     if task.started_at is None:
         task.started_at = now
-    _append_task_history(
+    append_task_history(
         db,
-        task_id=task.id,
+        task=task,
         old_status=old_status,
         new_status=TaskStatus.IN_PROGRESS,
         changed_by=user.id,
@@ -1031,6 +1195,7 @@ def list_book_returns(
     user: UserResponse,
     page: int = 1,
     limit: int = 20,
+    fields: Sequence[str] | None = None,
 ) -> BookReturnListResponse:
     limit = min(max(limit, 1), 100)
     page = max(page, 1)
@@ -1048,7 +1213,7 @@ def list_book_returns(
     )
 
     return BookReturnListResponse(
-        items=[book_return_to_response(db, r, user) for r in rows],
+        items=[book_return_to_response(db, r, user, fields) for r in rows],
         page=page,
         limit=limit,
         total=total,
@@ -1129,9 +1294,9 @@ def create_delivery_task_from_return(
     )
     db.add(task)
     db.flush()
-    _append_task_history(
+    append_task_history(
         db,
-        task_id=task.id,
+        task=task,
         old_status=None,
         new_status=TaskStatus.QUEUED,
         changed_by=user.id,
@@ -1157,12 +1322,7 @@ def get_return_activity(
     )
     payloads: list[DeliveryTaskResponse] = []
     for t in all_rows:
-        hist = (
-            db.query(TaskStatusHistory)
-            .filter(TaskStatusHistory.task_id == t.id)
-            .order_by(TaskStatusHistory.changed_at.asc())
-            .all()
-        )
+        hist = list_task_history(db, t)
         payloads.append(task_to_response(t, hist))
     primary = _primary_return_task(db, ret.id)
     primary_payload: DeliveryTaskResponse | None = None
@@ -1243,9 +1403,9 @@ def confirm_student_book_on_robot(db: Session, *, user: UserResponse, return_id:
     )
     db.add(task2)
     db.flush()
-    _append_task_history(
+    append_task_history(
         db,
-        task_id=task2.id,
+        task=task2,
         old_status=None,
         new_status=TaskStatus.QUEUED,
         changed_by=user.id,
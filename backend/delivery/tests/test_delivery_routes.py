@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from datetime import datetime, timezone
 from pathlib import Path
 from types import SimpleNamespace
 from uuid import uuid4
 
+import pytest
 from fastapi.testclient import TestClient
+from redis.exceptions import RedisError
 
 import sys
 
@@ -18,12 +22,15 @@ from delivery.main import app
 from delivery import routes as delivery_routes
 from delivery import services as delivery_services
 from delivery.schemas import DeliveryTaskListResponse
-from shared.auth_dependencies import get_current_user_dep
+from shared import auth_dependencies
+from shared.auth_dependencies import get_current_user_dep, get_websocket_user
+from delivery import events as delivery_events
+from delivery.events import TaskEventHub, TaskEventSubscription, task_event_filter
 
 
 def _mock_db_override():
     yield MagicMock()
-from shared.models import BookStatus, RequestStatus, ReturnStatus, TaskStatus, TaskType
+from shared.models import BookStatus, RequestStatus, ReturnStatus, TaskStatus, TaskStatusHistory, TaskType
 
 
 def _student() -> UserResponse:
@@ -263,7 +270,7 @@ def test_list_tasks_maps_book_placed(monkeypatch):
         task_metadata={"book_placed": True},
     )
 
-    def _list(db, *, user, page=1, limit=20):
+    async def _list(db, *, user, page=1, limit=20):
         return DeliveryTaskListResponse(
             items=[delivery_services.task_to_response(task)],
             page=1,
@@ -271,10 +278,10 @@ def test_list_tasks_maps_book_placed(monkeypatch):
             total=1,
         )
 
-    monkeypatch.setattr(delivery_routes, "list_delivery_tasks", _list)
+    monkeypatch.setattr(delivery_routes, "list_delivery_tasks_async", _list)
 
     app.dependency_overrides[get_current_user_dep] = lambda: user
-    app.dependency_overrides[delivery_routes.get_db] = _mock_db_override
+    app.dependency_overrides[delivery_routes.get_async_db] = _mock_db_override
     client = TestClient(app)
     try:
         res = client.get("/api/v1/deliveries/tasks")
@@ -286,3 +293,253 @@ def test_list_tasks_maps_book_placed(monkeypatch):
         assert item["id"] == str(tid)
     finally:
         app.dependency_overrides.clear()
+
+
+def test_list_tasks_sparse_fieldset(monkeypatch):
+    user = _librarian()
+    task = SimpleNamespace(
+        id=uuid4(),
+        status=TaskStatus.QUEUED,
+        completed_at=None,
+        return_id=None,
+        task_metadata={"book_placed": True},
+    )
+    seen = {}
+
+    async def _list(db, *, user, fields, page=1, limit=20):
+        seen["columns"] = [c.key for c in delivery_services._task_columns(fields)]
+        return [delivery_services.task_to_fields(task, fields)], 1
+
+    monkeypatch.setattr(delivery_routes, "list_delivery_task_fields_async", _list)
+
+    app.dependency_overrides[get_current_user_dep] = lambda: user
+    app.dependency_overrides[delivery_routes.get_async_db] = _mock_db_override
+    client = TestClient(app)
+    try:
+        res = client.get("/api/v1/deliveries/tasks?fields=status,book_placed,status_history")
+        assert res.status_code == 200
+        assert res.json()["data"]["items"] == [
+            {"status": "QUEUED", "book_placed": True, "status_history": []}
+        ]
+        assert seen["columns"] == ["id", "status", "task_metadata"]
+
+        assert client.get("/api/v1/deliveries/tasks?fields=robot_secret").status_code == 400
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_get_task_forbidden_for_other_student(monkeypatch):
+    user = _student()
+
+    async def _get(db, *, user, task_id):
+        raise delivery_services.DeliveryError("Not allowed to view this task.", status_code=403)
+
+    monkeypatch.setattr(delivery_routes, "get_delivery_task_async", _get)
+
+    app.dependency_overrides[get_current_user_dep] = lambda: user
+    app.dependency_overrides[delivery_routes.get_async_db] = _mock_db_override
+    client = TestClient(app)
+    try:
+        res = client.get(f"/api/v1/deliveries/tasks/{uuid4()}")
+        assert res.status_code == 403
+    finally:
+        app.dependency_overrides.clear()
+
+
+class _FakeHub:
+    """Stands in for the Redis-backed hub: events are pre-queued on the subscription."""
+
+    def __init__(self, live):
+        self.live = live
+        self.unsubscribed = False
+
+    async def subscribe(self, predicate):
+        sub = TaskEventSubscription(predicate=predicate)
+        for event_id, data in self.live:
+            if predicate(data):
+                sub.queue.put_nowait((event_id, data))
+        return sub
+
+    def unsubscribe(self, sub):
+        self.unsubscribed = True
+
+
+def _task_event(task_id, owner_id, new_status):
+    return {"task_id": str(task_id), "owner_id": str(owner_id), "new_status": new_status}
+
+
+def test_task_events_ws_replays_then_streams_live_without_duplicates(monkeypatch):
+    user = _student()
+    tid = uuid4()
+    replayed = [("1-0", _task_event(tid, user.id, "QUEUED")), ("2-0", _task_event(tid, user.id, "IN_PROGRESS"))]
+    # Live queue overlaps the replay window (2-0) and carries another student's task (3-0).
+    hub = _FakeHub(
+        [
+            ("2-0", _task_event(tid, user.id, "IN_PROGRESS")),
+            ("3-0", _task_event(uuid4(), uuid4(), "QUEUED")),
+            ("4-0", _task_event(tid, user.id, "COMPLETED")),
+        ]
+    )
+    seen_cursor = []
+
+    async def _replay(last_event_id, predicate):
+        seen_cursor.append(last_event_id)
+        return [(i, d) for i, d in replayed if predicate(d)]
+
+    monkeypatch.setattr(delivery_routes, "task_event_hub", hub)
+    monkeypatch.setattr(delivery_routes, "replay_task_events", _replay)
+    monkeypatch.setattr(delivery_routes, "get_delivery_task", lambda db, *, user, task_id: SimpleNamespace(id=task_id))
+
+    app.dependency_overrides[get_websocket_user] = lambda: user
+    app.dependency_overrides[delivery_routes.get_websocket_db] = _mock_db_override
+    client = TestClient(app)
+    try:
+        with client.websocket_connect(f"/api/v1/deliveries/tasks/events?task_id={tid}&last_event_id=0-5") as ws:
+            received = [ws.receive_json() for _ in range(3)]
+        assert seen_cursor == ["0-5"]
+        assert [m["id"] for m in received] == ["1-0", "2-0", "4-0"]
+        assert received[-1]["data"]["new_status"] == "COMPLETED"
+        assert hub.unsubscribed is True
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_task_events_ws_authenticates_with_query_token_and_real_session_dependency(monkeypatch):
+    user = _student()
+    tid = uuid4()
+    checked = []
+
+    def _get_task(db, *, user, task_id):
+        checked.append((db, user.id))
+        return SimpleNamespace(id=task_id)
+
+    async def _replay(last_event_id, predicate):
+        return []
+
+    hub = _FakeHub([("1-0", _task_event(tid, user.id, "QUEUED"))])
+    monkeypatch.setattr(auth_dependencies, "get_current_user", lambda token: user if token == "good" else None)
+    monkeypatch.setattr(delivery_routes, "task_event_hub", hub)
+    monkeypatch.setattr(delivery_routes, "replay_task_events", _replay)
+    monkeypatch.setattr(delivery_routes, "get_delivery_task", _get_task)
+    client = TestClient(app)
+    # No dependency overrides: the handshake runs get_websocket_user and the route's own session.
+    with client.websocket_connect(f"/api/v1/deliveries/tasks/events?task_id={tid}&last_event_id=0-0&token=good") as ws:
+        assert ws.receive_json()["id"] == "1-0"
+    assert checked and checked[0][1] == user.id
+    assert checked[0][0].info
+
+
+def test_task_event_filter_scopes_students_to_own_tasks():
+    student = _student()
+    own = _task_event(uuid4(), student.id, "QUEUED")
+    other = _task_event(uuid4(), uuid4(), "QUEUED")
+    assert task_event_filter(student)(own) is True
+    assert task_event_filter(student)(other) is False
+    assert task_event_filter(_librarian())(other) is True
+    assert task_event_filter(_librarian(), task_id=uuid4())(other) is False
+
+
+class _FakePubSub:
+    """Redis pub/sub whose SUBSCRIBE confirmation arrives only when the test releases it."""
+
+    def __init__(self):
+        self.confirm = asyncio.Event()
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self._confirmed = False
+
+    async def subscribe(self, channel):
+        self.channel = channel
+
+    async def get_message(self, timeout=None):
+        if not self._confirmed:
+            if not self.confirm.is_set():
+                await asyncio.sleep(0.01)
+                return None
+            self._confirmed = True
+            return {"type": "subscribe", "channel": self.channel, "data": 1}
+        try:
+            return await asyncio.wait_for(self.messages.get(), 0.01)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        pass
+
+
+def test_task_event_hub_subscribe_waits_for_redis_confirmation(monkeypatch):
+    pubsub = _FakePubSub()
+    monkeypatch.setattr(delivery_events, "get_async_redis", lambda: SimpleNamespace(pubsub=lambda: pubsub))
+
+    async def _scenario():
+        hub = TaskEventHub()
+        pending = asyncio.create_task(hub.subscribe(lambda data: True))
+        await asyncio.sleep(0.05)
+        assert not pending.done()  # the route must not read the stream cursor yet
+        pubsub.confirm.set()
+        sub = await asyncio.wait_for(pending, 1.0)
+        envelope = {"id": "7-0", "data": {"task_id": "t"}}
+        await pubsub.messages.put({"type": "message", "data": json.dumps(envelope)})
+        received = await asyncio.wait_for(sub.queue.get(), 1.0)
+        hub.unsubscribe(sub)
+        return received
+
+    assert asyncio.run(_scenario()) == ("7-0", {"task_id": "t"})
+
+
+def test_task_event_hub_subscribe_times_out_without_redis(monkeypatch):
+    pubsub = _FakePubSub()
+    monkeypatch.setattr(delivery_events, "get_async_redis", lambda: SimpleNamespace(pubsub=lambda: pubsub))
+
+    async def _scenario():
+        hub = TaskEventHub()
+        with pytest.raises(RedisError):
+            await hub.subscribe(lambda data: True, timeout=0.05)
+        return hub._subscribers
+
+    assert asyncio.run(_scenario()) == set()
+
+
+def test_task_events_carry_the_history_row_and_publish_behind_the_breaker(monkeypatch):
+    owner = uuid4()
+    task = SimpleNamespace(id=uuid4(), request_id=uuid4(), return_id=None)
+    lookups = []
+    db = SimpleNamespace(info={}, get=lambda model, key: lookups.append(key) or SimpleNamespace(user_id=owner))
+    first = TaskStatusHistory(task_id=task.id, old_status=None, new_status=TaskStatus.PENDING, reason="task_created")
+    second = TaskStatusHistory(task_id=task.id, old_status=TaskStatus.PENDING, new_status=TaskStatus.QUEUED)
+    delivery_events.queue_task_event(db, task, first)
+    delivery_events.queue_task_event(db, task, second)
+    assert lookups == [task.request_id]  # owner resolved once per task
+
+    changed_at = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    first.changed_at = second.changed_at = changed_at
+    delivery_events._stamp_pending_task_events(db, None)
+
+    class _Pipe:
+        def __init__(self):
+            self.results = []
+
+        def xadd(self, stream, fields, **kwargs):
+            published.append(json.loads(fields["data"]))
+            self.results.append(f"{len(published)}-0")
+
+        def publish(self, channel, message):
+            self.results.append(1)
+
+        def execute(self):
+            results, self.results = self.results, []
+            return results
+
+    published: list[dict] = []
+    guarded = []
+
+    def _guarded_call(op, default):
+        guarded.append(default)
+        return op(SimpleNamespace(pipeline=lambda transaction: _Pipe()))
+
+    monkeypatch.setattr(delivery_events, "guarded_call", _guarded_call)
+    delivery_events._publish_pending_task_events(db)
+
+    assert guarded == [False] and db.info == {}
+    assert [(e["old_status"], e["new_status"]) for e in published] == [(None, "PENDING"), ("PENDING", "QUEUED")]
+    assert {e["changed_at"] for e in published} == {changed_at.isoformat()}
+    assert {e["owner_id"] for e in published} == {str(owner)}
@@ -0,0 +1,303 @@
+"""
+EXPLAIN regression test for delivery.services hot queries.
+
+Runs the student/librarian read paths against a seeded PostgreSQL database, captures every
+SELECT they emit and fails if any plan contains a sequential scan, or if the task history
+query visits a task_status_history partition from before the task was created. Sequential scans are
+disabled for the EXPLAIN session so the planner only falls back to one when no usable index
+exists (small seed sizes would otherwise make seq scans legitimately cheaper). The same seed
+backs a query-count check on the task list endpoint (shared.testing.assert_max_queries).
+
+Requires LUNA_EXPLAIN_DATABASE_URL (postgresql://...). Tables are created in throwaway
+schemas (qp_app / qp_ops) that are dropped afterwards; enum types are shared with public.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from auth.schemas import UserResponse, UserRole
+from delivery import routes as delivery_routes
+from delivery import services as delivery_services
+from delivery.main import app
+from shared.auth_dependencies import get_current_user_dep
+from shared.db import Base, _async_database_url
+from shared.models import (
+    Book,
+    BookRequest,
+    BookReturn,
+    BookStatus,
+    DeliveryTask,
+    RequestStatus,
+    ReturnStatus,
+    TaskStatus,
+    TaskStatusHistory,
+    TaskType,
+    UserProfile,
+)
+from shared.partitions import (
+    PartitionedTable,
+    add_months,
+    create_partition,
+    month_start,
+)
+from shared.testing import assert_max_queries
+
+EXPLAIN_DATABASE_URL = os.getenv("LUNA_EXPLAIN_DATABASE_URL")
+SEED_STUDENTS = int(os.getenv("LUNA_EXPLAIN_SEED_STUDENTS", "200"))
+SCHEMA_MAP = {"app": "qp_app", "ops": "qp_ops"}
+HISTORY_PARTITIONS = PartitionedTable(SCHEMA_MAP["app"], "task_status_history", "changed_at", 0)
+
+pytestmark = pytest.mark.skipif(
+    not EXPLAIN_DATABASE_URL,
+    reason="LUNA_EXPLAIN_DATABASE_URL not set (needs a PostgreSQL database)",
+)
+
+
+def _seed(db: Session, n_students: int) -> tuple[UserProfile, UserProfile]:
+    now = datetime.now(timezone.utc)
+    librarian = UserProfile(
+        id=uuid4(),
+        email="librarian@qp.luna.dev",
+        first_name="Lib",
+        last_name="Rarian",
+        role=UserRole.LIBRARIAN.value,
+    )
+    db.add(librarian)
+    students: list[UserProfile] = []
+    for i in range(n_students):
+        students.append(
+            UserProfile(
+                id=uuid4(),
+                email=f"student{i}@qp.luna.dev",
+                first_name="Stu",
+                last_name=f"Dent{i}",
+                role=UserRole.STUDENT.value,
+            )
+        )
+    db.add_all(students)
+    db.flush()
+
+    for i, student in enumerate(students):
+        book = Book(
+            isbn=f"97800000{i:05d}",
+            title=f"Book {i}",
+            author=f"Author {i % 37}",
+            status=BookStatus.CHECKED_OUT,
+            shelf_location=f"A-{i % 50}",
+        )
+        db.add(book)
+        db.flush()
+        req = BookRequest(
+            user_id=student.id,
+            book_id=book.id,
+            request_location="Desk 3",
+            status=RequestStatus.COMPLETED,
+            requested_at=now - timedelta(days=2, minutes=i),
+            completed_at=now - timedelta(days=1),
+            student_confirmed_at=now - timedelta(days=1),
+        )
+        ret = BookReturn(
+            user_id=student.id,
+            book_id=book.id,
+            pickup_location="Desk 3",
+            status=ReturnStatus.PICKUP_SCHEDULED,
+            initiated_at=now - timedelta(hours=1, minutes=i),
+        )
+        db.add_all([req, ret])
+        db.flush()
+        for source_kwargs, task_type in (
+            ({"request_id": req.id}, TaskType.STUDENT_DELIVERY),
+            ({"return_id": ret.id}, TaskType.RETURN_PICKUP),
+        ):
+            task = DeliveryTask(
+                **source_kwargs,
+                task_type=task_type,
+                status=TaskStatus.COMPLETED,
+                source_location="A-1",
+                destination_location="Desk 3",
+                completed_at=now - timedelta(days=1),
+                task_metadata={"book_placed": True, "return_pickup_leg": "outbound"},
+            )
+            db.add(task)
+            db.flush()
+            for old, new in (
+                (None, TaskStatus.PENDING),
+                (TaskStatus.PENDING, TaskStatus.QUEUED),
+                (TaskStatus.QUEUED, TaskStatus.IN_PROGRESS),
+                (TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED),
+            ):
+                db.add(TaskStatusHistory(task_id=task.id, old_status=old, new_status=new))
+    db.commit()
+    return librarian, students[0]
+
+
+def _as_user(profile: UserProfile) -> UserResponse:
+    return UserResponse(
+        id=profile.id,
+        email=profile.email,
+        first_name=profile.first_name,
+        last_name=profile.last_name,
+        role=UserRole(profile.role),
+        phone_number=None,
+    )
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    found: list[str] = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(f"{plan.get('Schema')}.{plan.get('Relation Name')}")
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def _relations(plan: dict) -> set[str]:
+    found = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for child in plan.get("Plans", []):
+        found |= _relations(child)
+    return found
+
+
+@pytest.fixture(scope="module")
+def seeded_engine():
+    base_engine = create_engine(EXPLAIN_DATABASE_URL)
+    engine = base_engine.execution_options(schema_translate_map=SCHEMA_MAP)
+    with base_engine.begin() as conn:
+        for schema in SCHEMA_MAP.values():
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+    try:
+        yield engine
+    finally:
+        with base_engine.begin() as conn:
+            for schema in SCHEMA_MAP.values():
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        base_engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def seeded_users(seeded_engine) -> tuple[UserResponse, UserResponse]:
+    """(librarian, student) over a seeded, analyzed database."""
+    # A month partition from before any task plus the current one, so the history query's
+    # changed_at bound has a partition to prune.
+    this_month = month_start(datetime.now(timezone.utc))
+    with seeded_engine.engine.begin() as conn:
+        for month in (add_months(this_month, -2), this_month):
+            create_partition(conn, HISTORY_PARTITIONS, month)
+    with Session(bind=seeded_engine, expire_on_commit=False) as db:
+        librarian_row, student_row = _seed(db, SEED_STUDENTS)
+    with seeded_engine.begin() as conn:
+        for table in ("book_requests", "book_returns", "delivery_tasks", "task_status_history", "books"):
+            conn.execute(text(f"ANALYZE {SCHEMA_MAP['app']}.{table}"))
+    return _as_user(librarian_row), _as_user(student_row)
+
+
+def _list_delivery_tasks(db: Session, user: UserResponse) -> list[DeliveryTask]:
+    # The task list routes go through list_delivery_tasks_async; run the statements it builds on
+    # the sync session so they are captured and explained like the rest.
+    stmt, count_stmt = delivery_services._task_list_statements(user=user, page=1, limit=20)
+    db.scalar(count_stmt)
+    return list(db.scalars(stmt).all())
+
+
+def test_delivery_service_queries_use_indexes(seeded_engine, seeded_users, monkeypatch):
+    # Read paths must not kick off background timers while we capture SQL.
+    monkeypatch.setattr(delivery_services, "_schedule_student_confirm_deadline_timer", lambda _id: None)
+    librarian, student = seeded_users
+
+    captured: list[tuple[str, str, object]] = []
+    path = ""
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((path, statement, parameters))
+
+    read_paths = {
+        "student request list": lambda db: delivery_services.list_book_requests(db, user=student),
+        "student return list": lambda db: delivery_services.list_book_returns(db, user=student),
+        "student task list": lambda db: _list_delivery_tasks(db, student),
+        "returnable books": lambda db: delivery_services.list_returnable_books_for_student(db, user=student),
+        "request activity": lambda db: delivery_services.get_request_activity(
+            db, user=student, request_id=delivery_services.list_book_requests(db, user=student).items[0].id
+        ),
+        "return activity": lambda db: delivery_services.get_return_activity(
+            db, user=student, return_id=delivery_services.list_book_returns(db, user=student).items[0].id
+        ),
+        "task history": lambda db: delivery_services.list_task_history(db, _list_delivery_tasks(db, student)[0]),
+        "staff request list": lambda db: delivery_services.list_book_requests(db, user=librarian),
+        "staff return list": lambda db: delivery_services.list_book_returns(db, user=librarian),
+        "staff task list": lambda db: _list_delivery_tasks(db, librarian),
+    }
+
+    base_engine = seeded_engine.engine
+    event.listen(base_engine, "before_cursor_execute", _capture)
+    try:
+        with Session(bind=seeded_engine) as db:
+            for path, read in read_paths.items():
+                read(db)
+    finally:
+        event.remove(base_engine, "before_cursor_execute", _capture)
+
+    assert {p for p, _, _ in captured} == set(read_paths)
+    (history_statement,) = [
+        st for p, st, _ in captured if p == "task history" and "task_status_history" in st
+    ]
+    assert "changed_at >=" in history_statement
+
+    offenders: list[str] = []
+    history_relations: set[str] = set()
+    with base_engine.connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        for p, statement, parameters in captured:
+            plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+            scans = _seq_scans(plan[0]["Plan"])
+            if scans:
+                offenders.append(f"{p}: {', '.join(scans)} <- {' '.join(statement.split())[:200]}")
+            if statement == history_statement:
+                history_relations |= _relations(plan[0]["Plan"])
+
+    assert not offenders, "Sequential scans in delivery hot queries:\n" + "\n".join(offenders)
+    # The changed_at >= created_at bound prunes the month from before the task existed.
+    this_month = month_start(datetime.now(timezone.utc))
+    assert HISTORY_PARTITIONS.partition_name(this_month) in history_relations
+    assert HISTORY_PARTITIONS.partition_name(add_months(this_month, -2)) not in history_relations
+
+
+def test_task_list_endpoint_runs_two_queries(seeded_users):
+    # NullPool: TestClient runs each request on its own event loop, so asyncpg connections
+    # cannot be pooled across requests.
+    async_engine = create_async_engine(_async_database_url(EXPLAIN_DATABASE_URL), poolclass=NullPool)
+    translated = async_engine.execution_options(schema_translate_map=SCHEMA_MAP)
+
+    async def _async_db():
+        async with AsyncSession(bind=translated) as db:
+            yield db
+
+    librarian, student = seeded_users
+    app.dependency_overrides[delivery_routes.get_async_db] = _async_db
+    try:
+        client = TestClient(app)
+        for user, total in ((student, 2), (librarian, 2 * SEED_STUDENTS)):
+            app.dependency_overrides[get_current_user_dep] = lambda user=user: user
+            # One count and one page query, whoever asks and however many tasks they own.
+            with assert_max_queries(async_engine, 2):
+                res = client.get("/api/v1/deliveries/tasks", params={"limit": 20})
+            assert res.status_code == 200
+            assert res.json()["data"]["pagination"]["total"] == total
+    finally:
+        app.dependency_overrides.clear()
@@ -8,7 +8,20 @@ if [ "${RUN_MIGRATIONS_ON_START:-true}" != "false" ]; then
   /usr/local/bin/python -m alembic upgrade head || echo "[entrypoint] alembic exited non-zero (often OK if already at head)"
 fi
 
-sed "s/PLACEHOLDER_LISTEN/${PORT}/g" /app/nginx/nginx.render.conf > /etc/nginx/nginx.conf
+if [ "${RUN_PARTITION_MAINTENANCE_ON_START:-true}" != "false" ]; then
+  echo "[entrypoint] partition maintenance"
+  /usr/local/bin/python scripts/manage_partitions.py || echo "[entrypoint] partition maintenance failed; history tables still accept rows via their default partitions"
+fi
+
+if [ "${API_MODE:-services}" = "combined" ]; then
+  # One uvicorn app (api.main, API_WORKERS workers) on 8010 serves every service's routes.
+  sed -e "s/PLACEHOLDER_LISTEN/${PORT}/g" -e "s/127\.0\.0\.1:800[1-5]/127.0.0.1:8010/g" \
+    /app/nginx/nginx.render.conf > /etc/nginx/nginx.conf
+  SUPERVISORD_CONF=/app/docker/supervisord.render.combined.conf
+else
+  sed "s/PLACEHOLDER_LISTEN/${PORT}/g" /app/nginx/nginx.render.conf > /etc/nginx/nginx.conf
+  SUPERVISORD_CONF=/app/docker/supervisord.render.conf
+fi
 
-echo "[entrypoint] nginx listening on ${PORT}, supervisord starting backends"
-exec /usr/bin/supervisord -c /app/docker/supervisord.render.conf
+echo "[entrypoint] nginx listening on ${PORT}, supervisord starting backends (API_MODE=${API_MODE:-services})"
+exec /usr/bin/supervisord -c "${SUPERVISORD_CONF}"
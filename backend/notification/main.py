@@ -2,9 +2,17 @@
 LUNA Notification Service - FastAPI application.
 Base path: /api/v1/notifications
 """
+from shared.env_bootstrap import load_env
+
+load_env()
+
 from fastapi import FastAPI
 
+from notification.routes import router as notification_router
 from shared.cors import add_cors
+from shared.http_metrics import add_metrics
+from shared.readiness import add_readiness
+from shared.db_stats import add_db_pool_status
 
 app = FastAPI(
     title="LUNA Notification Service",
@@ -13,6 +21,11 @@ app = FastAPI(
 )
 
 add_cors(app)
+add_metrics(app)
+add_db_pool_status(app)
+add_readiness(app, {})
+
+app.include_router(notification_router)
 
 
 @app.get("/")
@@ -23,14 +36,3 @@ def root():
 @app.get("/health")
 def health():
     return {"status": "healthy"}
-
-
-@app.get("/api/v1/notifications")
-def notifications_root():
-    return {"service": "notification", "base_path": "/api/v1/notifications"}
-
-
-@app.get("/api/v1/notifications/health")
-def notifications_health():
-    return {"status": "healthy"}
-
@@ -0,0 +1,16 @@
+"""
+Notification service HTTP routes.
+"""
+from fastapi import APIRouter
+
+router = APIRouter(prefix="/api/v1/notifications", tags=["notifications"])
+
+
+@router.get("")
+def notifications_root():
+    return {"service": "notification", "base_path": "/api/v1/notifications"}
+
+
+@router.get("/health")
+def notifications_health():
+    return {"status": "healthy"}
@@ -0,0 +1,254 @@
+"""
+Multi-stop batched delivery runs: several queued tasks carried by one robot trip.
+
+Planning (pure Python, driven by robot.services and the benchmark below):
+- Tasks are grouped greedily: the next task in dispatch order seeds a run, then the closest
+  remaining tasks (pickup-to-pickup + drop-to-drop distance) join it while the run has capacity
+  and they lie within ``BATCH_RADIUS`` of the seed.
+- Stops are ordered pickups first (every book is loaded before any drop), each segment by a
+  nearest-neighbour tour improved with 2-opt over the waypoint distance matrix. Tasks sharing a
+  location share a stop.
+- A run is dispatched like a single task whose trip cost is the tour cost.
+
+Throughput metric: books delivered per robot-hour (tasks / hours robots spend on runs).
+
+  python -m robot.batching --robots 10 --tasks 2000 --capacity 4
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import itertools
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Hashable, Literal
+
+from robot.dispatcher import (
+    PRIORITY_RANK,
+    CostFn,
+    DispatchQueue,
+    DispatchTask,
+    Dispatcher,
+    RobotState,
+    bench_locations,
+    coordinate_cost_fn,
+)
+
+# Books a robot can carry on one run.
+ROBOT_CAPACITY = int(os.getenv("ROBOT_CAPACITY", "4"))
+# Tasks join a run only if their pickup + drop are this close (cost units) to the seed task's.
+BATCH_RADIUS = float(os.getenv("ROBOT_BATCH_RADIUS", "40"))
+# Time spent at each stop (loading / student handoff), used for robot-hour estimates.
+STOP_SERVICE_SECONDS = 20.0
+
+StopKind = Literal["pickup", "drop"]
+
+
+@dataclass(frozen=True)
+class Stop:
+    kind: StopKind
+    location: str | None
+    task_ids: tuple[Hashable, ...]
+
+
+@dataclass
+class BatchRun:
+    tasks: list[DispatchTask]
+    stops: list[Stop] = field(default_factory=list)
+    cost: float = 0.0
+
+    @property
+    def task_ids(self) -> list[Hashable]:
+        return [t.id for t in self.tasks]
+
+    def as_dispatch_task(self, run_id: Hashable) -> DispatchTask:
+        """The run seen by the dispatcher: most urgent member's priority, oldest created_at."""
+        lead = min(self.tasks, key=lambda t: (PRIORITY_RANK.get(t.priority, len(PRIORITY_RANK)), t.created_at))
+        return DispatchTask(
+            id=run_id,
+            priority=lead.priority,
+            created_at=min(t.created_at for t in self.tasks),
+            source_location=self.stops[0].location if self.stops else lead.source_location,
+            destination_location=self.stops[-1].location if self.stops else lead.destination_location,
+            trip_cost=self.cost,
+        )
+
+
+def _tour_cost(locations: list[str | None], cost_fn: CostFn, start: str | None) -> float:
+    total = 0.0
+    prev = start
+    for loc in locations:
+        total += cost_fn(prev, loc)
+        prev = loc
+    return total
+
+
+def _order_segment(locations: list[str | None], cost_fn: CostFn, start: str | None) -> list[str | None]:
+    """Nearest-neighbour open tour from ``start``, then 2-opt until no improving reversal remains."""
+    remaining = list(locations)
+    tour: list[str | None] = []
+    prev = start
+    while remaining:
+        nxt = min(remaining, key=lambda loc: cost_fn(prev, loc))
+        remaining.remove(nxt)
+        tour.append(nxt)
+        prev = nxt
+    improved = len(tour) > 2
+    while improved:
+        improved = False
+        best = _tour_cost(tour, cost_fn, start)
+        for i in range(len(tour) - 1):
+            for j in range(i + 1, len(tour)):
+                candidate = tour[:i] + tour[i : j + 1][::-1] + tour[j + 1 :]
+                cost = _tour_cost(candidate, cost_fn, start)
+                if cost + 1e-9 < best:
+                    tour, best, improved = candidate, cost, True
+    return tour
+
+
+def order_stops(tasks: list[DispatchTask], cost_fn: CostFn, start: str | None = None) -> tuple[list[Stop], float]:
+    """Pickups then drops, each segment TSP-ordered; returns (stops, tour cost from ``start``)."""
+    pickups: dict[str | None, list[Hashable]] = {}
+    drops: dict[str | None, list[Hashable]] = {}
+    for t in tasks:
+        pickups.setdefault(t.source_location, []).append(t.id)
+        drops.setdefault(t.destination_location, []).append(t.id)
+    pickup_order = _order_segment(list(pickups), cost_fn, start)
+    anchor = pickup_order[-1] if pickup_order else start
+    drop_order = _order_segment(list(drops), cost_fn, anchor)
+    stops = [Stop("pickup", loc, tuple(pickups[loc])) for loc in pickup_order]
+    stops += [Stop("drop", loc, tuple(drops[loc])) for loc in drop_order]
+    route = pickup_order + drop_order
+    # Cost of the run itself (first pickup onward); the approach leg is priced by the dispatcher.
+    return stops, _tour_cost(route[1:], cost_fn, route[0]) if route else 0.0
+
+
+def plan_batches(
+    tasks: list[DispatchTask],
+    cost_fn: CostFn,
+    *,
+    capacity: int = ROBOT_CAPACITY,
+    radius: float = BATCH_RADIUS,
+) -> list[BatchRun]:
+    """Group tasks (in dispatch order) into capacity-bounded, proximity-based multi-stop runs."""
+    queue = DispatchQueue(tasks)
+    pending: list[DispatchTask] = []
+    while (t := queue.pop()) is not None:
+        pending.append(t)
+    runs: list[BatchRun] = []
+    while pending:
+        seed = pending.pop(0)
+        members = [seed]
+        if capacity > 1 and pending:
+            scored = sorted(
+                (
+                    cost_fn(seed.source_location, t.source_location)
+                    + cost_fn(seed.destination_location, t.destination_location),
+                    i,
+                )
+                for i, t in enumerate(pending)
+            )
+            chosen = [i for score, i in scored[: capacity - 1] if score <= radius]
+            members += [pending[i] for i in chosen]
+            for i in sorted(chosen, reverse=True):
+                del pending[i]
+        stops, cost = order_stops(members, cost_fn)
+        runs.append(BatchRun(tasks=members, stops=stops, cost=cost))
+    return runs
+
+
+# --- Throughput benchmark (books per robot-hour, batched vs one task per run) ---
+
+
+@dataclass
+class BatchBenchResult:
+    capacity: int
+    runs: int
+    books: int
+    robot_hours: float
+    books_per_robot_hour: float
+    makespan_h: float
+
+
+def simulate_runs(
+    *,
+    n_robots: int,
+    n_tasks: int,
+    capacity: int,
+    speed_mps: float = 1.0,
+    seed: int = 7,
+) -> BatchBenchResult:
+    rng = random.Random(seed)
+    coords = bench_locations(seed)
+    cost_fn = coordinate_cost_fn(coords)
+    shelves = [c for c in coords if "-" in c]
+    desks = [c for c in coords if c.startswith("Desk")]
+    tasks = [
+        DispatchTask(
+            id=i,
+            priority=rng.choices(list(PRIORITY_RANK), [0.05, 0.15, 0.7, 0.1])[0],
+            created_at=float(i),
+            source_location=rng.choice(shelves),
+            destination_location=rng.choice(desks),
+        )
+        for i in range(n_tasks)
+    ]
+    runs = plan_batches(tasks, cost_fn, capacity=capacity)
+    dispatcher = Dispatcher(cost_fn=cost_fn)
+    by_run: dict[Hashable, BatchRun] = {}
+    for run_id, run in enumerate(runs):
+        by_run[run_id] = run
+        dispatcher.enqueue(run.as_dispatch_task(run_id))
+    for i in range(n_robots):
+        # Battery is not the subject here; keep every robot eligible.
+        dispatcher.upsert_robot(RobotState(id=i, location=rng.choice(desks), battery_level=100.0))
+
+    events: list[tuple[float, int, Hashable]] = []
+    seq = itertools.count()
+    now = 0.0
+    busy_seconds = 0.0
+    while len(dispatcher.queue) or dispatcher.assigned:
+        for a in dispatcher.dispatch():
+            run = by_run[a.task_id]
+            duration = (a.approach_cost + a.trip_cost) / speed_mps + STOP_SERVICE_SECONDS * len(run.stops)
+            busy_seconds += duration
+            heapq.heappush(events, (now + duration, next(seq), a.task_id))
+        if not events:
+            break
+        now, _, run_id = heapq.heappop(events)
+        dispatcher.release(run_id, battery_level=100.0)
+
+    robot_hours = busy_seconds / 3600
+    return BatchBenchResult(
+        capacity=capacity,
+        runs=len(runs),
+        books=n_tasks,
+        robot_hours=round(robot_hours, 2),
+        books_per_robot_hour=round(n_tasks / robot_hours, 1) if robot_hours else 0.0,
+        makespan_h=round(now / 3600, 2),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare books per robot-hour: batched vs single-task runs.")
+    parser.add_argument("--robots", type=int, default=10, help="Simulated fleet size.")
+    parser.add_argument("--tasks", type=int, default=2000, help="Queued delivery tasks.")
+    parser.add_argument("--capacity", type=int, default=ROBOT_CAPACITY, help="Books per robot run.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    for capacity in (1, args.capacity):
+        r = simulate_runs(n_robots=args.robots, n_tasks=args.tasks, capacity=capacity, seed=args.seed)
+        print(
+            "BATCH_BENCH "
+            f"capacity={r.capacity} "
+            f"runs={r.runs} "
+            f"books={r.books} "
+            f"robot_hours={r.robot_hours} "
+            f"books_per_robot_hour={r.books_per_robot_hour} "
+            f"makespan_h={r.makespan_h}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""
+Robot dispatch engine: priority queue of dispatchable delivery tasks + multi-robot assignment.
+
+The engine is pure Python (no DB) so it can be driven by robot.services for the live fleet and
+by the simulated-fleet benchmark below:
+
+  python -m robot.dispatcher --robots 50 --tasks 10000
+
+Assignment policy (greedy, highest-priority task first):
+- Tasks are ordered by priority (URGENT > HIGH > NORMAL > LOW), then by age.
+- For each task, every IDLE robot that can finish the trip and still keep
+  ``BATTERY_RESERVE_PCT`` is scored by travel cost to the pickup plus a penalty for a low battery;
+  the cheapest robot wins.
+- A task no robot can currently serve is put back and retried on the next dispatch pass.
+- When a robot faults, tasks assigned to it go back to the queue with their original position.
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import itertools
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Iterable
+
+from shared.models import RobotStatus, TaskPriority
+
+# Lower rank is served first.
+PRIORITY_RANK: dict[TaskPriority, int] = {
+    TaskPriority.URGENT: 0,
+    TaskPriority.HIGH: 1,
+    TaskPriority.NORMAL: 2,
+    TaskPriority.LOW: 3,
+}
+
+# Robots below this level are never dispatched (they should head to a charger).
+MIN_DISPATCH_BATTERY_PCT = 20.0
+# Battery that must remain after the whole trip (approach + pickup -> drop).
+BATTERY_RESERVE_PCT = 10.0
+# Battery percent consumed per unit of travel cost (cost units are metres for waypoint coordinates).
+BATTERY_PCT_PER_COST = 0.05
+# How many cost units one missing battery percent is worth when ranking robots.
+BATTERY_SCORE_WEIGHT = 0.5
+# Cost used when a location has no known coordinates.
+UNKNOWN_LOCATION_COST = 50.0
+
+CostFn = Callable[[str | None, str | None], float]
+
+
+@dataclass(frozen=True)
+class DispatchTask:
+    id: Hashable
+    priority: TaskPriority
+    created_at: float  # epoch seconds; older tasks win ties within a priority
+    source_location: str | None
+    destination_location: str | None
+    # Precomputed cost of the run itself (multi-stop batches); defaults to source -> destination.
+    trip_cost: float | None = None
+
+
+@dataclass
+class RobotState:
+    id: Hashable
+    location: str | None
+    battery_level: float | None
+    status: RobotStatus = RobotStatus.IDLE
+
+
+@dataclass(frozen=True)
+class Assignment:
+    task_id: Hashable
+    robot_id: Hashable
+    approach_cost: float
+    trip_cost: float
+
+
+class DispatchQueue:
+    """Min-heap of tasks keyed by (priority rank, created_at) with O(log n) push/pop and lazy removal."""
+
+    def __init__(self, tasks: Iterable[DispatchTask] = ()) -> None:
+        self._seq = itertools.count()
+        self._live: dict[Hashable, DispatchTask] = {}
+        self._heap: list[tuple[int, float, int, Hashable]] = []
+        for task in tasks:
+            self._live[task.id] = task
+            self._heap.append(self._entry(task))
+        heapq.heapify(self._heap)
+
+    def _entry(self, task: DispatchTask) -> tuple[int, float, int, Hashable]:
+        return (PRIORITY_RANK.get(task.priority, len(PRIORITY_RANK)), task.created_at, next(self._seq), task.id)
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, task_id: Hashable) -> bool:
+        return task_id in self._live
+
+    def push(self, task: DispatchTask) -> None:
+        if task.id in self._live:
+            return
+        self._live[task.id] = task
+        heapq.heappush(self._heap, self._entry(task))
+
+    def remove(self, task_id: Hashable) -> DispatchTask | None:
+        """Drop a task (e.g. cancelled); its heap entry is skipped when it surfaces."""
+        return self._live.pop(task_id, None)
+
+    def pop(self) -> DispatchTask | None:
+        while self._heap:
+            *_, task_id = heapq.heappop(self._heap)
+            task = self._live.pop(task_id, None)
+            if task is not None:
+                return task
+        return None
+
+
+def coordinate_cost_fn(coordinates: dict[str, tuple[float, float, float]]) -> CostFn:
+    """Straight-line travel cost between known location codes (e.g. Waypoint x/y/z)."""
+
+    def _cost(a: str | None, b: str | None) -> float:
+        if a is not None and a == b:
+            return 0.0
+        pa = coordinates.get(a) if a is not None else None
+        pb = coordinates.get(b) if b is not None else None
+        if pa is None or pb is None:
+            return UNKNOWN_LOCATION_COST
+        return math.dist(pa, pb)
+
+    return _cost
+
+
+@dataclass
+class Dispatcher:
+    cost_fn: CostFn
+    queue: DispatchQueue = field(default_factory=DispatchQueue)
+    robots: dict[Hashable, RobotState] = field(default_factory=dict)
+    # task id -> (task, robot id) for tasks handed to a robot and not yet released
+    assigned: dict[Hashable, tuple[DispatchTask, Hashable]] = field(default_factory=dict)
+
+    def upsert_robot(self, robot: RobotState) -> None:
+        self.robots[robot.id] = robot
+
+    def enqueue(self, task: DispatchTask) -> None:
+        if task.id not in self.assigned:
+            self.queue.push(task)
+
+    def _pick_robot(self, task: DispatchTask, idle: list[RobotState]) -> tuple[RobotState, float, float] | None:
+        trip = (
+            task.trip_cost
+            if task.trip_cost is not None
+            else self.cost_fn(task.source_location, task.destination_location)
+        )
+        best: tuple[float, RobotState, float] | None = None
+        for robot in idle:
+            battery = robot.battery_level if robot.battery_level is not None else 0.0
+            approach = self.cost_fn(robot.location, task.source_location)
+            if battery - (approach + trip) * BATTERY_PCT_PER_COST < BATTERY_RESERVE_PCT:
+                continue
+            score = approach + BATTERY_SCORE_WEIGHT * (100.0 - battery)
+            if best is None or score < best[0]:
+                best = (score, robot, approach)
+        if best is None:
+            return None
+        return best[1], best[2], trip
+
+    def dispatch(self) -> list[Assignment]:
+        """Assign queued tasks to idle robots until either runs out."""
+        idle = [
+            r
+            for r in self.robots.values()
+            if r.status == RobotStatus.IDLE
+            and r.battery_level is not None
+            and r.battery_level >= MIN_DISPATCH_BATTERY_PCT
+        ]
+        assignments: list[Assignment] = []
+        deferred: list[DispatchTask] = []
+        while idle and len(self.queue):
+            task = self.queue.pop()
+            if task is None:
+                break
+            picked = self._pick_robot(task, idle)
+            if picked is None:
+                deferred.append(task)
+                continue
+            robot, approach, trip = picked
+            idle.remove(robot)
+            robot.status = RobotStatus.BUSY
+            self.assigned[task.id] = (task, robot.id)
+            assignments.append(Assignment(task.id, robot.id, approach, trip))
+        for task in deferred:
+            self.queue.push(task)
+        return assignments
+
+    def release(self, task_id: Hashable, *, battery_level: float | None = None) -> None:
+        """Task finished: the robot is idle at the task destination."""
+        entry = self.assigned.pop(task_id, None)
+        if entry is None:
+            return
+        task, robot_id = entry
+        robot = self.robots.get(robot_id)
+        if robot is None:
+            return
+        robot.status = RobotStatus.IDLE
+        robot.location = task.destination_location
+        if battery_level is not None:
+            robot.battery_level = battery_level
+
+    def fail_robot(self, robot_id: Hashable) -> list[DispatchTask]:
+        """Robot faulted: take it out of rotation and requeue everything assigned to it."""
+        robot = self.robots.get(robot_id)
+        if robot is not None:
+            robot.status = RobotStatus.ERROR
+        requeued = [task for task, rid in self.assigned.values() if rid == robot_id]
+        for task in requeued:
+            del self.assigned[task.id]
+            self.queue.push(task)
+        return requeued
+
+
+# --- Simulated-fleet benchmark ---
+
+
+@dataclass
+class DispatchBenchResult:
+    robots: int
+    tasks: int
+    completed: int
+    faults: int
+    requeued: int
+    dispatch_calls: int
+    dispatch_total_ms: float
+    dispatch_avg_ms: float
+    dispatch_p95_ms: float
+    dispatch_max_ms: float
+    assignments_per_sec: float
+    simulated_makespan_s: float
+    avg_wait_s: float
+
+
+def bench_locations(seed: int) -> dict[str, tuple[float, float, float]]:
+    """Synthetic floor: 8 aisles x 10 shelves, 10 randomly placed desks and a charger."""
+    rng = random.Random(seed)
+    coords: dict[str, tuple[float, float, float]] = {}
+    for aisle in "ABCDEFGH":
+        for shelf in range(1, 11):
+            coords[f"{aisle}-{shelf}"] = ("ABCDEFGH".index(aisle) * 6.0, shelf * 2.5, 0.0)
+    for desk in range(1, 11):
+        coords[f"Desk {desk}"] = (rng.uniform(0, 60), rng.uniform(30, 60), 0.0)
+    coords["Charger"] = (30.0, -5.0, 0.0)
+    return coords
+
+
+def run_dispatch_bench(
+    *,
+    n_robots: int,
+    n_tasks: int,
+    fault_rate: float = 0.01,
+    speed_mps: float = 1.0,
+    seed: int = 7,
+) -> DispatchBenchResult:
+    """
+    Event-driven simulation: all tasks are queued up front, robots drive at ``speed_mps``,
+    drain battery per cost unit and recharge when they drop below the dispatch threshold.
+    Only time spent inside Dispatcher.dispatch() is measured.
+    """
+    rng = random.Random(seed)
+    coords = bench_locations(seed)
+    shelves = [c for c in coords if "-" in c]
+    desks = [c for c in coords if c.startswith("Desk")]
+    dispatcher = Dispatcher(cost_fn=coordinate_cost_fn(coords))
+    for i in range(n_robots):
+        dispatcher.upsert_robot(
+            RobotState(id=f"robot-{i}", location=rng.choice(desks), battery_level=rng.uniform(40.0, 100.0))
+        )
+    priorities = list(PRIORITY_RANK)
+    weights = [0.05, 0.15, 0.7, 0.1]
+    created: dict[Hashable, float] = {}
+    for i in range(n_tasks):
+        task = DispatchTask(
+            id=i,
+            priority=rng.choices(priorities, weights)[0],
+            created_at=float(i) * 1e-3,
+            source_location=rng.choice(shelves),
+            destination_location=rng.choice(desks),
+        )
+        created[task.id] = 0.0
+        dispatcher.enqueue(task)
+
+    events: list[tuple[float, int, str, Hashable]] = []  # (time, seq, kind, id)
+    seq = itertools.count()
+    now = 0.0
+    timings_ms: list[float] = []
+    completed = faults = requeued = assigned_total = 0
+    wait_total = 0.0
+
+    while len(dispatcher.queue) or dispatcher.assigned:
+        start = time.perf_counter()
+        assignments = dispatcher.dispatch()
+        timings_ms.append((time.perf_counter() - start) * 1000)
+        assigned_total += len(assignments)
+        for a in assignments:
+            wait_total += now - created[a.task_id]
+            if rng.random() < fault_rate:
+                heapq.heappush(events, (now + a.approach_cost / speed_mps / 2, next(seq), "fault", a.robot_id))
+                continue
+            duration = (a.approach_cost + a.trip_cost) / speed_mps
+            heapq.heappush(events, (now + duration, next(seq), "done", a.task_id))
+        if not events:
+            break  # nothing in flight and nothing assignable (fleet exhausted)
+        now, _, kind, ident = heapq.heappop(events)
+        if kind == "done":
+            task, robot_id = dispatcher.assigned[ident]
+            robot = dispatcher.robots[robot_id]
+            used = (
+                dispatcher.cost_fn(robot.location, task.source_location)
+                + dispatcher.cost_fn(task.source_location, task.destination_location)
+            ) * BATTERY_PCT_PER_COST
+            dispatcher.release(ident, battery_level=max(0.0, (robot.battery_level or 0.0) - used))
+            completed += 1
+            if (robot.battery_level or 0.0) < MIN_DISPATCH_BATTERY_PCT:
+                robot.status = RobotStatus.MAINTENANCE
+                heapq.heappush(events, (now + 600.0, next(seq), "charged", robot_id))
+        elif kind == "fault":
+            for task in dispatcher.fail_robot(ident):
+                created[task.id] = now
+                requeued += 1
+            faults += 1
+            heapq.heappush(events, (now + 120.0, next(seq), "charged", ident))
+        else:  # charged / repaired
+            robot = dispatcher.robots[ident]
+            robot.status = RobotStatus.IDLE
+            robot.location = "Charger"
+            robot.battery_level = 100.0
+
+    total_ms = sum(timings_ms)
+    ordered = sorted(timings_ms) or [0.0]
+    p95_index = max(0, int(round(0.95 * len(ordered))) - 1)
+    return DispatchBenchResult(
+        robots=n_robots,
+        tasks=n_tasks,
+        completed=completed,
+        faults=faults,
+        requeued=requeued,
+        dispatch_calls=len(timings_ms),
+        dispatch_total_ms=round(total_ms, 2),
+        dispatch_avg_ms=round(total_ms / max(1, len(timings_ms)), 4),
+        dispatch_p95_ms=round(ordered[p95_index], 4),
+        dispatch_max_ms=round(ordered[-1], 4),
+        assignments_per_sec=round(assigned_total / (total_ms / 1000), 1) if total_ms else 0.0,
+        simulated_makespan_s=round(now, 1),
+        avg_wait_s=round(wait_total / max(1, assigned_total), 1),
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the robot dispatcher on a simulated fleet.")
+    parser.add_argument("--robots", type=int, default=50, help="Simulated fleet size.")
+    parser.add_argument("--tasks", type=int, default=10000, help="Number of queued delivery tasks.")
+    parser.add_argument(
+        "--fault-rate",
+        type=float,
+        default=0.01,
+        help="Probability that a robot faults on the way to a pickup (its task is requeued).",
+    )
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for fleet/task generation.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    result = run_dispatch_bench(
+        n_robots=args.robots,
+        n_tasks=args.tasks,
+        fault_rate=args.fault_rate,
+        seed=args.seed,
+    )
+    print(
+        "DISPATCH_BENCH "
+        f"robots={result.robots} "
+        f"tasks={result.tasks} "
+        f"completed={result.completed} "
+        f"faults={result.faults} "
+        f"requeued={result.requeued}"
+    )
+    print(
+        "DISPATCH_LATENCY "
+        f"calls={result.dispatch_calls} "
+        f"total_ms={result.dispatch_total_ms} "
+        f"avg_ms={result.dispatch_avg_ms} "
+        f"p95_ms={result.dispatch_p95_ms} "
+        f"max_ms={result.dispatch_max_ms} "
+        f"assignments_per_sec={result.assignments_per_sec}"
+    )
+    print(
+        "SIMULATION "
+        f"makespan_s={result.simulated_makespan_s} "
+        f"avg_wait_s={result.avg_wait_s}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Live fleet state: each robot's latest location, battery and heartbeat, held in memory so dispatch
+and the fleet dashboard do not read ``ops.robots`` for every decision or refresh.
+
+Three layers, newest wins:
+- in-process: ``FleetState`` keeps a LiveRobot per robot. Telemetry (robot.telemetry) updates it
+  as frames arrive.
+- Redis: each telemetry flush publishes the robots this process heard from to one hash per robot
+  (``fleet:robot:<id>``). A hash expires FLEET_STATE_TTL_SECONDS after the robot's last publish.
+  Other workers and services re-read Redis at most every FLEET_REFRESH_SECONDS.
+- ``ops.robots``: the checkpoint. robot.telemetry writes the coalesced robot rows every
+  TELEMETRY_CHECKPOINT_SECONDS. ``FleetState`` reloads the table every FLEET_RESYNC_SECONDS to pick
+  up new or renamed robots and status changes made elsewhere (a delivery completing releases its
+  robot in delivery.services).
+
+Telemetry fields are compared by ``last_heartbeat``. ``status`` is compared by the time it was
+read from the table or set by ``record_status`` (after a dispatch or fault commits). The table
+stays the owner of the status: dispatch still locks and filters robots there.
+
+A robot is stale once its last heartbeat is more than ROBOT_STALE_AFTER_SECONDS old. Dispatch
+skips stale robots. A robot that never sent telemetry has no heartbeat and is not stale.
+
+Redis calls go through the cache breaker (shared.redis_client.guarded_call). While Redis is down,
+each process serves the telemetry it received itself plus the periodic table reload.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Callable, Iterable
+from uuid import UUID
+
+from shared.metrics import get_gauge
+from shared.models import RobotStatus
+from shared.redis_client import guarded_call
+
+logger = logging.getLogger(__name__)
+
+FLEET_STATE_TTL_SECONDS = int(os.getenv("FLEET_STATE_TTL_SECONDS", "300"))
+FLEET_REFRESH_SECONDS = float(os.getenv("FLEET_REFRESH_SECONDS", "1.0"))
+FLEET_RESYNC_SECONDS = float(os.getenv("FLEET_RESYNC_SECONDS", "30"))
+ROBOT_STALE_AFTER_SECONDS = float(os.getenv("ROBOT_STALE_AFTER_SECONDS", "30"))
+
+FLEET_KEY_PREFIX = "fleet:robot:"
+FLEET_INDEX_KEY = "fleet:robots"
+
+FLEET_STALE_ROBOTS = get_gauge(
+    "robot_fleet_stale_robots",
+    "Robots whose last heartbeat is older than ROBOT_STALE_AFTER_SECONDS, as seen by this process.",
+)
+
+
+@dataclass
+class LiveRobot:
+    id: UUID
+    robot_name: str | None = None
+    status: RobotStatus | None = None
+    # Epoch seconds the status was read from ops.robots or set by record_status.
+    status_at: float = 0.0
+    # Status in the robot's own latest frame (telemetry does not change ``status``).
+    reported_status: RobotStatus | None = None
+    current_location: str | None = None
+    battery_level: float | None = None
+    sensor_data: dict | None = None
+    last_heartbeat: datetime | None = None
+
+    def heartbeat_age(self, now: datetime) -> float | None:
+        if self.last_heartbeat is None:
+            return None
+        return max(0.0, (now - self.last_heartbeat).total_seconds())
+
+    def is_stale(self, now: datetime, stale_after_seconds: float = ROBOT_STALE_AFTER_SECONDS) -> bool:
+        age = self.heartbeat_age(now)
+        return age is not None and age > stale_after_seconds
+
+    def merge_telemetry(self, other: LiveRobot) -> bool:
+        """Take ``other``'s telemetry fields if its heartbeat is newer; unreported fields keep their value."""
+        if other.last_heartbeat is None or (
+            self.last_heartbeat is not None and other.last_heartbeat <= self.last_heartbeat
+        ):
+            return False
+        self.last_heartbeat = other.last_heartbeat
+        for name in ("reported_status", "current_location", "battery_level", "sensor_data"):
+            value = getattr(other, name)
+            if value is not None:
+                setattr(self, name, value)
+        return True
+
+    def merge_status(self, status: RobotStatus | None, at: float) -> None:
+        if status is not None and at >= self.status_at:
+            self.status = status
+            self.status_at = at
+
+
+def _telemetry_hash(robot: LiveRobot) -> dict[str, str]:
+    fields = {"last_heartbeat": robot.last_heartbeat.isoformat()}
+    if robot.reported_status is not None:
+        fields["reported_status"] = robot.reported_status.value
+    if robot.current_location is not None:
+        fields["current_location"] = robot.current_location
+    if robot.battery_level is not None:
+        fields["battery_level"] = repr(robot.battery_level)
+    if robot.sensor_data is not None:
+        fields["sensor_data"] = json.dumps(robot.sensor_data)
+    return fields
+
+
+def _from_hash(robot_id: UUID, fields: dict[str, str]) -> LiveRobot:
+    def _get(name: str, parse: Callable[[str], object]):
+        value = fields.get(name)
+        return parse(value) if value is not None else None
+
+    return LiveRobot(
+        id=robot_id,
+        status=_get("status", RobotStatus),
+        status_at=float(fields.get("status_at") or 0.0),
+        reported_status=_get("reported_status", RobotStatus),
+        current_location=fields.get("current_location"),
+        battery_level=_get("battery_level", float),
+        sensor_data=_get("sensor_data", json.loads),
+        last_heartbeat=_get("last_heartbeat", datetime.fromisoformat),
+    )
+
+
+def load_robots_from_db() -> list[LiveRobot]:
+    """Every robot's row in ``ops.robots`` (the checkpoint), status stamped with the read time."""
+    from sqlalchemy import select
+
+    from shared.db import SessionLocal
+    from shared.models import Robot
+
+    read_at = time.time()
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(
+                Robot.id,
+                Robot.robot_name,
+                Robot.status,
+                Robot.current_location,
+                Robot.battery_level,
+                Robot.sensor_data,
+                Robot.last_heartbeat,
+            )
+        ).all()
+    return [
+        LiveRobot(
+            id=row.id,
+            robot_name=row.robot_name,
+            status=row.status,
+            status_at=read_at,
+            current_location=row.current_location,
+            battery_level=row.battery_level,
+            sensor_data=row.sensor_data,
+            last_heartbeat=row.last_heartbeat,
+        )
+        for row in rows
+    ]
+
+
+class FleetState:
+    def __init__(
+        self,
+        *,
+        redis_call: Callable = guarded_call,
+        load_robots: Callable[[], list[LiveRobot]] = load_robots_from_db,
+        ttl_seconds: int = FLEET_STATE_TTL_SECONDS,
+        refresh_seconds: float = FLEET_REFRESH_SECONDS,
+        resync_seconds: float = FLEET_RESYNC_SECONDS,
+        stale_after_seconds: float = ROBOT_STALE_AFTER_SECONDS,
+    ) -> None:
+        self.redis_call = redis_call
+        self.load_robots = load_robots
+        self.ttl_seconds = ttl_seconds
+        self.refresh_seconds = refresh_seconds
+        self.resync_seconds = resync_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self._robots: dict[UUID, LiveRobot] = {}
+        self._dirty: set[UUID] = set()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._refreshed_at: float | None = None
+        self._resynced_at: float | None = None
+
+    def observe(
+        self,
+        robot_id: UUID,
+        *,
+        recorded_at: datetime,
+        reported_status: RobotStatus | None = None,
+        current_location: str | None = None,
+        battery_level: float | None = None,
+        sensor_data: dict | None = None,
+    ) -> None:
+        """One telemetry frame; applied in memory now, published to Redis on the next ``publish``."""
+        frame = LiveRobot(
+            id=robot_id,
+            reported_status=reported_status,
+            current_location=current_location,
+            battery_level=battery_level,
+            sensor_data=sensor_data,
+            last_heartbeat=recorded_at,
+        )
+        with self._lock:
+            robot = self._robots.setdefault(robot_id, LiveRobot(id=robot_id))
+            if robot.merge_telemetry(frame):
+                self._dirty.add(robot_id)
+
+    def publish(self) -> int:
+        """Write robots observed since the last publish to Redis; returns how many."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            mappings = {robot_id: _telemetry_hash(self._robots[robot_id]) for robot_id in dirty}
+            stale = sum(r.is_stale(now, self.stale_after_seconds) for r in self._robots.values())
+        FLEET_STALE_ROBOTS.set(stale)
+        if not mappings:
+            return 0
+
+        def _op(r) -> bool:
+            pipe = r.pipeline(transaction=False)
+            for robot_id, mapping in mappings.items():
+                key = f"{FLEET_KEY_PREFIX}{robot_id}"
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, self.ttl_seconds)
+            pipe.sadd(FLEET_INDEX_KEY, *(str(robot_id) for robot_id in mappings))
+            pipe.execute()
+            return True
+
+        if not self.redis_call(_op, False):
+            with self._lock:
+                self._dirty |= dirty  # retried on the next flush
+            return 0
+        return len(mappings)
+
+    def record_status(self, robot_ids: Iterable[UUID], status: RobotStatus) -> None:
+        """Status committed to ops.robots by this process (dispatch, fault); shared through Redis."""
+        robot_ids = list(robot_ids)
+        if not robot_ids:
+            return
+        at = time.time()
+        with self._lock:
+            for robot_id in robot_ids:
+                self._robots.setdefault(robot_id, LiveRobot(id=robot_id)).merge_status(status, at)
+
+        def _op(r) -> None:
+            pipe = r.pipeline(transaction=False)
+            for robot_id in robot_ids:
+                key = f"{FLEET_KEY_PREFIX}{robot_id}"
+                pipe.hset(key, mapping={"status": status.value, "status_at": repr(at)})
+                pipe.expire(key, self.ttl_seconds)
+            pipe.sadd(FLEET_INDEX_KEY, *(str(robot_id) for robot_id in robot_ids))
+            pipe.execute()
+
+        self.redis_call(_op, None)
+
+    def robots(self) -> list[LiveRobot]:
+        """The whole fleet for dashboards, by name; reads the table only when a resync is due."""
+        self._sync(resync=True)
+        with self._lock:
+            robots = [replace(r) for r in self._robots.values() if r.robot_name is not None]
+        return sorted(robots, key=lambda r: r.robot_name)
+
+    def live(self, robot_ids: Iterable[UUID]) -> dict[UUID, LiveRobot]:
+        """Latest known state of these robots (dispatch has their rows already: no table reload)."""
+        self._sync(resync=False)
+        with self._lock:
+            return {robot_id: replace(self._robots[robot_id]) for robot_id in robot_ids if robot_id in self._robots}
+
+    def _sync(self, *, resync: bool) -> None:
+        with self._sync_lock:
+            now = time.monotonic()
+            if resync and (self._resynced_at is None or now - self._resynced_at >= self.resync_seconds):
+                self._resync_from_db()
+                self._resynced_at = now
+            if self._refreshed_at is None or now - self._refreshed_at >= self.refresh_seconds:
+                self._refresh_from_redis()
+                self._refreshed_at = now
+
+    def _resync_from_db(self) -> None:
+        try:
+            rows = self.load_robots()
+        except Exception:
+            if self._resynced_at is None:
+                raise
+            logger.exception("Fleet resync from ops.robots failed; serving the in-memory state")
+            return
+        with self._lock:
+            current = {}
+            for row in rows:
+                robot = self._robots.get(row.id) or LiveRobot(id=row.id)
+                robot.robot_name = row.robot_name
+                robot.merge_status(row.status, row.status_at)
+                robot.merge_telemetry(row)
+                current[row.id] = robot
+            # Robots deleted from the table leave the fleet.
+            self._robots = current
+            self._dirty &= set(current)
+
+    def _refresh_from_redis(self) -> None:
+        def _op(r) -> dict[str, dict]:
+            ids = sorted(r.smembers(FLEET_INDEX_KEY))
+            if not ids:
+                return {}
+            pipe = r.pipeline(transaction=False)
+            for robot_id in ids:
+                pipe.hgetall(f"{FLEET_KEY_PREFIX}{robot_id}")
+            return dict(zip(ids, pipe.execute()))
+
+        entries = self.redis_call(_op, None)
+        if not entries:
+            return
+        expired = [robot_id for robot_id, fields in entries.items() if not fields]
+        if expired:
+            self.redis_call(lambda r: r.srem(FLEET_INDEX_KEY, *expired), None)
+        with self._lock:
+            for key, fields in entries.items():
+                if not fields:
+                    continue
+                try:
+                    shared = _from_hash(UUID(key), fields)
+                except ValueError:
+                    logger.warning("Skipping unreadable fleet state for robot %s", key)
+                    continue
+                robot = self._robots.setdefault(shared.id, LiveRobot(id=shared.id))
+                robot.merge_telemetry(shared)
+                robot.merge_status(shared.status, shared.status_at)
+
+
+_fleet: FleetState | None = None
+_fleet_lock = threading.Lock()
+
+
+def get_fleet_state() -> FleetState:
+    global _fleet
+    if _fleet is None:
+        with _fleet_lock:
+            if _fleet is None:
+                _fleet = FleetState()
+    return _fleet
@@ -2,9 +2,17 @@
 LUNA Robot Service - FastAPI application.
 Base path: /api/v1/robot
 """
+from shared.env_bootstrap import load_env
+
+load_env()
+
 from fastapi import FastAPI
 
+from robot.routes import router as robot_router
 from shared.cors import add_cors
+from shared.http_metrics import add_metrics
+from shared.readiness import add_readiness, database_check
+from shared.db_stats import add_db_pool_status
 
 app = FastAPI(
     title="LUNA Robot Service",
@@ -13,6 +21,11 @@ app = FastAPI(
 )
 
 add_cors(app)
+add_metrics(app)
+add_db_pool_status(app)
+add_readiness(app, {"database": database_check})
+
+app.include_router(robot_router)
 
 
 @app.get("/")
@@ -24,13 +37,3 @@ def root():
 def health():
     return {"status": "healthy"}
 
-
-@app.get("/api/v1/robot")
-def robot_root():
-    return {"service": "robot", "base_path": "/api/v1/robot"}
-
-
-@app.get("/api/v1/robot/health")
-def robot_health():
-    return {"status": "healthy"}
-
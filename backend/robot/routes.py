@@ -0,0 +1,331 @@
+"""
+Robot service HTTP routes (task dispatch, waypoint routing, fleet faults, telemetry ingestion,
+live fleet view).
+
+Telemetry is posted by robots, not users: it authenticates with the fleet's shared secret
+(``X-Robot-Token`` header, ROBOT_TELEMETRY_TOKEN) instead of a user JWT.
+"""
+from __future__ import annotations
+
+import hmac
+import os
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from auth.schemas import UserResponse
+from robot.dispatcher import Assignment
+from delivery.services import task_to_response
+from robot.schemas import (
+    AssignmentResponse,
+    BatchDispatchResultResponse,
+    BatchRunResponse,
+    BatchStopCompleteResponse,
+    BatchStopResponse,
+    DispatchResultResponse,
+    FleetResponse,
+    FleetRobotResponse,
+    QueuedTaskResponse,
+    RobotFaultRequest,
+    RobotFaultResponse,
+    RouteResponse,
+    RouteWaypointResponse,
+    TelemetryAcceptedResponse,
+    TelemetryBatchRequest,
+    ThroughputResponse,
+)
+from robot.services import (
+    RobotServiceError,
+    complete_batch_stop,
+    dispatch_batched_runs,
+    dispatch_queued_tasks,
+    fleet_overview,
+    get_route,
+    list_dispatch_queue,
+    report_robot_fault,
+    robot_throughput,
+)
+from robot.telemetry import Frame, get_telemetry_buffer, is_known_robot
+from shared.auth_dependencies import get_current_user_dep
+from shared.db import SessionLocal
+from shared.models import RobotStatus
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _success(data: dict) -> dict:
+    return {
+        "success": True,
+        "data": data,
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "request_id": str(uuid.uuid4())[:8],
+        },
+    }
+
+
+def _handle_robot_error(exc: RobotServiceError) -> HTTPException:
+    return HTTPException(status_code=exc.status_code, detail=str(exc))
+
+
+def _assignment_response(a: Assignment) -> AssignmentResponse:
+    return AssignmentResponse(
+        task_id=a.task_id,
+        robot_id=a.robot_id,
+        approach_cost=round(a.approach_cost, 2),
+        trip_cost=round(a.trip_cost, 2),
+    )
+
+
+def require_robot_token(x_robot_token: str | None = Header(None)) -> None:
+    expected = os.getenv("ROBOT_TELEMETRY_TOKEN")
+    if not expected:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Robot telemetry is not configured (ROBOT_TELEMETRY_TOKEN).",
+        )
+    if x_robot_token is None or not hmac.compare_digest(x_robot_token.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid robot token.")
+
+
+router = APIRouter(prefix="/api/v1/robot", tags=["robot"])
+
+
+@router.get("")
+def robot_root():
+    return {"service": "robot", "base_path": "/api/v1/robot"}
+
+
+@router.get("/health")
+def robot_health():
+    return {"status": "healthy"}
+
+
+@router.get("/dispatch/queue")
+def get_dispatch_queue(
+    user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_db),
+):
+    """Dispatchable tasks waiting for a robot, in dispatch order (priority, then age)."""
+    try:
+        tasks = list_dispatch_queue(db, user=user)
+        items = [
+            QueuedTaskResponse(
+                task_id=t.id,
+                priority=t.priority,
+                created_at=t.created_at,
+                source_location=t.source_location,
+                destination_location=t.destination_location,
+            ).model_dump(mode="json")
+            for t in tasks
+        ]
+        return _success({"items": items, "count": len(items)})
+    except RobotServiceError as e:
+        raise _handle_robot_error(e) from e
+
+
+@router.post("/dispatch")
+def post_dispatch(
+    user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_db),
+):
+    """Run one dispatch pass: assign queued tasks to idle robots by travel cost and battery."""
+    try:
+        assignments, remaining = dispatch_queued_tasks(db, user=user)
+        out = DispatchResultResponse(
+            assignments=[_assignment_response(a) for a in assignments],
+            queued_remaining=remaining,
+        )
+        return _success({"dispatch": out.model_dump(mode="json")})
+    except RobotServiceError as e:
+        raise _handle_robot_error(e) from e
+
+
+@router.post("/dispatch/batched")
+def post_dispatch_batched(
+    capacity: int | None = Query(None, ge=1, le=20, description="Books per run (defaults to ROBOT_CAPACITY)."),
+    user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_db),
+):
+    """Run one batched dispatch pass: group nearby tasks into multi-stop runs and assign whole runs."""
+    try:
+        kwargs = {"capacity": capacity} if capacity is not None else {}
+        planned, remaining = dispatch_batched_runs(db, user=user, **kwargs)
+        out = BatchDispatchResultResponse(
+            runs=[
+                BatchRunResponse(
+                    run_id=run_id,
+                    robot_id=a.robot_id,
+                    task_ids=run.task_ids,
+                    stops=[
+                        BatchStopResponse(kind=stop.kind, location=stop.location, task_ids=list(stop.task_ids))
+                        for stop in run.stops
+                    ],
+                    approach_cost=round(a.approach_cost, 2),
+                    trip_cost=round(a.trip_cost, 2),
+                )
+                for run_id, a, run in planned
+            ],
+            queued_remaining=remaining,
+        )
+        return _success({"dispatch": out.model_dump(mode="json")})
+    except RobotServiceError as e:
+        raise _handle_robot_error(e) from e
+
+
+@router.post("/runs/{run_id}/stops/{stop_index}/complete")
+def post_complete_batch_stop(
+    run_id: uuid.UUID,
+    stop_index: int,
+    user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_db),
+):
+    """Robot reached a stop of a multi-stop run (pickup -> IN_PROGRESS, drop -> COMPLETED)."""
+    try:
+        stop, tasks = complete_batch_stop(db, user=user, run_id=run_id, stop_index=stop_index)
+        out = BatchStopCompleteResponse(
+            run_id=run_id,
+            stop_index=stop_index,
+            stop=BatchStopResponse(**stop),
+            tasks=[task_to_response(t) for t in tasks],
+        )
+        return _success({"stop": out.model_dump(mode="json")})
+    except RobotServiceError as e:
+        raise _handle_robot_error(e) from e
+
+
+@router.get("/metrics/throughput")
+def get_robot_throughput(
+    hours: float = Query(24.0, gt=0, le=24 * 31),
+    user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_db),
+):
+    """Books delivered per robot-hour over a recent window."""
+    try:
+        out = ThroughputResponse(**robot_throughput(db, user=user, hours=hours))
+        return _success({"throughput": out.model_dump(mode="json")})
+    except RobotServiceError as e:
+        raise _handle_robot_error(e) from e
+
+
+@router.get("/routes")
+def get_route_route(
+    source: str = Query(..., min_length=1, description="Waypoint location code to start from."),
+    destination: str = Query(..., min_length=1, description="Waypoint location code to reach."),
+    user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_db),
+):
+    """Shortest path over the active waypoint graph (precomputed all-pairs table)."""
+    try:
+        table, distance, path = get_route(db, user=user, source=source, destination=destination)
+        out = RouteResponse(
+            source_location=source,
+            destination_location=destination,
+            distance=round(distance, 2) if distance is not None else None,
+            waypoints=[
+                RouteWaypointResponse(waypoint_id=n.id, location_code=n.location_code, sequence_order=i)
+                for i, n in enumerate(path)
+            ],
+            graph_version=table.version,
+        )
+        return _success({"route": out.model_dump(mode="json")})
+    except RobotServiceError as e:
+        raise _handle_robot_error(e) from e
+
+
+@router.get("/fleet")
+def get_fleet(
+    status_filter: RobotStatus | None = Query(None, alias="status"),
+    stale: bool | None = Query(None, description="Only robots whose heartbeat is (not) stale."),
+    user: UserResponse = Depends(get_current_user_dep),
+):
+    """Live fleet state for dashboards, served from memory (robot.fleet_state), not ops.robots."""
+    try:
+        as_of, robots = fleet_overview(user=user, status=status_filter, stale=stale)
+        items = []
+        for r in robots:
+            age = r.heartbeat_age(as_of)
+            items.append(
+                FleetRobotResponse(
+                    robot_id=r.id,
+                    robot_name=r.robot_name,
+                    status=r.status,
+                    reported_status=r.reported_status,
+                    current_location=r.current_location,
+                    battery_level=r.battery_level,
+                    sensor_data=r.sensor_data,
+                    last_heartbeat=r.last_heartbeat,
+                    heartbeat_age_seconds=round(age, 1) if age is not None else None,
+                    stale=r.is_stale(as_of),
+                )
+            )
+        out = FleetResponse(
+            as_of=as_of,
+            count=len(items),
+            stale_count=sum(i.stale for i in items),
+            items=items,
+        )
+        return _success({"fleet": out.model_dump(mode="json")})
+    except RobotServiceError as e:
+        raise _handle_robot_error(e) from e
+
+
+@router.post("/robots/{robot_id}/fault")
+def post_robot_fault(
+    robot_id: uuid.UUID,
+    body: RobotFaultRequest,
+    user: UserResponse = Depends(get_current_user_dep),
+    db: Session = Depends(get_db),
+):
+    """Mark a robot faulted; its assigned tasks are requeued and re-dispatched."""
+    try:
+        requeued, failed, reassignments = report_robot_fault(
+            db, user=user, robot_id=robot_id, reason=body.reason
+        )
+        out = RobotFaultResponse(
+            robot_id=robot_id,
+            requeued_task_ids=requeued,
+            failed_task_ids=failed,
+            reassignments=[_assignment_response(a) for a in reassignments],
+        )
+        return _success({"fault": out.model_dump(mode="json")})
+    except RobotServiceError as e:
+        raise _handle_robot_error(e) from e
+
+
+@router.post("/robots/{robot_id}/telemetry", status_code=status.HTTP_202_ACCEPTED)
+async def post_robot_telemetry(
+    robot_id: uuid.UUID,
+    body: TelemetryBatchRequest,
+    _robot: None = Depends(require_robot_token),
+):
+    """Queue a batch of heartbeat frames; robot.telemetry writes them in bulk (latest state + status log)."""
+    if not await is_known_robot(robot_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Robot not found.")
+    received = datetime.now(timezone.utc)
+    frames = []
+    for f in body.frames:
+        recorded = f.recorded_at or received
+        if recorded.tzinfo is None:
+            recorded = recorded.replace(tzinfo=timezone.utc)
+        frames.append(
+            Frame(
+                robot_id=robot_id,
+                recorded_at=min(recorded, received),
+                status=f.status,
+                current_location=f.current_location,
+                battery_level=f.battery_level,
+                sensor_data=f.sensor_data,
+            )
+        )
+    get_telemetry_buffer().add(frames)
+    out = TelemetryAcceptedResponse(robot_id=robot_id, accepted=len(frames))
+    return _success({"telemetry": out.model_dump(mode="json")})
@@ -0,0 +1,270 @@
+"""
+Waypoint graph routing: all-pairs shortest paths over active waypoints.
+
+Graph:
+- A waypoint may list explicit corridors in its metadata as ``{"neighbors": ["B-2", ...]}``
+  (location codes; edges are undirected). This is the only way to connect floors (lifts).
+- Waypoints without explicit neighbors are linked to their ``FALLBACK_NEIGHBORS`` nearest
+  waypoints on the same floor (same z).
+- Edge weight is the straight-line distance between waypoint coordinates.
+
+The distance / next-hop matrices are computed once per waypoint-set version (a digest of the
+active rows) with a Dijkstra run from every waypoint, and cached in-process. Distance lookups
+during dispatch are two dict lookups and a list index; paths are rebuilt from the next-hop matrix.
+
+  python -m robot.routing --waypoints 400   # precompute / lookup benchmark on a synthetic map
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from robot.dispatcher import UNKNOWN_LOCATION_COST
+from shared.models import DeliveryTask, TaskWaypoint, Waypoint
+
+FALLBACK_NEIGHBORS = 4
+
+
+@dataclass(frozen=True)
+class WaypointNode:
+    id: UUID | str
+    location_code: str
+    x: float
+    y: float
+    z: float
+    neighbors: tuple[str, ...] = ()
+
+
+@dataclass
+class RoutingTable:
+    version: str
+    nodes: list[WaypointNode]
+    index: dict[str, int]
+    dist: list[list[float]]
+    # next_hop[i][j] = index of the first waypoint after i on the shortest path to j (-1 if unreachable)
+    next_hop: list[list[int]]
+
+    def distance(self, a: str | None, b: str | None) -> float:
+        """Shortest-path cost between location codes; unknown codes cost UNKNOWN_LOCATION_COST."""
+        if a is not None and a == b:
+            return 0.0
+        i = self.index.get(a) if a is not None else None
+        j = self.index.get(b) if b is not None else None
+        if i is None or j is None:
+            return UNKNOWN_LOCATION_COST
+        return self.dist[i][j]
+
+    def path(self, a: str, b: str) -> list[WaypointNode]:
+        """Waypoints from a to b inclusive; empty if either is unknown or b is unreachable."""
+        i = self.index.get(a)
+        j = self.index.get(b)
+        if i is None or j is None or (i != j and self.next_hop[i][j] < 0):
+            return []
+        out = [self.nodes[i]]
+        while i != j:
+            i = self.next_hop[i][j]
+            out.append(self.nodes[i])
+        return out
+
+
+def waypoint_set_version(nodes: Iterable[WaypointNode]) -> str:
+    """Stable digest of everything that affects the graph (ids, codes, coordinates, corridors)."""
+    h = hashlib.sha1()
+    for n in sorted(nodes, key=lambda n: n.location_code):
+        h.update(
+            json.dumps(
+                [str(n.id), n.location_code, n.x, n.y, n.z, sorted(n.neighbors)],
+                separators=(",", ":"),
+            ).encode()
+        )
+    return h.hexdigest()
+
+
+def _adjacency(nodes: list[WaypointNode], index: dict[str, int]) -> list[list[tuple[int, float]]]:
+    adj: list[dict[int, float]] = [{} for _ in nodes]
+
+    def _link(i: int, j: int) -> None:
+        if i == j:
+            return
+        a, b = nodes[i], nodes[j]
+        w = math.dist((a.x, a.y, a.z), (b.x, b.y, b.z))
+        adj[i][j] = w
+        adj[j][i] = w
+
+    by_floor: dict[float, list[int]] = {}
+    for i, n in enumerate(nodes):
+        by_floor.setdefault(n.z, []).append(i)
+    for i, n in enumerate(nodes):
+        if n.neighbors:
+            for code in n.neighbors:
+                j = index.get(code)
+                if j is not None:
+                    _link(i, j)
+            continue
+        same_floor = [j for j in by_floor[n.z] if j != i]
+        same_floor.sort(key=lambda j: (nodes[j].x - n.x) ** 2 + (nodes[j].y - n.y) ** 2)
+        for j in same_floor[:FALLBACK_NEIGHBORS]:
+            _link(i, j)
+    return [list(d.items()) for d in adj]
+
+
+def build_routing_table(nodes: list[WaypointNode], version: str | None = None) -> RoutingTable:
+    """All-pairs shortest paths via one Dijkstra per source (graphs here are sparse)."""
+    nodes = sorted(nodes, key=lambda n: n.location_code)
+    index = {n.location_code: i for i, n in enumerate(nodes)}
+    adj = _adjacency(nodes, index)
+    size = len(nodes)
+    dist = [[math.inf] * size for _ in range(size)]
+    next_hop = [[-1] * size for _ in range(size)]
+    for src in range(size):
+        d = dist[src]
+        first = next_hop[src]
+        d[src] = 0.0
+        first[src] = src
+        heap: list[tuple[float, int]] = [(0.0, src)]
+        while heap:
+            du, u = heapq.heappop(heap)
+            if du > d[u]:
+                continue
+            for v, w in adj[u]:
+                nd = du + w
+                if nd < d[v]:
+                    d[v] = nd
+                    # First hop from src: the neighbour itself when leaving src, else inherited.
+                    first[v] = v if u == src else first[u]
+                    heapq.heappush(heap, (nd, v))
+    return RoutingTable(
+        version=version or waypoint_set_version(nodes),
+        nodes=nodes,
+        index=index,
+        dist=dist,
+        next_hop=next_hop,
+    )
+
+
+def _node_from_row(row: Waypoint) -> WaypointNode:
+    meta = row.waypoint_metadata or {}
+    neighbors = meta.get("neighbors") or ()
+    return WaypointNode(
+        id=row.id,
+        location_code=row.location_code,
+        x=float(row.x_coordinate),
+        y=float(row.y_coordinate),
+        z=float(row.z_coordinate or 0.0),
+        neighbors=tuple(str(c) for c in neighbors),
+    )
+
+
+_cache_lock = threading.Lock()
+_cached: RoutingTable | None = None
+
+
+def get_routing_table(db: Session) -> RoutingTable:
+    """Routing table for the current active waypoints; recomputed only when the waypoint set changes."""
+    global _cached
+    rows = db.query(Waypoint).filter(Waypoint.is_active.is_(True)).all()
+    nodes = [_node_from_row(r) for r in rows]
+    version = waypoint_set_version(nodes)
+    cached = _cached
+    if cached is not None and cached.version == version:
+        return cached
+    with _cache_lock:
+        if _cached is None or _cached.version != version:
+            _cached = build_routing_table(nodes, version)
+        return _cached
+
+
+def reset_routing_cache() -> None:
+    global _cached
+    _cached = None
+
+
+def plan_task_route(db: Session, task: DeliveryTask, table: RoutingTable | None = None) -> list[WaypointNode]:
+    """
+    Replace the task's TaskWaypoint rows with the shortest path from source_location to
+    destination_location (sequence_order 0..n). Returns the path; empty if it cannot be routed.
+    Caller commits.
+    """
+    table = table or get_routing_table(db)
+    db.query(TaskWaypoint).filter(TaskWaypoint.task_id == task.id).delete(synchronize_session=False)
+    if not task.source_location or not task.destination_location:
+        return []
+    path = table.path(task.source_location, task.destination_location)
+    db.add_all(
+        TaskWaypoint(task_id=task.id, waypoint_id=node.id, sequence_order=order)
+        for order, node in enumerate(path)
+    )
+    return path
+
+
+# --- Synthetic map benchmark ---
+
+
+def synthetic_waypoints(n: int, *, floors: int = 2, seed: int = 7) -> list[WaypointNode]:
+    """Roughly square grid per floor, floors joined by one lift waypoint pair."""
+    rng = random.Random(seed)
+    per_floor = max(1, n // floors)
+    side = max(1, math.isqrt(per_floor))
+    nodes: list[WaypointNode] = []
+    for f in range(floors):
+        for k in range(per_floor):
+            code = f"F{f}-{k}"
+            neighbors: tuple[str, ...] = ()
+            if k == 0 and f + 1 < floors:
+                neighbors = (f"F{f + 1}-0",)
+            nodes.append(
+                WaypointNode(
+                    id=code,
+                    location_code=code,
+                    x=(k % side) * 3.0 + rng.uniform(-0.5, 0.5),
+                    y=(k // side) * 3.0 + rng.uniform(-0.5, 0.5),
+                    z=f * 4.0,
+                    neighbors=neighbors,
+                )
+            )
+    return nodes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark waypoint all-pairs routing.")
+    parser.add_argument("--waypoints", type=int, default=400, help="Synthetic waypoint count.")
+    parser.add_argument("--lookups", type=int, default=1_000_000, help="Distance lookups to time.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    nodes = synthetic_waypoints(args.waypoints, seed=args.seed)
+    start = time.perf_counter()
+    table = build_routing_table(nodes)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(args.seed)
+    codes = [n.location_code for n in nodes]
+    pairs = [(rng.choice(codes), rng.choice(codes)) for _ in range(min(args.lookups, 100_000))]
+    start = time.perf_counter()
+    for i in range(args.lookups):
+        a, b = pairs[i % len(pairs)]
+        table.distance(a, b)
+    lookup_ns = (time.perf_counter() - start) * 1e9 / max(1, args.lookups)
+    reachable = sum(1 for row in table.dist for d in row if d < math.inf)
+    print(
+        "ROUTING_BENCH "
+        f"waypoints={len(nodes)} "
+        f"build_ms={build_ms:.1f} "
+        f"lookup_ns={lookup_ns:.0f} "
+        f"reachable_pairs={reachable}/{len(nodes) ** 2}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Pydantic schemas for robot dispatch APIs."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from delivery.schemas import DeliveryTaskResponse
+from shared.models import RobotStatus, TaskPriority
+
+
+class AssignmentResponse(BaseModel):
+    task_id: UUID
+    robot_id: UUID
+    approach_cost: float
+    trip_cost: float
+
+
+class DispatchResultResponse(BaseModel):
+    assignments: list[AssignmentResponse]
+    queued_remaining: int
+
+
+class BatchStopResponse(BaseModel):
+    kind: Literal["pickup", "drop"]
+    location: str | None
+    task_ids: list[UUID]
+
+
+class BatchRunResponse(BaseModel):
+    run_id: UUID
+    robot_id: UUID
+    task_ids: list[UUID]
+    stops: list[BatchStopResponse]
+    approach_cost: float
+    trip_cost: float
+
+
+class BatchDispatchResultResponse(BaseModel):
+    runs: list[BatchRunResponse]
+    queued_remaining: int
+
+
+class BatchStopCompleteResponse(BaseModel):
+    run_id: UUID
+    stop_index: int
+    stop: BatchStopResponse
+    tasks: list[DeliveryTaskResponse]
+
+
+class ThroughputResponse(BaseModel):
+    window_hours: float
+    books: int
+    runs: int
+    robot_hours: float
+    books_per_robot_hour: float | None
+
+
+class QueuedTaskResponse(BaseModel):
+    task_id: UUID
+    priority: TaskPriority
+    created_at: datetime
+    source_location: str | None
+    destination_location: str | None
+
+
+class RobotFaultRequest(BaseModel):
+    reason: str | None = Field(None, max_length=500)
+
+
+class RobotFaultResponse(BaseModel):
+    robot_id: UUID
+    requeued_task_ids: list[UUID]
+    failed_task_ids: list[UUID]
+    reassignments: list[AssignmentResponse]
+
+
+class RouteWaypointResponse(BaseModel):
+    waypoint_id: UUID
+    location_code: str
+    sequence_order: int
+
+
+class RouteResponse(BaseModel):
+    source_location: str
+    destination_location: str
+    distance: float | None
+    waypoints: list[RouteWaypointResponse]
+    graph_version: str
+
+
+class TelemetryFrameRequest(BaseModel):
+    status: RobotStatus
+    # Defaults to the time the batch is received; clamped to it if the robot's clock runs ahead.
+    recorded_at: datetime | None = None
+    current_location: str | None = Field(None, max_length=120)
+    battery_level: float | None = Field(None, ge=0, le=100)
+    sensor_data: dict | None = None
+
+
+class TelemetryBatchRequest(BaseModel):
+    frames: list[TelemetryFrameRequest] = Field(..., min_length=1, max_length=1000)
+
+
+class TelemetryAcceptedResponse(BaseModel):
+    robot_id: UUID
+    accepted: int
+
+
+class FleetRobotResponse(BaseModel):
+    robot_id: UUID
+    robot_name: str | None
+    status: RobotStatus | None
+    reported_status: RobotStatus | None
+    current_location: str | None
+    battery_level: float | None
+    sensor_data: dict | None
+    last_heartbeat: datetime | None
+    heartbeat_age_seconds: float | None
+    stale: bool
+
+
+class FleetResponse(BaseModel):
+    as_of: datetime
+    count: int
+    stale_count: int
+    items: list[FleetRobotResponse]
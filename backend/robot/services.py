@@ -0,0 +1,437 @@
+"""Robot dispatch persistence: load the live queue/fleet, apply assignments, handle robot faults."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy.orm import Session
+
+from auth.schemas import UserResponse, UserRole
+from delivery.services import (
+    DeliveryError,
+    append_task_history,
+    apply_task_status,
+    is_dispatchable,
+    task_status_committed,
+)
+from robot.batching import ROBOT_CAPACITY, BatchRun, plan_batches
+from robot.dispatcher import (
+    Assignment,
+    DispatchQueue,
+    DispatchTask,
+    Dispatcher,
+    RobotState,
+)
+from robot.fleet_state import LiveRobot, get_fleet_state
+from robot.routing import RoutingTable, WaypointNode, get_routing_table, plan_task_route
+from shared.models import DeliveryTask, Robot, RobotStatus, RobotStatusLog, TaskPriority, TaskStatus
+
+# Tasks that left a run through the normal status route (cancelled, failed) are skipped at its stops.
+_TERMINAL_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+# Run membership and progress, set by dispatch_batched_runs / complete_batch_stop.
+_BATCH_METADATA_KEYS = ("batch_run_id", "batch_run_stops", "batch_stops_done")
+
+
+class RobotServiceError(Exception):
+    """Business rule violation; maps to 4xx."""
+
+    def __init__(self, message: str, *, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _require_staff(user: UserResponse) -> None:
+    if user.role not in (UserRole.LIBRARIAN, UserRole.ADMIN):
+        raise RobotServiceError("Only librarians can manage robot dispatch.", status_code=403)
+
+
+def get_route(db: Session, *, user: UserResponse, source: str, destination: str) -> tuple[RoutingTable, float | None, list[WaypointNode]]:
+    """Shortest waypoint path between two location codes; distance is None when unreachable."""
+    _require_staff(user)
+    table = get_routing_table(db)
+    if source not in table.index or destination not in table.index:
+        raise RobotServiceError("Unknown waypoint location code.", status_code=404)
+    path = table.path(source, destination)
+    return table, (table.distance(source, destination) if path else None), path
+
+
+def to_dispatch_task(task: DeliveryTask) -> DispatchTask:
+    created = task.created_at or datetime.now(timezone.utc)
+    return DispatchTask(
+        id=task.id,
+        priority=task.priority or TaskPriority.NORMAL,
+        created_at=created.timestamp(),
+        source_location=task.source_location,
+        destination_location=task.destination_location,
+    )
+
+
+def _queued_tasks(db: Session, *, lock: bool) -> list[DeliveryTask]:
+    q = db.query(DeliveryTask).filter(
+        DeliveryTask.status == TaskStatus.QUEUED,
+        DeliveryTask.assigned_robot_id.is_(None),
+    )
+    if lock:
+        # Concurrent dispatch passes skip rows another pass is already assigning.
+        q = q.with_for_update(skip_locked=True)
+    return [t for t in q.all() if is_dispatchable(t)]
+
+
+def list_dispatch_queue(db: Session, *, user: UserResponse) -> list[DeliveryTask]:
+    """Dispatchable, unassigned tasks in the order the dispatcher will serve them."""
+    _require_staff(user)
+    tasks = {t.id: t for t in _queued_tasks(db, lock=False)}
+    queue = DispatchQueue(to_dispatch_task(t) for t in tasks.values())
+    ordered: list[DeliveryTask] = []
+    while (item := queue.pop()) is not None:
+        ordered.append(tasks[item.id])
+    return ordered
+
+
+def _apply_assignments(
+    db: Session,
+    assignments: list[Assignment],
+    tasks: dict[UUID, DeliveryTask],
+    robots: dict[UUID, Robot],
+    table: RoutingTable,
+    extra_metadata: dict[UUID, dict] | None = None,
+) -> None:
+    now = datetime.now(timezone.utc)
+    for a in assignments:
+        task = tasks[a.task_id]
+        robot = robots[a.robot_id]
+        plan_task_route(db, task, table)
+        meta = dict(task.task_metadata or {})
+        meta["assigned_at"] = now.isoformat()
+        meta["dispatch_approach_cost"] = round(a.approach_cost, 2)
+        meta["dispatch_trip_cost"] = round(a.trip_cost, 2)
+        meta.update((extra_metadata or {}).get(task.id, {}))
+        task.task_metadata = meta
+        task.assigned_robot_id = robot.id
+        old_status = task.status
+        task.status = TaskStatus.ASSIGNED
+        robot.status = RobotStatus.BUSY
+        append_task_history(
+            db,
+            task=task,
+            old_status=old_status,
+            new_status=TaskStatus.ASSIGNED,
+            changed_by=None,
+            reason=f"robot_assigned:{robot.robot_name}",
+        )
+
+
+def _dispatch_robot_state(robot: Robot, live: LiveRobot | None) -> LiveRobot:
+    """The robot's row overlaid with newer telemetry from the live fleet state."""
+    state = LiveRobot(
+        id=robot.id,
+        current_location=robot.current_location,
+        battery_level=robot.battery_level,
+        last_heartbeat=robot.last_heartbeat,
+    )
+    if live is not None:
+        state.merge_telemetry(live)
+    return state
+
+
+def _load_dispatch_state(db: Session) -> tuple[dict[UUID, DeliveryTask], dict[UUID, Robot], RoutingTable, Dispatcher]:
+    tasks = {t.id: t for t in _queued_tasks(db, lock=True)}
+    robots = {
+        r.id: r
+        for r in db.query(Robot)
+        .filter(Robot.status == RobotStatus.IDLE)
+        .with_for_update(skip_locked=True)
+        .all()
+    }
+    # Location and battery come from live telemetry (the table is only checkpointed); robots that
+    # stopped sending heartbeats are left out.
+    fleet = get_fleet_state()
+    live = fleet.live(robots)
+    now = datetime.now(timezone.utc)
+    states = {robot_id: _dispatch_robot_state(robot, live.get(robot_id)) for robot_id, robot in robots.items()}
+    robots = {
+        robot_id: robot
+        for robot_id, robot in robots.items()
+        if not states[robot_id].is_stale(now, fleet.stale_after_seconds)
+    }
+    # Shortest-path costs over the waypoint graph; cached per waypoint-set version, O(1) per lookup.
+    table = get_routing_table(db)
+    dispatcher = Dispatcher(cost_fn=table.distance)
+    for robot_id in robots:
+        state = states[robot_id]
+        dispatcher.upsert_robot(
+            RobotState(id=robot_id, location=state.current_location, battery_level=state.battery_level)
+        )
+    return tasks, robots, table, dispatcher
+
+
+def _dispatch(db: Session) -> tuple[list[Assignment], int]:
+    tasks, robots, table, dispatcher = _load_dispatch_state(db)
+    for task in tasks.values():
+        dispatcher.enqueue(to_dispatch_task(task))
+    assignments = dispatcher.dispatch()
+    _apply_assignments(db, assignments, tasks, robots, table)
+    return assignments, len(dispatcher.queue)
+
+
+def dispatch_queued_tasks(db: Session, *, user: UserResponse) -> tuple[list[Assignment], int]:
+    """Assign queued dispatchable tasks to idle robots; returns (assignments, tasks still queued)."""
+    _require_staff(user)
+    assignments, remaining = _dispatch(db)
+    db.commit()
+    get_fleet_state().record_status({a.robot_id for a in assignments}, RobotStatus.BUSY)
+    return assignments, remaining
+
+
+def dispatch_batched_runs(
+    db: Session,
+    *,
+    user: UserResponse,
+    capacity: int = ROBOT_CAPACITY,
+) -> tuple[list[tuple[UUID, Assignment, BatchRun]], int]:
+    """
+    Group queued dispatchable tasks into multi-stop runs (robot.batching) and assign whole runs to
+    idle robots. Every task of a run is ASSIGNED to the same robot and carries the run id and stop
+    plan in its metadata. Returns ([(run_id, assignment, run)], tasks still queued).
+    """
+    _require_staff(user)
+    if capacity < 1:
+        raise RobotServiceError("capacity must be at least 1.")
+    tasks, robots, table, dispatcher = _load_dispatch_state(db)
+    runs: dict[UUID, BatchRun] = {}
+    for run in plan_batches([to_dispatch_task(t) for t in tasks.values()], table.distance, capacity=capacity):
+        run_id = uuid4()
+        runs[run_id] = run
+        dispatcher.enqueue(run.as_dispatch_task(run_id))
+
+    out: list[tuple[UUID, Assignment, BatchRun]] = []
+    member_assignments: list[Assignment] = []
+    run_metadata: dict[UUID, dict] = {}
+    for a in dispatcher.dispatch():
+        run = runs[a.task_id]
+        stops = [
+            {"kind": stop.kind, "location": stop.location, "task_ids": [str(t) for t in stop.task_ids]}
+            for stop in run.stops
+        ]
+        for member in run.tasks:
+            member_assignments.append(Assignment(member.id, a.robot_id, a.approach_cost, a.trip_cost))
+            run_metadata[member.id] = {"batch_run_id": str(a.task_id), "batch_run_stops": stops}
+        out.append((a.task_id, a, run))
+    _apply_assignments(db, member_assignments, tasks, robots, table, run_metadata)
+    db.commit()
+    get_fleet_state().record_status({a.robot_id for _run_id, a, _run in out}, RobotStatus.BUSY)
+    assigned_runs = {run_id for run_id, _a, _run in out}
+    return out, sum(len(run.tasks) for run_id, run in runs.items() if run_id not in assigned_runs)
+
+
+def _run_tasks(db: Session, run_id: UUID) -> list[DeliveryTask]:
+    return (
+        db.query(DeliveryTask)
+        .filter(DeliveryTask.task_metadata["batch_run_id"].as_string() == str(run_id))
+        .with_for_update()
+        .all()
+    )
+
+
+def complete_batch_stop(
+    db: Session,
+    *,
+    user: UserResponse,
+    run_id: UUID,
+    stop_index: int,
+) -> tuple[dict, list[DeliveryTask]]:
+    """
+    Robot reached stop ``stop_index`` of a multi-stop run.
+
+    Pickup stops move their tasks ASSIGNED -> IN_PROGRESS; drop stops move them
+    IN_PROGRESS -> COMPLETED. Both go through delivery.services.apply_task_status, so each stop
+    lands in the task status history (and the task event stream) like a single-task run. A stop is
+    applied in one transaction: if any of its tasks cannot move, none do and the stop stays open.
+    Tasks already cancelled, failed or completed are skipped (a stop whose tasks are all terminal
+    is just marked done). Re-posting a completed stop is a no-op. The robot is released after the
+    last drop.
+    """
+    _require_staff(user)
+    tasks = _run_tasks(db, run_id)
+    if not tasks:
+        raise RobotServiceError("Batch run not found.", status_code=404)
+    meta = tasks[0].task_metadata or {}
+    stops = meta.get("batch_run_stops") or []
+    if not 0 <= stop_index < len(stops):
+        raise RobotServiceError("Stop index out of range.", status_code=400)
+    stop = stops[stop_index]
+    done = set(meta.get("batch_stops_done") or [])
+    by_id = {str(t.id): t for t in tasks}
+    if stop_index in done:
+        return stop, [by_id[t] for t in stop["task_ids"] if t in by_id]
+
+    if stop["kind"] == "pickup":
+        expected, new_status = TaskStatus.ASSIGNED, TaskStatus.IN_PROGRESS
+    else:
+        expected, new_status = TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED
+    stop_tasks = [
+        by_id[t] for t in stop["task_ids"] if t in by_id and by_id[t].status not in _TERMINAL_STATUSES
+    ]
+    for task in stop_tasks:
+        if task.status != expected:
+            raise RobotServiceError(
+                f"Task {task.id} is {task.status.value}; expected {expected.value} at this stop.",
+                status_code=409,
+            )
+
+    done.add(stop_index)
+    for task in tasks:
+        task_meta = dict(task.task_metadata or {})
+        task_meta["batch_stops_done"] = sorted(done)
+        task.task_metadata = task_meta
+
+    # The whole stop is one transaction: either every task moves and the stop is done, or nothing.
+    try:
+        for task in stop_tasks:
+            apply_task_status(
+                db,
+                task,
+                new_status=new_status,
+                changed_by=user.id,
+                reason=f"batch_{stop['kind']}:{stop['location']}",
+            )
+            # The robot-release check on the last drop queries its other tasks: it must see these.
+            db.flush()
+    except DeliveryError as e:
+        db.rollback()
+        raise RobotServiceError(str(e), status_code=e.status_code) from e
+    db.commit()
+    for task in stop_tasks:
+        db.refresh(task)
+        task_status_committed(task)
+    return stop, stop_tasks
+
+
+def robot_throughput(db: Session, *, user: UserResponse, hours: float = 24.0) -> dict:
+    """
+    Books delivered per robot-hour over the last ``hours``: completed robot tasks divided by the
+    time robots spent on them. Tasks of one multi-stop run share that run's time.
+    """
+    _require_staff(user)
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    rows = (
+        db.query(DeliveryTask.id, DeliveryTask.started_at, DeliveryTask.completed_at, DeliveryTask.task_metadata)
+        .filter(
+            DeliveryTask.status == TaskStatus.COMPLETED,
+            DeliveryTask.assigned_robot_id.isnot(None),
+            DeliveryTask.started_at.isnot(None),
+            DeliveryTask.completed_at >= since,
+        )
+        .all()
+    )
+    spans: dict[str, tuple[datetime, datetime]] = {}
+    for task_id, started_at, completed_at, meta in rows:
+        key = (meta or {}).get("batch_run_id") or str(task_id)
+        first, last = spans.get(key, (started_at, completed_at))
+        spans[key] = (min(first, started_at), max(last, completed_at))
+    robot_hours = sum((end - start).total_seconds() for start, end in spans.values()) / 3600
+    return {
+        "window_hours": hours,
+        "books": len(rows),
+        "runs": len(spans),
+        "robot_hours": round(robot_hours, 3),
+        "books_per_robot_hour": round(len(rows) / robot_hours, 2) if robot_hours > 0 else None,
+    }
+
+
+def report_robot_fault(
+    db: Session,
+    *,
+    user: UserResponse,
+    robot_id: UUID,
+    reason: str | None = None,
+) -> tuple[list[UUID], list[UUID], list[Assignment]]:
+    """
+    Take a robot out of rotation and recover its work.
+
+    ASSIGNED tasks (robot never started) go back to the queue and are immediately re-dispatched to
+    the remaining idle robots. IN_PROGRESS tasks are failed, since the book is on the faulted robot
+    and has to be recovered by staff.
+    """
+    _require_staff(user)
+    robot = db.get(Robot, robot_id, with_for_update=True)
+    if robot is None:
+        raise RobotServiceError("Robot not found.", status_code=404)
+
+    robot.status = RobotStatus.ERROR
+    db.add(
+        RobotStatusLog(
+            robot_id=robot.id,
+            status=RobotStatus.ERROR,
+            current_location=robot.current_location,
+            battery_level=robot.battery_level,
+            sensor_data={"fault_reason": reason} if reason else None,
+        )
+    )
+
+    requeued: list[UUID] = []
+    failed: list[UUID] = []
+    now = datetime.now(timezone.utc)
+    tasks = (
+        db.query(DeliveryTask)
+        .filter(
+            DeliveryTask.assigned_robot_id == robot.id,
+            DeliveryTask.status.in_((TaskStatus.ASSIGNED, TaskStatus.IN_PROGRESS)),
+        )
+        .with_for_update()
+        .all()
+    )
+    for task in tasks:
+        old_status = task.status
+        if old_status == TaskStatus.ASSIGNED:
+            task.status = TaskStatus.QUEUED
+            task.assigned_robot_id = None
+            meta = dict(task.task_metadata or {})
+            meta.pop("assigned_at", None)
+            # Re-dispatched on its own: it is no longer part of the dead robot's run.
+            for key in _BATCH_METADATA_KEYS:
+                meta.pop(key, None)
+            meta["requeued_after_fault_at"] = now.isoformat()
+            task.task_metadata = meta
+            requeued.append(task.id)
+            history_reason = "robot_fault_requeued"
+        else:
+            task.status = TaskStatus.FAILED
+            task.completed_at = now
+            failed.append(task.id)
+            history_reason = "robot_fault"
+        append_task_history(
+            db,
+            task=task,
+            old_status=old_status,
+            new_status=task.status,
+            changed_by=user.id,
+            reason=f"{history_reason}:{reason}" if reason else history_reason,
+        )
+    # Make the requeued rows visible to the dispatch query in this transaction.
+    db.flush()
+    reassignments, _remaining = _dispatch(db) if requeued else ([], 0)
+    db.commit()
+    fleet = get_fleet_state()
+    fleet.record_status([robot_id], RobotStatus.ERROR)
+    fleet.record_status({a.robot_id for a in reassignments}, RobotStatus.BUSY)
+    return requeued, failed, reassignments
+
+
+def fleet_overview(
+    *,
+    user: UserResponse,
+    status: RobotStatus | None = None,
+    stale: bool | None = None,
+) -> tuple[datetime, list[LiveRobot]]:
+    """Live state of the fleet from memory (robot.fleet_state), optionally filtered; returns (as_of, robots)."""
+    _require_staff(user)
+    fleet = get_fleet_state()
+    now = datetime.now(timezone.utc)
+    robots = [
+        r
+        for r in fleet.robots()
+        if (status is None or r.status == status)
+        and (stale is None or r.is_stale(now, fleet.stale_after_seconds) == stale)
+    ]
+    return now, robots
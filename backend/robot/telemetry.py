@@ -0,0 +1,318 @@
+"""
+Robot telemetry ingestion: heartbeat frames are buffered in-process and written in bulk.
+
+``POST /api/v1/robot/robots/{robot_id}/telemetry`` applies a batch of frames to the live fleet
+state (robot.fleet_state), queues them and returns. A background thread flushes every
+TELEMETRY_FLUSH_INTERVAL_SECONDS, or as soon as TELEMETRY_FLUSH_ROWS frames are pending:
+
+- the robots heard from since the last flush are published to Redis (robot.fleet_state)
+- every frame becomes an ``ops.robot_status_logs`` row, written with multi-row INSERTs of up to
+  TELEMETRY_INSERT_CHUNK rows each
+- every TELEMETRY_CHECKPOINT_SECONDS, in the same transaction, frames are coalesced per robot
+  (the newest value of each field wins) into a single ``UPDATE ops.robots ... FROM (VALUES ...)``.
+  Reads of the live state are served from memory, so the table is a checkpoint: one row update
+  per robot per checkpoint, not one per frame. A robot's row only moves forward in time: frames
+  older than its ``last_heartbeat`` (late or reordered batches) do not overwrite it
+
+``Robot.status`` is not written by telemetry. Assignment (BUSY) and faults stay with dispatch
+and the fault endpoint; the status a robot reports is kept in its log rows.
+
+Telemetry is a stream of samples, so the buffer is bounded instead of durable. Past
+TELEMETRY_MAX_PENDING frames the oldest log rows are dropped, counted as
+``robot_telemetry_frames{result="dropped"}``. The coalesced latest state is always kept. A failed
+flush is retried on the next interval. A crash loses at most the frames still pending (and, for
+``ops.robots``, the state since the last checkpoint, which the next heartbeats replace).
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+from uuid import UUID, uuid4
+
+from sqlalchemy import JSON, DateTime, Float, String, cast, column, func, insert, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from robot.fleet_state import FleetState, get_fleet_state
+from shared.metrics import get_counter, get_histogram
+from shared.models import Robot, RobotStatus, RobotStatusLog
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_FLUSH_INTERVAL_SECONDS = float(os.getenv("TELEMETRY_FLUSH_INTERVAL_SECONDS", "1.0"))
+TELEMETRY_FLUSH_ROWS = int(os.getenv("TELEMETRY_FLUSH_ROWS", "2000"))
+TELEMETRY_MAX_PENDING = int(os.getenv("TELEMETRY_MAX_PENDING", "50000"))
+TELEMETRY_CHECKPOINT_SECONDS = float(os.getenv("TELEMETRY_CHECKPOINT_SECONDS", "15"))
+TELEMETRY_INSERT_CHUNK = 1000
+
+TELEMETRY_FRAMES = get_counter(
+    "robot_telemetry_frames",
+    "Robot telemetry frames by result (accepted / written / dropped).",
+    ("result",),
+)
+TELEMETRY_FLUSH_SECONDS = get_histogram(
+    "robot_telemetry_flush_duration_seconds",
+    "Duration of one telemetry flush (log INSERTs, plus the coalesced robots UPDATE on checkpoints).",
+)
+
+# Robot columns a frame can update (besides last_heartbeat).
+STATE_FIELDS = ("current_location", "battery_level", "sensor_data")
+
+
+@dataclass
+class Frame:
+    robot_id: UUID
+    recorded_at: datetime
+    status: RobotStatus
+    current_location: str | None = None
+    battery_level: float | None = None
+    sensor_data: dict | None = None
+
+    def log_row(self) -> dict:
+        return {
+            "id": uuid4(),
+            "robot_id": self.robot_id,
+            "status": self.status,
+            "current_location": self.current_location,
+            "battery_level": self.battery_level,
+            "sensor_data": self.sensor_data,
+            "recorded_at": self.recorded_at,
+        }
+
+
+@dataclass
+class RobotState:
+    """Coalesced latest state of one robot since the last flush."""
+
+    last_heartbeat: datetime
+    fields: dict = field(default_factory=dict)
+
+    def merge(self, frame: Frame) -> None:
+        newer = frame.recorded_at >= self.last_heartbeat
+        for name in STATE_FIELDS:
+            value = getattr(frame, name)
+            if value is not None and (newer or name not in self.fields):
+                self.fields[name] = value
+        if newer:
+            self.last_heartbeat = frame.recorded_at
+
+
+def write_telemetry(db: Session, rows: list[dict], states: dict[UUID, RobotState]) -> None:
+    """Append ``rows`` to robot_status_logs and apply ``states`` to robots; caller commits."""
+    for start in range(0, len(rows), TELEMETRY_INSERT_CHUNK):
+        db.execute(insert(RobotStatusLog).values(rows[start : start + TELEMETRY_INSERT_CHUNK]))
+    if not states:
+        return
+    latest = values(
+        column("id", PG_UUID(as_uuid=True)),
+        column("current_location", String),
+        column("battery_level", Float),
+        # None must be SQL NULL (not JSON null) for the COALESCE below to keep the stored value.
+        column("sensor_data", JSON(none_as_null=True)),
+        column("last_heartbeat", DateTime(timezone=True)),
+        name="latest",
+    ).data(
+        [
+            (
+                robot_id,
+                state.fields.get("current_location"),
+                state.fields.get("battery_level"),
+                state.fields.get("sensor_data"),
+                state.last_heartbeat,
+            )
+            for robot_id, state in states.items()
+        ]
+    )
+    db.execute(
+        update(Robot)
+        .where(Robot.id == latest.c.id)
+        .where(or_(Robot.last_heartbeat.is_(None), Robot.last_heartbeat <= latest.c.last_heartbeat))
+        .values(
+            # A VALUES column that is NULL in every row is typed text: cast back to the column type.
+            current_location=func.coalesce(cast(latest.c.current_location, String), Robot.current_location),
+            battery_level=func.coalesce(cast(latest.c.battery_level, Float), Robot.battery_level),
+            sensor_data=func.coalesce(cast(latest.c.sensor_data, JSON), Robot.sensor_data),
+            last_heartbeat=latest.c.last_heartbeat,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _flush_to_database(rows: list[dict], states: dict[UUID, RobotState]) -> None:
+    from shared.db import SessionLocal
+
+    with SessionLocal() as db:
+        # A robot deleted since its frames were accepted would fail the whole batch on the FK.
+        robot_ids = {row["robot_id"] for row in rows} | set(states)
+        existing = set(db.scalars(select(Robot.id).where(Robot.id.in_(robot_ids))).all()) if robot_ids else set()
+        write_telemetry(
+            db,
+            [row for row in rows if row["robot_id"] in existing],
+            {robot_id: state for robot_id, state in states.items() if robot_id in existing},
+        )
+        db.commit()
+
+
+_known_robots: set[UUID] = set()
+
+
+async def is_known_robot(robot_id: UUID) -> bool:
+    """Whether the robot exists; hits are cached per process, so steady-state ingestion skips the DB."""
+    if robot_id in _known_robots:
+        return True
+    from shared.db import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        found = await db.scalar(select(Robot.id).where(Robot.id == robot_id))
+    if found is not None:
+        _known_robots.add(robot_id)
+    return found is not None
+
+
+class TelemetryBuffer:
+    def __init__(
+        self,
+        *,
+        flush: Callable[[list[dict], dict[UUID, RobotState]], None] = _flush_to_database,
+        interval_seconds: float = TELEMETRY_FLUSH_INTERVAL_SECONDS,
+        flush_rows: int = TELEMETRY_FLUSH_ROWS,
+        max_pending: int = TELEMETRY_MAX_PENDING,
+        checkpoint_seconds: float = TELEMETRY_CHECKPOINT_SECONDS,
+        fleet: FleetState | None = None,
+    ) -> None:
+        self.flush_fn = flush
+        self.fleet = fleet or get_fleet_state()
+        self.checkpoint_seconds = checkpoint_seconds
+        self.interval_seconds = interval_seconds
+        self.flush_rows = max(1, flush_rows)
+        self.max_pending = max(1, max_pending)
+        self._rows: deque[dict] = deque()
+        self._states: dict[UUID, RobotState] = {}
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._checkpointed_at: float | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def add(self, frames: list[Frame]) -> None:
+        for frame in frames:
+            self.fleet.observe(
+                frame.robot_id,
+                recorded_at=frame.recorded_at,
+                reported_status=frame.status,
+                current_location=frame.current_location,
+                battery_level=frame.battery_level,
+                sensor_data=frame.sensor_data,
+            )
+        dropped = 0
+        with self._cond:
+            for frame in frames:
+                self._rows.append(frame.log_row())
+                state = self._states.get(frame.robot_id)
+                if state is None:
+                    state = self._states[frame.robot_id] = RobotState(frame.recorded_at)
+                state.merge(frame)
+            while len(self._rows) > self.max_pending:
+                self._rows.popleft()
+                dropped += 1
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="robot-telemetry", daemon=True)
+                self._thread.start()
+            elif len(self._rows) >= self.flush_rows:
+                self._cond.notify()
+        TELEMETRY_FRAMES.inc(len(frames), result="accepted")
+        if dropped:
+            TELEMETRY_FRAMES.inc(dropped, result="dropped")
+            logger.warning("Telemetry buffer full; dropped %d oldest frames", dropped)
+
+    def flush(self, *, checkpoint: bool = False) -> bool:
+        """
+        Write pending log rows now (caller's thread), and the coalesced robot states when a
+        checkpoint is due or ``checkpoint`` is set. False if the write failed (kept pending).
+        """
+        self.fleet.publish()
+        with self._cond:
+            rows = list(self._rows)
+            self._rows.clear()
+            now = time.monotonic()
+            due = (
+                checkpoint
+                or self._checkpointed_at is None
+                or now - self._checkpointed_at >= self.checkpoint_seconds
+            )
+            states: dict[UUID, RobotState] = {}
+            if due:
+                states, self._states = self._states, {}
+        if not rows and not states:
+            return True
+        start = time.perf_counter()
+        try:
+            self.flush_fn(rows, states)
+        except Exception:
+            logger.exception("Telemetry flush of %d frames failed", len(rows))
+            self._restore(rows, states)
+            return False
+        TELEMETRY_FLUSH_SECONDS.observe(time.perf_counter() - start)
+        TELEMETRY_FRAMES.inc(len(rows), result="written")
+        if states:
+            self._checkpointed_at = now
+        return True
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(self.interval_seconds + 5.0)
+        self.flush(checkpoint=True)
+
+    def _restore(self, rows: list[dict], states: dict[UUID, RobotState]) -> None:
+        with self._cond:
+            # Frames that arrived during the failed flush are newer: keep them after the old ones.
+            self._rows.extendleft(reversed(rows))
+            while len(self._rows) > self.max_pending:
+                self._rows.popleft()
+            for robot_id, old in states.items():
+                newer = self._states.get(robot_id)
+                if newer is None:
+                    self._states[robot_id] = old
+                else:
+                    newer.fields = {**old.fields, **newer.fields}
+                    newer.last_heartbeat = max(newer.last_heartbeat, old.last_heartbeat)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or len(self._rows) >= self.flush_rows,
+                    timeout=self.interval_seconds,
+                )
+                if self._closed:
+                    return
+            if not self.flush():
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closed, timeout=self.interval_seconds)
+
+
+_buffer: TelemetryBuffer | None = None
+_buffer_lock = threading.Lock()
+
+
+def get_telemetry_buffer() -> TelemetryBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = TelemetryBuffer()
+                atexit.register(_buffer.close)
+    return _buffer
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from auth.schemas import UserResponse, UserRole
+from delivery.services import DeliveryError
+from robot import services as robot_services
+from robot.batching import order_stops, plan_batches, simulate_runs
+from robot.dispatcher import DispatchTask, coordinate_cost_fn
+from shared.models import TaskPriority, TaskStatus
+
+COORDS = {
+    "A-1": (0.0, 0.0, 0.0),
+    "A-2": (3.0, 0.0, 0.0),
+    "A-3": (6.0, 0.0, 0.0),
+    "Z-9": (200.0, 0.0, 0.0),
+    "Desk 1": (0.0, 20.0, 0.0),
+    "Desk 2": (6.0, 20.0, 0.0),
+}
+COST = coordinate_cost_fn(COORDS)
+
+
+def _task(tid, src, dst, priority=TaskPriority.NORMAL, created_at=0.0):
+    return DispatchTask(id=tid, priority=priority, created_at=created_at, source_location=src, destination_location=dst)
+
+
+def test_plan_batches_respects_capacity_and_radius():
+    tasks = [
+        _task("t1", "A-1", "Desk 1", created_at=1.0),
+        _task("t2", "A-2", "Desk 1", created_at=2.0),
+        _task("t3", "A-3", "Desk 2", created_at=3.0),
+        _task("far", "Z-9", "Desk 1", created_at=4.0),
+    ]
+    runs = plan_batches(tasks, COST, capacity=2, radius=40.0)
+    assert [sorted(r.task_ids) for r in runs] == [["t1", "t2"], ["t3"], ["far"]]
+
+    runs = plan_batches(tasks, COST, capacity=4, radius=40.0)
+    assert [sorted(r.task_ids) for r in runs] == [["t1", "t2", "t3"], ["far"]]
+
+
+def test_order_stops_loads_everything_before_dropping_and_merges_locations():
+    tasks = [
+        _task("t1", "A-3", "Desk 1"),
+        _task("t2", "A-1", "Desk 2"),
+        _task("t3", "A-2", "Desk 1"),
+    ]
+    stops, cost = order_stops(tasks, COST)
+    kinds = [s.kind for s in stops]
+    assert kinds == ["pickup", "pickup", "pickup", "drop", "drop"]
+    assert [s.location for s in stops[:3]] in (["A-1", "A-2", "A-3"], ["A-3", "A-2", "A-1"])
+    drop_desk_1 = next(s for s in stops if s.kind == "drop" and s.location == "Desk 1")
+    assert sorted(drop_desk_1.task_ids) == ["t1", "t3"]
+    # Pickups along the aisle (6) + aisle end to nearest desk (20) + desk to desk (6).
+    assert round(cost, 6) == 32.0
+
+
+def test_run_inherits_most_urgent_priority():
+    runs = plan_batches(
+        [_task("t1", "A-1", "Desk 1", created_at=1.0), _task("t2", "A-2", "Desk 1", TaskPriority.URGENT, 5.0)],
+        COST,
+        capacity=2,
+    )
+    [run] = runs
+    dispatch_task = run.as_dispatch_task("run-1")
+    assert dispatch_task.priority == TaskPriority.URGENT
+    assert dispatch_task.created_at == 1.0
+    assert dispatch_task.trip_cost == run.cost
+
+
+def test_batching_improves_books_per_robot_hour():
+    single = simulate_runs(n_robots=4, n_tasks=200, capacity=1, seed=3)
+    batched = simulate_runs(n_robots=4, n_tasks=200, capacity=4, seed=3)
+    assert batched.runs < single.runs
+    assert batched.books_per_robot_hour > single.books_per_robot_hour
+
+
+def _librarian() -> UserResponse:
+    return UserResponse(
+        id=uuid4(), email="lib@luna.dev", first_name="Lib", last_name="Rarian", role=UserRole.LIBRARIAN, phone_number=None
+    )
+
+
+def test_batch_stop_skips_tasks_cancelled_before_it(monkeypatch):
+    kept, cancelled = uuid4(), uuid4()
+    stops = [
+        {"kind": "pickup", "location": "A-1", "task_ids": [str(kept), str(cancelled)]},
+        {"kind": "drop", "location": "Desk 1", "task_ids": [str(cancelled)]},
+        {"kind": "drop", "location": "Desk 2", "task_ids": [str(kept)]},
+    ]
+    tasks = [
+        SimpleNamespace(id=kept, status=TaskStatus.ASSIGNED, task_metadata={"batch_run_stops": stops}),
+        SimpleNamespace(id=cancelled, status=TaskStatus.CANCELLED, task_metadata={"batch_run_stops": stops}),
+    ]
+    applied = []
+
+    def _apply(db, task, *, new_status, changed_by, reason=None):
+        task.status = new_status
+        applied.append((task.id, new_status))
+        return True
+
+    monkeypatch.setattr(robot_services, "_run_tasks", lambda db, run_id: tasks)
+    monkeypatch.setattr(robot_services, "apply_task_status", _apply)
+    monkeypatch.setattr(robot_services, "task_status_committed", lambda task: None)
+    db = MagicMock()
+    run_id = uuid4()
+
+    _stop, moved = robot_services.complete_batch_stop(db, user=_librarian(), run_id=run_id, stop_index=0)
+    assert [t.id for t in moved] == [kept]
+    # Only the cancelled task's drop: nothing to move, the stop is just marked done.
+    _stop, moved = robot_services.complete_batch_stop(db, user=_librarian(), run_id=run_id, stop_index=1)
+    assert moved == []
+    robot_services.complete_batch_stop(db, user=_librarian(), run_id=run_id, stop_index=2)
+
+    assert applied == [(kept, TaskStatus.IN_PROGRESS), (kept, TaskStatus.COMPLETED)]
+    assert tasks[0].task_metadata["batch_stops_done"] == [0, 1, 2]
+    assert db.commit.call_count == 3 and not db.rollback.called
+
+
+def test_robot_fault_takes_requeued_tasks_out_of_their_run(monkeypatch):
+    robot = SimpleNamespace(id=uuid4(), status=None, current_location="A-1", battery_level=50.0)
+    task = SimpleNamespace(
+        id=uuid4(),
+        status=TaskStatus.ASSIGNED,
+        assigned_robot_id=robot.id,
+        task_metadata={
+            "assigned_at": "2026-01-01T00:00:00+00:00",
+            "batch_run_id": str(uuid4()),
+            "batch_run_stops": [],
+            "batch_stops_done": [0],
+            "route": ["A-1"],
+        },
+    )
+    db = MagicMock()
+    db.get.return_value = robot
+    db.query.return_value.filter.return_value.with_for_update.return_value.all.return_value = [task]
+    monkeypatch.setattr(robot_services, "append_task_history", lambda db, **kwargs: None)
+    monkeypatch.setattr(robot_services, "_dispatch", lambda db: ([], 1))
+    monkeypatch.setattr(robot_services, "get_fleet_state", lambda: MagicMock())
+
+    requeued, failed, _ = robot_services.report_robot_fault(db, user=_librarian(), robot_id=robot.id)
+
+    assert requeued == [task.id] and failed == []
+    assert task.status == TaskStatus.QUEUED and task.assigned_robot_id is None
+    assert set(task.task_metadata) == {"route", "requeued_after_fault_at"}
+
+
+def test_batch_stop_is_applied_atomically(monkeypatch):
+    ok, bad = uuid4(), uuid4()
+    stops = [{"kind": "pickup", "location": "A-1", "task_ids": [str(ok), str(bad)]}]
+    tasks = [
+        SimpleNamespace(id=tid, status=TaskStatus.ASSIGNED, task_metadata={"batch_run_stops": stops})
+        for tid in (ok, bad)
+    ]
+    applied = []
+
+    def _apply(db, task, *, new_status, changed_by, reason=None):
+        if task.id == bad:
+            raise DeliveryError("Cannot change status of a terminal task.", status_code=400)
+        task.status = new_status
+        applied.append(task.id)
+        return True
+
+    monkeypatch.setattr(robot_services, "_run_tasks", lambda db, run_id: tasks)
+    monkeypatch.setattr(robot_services, "apply_task_status", _apply)
+    db = MagicMock()
+
+    with pytest.raises(robot_services.RobotServiceError):
+        robot_services.complete_batch_stop(db, user=_librarian(), run_id=uuid4(), stop_index=0)
+    # The first task moved in the session only; the stop is rolled back as a whole.
+    assert applied == [ok]
+    db.rollback.assert_called_once()
+    db.commit.assert_not_called()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from auth.schemas import UserResponse, UserRole
+from robot import routes as robot_routes
+from robot.dispatcher import (
+    Assignment,
+    DispatchQueue,
+    DispatchTask,
+    Dispatcher,
+    RobotState,
+    coordinate_cost_fn,
+    run_dispatch_bench,
+)
+from robot.main import app
+from shared.auth_dependencies import get_current_user_dep
+from shared.models import RobotStatus, TaskPriority
+
+COORDS = {
+    "A-1": (0.0, 0.0, 0.0),
+    "A-2": (10.0, 0.0, 0.0),
+    "Desk 1": (0.0, 20.0, 0.0),
+    "Desk 2": (40.0, 20.0, 0.0),
+}
+
+
+def _task(tid, priority=TaskPriority.NORMAL, created_at=0.0, source="A-1", dest="Desk 1"):
+    return DispatchTask(
+        id=tid,
+        priority=priority,
+        created_at=created_at,
+        source_location=source,
+        destination_location=dest,
+    )
+
+
+def _dispatcher(*robots: RobotState, tasks=()) -> Dispatcher:
+    d = Dispatcher(cost_fn=coordinate_cost_fn(COORDS), queue=DispatchQueue(tasks))
+    for r in robots:
+        d.upsert_robot(r)
+    return d
+
+
+def _mock_db_override():
+    yield MagicMock()
+
+
+def test_queue_orders_by_priority_then_age_and_skips_removed():
+    q = DispatchQueue(
+        [
+            _task("old-normal", TaskPriority.NORMAL, created_at=1.0),
+            _task("new-normal", TaskPriority.NORMAL, created_at=2.0),
+            _task("low", TaskPriority.LOW, created_at=0.0),
+            _task("urgent", TaskPriority.URGENT, created_at=5.0),
+        ]
+    )
+    q.remove("new-normal")
+    assert [q.pop().id for _ in range(3)] == ["urgent", "old-normal", "low"]
+    assert q.pop() is None
+
+
+def test_dispatch_prefers_nearest_robot_with_enough_battery():
+    near_low = RobotState(id="near", location="A-2", battery_level=11.5)
+    far_full = RobotState(id="far", location="Desk 2", battery_level=100.0)
+    d = _dispatcher(near_low, far_full, tasks=[_task("t1")])
+    # "near" is below the dispatch threshold, so only "far" is eligible.
+    [a] = d.dispatch()
+    assert a.robot_id == "far"
+    assert far_full.status == RobotStatus.BUSY
+
+    d = _dispatcher(
+        RobotState(id="near", location="A-2", battery_level=90.0),
+        RobotState(id="far", location="Desk 2", battery_level=100.0),
+        tasks=[_task("t1")],
+    )
+    [a] = d.dispatch()
+    assert a.robot_id == "near"
+    assert a.approach_cost == 10.0
+
+
+def test_dispatch_leaves_tasks_queued_when_fleet_is_busy():
+    d = _dispatcher(
+        RobotState(id="r1", location="A-1", battery_level=100.0),
+        tasks=[_task("t1", TaskPriority.LOW), _task("t2", TaskPriority.HIGH)],
+    )
+    [a] = d.dispatch()
+    assert a.task_id == "t2"
+    assert "t1" in d.queue
+    assert d.dispatch() == []
+
+
+def test_fail_robot_requeues_assigned_tasks_for_reassignment():
+    r1 = RobotState(id="r1", location="A-1", battery_level=100.0)
+    r2 = RobotState(id="r2", location="Desk 2", battery_level=100.0, status=RobotStatus.BUSY)
+    d = _dispatcher(r1, r2, tasks=[_task("t1")])
+    [a] = d.dispatch()
+    assert a.robot_id == "r1"
+
+    requeued = d.fail_robot("r1")
+    assert [t.id for t in requeued] == ["t1"]
+    assert r1.status == RobotStatus.ERROR
+    r2.status = RobotStatus.IDLE
+    [a] = d.dispatch()
+    assert (a.task_id, a.robot_id) == ("t1", "r2")
+
+    d.release("t1", battery_level=80.0)
+    assert r2.status == RobotStatus.IDLE
+    assert r2.location == "Desk 1"
+
+
+def test_dispatch_bench_completes_every_task():
+    result = run_dispatch_bench(n_robots=5, n_tasks=300, fault_rate=0.05, seed=1)
+    assert result.completed == 300
+    assert result.requeued == result.faults
+
+
+def test_dispatch_route_returns_assignments(monkeypatch):
+    user = UserResponse(
+        id=uuid4(),
+        email="lib@luna.dev",
+        first_name="Lib",
+        last_name="Rarian",
+        role=UserRole.LIBRARIAN,
+        phone_number=None,
+    )
+    task_id, robot_id = uuid4(), uuid4()
+
+    def _dispatch(db, *, user):
+        return [Assignment(task_id=task_id, robot_id=robot_id, approach_cost=3.14159, trip_cost=12.0)], 7
+
+    monkeypatch.setattr(robot_routes, "dispatch_queued_tasks", _dispatch)
+    app.dependency_overrides[get_current_user_dep] = lambda: user
+    app.dependency_overrides[robot_routes.get_db] = _mock_db_override
+    client = TestClient(app)
+    try:
+        res = client.post("/api/v1/robot/dispatch")
+        assert res.status_code == 200
+        body = res.json()["data"]["dispatch"]
+        assert body["queued_remaining"] == 7
+        assert body["assignments"] == [
+            {"task_id": str(task_id), "robot_id": str(robot_id), "approach_cost": 3.14, "trip_cost": 12.0}
+        ]
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from auth.schemas import UserResponse, UserRole
+from robot.fleet_state import FleetState, LiveRobot
+from robot.main import app
+from robot import services as robot_services
+from shared.auth_dependencies import get_current_user_dep
+from shared.models import RobotStatus
+
+
+class _SharedRedis:
+    """Hashes and sets in a dict, enough for FleetState's pipelines (stands in for one Redis)."""
+
+    def __init__(self):
+        self.data: dict[str, dict | set] = {}
+        self._queued: list = []
+
+    def pipeline(self, transaction: bool = True):
+        return self
+
+    def hset(self, key, mapping):
+        self._queued.append(lambda: self.data.setdefault(key, {}).update(mapping))
+
+    def expire(self, key, seconds):
+        self._queued.append(lambda: None)
+
+    def sadd(self, key, *members):
+        self._queued.append(lambda: self.data.setdefault(key, set()).update(members))
+
+    def hgetall(self, key):
+        self._queued.append(lambda: dict(self.data.get(key, {})))
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def srem(self, key, *members):
+        self.data.get(key, set()).difference_update(members)
+
+    def execute(self):
+        queued, self._queued = self._queued, []
+        return [op() for op in queued]
+
+    def call(self, op, default):
+        return op(self)
+
+
+def test_state_is_shared_through_redis_and_newer_data_wins():
+    redis = _SharedRedis()
+    robot_id = uuid4()
+    now = datetime.now(timezone.utc)
+    table = [LiveRobot(id=robot_id, robot_name="luna-1", status=RobotStatus.IDLE, status_at=0.0, battery_level=50.0)]
+    ingest = FleetState(redis_call=redis.call, load_robots=lambda: table, refresh_seconds=0)
+    dashboard = FleetState(redis_call=redis.call, load_robots=lambda: table, refresh_seconds=0)
+
+    ingest.observe(robot_id, recorded_at=now, reported_status=RobotStatus.BUSY, current_location="A-1", battery_level=80.0)
+    ingest.observe(robot_id, recorded_at=now - timedelta(seconds=5), current_location="late frame")
+    assert ingest.publish() == 1
+    assert ingest.publish() == 0  # nothing new since
+
+    (robot,) = dashboard.robots()
+    assert (robot.robot_name, robot.current_location, robot.battery_level) == ("luna-1", "A-1", 80.0)
+    assert robot.status == RobotStatus.IDLE and robot.reported_status == RobotStatus.BUSY
+    assert not robot.is_stale(now)
+
+    dashboard.record_status([robot_id], RobotStatus.BUSY)
+    assert ingest.live([robot_id])[robot_id].status == RobotStatus.BUSY
+
+
+def test_stale_robots_and_table_resync():
+    now = datetime.now(timezone.utc)
+    quiet, silent, deleted = uuid4(), uuid4(), uuid4()
+    table = [
+        LiveRobot(id=quiet, robot_name="quiet", status=RobotStatus.IDLE, last_heartbeat=now - timedelta(minutes=5)),
+        LiveRobot(id=silent, robot_name="never-reported", status=RobotStatus.MAINTENANCE),
+    ]
+    fleet = FleetState(redis_call=lambda op, default: default, load_robots=lambda: table, resync_seconds=0)
+    fleet.observe(deleted, recorded_at=now)
+
+    robots = {r.id: r for r in fleet.robots()}
+    assert set(robots) == {quiet, silent}  # robots gone from the table leave the fleet
+    assert robots[quiet].is_stale(now, fleet.stale_after_seconds)
+    assert not robots[silent].is_stale(now, fleet.stale_after_seconds)
+
+    fleet.observe(quiet, recorded_at=now, battery_level=77.0)
+    robots = {r.id: r for r in fleet.robots()}
+    assert not robots[quiet].is_stale(now) and robots[quiet].battery_level == 77.0
+
+
+def test_fleet_route_serves_memory_and_filters(monkeypatch):
+    now = datetime.now(timezone.utc)
+    fresh, stale = uuid4(), uuid4()
+    table = [
+        LiveRobot(id=fresh, robot_name="a", status=RobotStatus.IDLE, last_heartbeat=now),
+        LiveRobot(id=stale, robot_name="b", status=RobotStatus.BUSY, last_heartbeat=now - timedelta(hours=1)),
+    ]
+    loads = []
+    fleet = FleetState(redis_call=lambda op, default: default, load_robots=lambda: loads.append(1) or table)
+    monkeypatch.setattr(robot_services, "get_fleet_state", lambda: fleet)
+    user = UserResponse(
+        id=uuid4(),
+        email="lib@luna.dev",
+        first_name="Lib",
+        last_name="Rarian",
+        role=UserRole.LIBRARIAN,
+        phone_number=None,
+    )
+    app.dependency_overrides[get_current_user_dep] = lambda: user
+    client = TestClient(app)
+    try:
+        body = client.get("/api/v1/robot/fleet").json()["data"]["fleet"]
+        assert (body["count"], body["stale_count"]) == (2, 1)
+        assert [i["robot_name"] for i in body["items"]] == ["a", "b"]
+
+        body = client.get("/api/v1/robot/fleet", params={"stale": "true"}).json()["data"]["fleet"]
+        assert [i["robot_id"] for i in body["items"]] == [str(stale)]
+        body = client.get("/api/v1/robot/fleet", params={"status": "IDLE"}).json()["data"]["fleet"]
+        assert [i["robot_id"] for i in body["items"]] == [str(fresh)]
+        assert loads == [1]  # one table load; later views come from memory
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import math
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from robot import routing
+from robot.dispatcher import UNKNOWN_LOCATION_COST
+from robot.routing import WaypointNode, build_routing_table, plan_task_route, waypoint_set_version
+
+
+def _node(code, x, y, z=0.0, neighbors=()):
+    return WaypointNode(id=uuid4(), location_code=code, x=x, y=y, z=z, neighbors=tuple(neighbors))
+
+
+def _corridor_map():
+    # A -- B -- C along a corridor; D sits right next to A but is only reachable via C.
+    return [
+        _node("A", 0, 0, neighbors=["B"]),
+        _node("B", 10, 0, neighbors=["A", "C"]),
+        _node("C", 20, 0, neighbors=["B", "D"]),
+        _node("D", 0, 1, neighbors=["C"]),
+        _node("L2", 0, 0, z=4.0, neighbors=[]),
+    ]
+
+
+def test_shortest_paths_follow_explicit_corridors():
+    table = build_routing_table(_corridor_map())
+    assert table.distance("A", "C") == 20.0
+    assert [n.location_code for n in table.path("A", "D")] == ["A", "B", "C", "D"]
+    assert math.isclose(table.distance("A", "D"), 20.0 + math.dist((20, 0), (0, 1)))
+    assert table.distance("D", "A") == table.distance("A", "D")
+    # Floors only connect through explicit neighbors; unknown codes get the flat fallback cost.
+    assert table.distance("A", "L2") == math.inf
+    assert table.path("A", "L2") == []
+    assert table.distance("A", "nowhere") == UNKNOWN_LOCATION_COST
+
+
+def test_fallback_links_nearest_same_floor_waypoints():
+    nodes = [_node(f"W{i}", float(i), 0.0) for i in range(10)]
+    table = build_routing_table(nodes)
+    assert table.distance("W0", "W9") == 9.0
+    assert len(table.path("W0", "W9")) >= 3
+
+
+def test_version_changes_with_geometry_only():
+    nodes = _corridor_map()
+    assert waypoint_set_version(nodes) == waypoint_set_version(list(reversed(nodes)))
+    moved = [*nodes[:-1], _node("L2", 0, 1, z=4.0)]
+    assert waypoint_set_version(nodes) != waypoint_set_version(moved)
+
+
+def test_plan_task_route_writes_sequence_order(monkeypatch):
+    table = build_routing_table(_corridor_map())
+    monkeypatch.setattr(routing, "get_routing_table", lambda db: table)
+    db = MagicMock()
+    task = SimpleNamespace(id=uuid4(), source_location="A", destination_location="C")
+    path = plan_task_route(db, task)
+    rows = list(db.add_all.call_args.args[0])
+    assert [n.location_code for n in path] == ["A", "B", "C"]
+    assert [r.sequence_order for r in rows] == [0, 1, 2]
+    assert [r.waypoint_id for r in rows] == [n.id for n in path]
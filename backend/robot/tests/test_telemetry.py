@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import robot.routes as robot_routes
+from robot.main import app
+from robot.fleet_state import FleetState
+from robot.telemetry import Frame, TelemetryBuffer
+from shared.models import RobotStatus
+
+T0 = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def _frame(robot_id, seconds: float, **fields) -> Frame:
+    return Frame(robot_id=robot_id, recorded_at=T0 + timedelta(seconds=seconds), status=RobotStatus.BUSY, **fields)
+
+
+def _fleet() -> FleetState:
+    return FleetState(redis_call=lambda op, default: default, load_robots=list)
+
+
+def test_frames_are_logged_individually_and_coalesced_per_robot():
+    flushed = []
+    fleet = _fleet()
+    buffer = TelemetryBuffer(flush=lambda rows, states: flushed.append((rows, states)), fleet=fleet)
+    a, b = uuid4(), uuid4()
+
+    buffer.add([_frame(a, 0.0, current_location="A-1", battery_level=90.0), _frame(a, 0.1, battery_level=89.9)])
+    buffer.add([_frame(a, -5.0, current_location="stale", sensor_data={"lidar": "ok"}), _frame(b, 0.0)])
+    assert buffer.flush()
+
+    (rows, states), = flushed
+    assert len(rows) == 4
+    assert states[a].last_heartbeat == T0 + timedelta(seconds=0.1)
+    # Newest value per field; an older frame only fills fields nothing newer reported.
+    assert states[a].fields == {"current_location": "A-1", "battery_level": 89.9, "sensor_data": {"lidar": "ok"}}
+    assert states[b].fields == {}
+    # The live state has the newest frame already, before any flush to the database.
+    live = fleet.live([a])[a]
+    assert (live.current_location, live.battery_level) == ("A-1", 89.9)
+
+
+def test_robot_rows_are_checkpointed_less_often_than_log_rows():
+    flushed = []
+    buffer = TelemetryBuffer(
+        flush=lambda rows, states: flushed.append((len(rows), set(states))), checkpoint_seconds=3600, fleet=_fleet()
+    )
+    robot_id = uuid4()
+    for i in range(3):
+        buffer.add([_frame(robot_id, float(i), battery_level=90.0 - i)])
+        assert buffer.flush()
+    buffer.close()
+
+    # First flush checkpoints, the next ones only append log rows, close() checkpoints the rest.
+    assert flushed == [(1, {robot_id}), (1, set()), (1, set()), (0, {robot_id})]
+
+
+def test_failed_flush_keeps_frames_and_buffer_is_bounded():
+    def fail(rows, states):
+        raise ConnectionError("database down")
+
+    buffer = TelemetryBuffer(flush=fail, max_pending=3, fleet=_fleet())
+    robot_id = uuid4()
+    buffer.add([_frame(robot_id, float(i), battery_level=float(i)) for i in range(5)])
+    assert buffer.pending == 3
+
+    assert not buffer.flush()
+    assert buffer.pending == 3
+
+    written = []
+    buffer.flush_fn = lambda rows, states: written.extend(rows)
+    assert buffer.flush()
+    assert [row["battery_level"] for row in written] == [2.0, 3.0, 4.0]
+
+
+def test_telemetry_route_requires_robot_token_and_queues_frames(monkeypatch):
+    robot_id = uuid4()
+    queued = []
+
+    async def known(rid):
+        return rid == robot_id
+
+    monkeypatch.setenv("ROBOT_TELEMETRY_TOKEN", "fleet-secret")
+    monkeypatch.setattr(robot_routes, "is_known_robot", known)
+    monkeypatch.setattr(robot_routes, "get_telemetry_buffer", lambda: SimpleNamespace(add=queued.extend))
+    client = TestClient(app)
+    body = {
+        "frames": [
+            {"status": "BUSY", "battery_level": 81.5, "current_location": "A-1"},
+            {"status": "BUSY", "recorded_at": "2999-01-01T00:00:00Z"},
+        ]
+    }
+
+    assert client.post(f"/api/v1/robot/robots/{robot_id}/telemetry", json=body).status_code == 401
+    headers = {"X-Robot-Token": "fleet-secret"}
+    assert client.post(f"/api/v1/robot/robots/{uuid4()}/telemetry", json=body, headers=headers).status_code == 404
+
+    res = client.post(f"/api/v1/robot/robots/{robot_id}/telemetry", json=body, headers=headers)
+    assert res.status_code == 202
+    assert res.json()["data"]["telemetry"] == {"robot_id": str(robot_id), "accepted": 2}
+    assert queued[0].battery_level == 81.5
+    assert queued[1].recorded_at <= datetime.now(timezone.utc)  # future timestamps are clamped
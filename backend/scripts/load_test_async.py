@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Closed-loop HTTP load test for the book / delivery read paths (sync vs async handlers).
+
+Each of --concurrency clients sends its next request as soon as the previous one returns,
+for --duration seconds, round-robin over --path. One summary line per --base-url, so
+pointing two URLs at two builds (e.g. the threadpool build on :8001 and the asyncpg build
+on :8011) gives a side-by-side requests/sec comparison at the same client count.
+
+Usage (from backend/, services running):
+  python3 scripts/load_test_async.py \\
+      --base-url http://localhost:8001 --base-url http://localhost:8011 \\
+      --path /api/v1/books/?limit=20 --path "/api/v1/books/?q=harry" \\
+      --concurrency 200 --duration 30 --token "$LUNA_LOAD_TEST_TOKEN"
+
+Delivery task list: --path /api/v1/deliveries/tasks against the delivery service port.
+Requires: httpx (requirements.txt).
+
+Measured (1 CPU shared by client, service and Postgres 16; 2000 books, no Redis; book list +
+"?q=harry", 20 s per build, threadpool build vs the first asyncpg build):
+  200 clients  threadpool 48-56 rps, p50 2.3-3.1 s, p99 14-15 s
+               asyncpg    37-42 rps, p50 3.7-4.0 s, p99 12-16 s
+  20 clients   threadpool 102 rps, p50 186 ms, p95 301 ms
+               asyncpg     82 rps, p50 231 ms, p95 383 ms
+  On one core the run is CPU-bound and the async handlers are ~20% slower; the gain they are
+  for (not tying up a threadpool slot while waiting on Postgres) needs more cores than clients
+  can saturate, so rerun on the target host before drawing conclusions.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+
+@dataclass
+class LoadResult:
+    base_url: str
+    concurrency: int
+    duration_s: float
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies_ms) + self.errors
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _client_loop(
+    client: httpx.AsyncClient,
+    paths: itertools.cycle,
+    deadline: float,
+    result: LoadResult,
+) -> None:
+    while time.perf_counter() < deadline:
+        path = next(paths)
+        start = time.perf_counter()
+        try:
+            res = await client.get(path)
+            ok = res.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+        else:
+            result.errors += 1
+
+
+async def run_load(
+    base_url: str,
+    paths: list[str],
+    *,
+    concurrency: int,
+    duration_s: float,
+    token: str | None,
+    warmup_s: float = 2.0,
+) -> LoadResult:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30.0) as client:
+        if warmup_s > 0:
+            # Fill the server's connection pools before measuring.
+            warm = LoadResult(base_url, concurrency, warmup_s)
+            deadline = time.perf_counter() + warmup_s
+            await asyncio.gather(
+                *(_client_loop(client, itertools.cycle(paths), deadline, warm) for _ in range(concurrency))
+            )
+        result = LoadResult(base_url, concurrency, duration_s)
+        start = time.perf_counter()
+        deadline = start + duration_s
+        await asyncio.gather(
+            *(_client_loop(client, itertools.cycle(paths), deadline, result) for _ in range(concurrency))
+        )
+        result.duration_s = time.perf_counter() - start
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Requests/sec at N concurrent clients against one or more builds.")
+    parser.add_argument("--base-url", action="append", required=True, help="Service root; repeat to compare builds.")
+    parser.add_argument("--path", action="append", default=None, help="GET path (repeatable). Default: book list.")
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent clients.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per base URL.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each run.")
+    parser.add_argument(
+        "--token",
+        default=os.getenv("LUNA_LOAD_TEST_TOKEN"),
+        help="Bearer token (default: LUNA_LOAD_TEST_TOKEN).",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    paths = args.path or ["/api/v1/books/?limit=20"]
+    if not args.token:
+        print("warning: no --token / LUNA_LOAD_TEST_TOKEN; authenticated routes will count as errors", file=sys.stderr)
+    for base_url in args.base_url:
+        r = asyncio.run(
+            run_load(
+                base_url,
+                paths,
+                concurrency=args.concurrency,
+                duration_s=args.duration,
+                token=args.token,
+                warmup_s=args.warmup,
+            )
+        )
+        ok = len(r.latencies_ms)
+        print(
+            "LOAD_TEST "
+            f"base_url={r.base_url} "
+            f"concurrency={r.concurrency} "
+            f"requests={r.requests} "
+            f"errors={r.errors} "
+            f"rps={ok / r.duration_s:.1f} "
+            f"p50_ms={r.percentile(50):.1f} "
+            f"p95_ms={r.percentile(95):.1f} "
+            f"p99_ms={r.percentile(99):.1f} "
+            f"mean_ms={statistics.fmean(r.latencies_ms) if ok else 0.0:.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Persona-based load test through the nginx gateway (capacity check before semester start).
+
+--users virtual users are started over --ramp-up seconds; each is a student or a librarian
+(weighted by --student-weight / --librarian-weight) and loops over sessions until --duration
+elapses, with exponential think time between calls:
+
+  student:    discovery overview -> search (suggestions + list) -> book detail -> sometimes
+              request an available book -> own request list -> confirm delivered requests
+  librarian:  request queue + task list -> approve a pending request -> create its delivery
+              task -> book placed -> start the simulated robot run
+
+Requests created by students are handed to librarians in-process, and students confirm once
+the run's task reports COMPLETED, so the full request -> delivery workflow is exercised. Start
+the services with SIMULATED_DELIVERY_SECONDS=20 (or similar) so runs finish within the test.
+
+Auth: with AUTH_STUB_MODE=true on the services, each virtual user sends "stub:<email>" for a
+seeded account (student<n>@bench.invalid / librarian<n>@bench.invalid from benchmarks/seed.py
+or benchmarks/datagen.py), so no Supabase is needed. Against real auth, pass
+--student-token / --librarian-token instead (every virtual user of a persona shares it).
+
+Reports per-endpoint (route template) request count, error rate, status codes and latency
+percentiles; --json writes the same report to a file.
+
+Usage (from backend/; stack up behind nginx on :8000, bench data seeded):
+  python3 scripts/load_test_personas.py --users 300 --ramp-up 60 --duration 600
+  python3 scripts/load_test_personas.py --base-url https://staging.example --users 50 \\
+      --student-token "$STUDENT_TOKEN" --librarian-token "$LIBRARIAN_TOKEN"
+
+Requires: httpx (requirements.txt).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+STUB_TOKEN_PREFIX = "stub:"
+BENCH_EMAIL_DOMAIN = "@bench.invalid"
+REQUEST_LOCATIONS = [f"Study Room {n}" for n in range(1, 21)]
+SEARCH_TERMS = (
+    "river night garden stone winter light empire shadow ocean silver machine forest city "
+    "history science moon glass fire quiet letters journey secret modern theory island song"
+).split()
+
+
+class CallError(Exception):
+    pass
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: collections.Counter = field(default_factory=collections.Counter)
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies_ms) + self.errors
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+@dataclass
+class Shared:
+    """State handed between personas (all virtual users run on one event loop)."""
+
+    endpoints: dict[str, EndpointStats] = field(default_factory=lambda: collections.defaultdict(EndpointStats))
+    sessions: collections.Counter = field(default_factory=collections.Counter)
+    workflow: collections.Counter = field(default_factory=collections.Counter)
+    # Request ids waiting for a librarian.
+    pending_requests: collections.deque = field(default_factory=collections.deque)
+    # request id -> delivery task id, once a librarian started the run.
+    started_runs: dict[str, str] = field(default_factory=dict)
+    available_book_ids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class VirtualUser:
+    client: httpx.AsyncClient
+    shared: Shared
+    token: str
+    rng: random.Random
+    think_time_s: float
+    deadline: float
+    my_requests: list[str] = field(default_factory=list)
+
+    async def think(self) -> None:
+        if self.think_time_s > 0:
+            await asyncio.sleep(min(self.rng.expovariate(1 / self.think_time_s), 5 * self.think_time_s))
+
+    async def call(self, method: str, endpoint: str, path: str, **kwargs) -> dict:
+        """Send one request; ``endpoint`` is the route template the stats are grouped by."""
+        stats = self.shared.endpoints[f"{method} {endpoint}"]
+        start = time.perf_counter()
+        try:
+            res = await self.client.request(
+                method, path, headers={"Authorization": f"Bearer {self.token}"}, **kwargs
+            )
+        except httpx.HTTPError as e:
+            stats.errors += 1
+            stats.statuses[type(e).__name__] += 1
+            raise CallError(f"{method} {path}: {e!r}") from e
+        stats.statuses[str(res.status_code)] += 1
+        if res.status_code >= 400:
+            stats.errors += 1
+            raise CallError(f"{method} {path}: {res.status_code} {res.text[:200]}")
+        stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+        return res.json() if res.content else {}
+
+    @property
+    def running(self) -> bool:
+        return time.perf_counter() < self.deadline
+
+
+# --- Personas ---
+
+
+async def student_session(vu: VirtualUser) -> None:
+    shared = vu.shared
+    await vu.call("GET", "/api/v1/books/discover/overview", "/api/v1/books/discover/overview")
+    await vu.think()
+    term = vu.rng.choice(SEARCH_TERMS)
+    await vu.call(
+        "GET", "/api/v1/books/search/suggestions", "/api/v1/books/search/suggestions", params={"q": term[:3]}
+    )
+    found = await vu.call("GET", "/api/v1/books/", "/api/v1/books/", params={"q": term, "limit": 20})
+    items = found.get("data", {}).get("items", [])
+    available = [b["id"] for b in items if b.get("status") == "AVAILABLE"]
+    if available:
+        shared.available_book_ids = (shared.available_book_ids + available)[-1000:]
+    await vu.think()
+    if items:
+        await vu.call("GET", "/api/v1/books/{book_id}", f"/api/v1/books/{vu.rng.choice(items)['id']}")
+        await vu.think()
+    if available and vu.rng.random() < 0.3:
+        created = await vu.call(
+            "POST",
+            "/api/v1/requests/",
+            "/api/v1/requests/",
+            json={"book_id": vu.rng.choice(available), "request_location": vu.rng.choice(REQUEST_LOCATIONS)},
+        )
+        request_id = created["data"]["request"]["id"]
+        vu.my_requests.append(request_id)
+        shared.pending_requests.append(request_id)
+        shared.workflow["requested"] += 1
+        await vu.think()
+    await vu.call("GET", "/api/v1/requests/", "/api/v1/requests/", params={"limit": 20})
+    for request_id in list(vu.my_requests):
+        task_id = shared.started_runs.get(request_id)
+        if task_id is None:
+            continue
+        task = await vu.call("GET", "/api/v1/deliveries/tasks/{task_id}", f"/api/v1/deliveries/tasks/{task_id}")
+        if task["data"]["task"]["status"] != "COMPLETED":
+            continue
+        await vu.call(
+            "POST",
+            "/api/v1/requests/{request_id}/confirm-delivery",
+            f"/api/v1/requests/{request_id}/confirm-delivery",
+        )
+        vu.my_requests.remove(request_id)
+        shared.started_runs.pop(request_id, None)
+        shared.workflow["confirmed"] += 1
+
+
+async def librarian_session(vu: VirtualUser) -> None:
+    shared = vu.shared
+    await vu.call("GET", "/api/v1/requests/", "/api/v1/requests/", params={"limit": 20})
+    await vu.call("GET", "/api/v1/deliveries/tasks", "/api/v1/deliveries/tasks", params={"limit": 20})
+    await vu.think()
+    if not shared.pending_requests:
+        return
+    request_id = shared.pending_requests.popleft()
+    await vu.call("POST", "/api/v1/requests/{request_id}/approve", f"/api/v1/requests/{request_id}/approve")
+    task = await vu.call("POST", "/api/v1/deliveries/tasks", "/api/v1/deliveries/tasks", json={"request_id": request_id})
+    task_id = task["data"]["task"]["id"]
+    await vu.think()
+    await vu.call(
+        "POST", "/api/v1/deliveries/tasks/{task_id}/book-placed", f"/api/v1/deliveries/tasks/{task_id}/book-placed"
+    )
+    await vu.call(
+        "POST", "/api/v1/deliveries/tasks/{task_id}/simulate-run", f"/api/v1/deliveries/tasks/{task_id}/simulate-run"
+    )
+    shared.started_runs[request_id] = task_id
+    shared.workflow["runs_started"] += 1
+
+
+PERSONAS = {"student": student_session, "librarian": librarian_session}
+
+
+async def _user_loop(persona: str, vu: VirtualUser, first_errors: dict[str, str]) -> None:
+    session = PERSONAS[persona]
+    while vu.running:
+        vu.shared.sessions[persona] += 1
+        try:
+            await session(vu)
+        except CallError as e:
+            first_errors.setdefault(persona, str(e))
+        await vu.think()
+
+
+# --- Runner ---
+
+
+@dataclass
+class LoadConfig:
+    base_url: str
+    users: int
+    duration_s: float
+    ramp_up_s: float
+    think_time_s: float
+    student_weight: float
+    librarian_weight: float
+    students: int
+    librarians: int
+    student_token: str | None
+    librarian_token: str | None
+    seed: int
+
+
+def _token(cfg: LoadConfig, persona: str, n: int) -> str:
+    if persona == "student" and cfg.student_token:
+        return cfg.student_token
+    if persona == "librarian" and cfg.librarian_token:
+        return cfg.librarian_token
+    pool = cfg.students if persona == "student" else cfg.librarians
+    return f"{STUB_TOKEN_PREFIX}{persona}{n % pool}{BENCH_EMAIL_DOMAIN}"
+
+
+async def run_load(cfg: LoadConfig) -> tuple[Shared, float, dict[str, str]]:
+    shared = Shared()
+    rng = random.Random(cfg.seed)
+    first_errors: dict[str, str] = {}
+    limits = httpx.Limits(max_connections=cfg.users, max_keepalive_connections=cfg.users)
+    async with httpx.AsyncClient(base_url=cfg.base_url, limits=limits, timeout=30.0) as client:
+        start = time.perf_counter()
+        deadline = start + cfg.duration_s
+        tasks = []
+        counts = collections.Counter()
+        for i in range(cfg.users):
+            persona = rng.choices(("student", "librarian"), weights=(cfg.student_weight, cfg.librarian_weight))[0]
+            vu = VirtualUser(
+                client=client,
+                shared=shared,
+                token=_token(cfg, persona, counts[persona]),
+                rng=random.Random(rng.getrandbits(64)),
+                think_time_s=cfg.think_time_s,
+                deadline=deadline,
+            )
+            counts[persona] += 1
+            tasks.append(asyncio.create_task(_user_loop(persona, vu, first_errors)))
+            if cfg.ramp_up_s > 0 and i < cfg.users - 1:
+                await asyncio.sleep(cfg.ramp_up_s / cfg.users)
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return shared, elapsed, first_errors
+
+
+def build_report(shared: Shared, elapsed: float) -> dict:
+    endpoints = {}
+    for name, s in sorted(shared.endpoints.items()):
+        endpoints[name] = {
+            "requests": s.requests,
+            "errors": s.errors,
+            "error_rate": round(s.error_rate, 4),
+            "rps": round(s.requests / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(s.percentile(50), 1),
+            "p95_ms": round(s.percentile(95), 1),
+            "p99_ms": round(s.percentile(99), 1),
+            "mean_ms": round(statistics.fmean(s.latencies_ms), 1) if s.latencies_ms else 0.0,
+            "statuses": dict(s.statuses),
+        }
+    total_requests = sum(e["requests"] for e in endpoints.values())
+    total_errors = sum(e["errors"] for e in endpoints.values())
+    return {
+        "duration_s": round(elapsed, 1),
+        "requests": total_requests,
+        "errors": total_errors,
+        "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+        "rps": round(total_requests / elapsed, 1) if elapsed else 0.0,
+        "sessions": dict(shared.sessions),
+        "workflow": dict(shared.workflow),
+        "endpoints": endpoints,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Weighted student / librarian load test through nginx.")
+    parser.add_argument("--base-url", default=os.getenv("LUNA_GATEWAY_URL", "http://localhost:8000"), help="nginx gateway root.")
+    parser.add_argument("--users", type=int, default=100, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=300.0, help="Seconds from the first user starting.")
+    parser.add_argument("--ramp-up", type=float, default=30.0, help="Seconds over which users are started.")
+    parser.add_argument("--think-time", type=float, default=2.0, help="Mean pause between calls (exponential).")
+    parser.add_argument("--student-weight", type=float, default=9.0)
+    parser.add_argument("--librarian-weight", type=float, default=1.0)
+    parser.add_argument("--students", type=int, default=200, help="Seeded student accounts to spread stub users over.")
+    parser.add_argument("--librarians", type=int, default=5, help="Seeded librarian accounts to spread stub users over.")
+    parser.add_argument("--student-token", default=os.getenv("LUNA_LOAD_TEST_STUDENT_TOKEN"), help="Real bearer token instead of stub tokens.")
+    parser.add_argument("--librarian-token", default=os.getenv("LUNA_LOAD_TEST_LIBRARIAN_TOKEN"), help="Real bearer token instead of stub tokens.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", default=None, help="Also write the report to this file.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    cfg = LoadConfig(
+        base_url=args.base_url,
+        users=args.users,
+        duration_s=args.duration,
+        ramp_up_s=args.ramp_up,
+        think_time_s=args.think_time,
+        student_weight=args.student_weight,
+        librarian_weight=args.librarian_weight,
+        students=args.students,
+        librarians=args.librarians,
+        student_token=args.student_token,
+        librarian_token=args.librarian_token,
+        seed=args.seed,
+    )
+    shared, elapsed, first_errors = asyncio.run(run_load(cfg))
+    report = build_report(shared, elapsed)
+    for name, e in report["endpoints"].items():
+        print(
+            f"LOAD_ENDPOINT endpoint={name.replace(' ', '_')} requests={e['requests']} errors={e['errors']} "
+            f"error_rate={e['error_rate']:.2%} rps={e['rps']} p50_ms={e['p50_ms']} p95_ms={e['p95_ms']} "
+            f"p99_ms={e['p99_ms']}"
+        )
+    workflow = " ".join(f"{k}={v}" for k, v in report["workflow"].items())
+    print(
+        f"LOAD_TEST base_url={cfg.base_url} users={cfg.users} duration_s={report['duration_s']} "
+        f"requests={report['requests']} errors={report['errors']} error_rate={report['error_rate']:.2%} "
+        f"rps={report['rps']} {workflow}".rstrip()
+    )
+    for persona, message in first_errors.items():
+        print(f"warning: first {persona} error: {message}", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Partition maintenance for the monthly-partitioned history tables (shared/partitions.py):
+pre-create the coming months and detach / drop the months past retention.
+
+Run it daily (cron) or at least monthly. docker/entrypoint-render.sh also runs it on every
+start. PARTITION_PREMAKE_MONTHS (default 3) months are created ahead, so a missed run does
+not send rows to the default partition.
+
+Usage (from backend/; database from DATABASE_URL_SYNC):
+  python3 scripts/manage_partitions.py
+  python3 scripts/manage_partitions.py --detach-only   # keep expired months as plain tables
+
+Output: one PARTITION line per created / detached / dropped partition.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from shared.db import engine  # noqa: E402
+from shared.partitions import PARTITION_PREMAKE_MONTHS, manage_partitions  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create upcoming monthly partitions and retire expired ones.")
+    parser.add_argument("--premake-months", type=int, default=PARTITION_PREMAKE_MONTHS)
+    parser.add_argument(
+        "--detach-only", action="store_true", help="Detach expired partitions without dropping them."
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    args = parse_args()
+    actions = manage_partitions(engine, premake_months=args.premake_months, detach_only=args.detach_only)
+    for action in actions:
+        print(
+            f"PARTITION table={action.table} partition={action.partition} "
+            f"action={action.action} moved_rows={action.moved_rows}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
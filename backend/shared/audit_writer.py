@@ -0,0 +1,302 @@
+"""
+Buffered audit writer: ``enqueue_audit`` appends a row to an in-process queue and returns; a
+background thread writes ``ops.audit_logs`` in multi-row INSERTs.
+
+A batch is flushed when AUDIT_FLUSH_BATCH_SIZE rows are pending or AUDIT_FLUSH_INTERVAL_SECONDS
+have passed, whichever comes first. ``id`` and ``created_at`` are set at enqueue time, so rows
+keep the time of the event, not of the flush. A failed flush keeps the batch queued (oldest
+first) and is retried on the next interval. A batch the database rejects for its data
+(DataError / IntegrityError) is not retried as a whole: it is written row by row, and the rows
+that are still rejected are logged in full and dropped, so one bad row cannot stall the queue.
+
+Durability: past AUDIT_QUEUE_MAX queued rows (database down for a long time), and at process
+exit for whatever the final flush cannot write, rows are appended to AUDIT_SPOOL_PATH as JSON
+lines instead of being dropped. The next writer to start, in any process, claims the spool file
+(atomic rename) and replays it.
+
+For audit events outside a database transaction (book.services.log_audit_event). Catalog
+writes commit their audit row together with the change (book.services.AuditEntry).
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+from uuid import UUID, uuid4
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from shared.metrics import get_counter, get_histogram
+
+logger = logging.getLogger(__name__)
+
+AUDIT_FLUSH_BATCH_SIZE = int(os.getenv("AUDIT_FLUSH_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0"))
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))
+AUDIT_SPOOL_PATH = Path(
+    os.getenv("AUDIT_SPOOL_PATH") or Path(tempfile.gettempdir()) / "luna-audit-spool.jsonl"
+)
+# How long process exit waits for the writer thread's in-flight batch.
+AUDIT_CLOSE_TIMEOUT_SECONDS = 5.0
+
+AUDIT_EVENTS = get_counter(
+    "audit_events",
+    "Audit rows handled by the buffered writer, by result (written / spooled / replayed / rejected).",
+    ("result",),
+)
+AUDIT_FLUSH_SECONDS = get_histogram(
+    "audit_flush_duration_seconds",
+    "Duration of one multi-row audit_logs INSERT (commit included).",
+)
+
+_UUID_FIELDS = ("id", "user_id", "resource_id")
+# Errors about the rows themselves: retrying the same INSERT can never succeed.
+_PERMANENT_ERRORS = (DataError, IntegrityError)
+
+
+def audit_row(
+    *,
+    actor_user_id: UUID | None,
+    action: str,
+    resource_type: str,
+    resource_id: UUID | None = None,
+    changes: dict | None = None,
+    ip_address: str | None = None,
+) -> dict:
+    """An ``ops.audit_logs`` row (column -> value), stamped now."""
+    return {
+        "id": uuid4(),
+        "user_id": actor_user_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "changes": changes,
+        "ip_address": ip_address,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def insert_audit_rows(rows: list[dict]) -> None:
+    """One multi-row INSERT into ``ops.audit_logs``, in its own transaction."""
+    from sqlalchemy import insert
+
+    from shared.db import SessionLocal
+    from shared.models import AuditLog
+
+    with SessionLocal() as db:
+        db.execute(insert(AuditLog).values(rows))
+        db.commit()
+
+
+def _to_json(row: dict) -> str:
+    return json.dumps(row, default=str)
+
+
+def _from_json(line: str) -> dict:
+    row = json.loads(line)
+    for key in _UUID_FIELDS:
+        if row.get(key) is not None:
+            row[key] = UUID(row[key])
+    row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        *,
+        write_rows: Callable[[list[dict]], None] = insert_audit_rows,
+        batch_size: int = AUDIT_FLUSH_BATCH_SIZE,
+        interval_seconds: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        max_queued: int = AUDIT_QUEUE_MAX,
+        spool_path: Path = AUDIT_SPOOL_PATH,
+    ) -> None:
+        self.write_rows = write_rows
+        self.batch_size = max(1, batch_size)
+        self.interval_seconds = interval_seconds
+        self.max_queued = max_queued
+        self.spool_path = Path(spool_path)
+        self._pending: deque[dict] = deque()
+        self._cond = threading.Condition()
+        self._spool_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, row: dict) -> None:
+        with self._cond:
+            accepted = not self._closed and len(self._pending) < self.max_queued
+            if accepted:
+                self._pending.append(row)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                    self._thread.start()
+                elif len(self._pending) >= self.batch_size:
+                    self._cond.notify()
+        if not accepted:
+            self._spool([row])
+
+    def flush(self) -> bool:
+        """Write every queued row now (caller's thread); False if a batch failed and was requeued."""
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return True
+            failed = self._write(batch)
+            if failed:
+                self._requeue(failed)
+                return False
+
+    def close(self, timeout_seconds: float = AUDIT_CLOSE_TIMEOUT_SECONDS) -> None:
+        """Stop the writer thread, flush what is queued and spool whatever cannot be written."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout_seconds)
+        if not self.flush():
+            with self._cond:
+                rows = list(self._pending)
+                self._pending.clear()
+            self._spool(rows)
+
+    def replay_spool(self) -> int:
+        """Queue the rows of a spool file left by an earlier process; returns how many."""
+        claimed = self.spool_path.with_name(f"{self.spool_path.name}.{os.getpid()}.replay")
+        try:
+            os.replace(self.spool_path, claimed)
+        except FileNotFoundError:
+            return 0
+        except OSError:
+            logger.exception("Could not claim audit spool %s", self.spool_path)
+            return 0
+        rows = []
+        with claimed.open(encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    try:
+                        rows.append(_from_json(line))
+                    except (ValueError, KeyError):
+                        logger.error("Skipping unreadable audit spool line: %r", line[:200])
+        with self._cond:
+            self._pending.extendleft(reversed(rows))
+        claimed.unlink()
+        AUDIT_EVENTS.inc(len(rows), result="replayed")
+        logger.info("Replayed %d spooled audit rows from %s", len(rows), self.spool_path)
+        return len(rows)
+
+    def _run(self) -> None:
+        self.replay_spool()
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or len(self._pending) >= self.batch_size,
+                    timeout=self.interval_seconds,
+                )
+                if self._closed:
+                    return
+            failed = self._write(self._take_batch())
+            if failed:
+                self._requeue(failed)
+                # Database down: wait for the next interval instead of retrying immediately.
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closed, timeout=self.interval_seconds)
+
+    def _take_batch(self) -> list[dict]:
+        with self._cond:
+            return [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+
+    def _requeue(self, batch: list[dict]) -> None:
+        with self._cond:
+            self._pending.extendleft(reversed(batch))
+
+    def _write(self, batch: list[dict]) -> list[dict]:
+        """Write a batch; returns the rows to requeue (empty when nothing is left to retry)."""
+        if not batch:
+            return []
+        start = time.perf_counter()
+        try:
+            self.write_rows(batch)
+        except _PERMANENT_ERRORS:
+            logger.warning("Audit flush of %d rows rejected by the database; writing them one by one", len(batch))
+            return self._write_each(batch)
+        except Exception:
+            logger.exception("Audit flush of %d rows failed; %d queued", len(batch), len(self._pending) + len(batch))
+            return batch
+        AUDIT_FLUSH_SECONDS.observe(time.perf_counter() - start)
+        AUDIT_EVENTS.inc(len(batch), result="written")
+        return []
+
+    def _write_each(self, batch: list[dict]) -> list[dict]:
+        for i, row in enumerate(batch):
+            try:
+                self.write_rows([row])
+            except _PERMANENT_ERRORS:
+                logger.exception("Dropping audit row rejected by the database: %s", _to_json(row))
+                AUDIT_EVENTS.inc(result="rejected")
+                continue
+            except Exception:
+                logger.exception("Audit flush failed; %d rows queued", len(self._pending) + len(batch) - i)
+                return batch[i:]
+            AUDIT_EVENTS.inc(result="written")
+        return []
+
+    def _spool(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        try:
+            with self._spool_lock, self.spool_path.open("a", encoding="utf-8") as fh:
+                fh.writelines(_to_json(row) + "\n" for row in rows)
+                fh.flush()
+                os.fsync(fh.fileno())
+        except OSError:
+            logger.exception("Audit spool write failed; %d audit rows lost", len(rows))
+            return
+        AUDIT_EVENTS.inc(len(rows), result="spooled")
+        logger.warning("Spooled %d audit rows to %s", len(rows), self.spool_path)
+
+
+_writer: AuditWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> AuditWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditWriter()
+                atexit.register(_writer.close)
+    return _writer
+
+
+def enqueue_audit(
+    *,
+    actor_user_id: UUID | None,
+    action: str,
+    resource_type: str,
+    resource_id: UUID | None = None,
+    changes: dict | None = None,
+    ip_address: str | None = None,
+) -> None:
+    get_audit_writer().enqueue(
+        audit_row(
+            actor_user_id=actor_user_id,
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            changes=changes,
+            ip_address=ip_address,
+        )
+    )
@@ -4,7 +4,7 @@ Other services can use these to protect routes.
 """
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, WebSocket, WebSocketException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from auth.schemas import UserResponse, UserRole
@@ -52,6 +52,23 @@ def get_current_user_dep(
         )
 
 
+def get_websocket_user(
+    websocket: WebSocket,
+    token: str | None = Query(None, description="Access token (browsers cannot set headers on websockets)."),
+) -> UserResponse:
+    """Authenticate a websocket handshake from ?token= or an Authorization: Bearer header."""
+    if not token:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer":
+            token = credentials.strip()
+    if not token:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Not authenticated")
+    try:
+        return get_current_user(token)
+    except Exception:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid or expired token")
+
+
 def require_role(*allowed_roles: UserRole):
     """Dependency factory: require user to have one of the given roles."""
 
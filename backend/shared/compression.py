@@ -0,0 +1,133 @@
+"""
+Response compression for API services (brotli when installed, otherwise gzip).
+
+List pages are mostly repeated keys and short strings, so JSON bodies over COMPRESSION_MIN_BYTES
+(default 1024; below that the saving is smaller than a packet) shrink 5-10x. The encoding is
+negotiated from Accept-Encoding, q-values included; brotli is preferred when the ``brotli``
+package is importable and the client accepts it. Streaming responses, bodies that already carry a
+Content-Encoding, and non-text media types pass through untouched.
+
+A compressed response's ETag is weakened (``W/"..."``), as nginx's gzip filter does: the bytes
+differ per encoding, while If-None-Match uses weak comparison (shared.http_cache), so
+revalidation keeps working across encodings.
+"""
+from __future__ import annotations
+
+import gzip
+import os
+
+import anyio.to_thread
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+# Speed over ratio: these levels get most of the size reduction at a fraction of the CPU.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+# Bodies this large are compressed in a worker thread instead of on the event loop.
+THREAD_MIN_BYTES = 128 * 1024
+
+_COMPRESSIBLE_PREFIXES = ("application/json", "text/", "application/javascript", "application/xml")
+
+
+def _supported_encodings() -> tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """The preferred supported encoding the client accepts (q > 0), or None for identity."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    for encoding in _supported_encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def _is_compressible(content_type: str) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type.startswith(_COMPRESSIBLE_PREFIXES) or media_type.endswith("+json")
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_BYTES) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        pending_start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal pending_start
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk shows whether the response is worth compressing.
+                pending_start = message
+                return
+            if pending_start is None:
+                await send(message)
+                return
+            start, pending_start = pending_start, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"") if message["type"] == "http.response.body" else b""
+            if (
+                message["type"] != "http.response.body"
+                or message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not _is_compressible(headers.get("content-type", ""))
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= THREAD_MIN_BYTES:
+                compressed = await anyio.to_thread.run_sync(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def add_compression(app: FastAPI) -> None:
+    app.add_middleware(CompressionMiddleware)
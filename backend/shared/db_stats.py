@@ -0,0 +1,310 @@
+"""
+DB connection pool instrumentation.
+
+Per request: every pool checkout on an instrumented engine increments the counter bound to
+the current request (a ContextVar, so it follows the request into the threadpool for sync
+handlers). With DEBUG=true the count is returned as an ``X-DB-Checkouts`` response header; a
+request that needs more than one checkout is holding (or re-acquiring) connections it could share.
+
+Per statement: instrumented engines add each cursor execution and its duration to the current
+request's ``RequestStats`` (shared.metrics), grouped by statement fingerprint. The /metrics
+middleware exports the totals per route, returns them in a ``Server-Timing`` header (DEBUG
+only) and logs requests over SLOW_REQUEST_MS or SLOW_REQUEST_QUERIES with their top fingerprints
+(an N+1 shows up as one fingerprint executed many times).
+
+Per pool: ``timed_pool_class`` wraps a pool class so every checkout records how long it took to
+obtain a connection (queue wait, plus connect time when the pool opens a new one) and whether it
+timed out. ``pool_snapshot`` combines those counters with the pool's live in-use / overflow
+numbers; services expose them to staff at ``GET /health/db``. Slow checkouts, timeouts and a fully
+checked-out pool log a (rate-limited) warning, so starvation shows up separately from slow queries.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from shared.metrics import RequestStats, current_request_stats
+
+logger = logging.getLogger(__name__)
+
+CHECKOUT_HEADER = b"x-db-checkouts"
+
+# A one-element list so threadpool copies of the context increment the request's counter.
+_request_checkouts: ContextVar[list[int] | None] = ContextVar("request_db_checkouts", default=None)
+
+
+def _on_checkout(_dbapi_connection, _connection_record, _connection_proxy) -> None:
+    counter = _request_checkouts.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SLOW_REQUEST_QUERIES = int(os.getenv("SLOW_REQUEST_QUERIES", "25"))
+# Distinct fingerprints kept per request; the rest are folded into one bucket.
+MAX_FINGERPRINTS = 100
+OTHER_STATEMENTS = "<other statements>"
+
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND = re.compile(r"%\(\w+\)s|\$\d+|(?<!:):\w+|\?")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint_statement(statement: str) -> str:
+    """Normalize SQL so executions differing only in parameters / IN-list length group together."""
+    text = _STRING_LITERAL.sub("?", statement)
+    text = _BIND.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _IN_LIST.sub("IN (...)", text)
+    return _WHITESPACE.sub(" ", text).strip()[:300]
+
+
+# The start time lives on the statement's execution context rather than the connection, so a
+# statement that raises (no after_cursor_execute) leaves nothing behind for the next one to pop.
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany) -> None:
+    if context is not None and current_request_stats() is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany) -> None:
+    stats = current_request_stats()
+    start = getattr(context, "_query_start", None)
+    if stats is None or start is None:
+        return
+    elapsed = time.perf_counter() - start
+    stats.db_queries += 1
+    stats.db_seconds += elapsed
+    key = fingerprint_statement(_statement)
+    if key not in stats.statements and len(stats.statements) >= MAX_FINGERPRINTS:
+        key = OTHER_STATEMENTS
+    entry = stats.statements.setdefault(key, [0, 0.0])
+    entry[0] += 1
+    entry[1] += elapsed
+
+
+def log_if_slow(method: str, route: str, status: str, elapsed: float, stats: RequestStats) -> bool:
+    """Warn about a request over the latency or statement-count threshold; True if logged."""
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms < SLOW_REQUEST_MS and stats.db_queries < SLOW_REQUEST_QUERIES:
+        return False
+    top = sorted(stats.statements.items(), key=lambda kv: (kv[1][0], kv[1][1]), reverse=True)[:5]
+    logger.warning(
+        "Slow request %s %s -> %s: %.1fms, %d queries, %.1fms in DB; top statements:\n%s",
+        method,
+        route,
+        status,
+        elapsed_ms,
+        stats.db_queries,
+        stats.db_seconds * 1000,
+        "\n".join(f"  {n}x {secs * 1000:.1f}ms  {fp}" for fp, (n, secs) in top),
+    )
+    return True
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count checkouts and statements from this engine for the current request
+    (pass ``async_engine.sync_engine`` for async engines).
+    """
+    for name, fn in (
+        ("checkout", _on_checkout),
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+    ):
+        if not event.contains(engine, name, fn):
+            event.listen(engine, name, fn)
+
+
+def current_request_checkouts() -> int | None:
+    counter = _request_checkouts.get()
+    return counter[0] if counter is not None else None
+
+
+class _CheckoutCounterMiddleware:
+    """Pure ASGI (no response buffering), so streaming and websocket routes are unaffected."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        counter = [0]
+        token = _request_checkouts.set(counter)
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((CHECKOUT_HEADER, str(counter[0]).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            _request_checkouts.reset(token)
+
+
+def add_db_debug_headers(app: FastAPI) -> None:
+    """Expose per-request checkout counts when DEBUG is on; no-op otherwise."""
+    if os.getenv("DEBUG", "").lower() in ("1", "true", "yes"):
+        app.add_middleware(_CheckoutCounterMiddleware)
+
+
+# --- Pool wait / saturation stats ---
+
+# Checkout waits at or above this are logged as pool-starvation warnings.
+POOL_WAIT_WARN_MS = float(os.getenv("DB_POOL_WAIT_WARN_MS", "100"))
+# At most one warning per pool per interval, so a saturated pool does not flood the logs.
+POOL_WARN_INTERVAL_SECONDS = 30.0
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+@dataclass
+class PoolStats:
+    name: str
+    checkouts: int = 0
+    timeouts: int = 0
+    slow_checkouts: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    # bucket_counts[i] = checkouts with wait <= WAIT_BUCKETS_MS[i]; last slot is the overflow bucket.
+    bucket_counts: list[int] = field(default_factory=lambda: [0] * (len(WAIT_BUCKETS_MS) + 1))
+    last_warning_at: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, wait_ms: float) -> bool:
+        """Record one checkout; True if it was slow enough to warn about."""
+        with self.lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.bucket_counts[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            slow = wait_ms >= POOL_WAIT_WARN_MS
+            if slow:
+                self.slow_checkouts += 1
+            return slow
+
+    def record_timeout(self) -> None:
+        with self.lock:
+            self.timeouts += 1
+
+    def should_warn(self) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_warning_at < POOL_WARN_INTERVAL_SECONDS:
+                return False
+            self.last_warning_at = now
+            return True
+
+
+_pool_stats: dict[str, PoolStats] = {}
+
+
+def get_pool_stats(name: str) -> PoolStats:
+    stats = _pool_stats.get(name)
+    if stats is None:
+        stats = _pool_stats.setdefault(name, PoolStats(name=name))
+    return stats
+
+
+def _pool_capacity(pool: Pool) -> int | None:
+    size = getattr(pool, "size", None)
+    max_overflow = getattr(pool, "_max_overflow", None)
+    if not callable(size) or max_overflow is None or max_overflow < 0:
+        return None
+    return size() + max_overflow
+
+
+class _TimedCheckoutMixin:
+    stats_name = "default"
+
+    def _do_get(self):
+        stats = get_pool_stats(self.stats_name)
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            stats.record_timeout()
+            if stats.should_warn():
+                logger.warning(
+                    "DB pool %s exhausted: checkout timed out (%s)", self.stats_name, self.status()
+                )
+            raise
+        wait_ms = (time.perf_counter() - start) * 1000
+        slow = stats.record(wait_ms)
+        capacity = _pool_capacity(self)
+        saturated = capacity is not None and self.checkedout() >= capacity
+        if (slow or saturated) and stats.should_warn():
+            logger.warning(
+                "DB pool %s under pressure: checkout waited %.1fms, %s",
+                self.stats_name,
+                wait_ms,
+                self.status(),
+            )
+        return conn
+
+
+def timed_pool_class(base: type[Pool], name: str) -> type[Pool]:
+    """``base`` with checkout timing recorded under ``name`` (survives engine.dispose())."""
+    return type(f"Timed{base.__name__}", (_TimedCheckoutMixin, base), {"stats_name": name})
+
+
+def pool_snapshot(name: str, pool: Pool) -> dict:
+    stats = get_pool_stats(name)
+    with stats.lock:
+        counters = {
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "slow_checkouts": stats.slow_checkouts,
+            "avg_wait_ms": round(stats.total_wait_ms / stats.checkouts, 3) if stats.checkouts else 0.0,
+            "max_wait_ms": round(stats.max_wait_ms, 3),
+            "wait_histogram_ms": {
+                **{f"le_{b}": n for b, n in zip(WAIT_BUCKETS_MS, stats.bucket_counts)},
+                "gt_max": stats.bucket_counts[-1],
+            },
+        }
+    live = {}
+    for key, attr in (
+        ("size", "size"),
+        ("checked_in", "checkedin"),
+        ("checked_out", "checkedout"),
+        ("overflow", "overflow"),
+    ):
+        fn = getattr(pool, attr, None)
+        if callable(fn):
+            live[key] = fn()
+    max_overflow = getattr(pool, "_max_overflow", None)
+    if max_overflow is not None:
+        live["max_overflow"] = max_overflow
+    timeout = getattr(pool, "timeout", None)
+    if callable(timeout):
+        live["timeout_s"] = timeout()
+    return {**live, **counters}
+
+
+def add_db_pool_status(app: FastAPI) -> None:
+    """
+    ``GET /health/db``: pool sizing, live usage and checkout wait stats for this process.
+    Librarians and admins only; the numbers describe the deployment's database capacity.
+    """
+    from shared.auth_dependencies import RequireLibrarianOrAdmin
+    from shared.db import pool_status
+
+    @app.get("/health/db", include_in_schema=False)
+    def db_pool_health(_user=RequireLibrarianOrAdmin):
+        return {"pools": pool_status()}
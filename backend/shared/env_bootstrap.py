@@ -9,6 +9,17 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+BACKEND_ENV_PATH = Path(__file__).resolve().parent.parent / ".env"
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load backend/.env into os.environ (set variables win). Parses the file once per process."""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv(BACKEND_ENV_PATH, override=False)
+        _env_loaded = True
+
 
 def ensure_local_jwt_secret(env_path: Path) -> None:
     """
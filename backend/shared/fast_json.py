@@ -0,0 +1,61 @@
+"""
+Fast JSON responses for list endpoints.
+
+A route that returns a plain dict goes through FastAPI's jsonable_encoder (a recursive walk of
+the whole payload) and then the stdlib json module; list pages also build and dump one Pydantic
+model per item first. Routes that return ``FastJSONResponse(...)`` skip both: orjson encodes
+the dict directly (UUIDs, enums and datetimes natively), and ``rows_to_dicts`` reads response
+fields straight off ORM rows instead of validating them into models. Pydantic models that are
+already built (service results) are dumped in python mode and left to orjson.
+
+Output matches ``model_dump(mode="json")``: UTC datetimes end in ``Z``, enums are their values.
+benchmarks/serialization.py compares both paths on a 100-item page.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from operator import attrgetter
+from typing import Any
+from uuid import UUID
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, UUID):
+        # asyncpg returns its own UUID subclass, which orjson does not encode natively.
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def rows_to_dicts(
+    rows: Iterable[Any], schema: type[BaseModel], fields: Sequence[str] | None = None
+) -> list[dict[str, Any]]:
+    """``schema``'s fields (or just ``fields``) read off each ORM row, without building the model.
+
+    Trusted DB rows only.
+    """
+    fields = tuple(fields) if fields is not None else tuple(schema.model_fields)
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        return [{fields[0]: getter(row)} for row in rows]
+    return [dict(zip(fields, getter(row))) for row in rows]
@@ -0,0 +1,36 @@
+"""
+Sparse fieldsets for list endpoints: ``?fields=id,title,status``.
+
+``parse_fields`` validates the requested names against the item's response schema (keeping the
+request's order, dropping duplicates). Services push the result down: only the columns those
+fields read are loaded (``load_only``), and derived values nobody asked for are not computed.
+Without ``fields`` an endpoint returns full items, as before.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from pydantic import BaseModel
+
+
+class InvalidFieldsError(ValueError):
+    pass
+
+
+def parse_fields(raw: str | None, schema: type[BaseModel]) -> tuple[str, ...] | None:
+    if raw is None or not raw.strip():
+        return None
+    requested = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in schema.model_fields]
+    if unknown:
+        raise InvalidFieldsError(
+            f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(schema.model_fields)}."
+        )
+    return requested
+
+
+def with_required(fields: tuple[str, ...] | None, required: Iterable[str]) -> tuple[str, ...] | None:
+    """``fields`` plus names the server needs regardless (ETags, ownership checks); None stays None."""
+    if fields is None:
+        return None
+    return tuple(dict.fromkeys((*fields, *required)))
@@ -0,0 +1,50 @@
+"""
+Conditional GET helpers: strong ETags, If-None-Match matching and 304 responses.
+
+A route computes its ETag from whatever versions the representation (row ids and updated_at,
+or the catalog generation for aggregates), answers a matching If-None-Match with
+``not_modified`` before serializing anything, and otherwise tags the full response with
+``set_cache_headers``. The ETag covers ``data`` only; the per-response envelope ``meta``
+(timestamp, request id) is not part of the validated representation.
+
+Cache-Control defaults to ``private, no-cache``: clients may keep the body but revalidate every
+time, which with an unchanged ETag is a bodiless 304. The nginx gateway may still microcache the
+response for CATALOG_MICROCACHE_SECONDS (sent as X-Accel-Expires, which nginx honors over
+Cache-Control and strips before the client sees it; 0 turns the microcache off), keyed by the
+caller's role and the catalog generation, so a catalog write invalidates it (nginx/nginx.conf).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+
+from starlette.responses import Response
+
+CATALOG_CACHE_CONTROL = os.getenv("CATALOG_CACHE_CONTROL", "private, no-cache")
+CATALOG_MICROCACHE_SECONDS = int(os.getenv("CATALOG_MICROCACHE_SECONDS", "2"))
+
+
+def strong_etag(*parts: object) -> str:
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so ``W/"x"`` matches ``"x"``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str, cache_control: str = CATALOG_CACHE_CONTROL) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def set_cache_headers(response: Response, etag: str | None, cache_control: str = CATALOG_CACHE_CONTROL) -> None:
+    if etag is not None:
+        response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    if CATALOG_MICROCACHE_SECONDS > 0:
+        response.headers["X-Accel-Expires"] = str(CATALOG_MICROCACHE_SECONDS)
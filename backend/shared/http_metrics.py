@@ -0,0 +1,169 @@
+"""
+Prometheus metrics for API services: ``add_metrics(app)`` next to ``add_cors(app)``.
+
+Per request, labelled by method and route template (``/api/v1/books/{book_id}``, never the raw
+path, so cardinality stays bounded; unrouted paths are ``unmatched``) and response status:
+request count, latency histogram, DB statements / DB time and cache hits / misses. An in-flight
+gauge is labelled by method and route. Everything in the shared.metrics registry (including
+Redis command latency) is served at ``GET /metrics`` in the Prometheus text format.
+
+Each response also carries a ``Server-Timing`` header (``db`` time and statement count, ``cache``
+hits / misses, ``app`` time to first byte) so browser dev tools and the load tests can see where
+the time went. It exposes internals, so it is sent only with DEBUG=true unless SERVER_TIMING is
+set explicitly. Requests over the slow thresholds are logged with their statement fingerprints
+(shared.db_stats.log_if_slow).
+"""
+from __future__ import annotations
+
+import os
+import time
+
+from fastapi import FastAPI
+from starlette.responses import Response
+from starlette.routing import Match, Router
+
+from shared.db_stats import log_if_slow
+from shared.metrics import (
+    CONTENT_TYPE,
+    RequestStats,
+    begin_request_stats,
+    end_request_stats,
+    get_counter,
+    get_gauge,
+    get_histogram,
+    render_prometheus,
+)
+
+METRICS_PATH = "/metrics"
+UNMATCHED_ROUTE = "unmatched"
+SERVER_TIMING = os.getenv("SERVER_TIMING", os.getenv("DEBUG", "false")).lower() in ("1", "true", "yes")
+
+# Statements per request; N+1 patterns show up in the upper buckets.
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+HTTP_REQUESTS = get_counter(
+    "http_requests",
+    "HTTP requests handled, by method, route template and status.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_SECONDS = get_histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency (until the response body is sent).",
+    ("method", "route", "status"),
+)
+HTTP_IN_FLIGHT = get_gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled.",
+    ("method", "route"),
+)
+DB_QUERIES_PER_REQUEST = get_histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ("method", "route", "status"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_SECONDS_PER_REQUEST = get_histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL statements per HTTP request.",
+    ("method", "route", "status"),
+)
+CACHE_LOOKUPS_PER_ROUTE = get_counter(
+    "http_request_cache_lookups",
+    "Cache reads made while handling HTTP requests, by route and result (hit / miss).",
+    ("method", "route", "result"),
+)
+
+
+def _route_template(router: Router, scope) -> str:
+    # Same matching the router does next; the template is needed before the handler runs
+    # for the in-flight gauge.
+    return _match_template(router.routes, scope)
+
+
+def _match_template(routes, scope) -> str:
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return _template(route, scope)
+        if match == Match.PARTIAL and partial is None:
+            partial = route
+    if partial is not None:
+        return _template(partial, scope)
+    return UNMATCHED_ROUTE
+
+
+def _template(route, scope) -> str:
+    path = getattr(route, "path", None)
+    if path is not None:
+        return path
+    # Newer FastAPI keeps include_router() routers as one wrapper route without a path; the
+    # routes it resolves to carry the full (prefixed) template.
+    contexts = getattr(route, "effective_route_contexts", None)
+    if contexts is not None:
+        return _match_template(contexts(), scope)
+    return UNMATCHED_ROUTE
+
+
+def _server_timing(stats: RequestStats, elapsed: float) -> bytes:
+    return (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_queries} queries", '
+        f'cache;desc="{stats.cache_hits} hit / {stats.cache_misses} miss", '
+        f"app;dur={elapsed * 1000:.1f}"
+    ).encode()
+
+
+class _MetricsMiddleware:
+    """Pure ASGI (no response buffering), so streaming and websocket routes are unaffected."""
+
+    def __init__(self, app, router: Router):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        route = _route_template(self.router, scope)
+        status = "500"
+
+        stats, token = begin_request_stats()
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                if SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(stats, time.perf_counter() - start)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method, route=route)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            end_request_stats(token)
+            HTTP_IN_FLIGHT.dec(method=method, route=route)
+            labels = {"method": method, "route": route, "status": status}
+            HTTP_REQUESTS.inc(**labels)
+            HTTP_REQUEST_SECONDS.observe(elapsed, **labels)
+            DB_QUERIES_PER_REQUEST.observe(stats.db_queries, **labels)
+            DB_SECONDS_PER_REQUEST.observe(stats.db_seconds, **labels)
+            if stats.cache_hits:
+                CACHE_LOOKUPS_PER_ROUTE.inc(stats.cache_hits, method=method, route=route, result="hit")
+            if stats.cache_misses:
+                CACHE_LOOKUPS_PER_ROUTE.inc(stats.cache_misses, method=method, route=route, result="miss")
+            log_if_slow(method, route, status, elapsed, stats)
+
+
+def add_metrics(app: FastAPI) -> None:
+    """Record per-route request metrics and serve them at ``GET /metrics``."""
+    app.add_middleware(_MetricsMiddleware, router=app.router)
+
+    @app.get(METRICS_PATH, include_in_schema=False)
+    def metrics():
+        return Response(render_prometheus(), media_type=CONTENT_TYPE)
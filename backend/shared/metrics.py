@@ -0,0 +1,238 @@
+"""
+In-process metric primitives shared by service instrumentation.
+
+Metrics are Prometheus-style (name, help text, label names, cumulative histogram buckets)
+and live in a per-process registry; ``get_counter`` / ``get_gauge`` / ``get_histogram`` return
+the same object for a name every time, so modules can declare their metrics at import time.
+``render_prometheus`` serializes the registry in the Prometheus text exposition format
+(served at ``/metrics`` by shared.http_metrics). Each worker process has its own registry, so
+run one worker per scrape target or aggregate across targets in Prometheus.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+# Seconds; tuned for cache round trips (sub-ms) up to slow DB / HTTP calls.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _label_key(labelnames: tuple[str, ...], labels: dict[str, str]) -> tuple[str, ...]:
+    return tuple(str(labels.get(n, "")) for n in labelnames)
+
+
+@dataclass
+class Counter:
+    name: str
+    documentation: str
+    labelnames: tuple[str, ...] = ()
+    _values: dict[tuple[str, ...], float] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0.0)
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            return [
+                (f"{self.name}_total", dict(zip(self.labelnames, key)), v)
+                for key, v in self._values.items()
+            ]
+
+
+@dataclass
+class Gauge:
+    name: str
+    documentation: str
+    labelnames: tuple[str, ...] = ()
+    _values: dict[tuple[str, ...], float] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_label_key(self.labelnames, labels)] = value
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0.0)
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            return [(self.name, dict(zip(self.labelnames, key)), v) for key, v in self._values.items()]
+
+
+@dataclass
+class _HistogramSeries:
+    # counts[i] = observations <= buckets[i] (non-cumulative); last slot is +Inf.
+    counts: list[int]
+    total: float = 0.0
+    count: int = 0
+
+
+@dataclass
+class Histogram:
+    name: str
+    documentation: str
+    labelnames: tuple[str, ...] = ()
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    _series: dict[tuple[str, ...], _HistogramSeries] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(counts=[0] * (len(self.buckets) + 1))
+            series.counts[bisect.bisect_left(self.buckets, value)] += 1
+            series.total += value
+            series.count += 1
+
+    def snapshot(self) -> list[dict]:
+        """One entry per label set: labels, cumulative bucket counts (``le`` -> count), sum, count."""
+        out = []
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+                buckets = {}
+                for upper, n in zip((*self.buckets, float("inf")), series.counts):
+                    cumulative += n
+                    buckets[upper] = cumulative
+                out.append(
+                    {
+                        "labels": dict(zip(self.labelnames, key)),
+                        "buckets": buckets,
+                        "sum": series.total,
+                        "count": series.count,
+                    }
+                )
+        return out
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        out = []
+        for series in self.snapshot():
+            labels = series["labels"]
+            for upper, n in series["buckets"].items():
+                out.append((f"{self.name}_bucket", {**labels, "le": _format_value(upper)}, n))
+            out.append((f"{self.name}_sum", labels, series["sum"]))
+            out.append((f"{self.name}_count", labels, series["count"]))
+        return out
+
+
+Metric = Counter | Gauge | Histogram
+
+_registry: dict[str, Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_or_create(cls: type, name: str, *args) -> Metric:
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, *args)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name!r} is already registered as a {type(metric).__name__}")
+        return metric
+
+
+def get_counter(name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+    return _get_or_create(Counter, name, documentation, tuple(labelnames))
+
+
+def get_gauge(name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+    return _get_or_create(Gauge, name, documentation, tuple(labelnames))
+
+
+def get_histogram(
+    name: str,
+    documentation: str,
+    labelnames: tuple[str, ...] = (),
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return _get_or_create(Histogram, name, documentation, tuple(labelnames), tuple(buckets))
+
+
+def registered_metrics() -> list[Metric]:
+    with _registry_lock:
+        return list(_registry.values())
+
+
+_TYPES = {Counter: "counter", Gauge: "gauge", Histogram: "histogram"}
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(float(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus() -> str:
+    """All registered metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: list[str] = []
+    for metric in sorted(registered_metrics(), key=lambda m: m.name):
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {_TYPES[type(metric)]}")
+        for sample_name, labels, value in metric.samples():
+            if labels:
+                rendered = ",".join(f'{k}="{_escape_label(str(v))}"' for k, v in labels.items())
+                lines.append(f"{sample_name}{{{rendered}}} {_format_value(value)}")
+            else:
+                lines.append(f"{sample_name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Per-request accounting ---
+
+
+@dataclass
+class RequestStats:
+    """Work done on behalf of one HTTP request; filled in by the DB and cache instrumentation."""
+
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # Statement fingerprint -> [executions, seconds]; see shared.db_stats.fingerprint_statement.
+    statements: dict[str, list] = field(default_factory=dict)
+
+
+# Holds a mutable object, so threadpool copies of the context update the request's totals.
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def begin_request_stats() -> tuple[RequestStats, Token]:
+    stats = RequestStats()
+    return stats, _request_stats.set(stats)
+
+
+def end_request_stats(token: Token) -> None:
+    _request_stats.reset(token)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _request_stats.get()
@@ -5,6 +5,8 @@ Design notes:
 - Supabase Auth remains the source of truth for credentials and JWT.
 - user_profiles.id stores the Supabase auth user UUID.
 - Tables are split across `app` and `ops` schemas for clarity.
+- Append-only history tables are range-partitioned by month on their timestamp
+  (shared/partitions.py); their primary key includes that timestamp.
 """
 from __future__ import annotations
 
@@ -13,6 +15,7 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import (
+    DDL,
     JSON,
     Boolean,
     CheckConstraint,
@@ -20,10 +23,13 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
+    Table,
     Text,
     UniqueConstraint,
+    event,
     func,
 )
 from sqlalchemy.dialects.postgresql import UUID
@@ -32,6 +38,18 @@ from sqlalchemy.orm import Mapped, mapped_column
 from shared.db import Base
 
 
+def _add_default_partition(table: Table) -> None:
+    # create_all builds the partitioned parent only; without any partition every INSERT fails.
+    # Monthly partitions are created by shared.partitions.manage_partitions (and the migration).
+    event.listen(
+        table,
+        "after_create",
+        DDL(
+            "CREATE TABLE IF NOT EXISTS %(schema)s.%(table)s_default PARTITION OF %(fullname)s DEFAULT"
+        ).execute_if(dialect="postgresql"),
+    )
+
+
 class TimestampMixin:
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -156,13 +174,19 @@ class Book(Base, TimestampMixin):
 
 class BookRequest(Base):
     __tablename__ = "book_requests"
-    __table_args__ = {"schema": "app"}
+    __table_args__ = (
+        # Student request lists: WHERE user_id = ? ORDER BY requested_at DESC
+        Index("ix_book_requests_user_id_requested_at", "user_id", "requested_at"),
+        # Staff request lists: ORDER BY requested_at DESC LIMIT ?
+        Index("ix_book_requests_requested_at", "requested_at"),
+        {"schema": "app"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("app.user_profiles.id"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("app.user_profiles.id"), nullable=False
     )
     book_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("app.books.id"), nullable=False, index=True
@@ -189,13 +213,19 @@ class BookRequest(Base):
 
 class BookReturn(Base):
     __tablename__ = "book_returns"
-    __table_args__ = {"schema": "app"}
+    __table_args__ = (
+        # Active-return checks: WHERE user_id = ? AND status IN (...)
+        Index("ix_book_returns_user_id_status", "user_id", "status"),
+        # Return lists: ORDER BY initiated_at DESC LIMIT ?
+        Index("ix_book_returns_initiated_at", "initiated_at"),
+        {"schema": "app"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("app.user_profiles.id"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("app.user_profiles.id"), nullable=False
     )
     book_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("app.books.id"), nullable=False, index=True
@@ -251,6 +281,11 @@ class DeliveryTask(Base):
             "(request_id IS NULL) <> (return_id IS NULL)",
             name="ck_delivery_task_exactly_one_source",
         ),
+        # Latest/chronological task per request or return.
+        Index("ix_delivery_tasks_request_id_created_at", "request_id", "created_at"),
+        Index("ix_delivery_tasks_return_id_created_at", "return_id", "created_at"),
+        # Staff task lists: ORDER BY created_at DESC LIMIT ? (created in the initial migration)
+        Index("ix_delivery_tasks_created_at", "created_at"),
         {"schema": "app"},
     )
 
@@ -260,12 +295,10 @@ class DeliveryTask(Base):
     request_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("app.book_requests.id", ondelete="SET NULL"),
-        index=True,
     )
     return_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("app.book_returns.id", ondelete="SET NULL"),
-        index=True,
     )
     task_type: Mapped[TaskType] = mapped_column(
         Enum(TaskType, name="task_type_enum"), nullable=False, index=True
@@ -297,13 +330,17 @@ class DeliveryTask(Base):
 
 class TaskStatusHistory(Base):
     __tablename__ = "task_status_history"
-    __table_args__ = {"schema": "app"}
+    __table_args__ = (
+        # Task timelines: WHERE task_id = ? ORDER BY changed_at
+        Index("ix_task_status_history_task_id_changed_at", "task_id", "changed_at"),
+        {"schema": "app", "postgresql_partition_by": "RANGE (changed_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     task_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("app.delivery_tasks.id", ondelete="CASCADE"), index=True
+        UUID(as_uuid=True), ForeignKey("app.delivery_tasks.id", ondelete="CASCADE")
     )
     old_status: Mapped[TaskStatus | None] = mapped_column(
         Enum(TaskStatus, name="task_status_enum")
@@ -313,11 +350,14 @@ class TaskStatusHistory(Base):
     )
     changed_by: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
     changed_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False
     )
     reason: Mapped[str | None] = mapped_column(Text)
 
 
+_add_default_partition(TaskStatusHistory.__table__)
+
+
 class Waypoint(Base):
     __tablename__ = "waypoints"
     __table_args__ = {"schema": "ops"}
@@ -412,7 +452,7 @@ class NotificationPreference(Base):
 
 class RobotStatusLog(Base):
     __tablename__ = "robot_status_logs"
-    __table_args__ = {"schema": "ops"}
+    __table_args__ = {"schema": "ops", "postgresql_partition_by": "RANGE (recorded_at)"}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -427,13 +467,16 @@ class RobotStatusLog(Base):
     battery_level: Mapped[float | None] = mapped_column(Float)
     sensor_data: Mapped[dict | None] = mapped_column(JSON)
     recorded_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False
     )
 
 
+_add_default_partition(RobotStatusLog.__table__)
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
-    __table_args__ = {"schema": "ops"}
+    __table_args__ = {"schema": "ops", "postgresql_partition_by": "RANGE (created_at)"}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -445,6 +488,9 @@ class AuditLog(Base):
     changes: Mapped[dict | None] = mapped_column(JSON)
     ip_address: Mapped[str | None] = mapped_column(String(64))
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False
     )
 
+
+_add_default_partition(AuditLog.__table__)
+
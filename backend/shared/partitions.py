@@ -0,0 +1,210 @@
+"""
+Monthly range partitions for the append-only history tables, and their retention.
+
+  app.task_status_history  by changed_at   TASK_HISTORY_RETENTION_MONTHS (default 24)
+  ops.robot_status_logs    by recorded_at  ROBOT_STATUS_LOG_RETENTION_MONTHS (default 3)
+  ops.audit_logs           by created_at   AUDIT_LOG_RETENTION_MONTHS (default 24)
+
+Partitions are named ``<table>_pYYYYMM`` and hold [first of the month, first of the next
+month) in UTC. Each table also has a ``<table>_default`` partition, a safety net for rows
+outside the created months (clock skew, a maintenance run that did not happen). It should stay
+empty: ``manage_partitions`` moves its rows into a month partition when it creates that month,
+and logs a warning while it holds any.
+A retention of 0 keeps every month.
+
+``manage_partitions`` (scripts/manage_partitions.py, run daily) creates the current month plus
+PARTITION_PREMAKE_MONTHS ahead, and detaches and drops months that ended more than the
+retention ago. Dropping a partition is a catalog change, with no DELETE and no dead rows to
+vacuum. The remaining indexes only cover the retained months, so their size stays flat as
+history accumulates. Each step runs in its own short transaction with PARTITION_LOCK_TIMEOUT,
+so a long-running query makes the step fail (and retry on the next run) rather than queue
+writers behind its lock.
+
+Queries on these tables should bound the partition column (e.g. task history from the task's
+``created_at``), so the planner only visits the partitions that can match.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREMAKE_MONTHS = int(os.getenv("PARTITION_PREMAKE_MONTHS", "3"))
+PARTITION_LOCK_TIMEOUT = os.getenv("PARTITION_LOCK_TIMEOUT", "5s")
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    schema: str
+    table: str
+    column: str
+    retention_months: int
+
+    @property
+    def qualified(self) -> str:
+        return f"{self.schema}.{self.table}"
+
+    @property
+    def default_partition(self) -> str:
+        return f"{self.schema}.{self.table}_default"
+
+    def partition_name(self, month: datetime) -> str:
+        return f"{self.table}_p{month:%Y%m}"
+
+
+PARTITIONED_TABLES = (
+    PartitionedTable(
+        "app", "task_status_history", "changed_at", int(os.getenv("TASK_HISTORY_RETENTION_MONTHS", "24"))
+    ),
+    PartitionedTable(
+        "ops", "robot_status_logs", "recorded_at", int(os.getenv("ROBOT_STATUS_LOG_RETENTION_MONTHS", "3"))
+    ),
+    PartitionedTable("ops", "audit_logs", "created_at", int(os.getenv("AUDIT_LOG_RETENTION_MONTHS", "24"))),
+)
+
+
+@dataclass
+class PartitionAction:
+    table: str
+    partition: str
+    action: str  # created / dropped / detached
+    moved_rows: int = 0
+
+
+def month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def list_partitions(conn: Connection, spec: PartitionedTable) -> dict[datetime, str]:
+    """Month -> partition name for the table's ``_pYYYYMM`` partitions."""
+    names = conn.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "JOIN pg_namespace n ON n.oid = p.relnamespace "
+            "WHERE n.nspname = :schema AND p.relname = :table"
+        ),
+        {"schema": spec.schema, "table": spec.table},
+    ).all()
+    pattern = re.compile(rf"^{re.escape(spec.table)}_p(\d{{4}})(\d{{2}})$")
+    months = {}
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            months[datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)] = name
+    return months
+
+
+def create_partition(conn: Connection, spec: PartitionedTable, month: datetime) -> int:
+    """Create the month's partition; returns how many rows were moved in from the default partition."""
+    name = f"{spec.schema}.{spec.partition_name(month)}"
+    bounds = {"lo": month, "hi": add_months(month, 1)}
+    in_range = f"{spec.column} >= :lo AND {spec.column} < :hi"
+    stray = conn.scalar(text(f"SELECT count(*) FROM {spec.default_partition} WHERE {in_range}"), bounds)
+    if not stray:
+        conn.execute(
+            text(
+                f"CREATE TABLE {name} PARTITION OF {spec.qualified} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{bounds['hi'].isoformat()}')"
+            )
+        )
+        return 0
+    # A partition cannot be created over rows the default partition already holds: build the
+    # month as a standalone table, move the rows over and attach it.
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {spec.qualified} INCLUDING DEFAULTS)"))
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {spec.default_partition} WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    conn.execute(
+        text(
+            f"ALTER TABLE {spec.qualified} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{bounds['hi'].isoformat()}')"
+        )
+    )
+    return int(stray)
+
+
+def _in_transaction(engine: Engine):
+    conn = engine.connect()
+    tx = conn.begin()
+    conn.execute(text("SELECT set_config('lock_timeout', :timeout, true)"), {"timeout": PARTITION_LOCK_TIMEOUT})
+    return conn, tx
+
+
+def manage_partitions(
+    engine: Engine,
+    *,
+    now: datetime | None = None,
+    premake_months: int = PARTITION_PREMAKE_MONTHS,
+    detach_only: bool = False,
+    tables: tuple[PartitionedTable, ...] = PARTITIONED_TABLES,
+) -> list[PartitionAction]:
+    """
+    Create missing months (current through ``premake_months`` ahead) and retire expired ones.
+    ``detach_only`` leaves expired partitions as standalone tables (e.g. to archive with
+    pg_dump) instead of dropping them. A failing step is logged and skipped; the next run
+    retries it.
+    """
+    current = month_start(now or datetime.now(timezone.utc))
+    actions: list[PartitionAction] = []
+    for spec in tables:
+        with engine.connect() as conn:
+            existing = list_partitions(conn, spec)
+            stray = conn.scalar(text(f"SELECT count(*) FROM {spec.default_partition}"))
+        if stray:
+            logger.warning("%s holds %d rows outside the monthly partitions", spec.default_partition, stray)
+        for offset in range(premake_months + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            conn, tx = _in_transaction(engine)
+            try:
+                moved = create_partition(conn, spec, month)
+                tx.commit()
+                actions.append(PartitionAction(spec.qualified, spec.partition_name(month), "created", moved))
+            except Exception:
+                tx.rollback()
+                logger.exception("Creating partition %s failed", spec.partition_name(month))
+            finally:
+                conn.close()
+
+        if spec.retention_months <= 0:
+            continue
+        # A month is dropped once all of it is older than the retention.
+        oldest_kept = add_months(current, -spec.retention_months)
+        for month, name in sorted(existing.items()):
+            if month >= oldest_kept:
+                continue
+            conn, tx = _in_transaction(engine)
+            try:
+                conn.execute(text(f"ALTER TABLE {spec.qualified} DETACH PARTITION {spec.schema}.{name}"))
+                if not detach_only:
+                    conn.execute(text(f"DROP TABLE {spec.schema}.{name}"))
+                tx.commit()
+                actions.append(PartitionAction(spec.qualified, name, "detached" if detach_only else "dropped"))
+            except Exception:
+                tx.rollback()
+                logger.exception("Retiring partition %s failed", name)
+            finally:
+                conn.close()
+    for action in actions:
+        logger.info("Partition %s %s (%d rows moved from default)", action.partition, action.action, action.moved_rows)
+    return actions
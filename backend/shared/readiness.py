@@ -0,0 +1,136 @@
+"""
+Readiness: ``GET /ready`` turns 200 once the app's startup dependencies have connected.
+
+``/health`` stays a liveness check (the process serves requests). Dependency checks (a Redis
+ping, a ``SELECT 1``) used to run synchronously in startup, with retries that held the port
+closed for up to 15s on a cold start. Here they start in the background when the app starts:
+each check runs in a worker thread and is retried with backoff (READINESS_RETRY_SECONDS, doubling
+up to READINESS_MAX_RETRY_SECONDS) until it passes. Until then ``/ready`` answers 503 with the
+last error of each pending check. Checks never make the process exit. A dependency that stays
+down shows up on ``/ready`` and in the logs instead.
+
+benchmarks/startup_profile.py measures time to ``/health`` and to ``/ready`` from spawn.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Callable
+
+import anyio.to_thread
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+READINESS_RETRY_SECONDS = float(os.getenv("READINESS_RETRY_SECONDS", "0.5"))
+READINESS_MAX_RETRY_SECONDS = float(os.getenv("READINESS_MAX_RETRY_SECONDS", "10"))
+# A check still failing after this long is logged as a warning (once per check).
+READINESS_WARN_AFTER_SECONDS = 15.0
+
+
+@dataclass
+class CheckState:
+    ready: bool = False
+    attempts: int = 0
+    last_error: str | None = None
+    ready_after_ms: float | None = None
+
+
+@dataclass
+class Readiness:
+    checks: dict[str, Callable[[], None]]
+    states: dict[str, CheckState] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        self.states = {name: CheckState() for name in self.checks}
+
+    @property
+    def ready(self) -> bool:
+        return all(state.ready for state in self.states.values())
+
+    async def run_check(self, name: str, check: Callable[[], None]) -> None:
+        state = self.states[name]
+        delay = READINESS_RETRY_SECONDS
+        warned = False
+        while True:
+            state.attempts += 1
+            try:
+                await anyio.to_thread.run_sync(check)
+            except Exception as exc:
+                state.last_error = f"{type(exc).__name__}: {exc}"
+                elapsed = time.monotonic() - self.started_at
+                if not warned and elapsed >= READINESS_WARN_AFTER_SECONDS:
+                    warned = True
+                    logger.warning("Readiness check %s still failing after %.0fs: %s", name, elapsed, state.last_error)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, READINESS_MAX_RETRY_SECONDS)
+                continue
+            state.ready = True
+            state.last_error = None
+            state.ready_after_ms = round((time.monotonic() - self.started_at) * 1000, 1)
+            logger.info("Readiness check %s passed after %.0f ms", name, state.ready_after_ms)
+            return
+
+    def payload(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "starting",
+            "checks": {
+                name: {
+                    "ready": state.ready,
+                    "attempts": state.attempts,
+                    "ready_after_ms": state.ready_after_ms,
+                    "error": state.last_error,
+                }
+                for name, state in self.states.items()
+            },
+        }
+
+
+def add_readiness(app: FastAPI, checks: dict[str, Callable[[], None]]) -> None:
+    """``GET /ready`` for ``app``; ``checks`` (name -> callable raising on failure) start with it."""
+    readiness = Readiness(checks)
+    app.state.readiness = readiness
+    inner = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(application):
+        readiness.started_at = time.monotonic()
+        tasks = [asyncio.create_task(readiness.run_check(name, check)) for name, check in checks.items()]
+        try:
+            async with inner(application) as state:
+                yield state
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    app.router.lifespan_context = lifespan
+
+    @app.get("/ready", include_in_schema=False)
+    def ready():
+        return JSONResponse(readiness.payload(), status_code=200 if readiness.ready else 503)
+
+
+def database_check() -> None:
+    from sqlalchemy import text
+
+    from shared.db import SessionLocal
+
+    with SessionLocal() as db:
+        db.execute(text("SELECT 1"))
+
+
+def redis_check() -> None:
+    from shared.redis_client import get_redis, reset_redis_client
+
+    try:
+        get_redis().ping()
+    except Exception:
+        # On container restart Docker DNS may not resolve `redis` yet; reconnect on the next try.
+        reset_redis_client()
+        raise
@@ -1,38 +1,224 @@
 """
 Redis client for token storage and cache.
+
+One explicit connection pool per process (REDIS_MAX_CONNECTIONS, socket / connect timeouts),
+so a slow or unreachable Redis costs at most the timeout per call instead of hanging a worker.
+
+Cache helpers (cache_*) are best-effort: they go through a circuit breaker that opens after
+REDIS_BREAKER_FAILURES consecutive errors and short-circuits for REDIS_BREAKER_RESET_SECONDS
+(reads return a miss, writes are dropped), so a Redis outage degrades to DB reads. Token
+helpers are not cached data and still raise on failure.
+
+Every command on the sync client is timed into the ``redis_command_duration_seconds``
+histogram (label: command; pipelines count as PIPELINE).
 """
+import asyncio
+import logging
 import os
-from typing import Iterator
+import threading
+import time
+from typing import Awaitable, Callable, Iterator, TypeVar
 
-from redis import Redis
-
-from dotenv import load_dotenv
+from redis import ConnectionPool, Redis
+from redis.asyncio import ConnectionPool as AsyncConnectionPool
+from redis.asyncio import Redis as AsyncRedis
+from redis.client import Pipeline
+from redis.exceptions import RedisError
 
+from shared.env_bootstrap import load_env
+from shared.metrics import current_request_stats, get_counter, get_histogram
 from shared.redis_url import normalize_upstash_redis_url
 
-load_dotenv()
+load_env()
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 _redis: Redis | None = None
+_async_redis: AsyncRedis | None = None
+_client_lock = threading.Lock()
 
 # Redis key prefixes
 REFRESH_TOKEN_PREFIX = "refresh_token:"
 REFRESH_TOKEN_TTL = 7 * 24 * 3600  # 7 days
 CACHE_PREFIX = "cache:"
 
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "1.0"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "1.0"))
+REDIS_HEALTH_CHECK_INTERVAL = 30
+REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", "5"))
+REDIS_BREAKER_RESET_SECONDS = float(os.getenv("REDIS_BREAKER_RESET_SECONDS", "10"))
+
+REDIS_COMMAND_SECONDS = get_histogram(
+    "redis_command_duration_seconds",
+    "Latency of Redis commands issued through shared.redis_client.",
+    ("command",),
+)
+CACHE_LOOKUPS = get_counter(
+    "cache_lookups",
+    "Cache reads by result (hit / miss; skipped calls while the breaker is open count as misses).",
+    ("result",),
+)
+
+
+def _redis_url() -> str:
+    return normalize_upstash_redis_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+
+
+class _TimedPipeline(Pipeline):
+    def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_SECONDS.observe(time.perf_counter() - start, command="PIPELINE")
+
+
+class _TimedRedis(Redis):
+    def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_SECONDS.observe(time.perf_counter() - start, command=str(args[0]).upper())
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> Pipeline:
+        return _TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
 
 def get_redis() -> Redis:
-    """Get Redis client. Requires REDIS_URL in env."""
+    """Get Redis client (pooled, with socket timeouts). Requires REDIS_URL in env."""
     global _redis
     if _redis is None:
-        url = normalize_upstash_redis_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
-        _redis = Redis.from_url(url, decode_responses=True)
+        with _client_lock:
+            if _redis is None:
+                pool = ConnectionPool.from_url(
+                    _redis_url(),
+                    decode_responses=True,
+                    max_connections=REDIS_MAX_CONNECTIONS,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+                    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+                )
+                _redis = _TimedRedis(connection_pool=pool)
     return _redis
 
 
+def get_async_redis() -> AsyncRedis:
+    """Get asyncio Redis client (pub/sub listeners, streaming endpoints). Same REDIS_URL as get_redis()."""
+    global _async_redis
+    if _async_redis is None:
+        # No socket_timeout: pub/sub listeners legitimately sit idle on a read.
+        pool = AsyncConnectionPool.from_url(
+            _redis_url(),
+            decode_responses=True,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        )
+        _async_redis = AsyncRedis(connection_pool=pool)
+    return _async_redis
+
+
 def reset_redis_client() -> None:
-    """Drop the cached client (e.g. after a failed connect so the next get_redis() retries)."""
-    global _redis
+    """Drop the cached clients (e.g. after a failed connect so the next get_redis() retries)."""
+    global _redis, _async_redis
+    if _redis is not None:
+        _redis.connection_pool.disconnect()
     _redis = None
+    _async_redis = None
+    cache_breaker.reset()
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker. Open: calls are skipped until ``reset_seconds`` pass; then
+    one trial call is let through (half-open) and either closes the breaker or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                # Half-open: this caller is the trial; others keep short-circuiting meanwhile.
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Redis circuit breaker closed")
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(
+                        "Redis circuit breaker open after %d failures; cache calls skipped for %.0fs",
+                        self._failures,
+                        self.reset_seconds,
+                    )
+                self._opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+
+cache_breaker = CircuitBreaker(REDIS_BREAKER_FAILURES, REDIS_BREAKER_RESET_SECONDS)
+
+
+def guarded_call(op: Callable[[Redis], T], default: T) -> T:
+    """Run a best-effort Redis operation behind the cache breaker; ``default`` when skipped or failed."""
+    if not cache_breaker.allow():
+        return default
+    try:
+        result = op(get_redis())
+    except RedisError as exc:
+        cache_breaker.record_failure()
+        logger.debug("Redis call failed, using default: %s", exc)
+        return default
+    cache_breaker.record_success()
+    return result
+
+
+async def guarded_call_async(
+    op: Callable[[AsyncRedis], Awaitable[T]], default: T, *, timeout: float | None = None
+) -> T:
+    """
+    ``guarded_call`` for the asyncio client. The async pool has no socket timeout (pub/sub
+    listeners idle on reads), so the call is bounded by ``timeout`` (default
+    REDIS_SOCKET_TIMEOUT) here; a timeout counts as a failure toward the breaker.
+    """
+    if not cache_breaker.allow():
+        return default
+    try:
+        result = await asyncio.wait_for(op(get_async_redis()), timeout or REDIS_SOCKET_TIMEOUT)
+    except (RedisError, OSError, asyncio.TimeoutError) as exc:
+        cache_breaker.record_failure()
+        logger.debug("Async Redis call failed, using default: %r", exc)
+        return default
+    cache_breaker.record_success()
+    return result
 
 
 def store_refresh_token(user_id: str, refresh_token: str) -> None:
@@ -57,26 +243,63 @@ def invalidate_refresh_token(user_id: str) -> None:
     r.delete(key)
 
 
+def _record_cache_lookups(hits: int, misses: int) -> None:
+    if hits:
+        CACHE_LOOKUPS.inc(hits, result="hit")
+    if misses:
+        CACHE_LOOKUPS.inc(misses, result="miss")
+    stats = current_request_stats()
+    if stats is not None:
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+
+
 def cache_get(key: str) -> str | None:
-    """Get a cached string value by key."""
-    r = get_redis()
-    return r.get(f"{CACHE_PREFIX}{key}")
+    """Get a cached string value by key (None on miss or when Redis is unavailable)."""
+    value = guarded_call(lambda r: r.get(f"{CACHE_PREFIX}{key}"), None)
+    _record_cache_lookups(int(value is not None), int(value is None))
+    return value
 
 
 def cache_set(key: str, value: str, ttl_seconds: int) -> None:
-    """Set a cached string value with TTL."""
-    r = get_redis()
-    r.setex(f"{CACHE_PREFIX}{key}", ttl_seconds, value)
+    """Set a cached string value with TTL (dropped when Redis is unavailable)."""
+    guarded_call(lambda r: r.setex(f"{CACHE_PREFIX}{key}", ttl_seconds, value), None)
 
 
-def cache_delete_prefix(prefix: str) -> int:
-    """Delete cache entries matching prefix; returns deleted count."""
-    r = get_redis()
-    pattern = f"{CACHE_PREFIX}{prefix}*"
-    keys: list[str] = list(_scan_keys(r, pattern))
+def cache_mget(keys: list[str]) -> list[str | None]:
+    """Get several cached values in one round trip; all misses when Redis is unavailable."""
     if not keys:
-        return 0
-    return int(r.delete(*keys))
+        return []
+    values = guarded_call(lambda r: r.mget([f"{CACHE_PREFIX}{k}" for k in keys]), [None] * len(keys))
+    hits = sum(v is not None for v in values)
+    _record_cache_lookups(hits, len(values) - hits)
+    return values
+
+
+def cache_mset(values: dict[str, str], ttl_seconds: int) -> None:
+    """Set several cached values with the same TTL in one pipelined round trip."""
+    if not values:
+        return
+
+    def _op(r: Redis) -> None:
+        pipe = r.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.setex(f"{CACHE_PREFIX}{key}", ttl_seconds, value)
+        pipe.execute()
+
+    guarded_call(_op, None)
+
+
+def cache_delete_prefix(prefix: str) -> int:
+    """Delete cache entries matching prefix; returns deleted count (0 when Redis is unavailable)."""
+
+    def _op(r: Redis) -> int:
+        keys: list[str] = list(_scan_keys(r, f"{CACHE_PREFIX}{prefix}*"))
+        if not keys:
+            return 0
+        return int(r.delete(*keys))
+
+    return guarded_call(_op, 0)
 
 
 def _scan_keys(r: Redis, pattern: str) -> Iterator[str]:
@@ -2,15 +2,18 @@
 Supabase client for LUNA backend.
 Uses service role key for server-side operations (bypasses RLS when needed).
 """
+from __future__ import annotations
+
 import os
-from pathlib import Path
+from typing import TYPE_CHECKING
+
+from shared.env_bootstrap import load_env
 
-from dotenv import load_dotenv
-from supabase import create_client, Client
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Load .env so SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are available
-_env_path = Path(__file__).resolve().parent.parent / ".env"
-load_dotenv(_env_path, override=False)
+load_env()
 
 _supabase: Client | None = None
 
@@ -25,5 +28,8 @@ def get_supabase() -> Client:
             raise ValueError(
                 "SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set in environment"
             )
+        # Imported on first use: the supabase package is a large share of service import time.
+        from supabase import create_client
+
         _supabase = create_client(url, key)
     return _supabase
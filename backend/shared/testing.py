@@ -0,0 +1,51 @@
+"""
+Test helpers for locking in query-count fixes.
+
+    with assert_max_queries(engine, 3):
+        client.get("/api/v1/books/...")
+
+Counts every statement the engine executes inside the block (any thread, so it works with
+TestClient) and fails with the executed statements' fingerprints when there are too many.
+"""
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from shared.db_stats import fingerprint_statement
+
+
+@contextmanager
+def count_queries(engine: Engine | AsyncEngine) -> Iterator[list[str]]:
+    """Collect the statements executed on ``engine`` inside the block."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    statements: list[str] = []
+    lock = threading.Lock()
+
+    def _record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        with lock:
+            statements.append(statement)
+
+    event.listen(sync_engine, "after_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(sync_engine, "after_cursor_execute", _record)
+
+
+@contextmanager
+def assert_max_queries(engine: Engine | AsyncEngine, max_queries: int) -> Iterator[list[str]]:
+    with count_queries(engine) as statements:
+        yield statements
+    if len(statements) > max_queries:
+        grouped = Counter(fingerprint_statement(s) for s in statements)
+        detail = "\n".join(f"  {n}x {fp}" for fp, n in grouped.most_common())
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, got {len(statements)}:\n{detail}"
+        )
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import time
+
+from sqlalchemy.exc import DataError
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from shared.audit_writer import AuditWriter, audit_row
+
+
+def _row(action: str = "book.import_open_library") -> dict:
+    return audit_row(actor_user_id=None, action=action, resource_type="book_catalog")
+
+
+def _wait_until(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_rows_are_written_in_batches(tmp_path):
+    batches: list[list[dict]] = []
+    writer = AuditWriter(write_rows=batches.append, batch_size=3, interval_seconds=0.05, spool_path=tmp_path / "spool")
+
+    for i in range(7):
+        writer.enqueue(_row(f"a{i}"))
+
+    assert _wait_until(lambda: sum(map(len, batches)) == 7)
+    writer.close()
+    assert max(map(len, batches)) <= 3
+    assert [row["action"] for batch in batches for row in batch] == [f"a{i}" for i in range(7)]
+
+
+def test_unwritable_rows_are_spooled_on_close_and_replayed(tmp_path):
+    spool = tmp_path / "audit.jsonl"
+
+    def fail(rows):
+        raise ConnectionError("database down")
+
+    down = AuditWriter(write_rows=fail, interval_seconds=0.01, spool_path=spool)
+    row = _row()
+    down.enqueue(row)
+    down.close(timeout_seconds=1.0)
+    assert down.pending == 0 and len(spool.read_text().splitlines()) == 1
+
+    written: list[dict] = []
+    up = AuditWriter(write_rows=written.extend, spool_path=spool)
+    assert up.replay_spool() == 1
+    assert up.flush()
+    assert written == [row]
+    assert not spool.exists()
+
+
+def test_overflow_spools_instead_of_growing_the_queue(tmp_path):
+    spool = tmp_path / "audit.jsonl"
+    writer = AuditWriter(write_rows=lambda rows: None, max_queued=0, spool_path=spool)
+
+    writer.enqueue(_row())
+
+    assert writer.pending == 0 and len(spool.read_text().splitlines()) == 1
+
+
+def test_rows_rejected_by_the_database_are_dropped_not_requeued(tmp_path):
+    written: list[dict] = []
+    attempts: list[int] = []
+
+    def write(rows):
+        attempts.append(len(rows))
+        if any(row["action"] == "bad" for row in rows):
+            raise DataError("INSERT INTO ops.audit_logs", {}, Exception("value too long"))
+        written.extend(rows)
+
+    writer = AuditWriter(write_rows=write, batch_size=3, spool_path=tmp_path / "audit.jsonl")
+    for action in ("a0", "bad", "a2"):
+        writer._pending.append(_row(action))
+
+    assert writer.flush()
+    assert writer.pending == 0
+    assert [row["action"] for row in written] == ["a0", "a2"]
+    assert attempts == [3, 1, 1, 1]
+    assert writer.flush() and attempts == [3, 1, 1, 1]  # the bad row is gone, not retried
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+import sys
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from shared.compression import add_compression, choose_encoding
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    add_compression(app)
+
+    @app.get("/big")
+    def big(response: Response):
+        response.headers["ETag"] = '"v1"'
+        return {"items": [{"title": "Harry Potter", "status": "AVAILABLE"}] * 200}
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    return app
+
+
+def test_large_json_is_gzipped_with_a_weak_etag():
+    client = TestClient(_app())
+    res = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["etag"] == 'W/"v1"'
+    assert "accept-encoding" in res.headers["vary"].lower()
+    assert int(res.headers["content-length"]) < 1000
+    assert len(res.json()["items"]) == 200  # httpx decodes transparently
+
+
+def test_small_or_unaccepted_responses_pass_through():
+    client = TestClient(_app())
+    res = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in res.headers
+
+    res = client.get("/big", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in res.headers and res.headers["etag"] == '"v1"'
+
+
+def test_choose_encoding_respects_q_values():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("*") is not None
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("") is None
+
+
+def test_raw_body_is_valid_gzip():
+    client = TestClient(_app())
+    with client.stream("GET", "/big", headers={"Accept-Encoding": "gzip"}) as res:
+        raw = b"".join(res.iter_raw())
+    assert json.loads(gzip.decompress(raw))["items"][0]["title"] == "Harry Potter"
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+import sys
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from auth.schemas import UserResponse, UserRole
+from shared import db_stats
+from shared.auth_dependencies import get_current_user_dep
+
+
+def _tiny_engine(tmp_path, name: str):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=db_stats.timed_pool_class(QueuePool, name),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+
+def test_pool_snapshot_reports_usage_and_waits(tmp_path):
+    engine = _tiny_engine(tmp_path, "test-usage")
+    with engine.connect():
+        snap = db_stats.pool_snapshot("test-usage", engine.pool)
+        assert snap["size"] == 1 and snap["max_overflow"] == 0
+        assert snap["checked_out"] == 1
+        assert snap["checkouts"] == 1
+    assert db_stats.pool_snapshot("test-usage", engine.pool)["checked_out"] == 0
+    assert sum(snap["wait_histogram_ms"].values()) == 1
+
+
+def test_pool_exhaustion_counts_timeout_and_warns(tmp_path, caplog):
+    engine = _tiny_engine(tmp_path, "test-exhausted")
+    stats = db_stats.get_pool_stats("test-exhausted")
+    with caplog.at_level(logging.WARNING, logger=db_stats.logger.name):
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+    assert stats.timeouts == 1
+    # The held checkout saturated the pool (1/1) and already used up the rate-limited warning.
+    assert any("test-exhausted" in r.getMessage() for r in caplog.records)
+    assert db_stats.pool_snapshot("test-exhausted", engine.pool)["timeouts"] == 1
+
+
+def test_pool_status_endpoint_is_staff_only():
+    app = FastAPI()
+    db_stats.add_db_pool_status(app)
+    client = TestClient(app)
+    assert client.get("/health/db").status_code == 401
+
+    def _as(role: UserRole):
+        return lambda: UserResponse(
+            id=uuid4(),
+            email="user@luna.dev",
+            first_name="Test",
+            last_name="User",
+            role=role,
+            phone_number=None,
+        )
+
+    app.dependency_overrides[get_current_user_dep] = _as(UserRole.STUDENT)
+    assert client.get("/health/db").status_code == 403
+    app.dependency_overrides[get_current_user_dep] = _as(UserRole.LIBRARIAN)
+    res = client.get("/health/db")
+    assert res.status_code == 200
+    assert "sync" in res.json()["pools"]
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+import sys
+from uuid import uuid4
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import Column, Integer, String, create_engine, select, update
+from sqlalchemy.orm import declarative_base
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from shared import db as shared_db
+from shared import redis_client
+
+_Base = declarative_base()
+
+
+class _Item(_Base):
+    __tablename__ = "items"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.keys: set[str] = set()
+        self.down = False
+
+    def set(self, key, _value, px=None):
+        if self.down:
+            raise RedisConnectionError("redis down")
+        self.keys.add(key)
+
+    def exists(self, key):
+        if self.down:
+            raise RedisConnectionError("redis down")
+        return int(key in self.keys)
+
+
+@pytest.fixture
+def routing(tmp_path, monkeypatch):
+    """SQLite stand-ins: the primary holds one row named 'primary', the replica one named 'replica'."""
+    engines = {}
+    for name in ("primary", "replica"):
+        eng = create_engine(f"sqlite:///{tmp_path / name}.db")
+        _Base.metadata.create_all(eng)
+        with eng.begin() as conn:
+            conn.execute(_Item.__table__.insert().values(id=1, name=name))
+        engines[name] = eng
+
+    class _TestRoutingSession(shared_db.RoutingSession):
+        primary = engines["primary"]
+        replica = engines["replica"]
+
+    redis = _FakeRedis()
+    monkeypatch.setattr(shared_db, "replica_engine", engines["replica"])
+    monkeypatch.setattr(redis_client, "get_redis", lambda: redis)
+    redis_client.cache_breaker.reset()
+    monkeypatch.setattr(shared_db, "_recent_writers", {})
+    return _TestRoutingSession, redis
+
+
+def _name(db) -> str:
+    return db.scalar(select(_Item.name).where(_Item.id == 1))
+
+
+def test_reads_use_primary_unless_opted_in(routing):
+    Session, _ = routing
+    with Session() as db:
+        assert _name(db) == "primary"
+    with Session() as db:
+        assert shared_db.use_replica_for_reads(db, user_id=uuid4()) is True
+        assert _name(db) == "replica"
+
+
+def test_session_stays_on_primary_after_a_write(routing):
+    Session, _ = routing
+    with Session() as db:
+        shared_db.use_replica_for_reads(db, user_id=uuid4())
+        assert _name(db) == "replica"
+        db.add(_Item(id=2, name="new"))
+        db.flush()
+        assert _name(db) == "primary"
+        assert db.scalar(select(_Item.name).where(_Item.id == 2)) == "new"
+
+
+def test_bulk_update_goes_to_primary(routing):
+    Session, _ = routing
+    with Session() as db:
+        shared_db.use_replica_for_reads(db, user_id=uuid4())
+        db.execute(update(_Item).where(_Item.id == 1).values(name="renamed"))
+        assert _name(db) == "renamed"
+
+
+def test_writer_is_sticky_to_primary_after_commit(routing):
+    Session, redis = routing
+    writer, other = uuid4(), uuid4()
+    with Session() as db:
+        shared_db.bind_session_user(db, writer)
+        db.add(_Item(id=3, name="mine"))
+        db.commit()
+    assert f"db_sticky:{writer}" in redis.keys
+
+    with Session() as db:
+        assert shared_db.use_replica_for_reads(db, user_id=writer) is False
+        assert _name(db) == "primary"
+    with Session() as db:
+        assert shared_db.use_replica_for_reads(db, user_id=other) is True
+        assert _name(db) == "replica"
+
+
+def test_sticky_state_from_another_process_via_redis(routing):
+    Session, redis = routing
+    writer = uuid4()
+    redis.keys.add(f"db_sticky:{writer}")
+    with Session() as db:
+        assert shared_db.use_replica_for_reads(db, user_id=writer) is False
+
+
+def test_unknown_stickiness_falls_back_to_primary(routing):
+    Session, redis = routing
+    redis.down = True
+    with Session() as db:
+        assert shared_db.use_replica_for_reads(db, user_id=uuid4()) is False
+        assert _name(db) == "primary"
+
+
+def test_async_stickiness_check_is_bounded_and_behind_the_breaker(routing, monkeypatch):
+    calls = []
+
+    class _HungRedis:
+        async def exists(self, key):
+            calls.append(key)
+            await asyncio.sleep(30)
+
+    monkeypatch.setattr(redis_client, "get_async_redis", lambda: _HungRedis())
+    monkeypatch.setattr(redis_client, "REDIS_SOCKET_TIMEOUT", 0.05)
+    monkeypatch.setattr(redis_client.cache_breaker, "failure_threshold", 2)
+
+    async def _checks():
+        return [await shared_db.is_recent_writer_async(uuid4()) for _ in range(4)]
+
+    start = time.perf_counter()
+    # Unknown means primary; after two timeouts the breaker opens and Redis is not called at all.
+    assert asyncio.run(_checks()) == [True] * 4
+    assert len(calls) == 2
+    assert time.perf_counter() - start < 1.0
+    redis_client.cache_breaker.reset()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+from uuid import uuid4
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from book.schemas import BookResponse
+from delivery.services import task_to_response
+from shared.fast_json import FastJSONResponse, rows_to_dicts
+from shared.models import BookStatus, TaskStatus, TaskType
+
+
+def _book(**overrides):
+    base = {
+        "id": uuid4(),
+        "isbn": "9780439554930",
+        "title": "Harry Potter and the Sorcerer's Stone",
+        "author": "J. K. Rowling",
+        "publisher": None,
+        "publication_year": 1997,
+        "description": "Sample",
+        "cover_image_url": None,
+        "status": BookStatus.CHECKED_OUT,
+        "shelf_location": "A-101",
+        "created_at": datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=timezone.utc),
+        "updated_at": datetime(2026, 3, 2, 8, 0, tzinfo=timezone.utc),
+    }
+    base.update(overrides)
+    return SimpleNamespace(**base)
+
+
+def test_rows_match_pydantic_json_dump():
+    rows = [_book(), _book(updated_at=datetime(2026, 3, 2, 8, 0, 0, 5))]
+    fast = json.loads(FastJSONResponse({"items": rows_to_dicts(rows, BookResponse)}).body)
+    expected = [BookResponse.model_validate(r).model_dump(mode="json") for r in rows]
+    assert fast["items"] == expected
+
+
+def test_models_are_dumped_like_json_mode():
+    task = SimpleNamespace(
+        id=uuid4(),
+        request_id=uuid4(),
+        return_id=None,
+        task_type=TaskType.STUDENT_DELIVERY,
+        status=TaskStatus.COMPLETED,
+        source_location="A-1",
+        destination_location="Desk",
+        created_at=datetime.now(timezone.utc),
+        started_at=datetime.now(timezone.utc),
+        completed_at=datetime.now(timezone.utc),
+        task_metadata={"book_placed": True, "book_placed_at": "2026-03-01T10:00:00+00:00"},
+    )
+    response = task_to_response(task)
+    body = FastJSONResponse({"items": [response]}).body
+    assert json.loads(body)["items"] == [response.model_dump(mode="json")]
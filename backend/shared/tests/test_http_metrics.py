@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from shared import metrics
+from shared.db_stats import instrument_engine
+from shared.http_metrics import (
+    DB_QUERIES_PER_REQUEST,
+    HTTP_IN_FLIGHT,
+    HTTP_REQUESTS,
+    add_metrics,
+)
+
+
+def _app() -> FastAPI:
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    instrument_engine(engine)
+    app = FastAPI()
+    add_metrics(app)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    shelves = APIRouter(prefix="/shelves")
+
+    @shelves.get("/{shelf_id}")
+    def get_shelf(shelf_id: int):
+        return {"id": shelf_id}
+
+    app.include_router(shelves, prefix="/api/v1")
+    return app
+
+
+def _series(histogram, **labels) -> dict:
+    return next(s for s in histogram.snapshot() if s["labels"] == labels)
+
+
+def test_requests_are_labelled_by_route_template_and_status():
+    client = TestClient(_app())
+    before = HTTP_REQUESTS.value(method="GET", route="/items/{item_id}", status="200")
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nope")
+
+    assert HTTP_REQUESTS.value(method="GET", route="/items/{item_id}", status="200") == before + 2
+    assert HTTP_REQUESTS.value(method="GET", route="unmatched", status="404") >= 1
+    assert HTTP_IN_FLIGHT.value(method="GET", route="/items/{item_id}") == 0
+    series = _series(DB_QUERIES_PER_REQUEST, method="GET", route="/items/{item_id}", status="200")
+    assert series["sum"] >= 4 and series["buckets"][2] >= 2
+
+
+def test_included_router_routes_are_labelled_with_their_full_template():
+    client = TestClient(_app())
+    before = HTTP_REQUESTS.value(method="GET", route="/api/v1/shelves/{shelf_id}", status="200")
+    assert client.get("/api/v1/shelves/3").status_code == 200
+    assert HTTP_REQUESTS.value(method="GET", route="/api/v1/shelves/{shelf_id}", status="200") == before + 1
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    client = TestClient(_app())
+    client.get("/items/1")
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = res.text
+    assert "# TYPE http_requests counter" in body
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/items/{item_id}",status="200",le="+Inf"}' in body
+
+
+def test_render_escapes_label_values():
+    counter = metrics.get_counter("test_escaped", "Escaping.", ("value",))
+    counter.inc(value='a"b\\c')
+    assert 'test_escaped_total{value="a\\"b\\\\c"} 1' in metrics.render_prometheus()
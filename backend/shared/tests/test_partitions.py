@@ -0,0 +1,59 @@
+"""
+Month arithmetic runs everywhere. The maintenance test needs PostgreSQL: it uses
+LUNA_EXPLAIN_DATABASE_URL, the database delivery/tests/test_query_plans.py runs against, and
+works in a throwaway schema.
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+import sys
+
+import pytest
+from sqlalchemy import create_engine, text
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from shared.partitions import PartitionedTable, add_months, list_partitions, manage_partitions, month_start
+
+DATABASE_URL = os.getenv("LUNA_EXPLAIN_DATABASE_URL")
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_month_arithmetic_crosses_years():
+    assert month_start(_utc(2026, 12, 31, 23, 59)) == _utc(2026, 12, 1)
+    assert add_months(_utc(2026, 11, 1), 3) == _utc(2027, 2, 1)
+    assert add_months(_utc(2026, 1, 1), -1) == _utc(2025, 12, 1)
+    assert PartitionedTable("ops", "audit_logs", "created_at", 24).partition_name(_utc(2027, 2, 1)) == "audit_logs_p202702"
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="LUNA_EXPLAIN_DATABASE_URL not set (needs a PostgreSQL database)")
+def test_manage_partitions_premakes_moves_stray_rows_and_drops_expired():
+    engine = create_engine(DATABASE_URL)
+    spec = PartitionedTable("pt_ops", "events", "recorded_at", retention_months=2)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS pt_ops CASCADE"))
+        conn.execute(text("CREATE SCHEMA pt_ops"))
+        conn.execute(text("CREATE TABLE pt_ops.events (recorded_at timestamptz NOT NULL) PARTITION BY RANGE (recorded_at)"))
+        conn.execute(text("CREATE TABLE pt_ops.events_default PARTITION OF pt_ops.events DEFAULT"))
+        conn.execute(text("INSERT INTO pt_ops.events VALUES ('2026-03-10'), ('2026-06-02')"))
+    try:
+        manage_partitions(engine, now=_utc(2026, 3, 20), premake_months=3, tables=(spec,))
+        with engine.connect() as conn:
+            assert sorted(list_partitions(conn, spec)) == [_utc(2026, m, 1) for m in (3, 4, 5, 6)]
+            assert conn.scalar(text("SELECT count(*) FROM pt_ops.events_default")) == 0
+
+        actions = manage_partitions(engine, now=_utc(2026, 6, 1), premake_months=0, tables=(spec,))
+        assert [(a.partition, a.action) for a in actions] == [
+            ("events_p202603", "dropped"),
+        ]
+        with engine.connect() as conn:
+            assert conn.scalar(text("SELECT count(*) FROM pt_ops.events")) == 1
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA IF EXISTS pt_ops CASCADE"))
+        engine.dispose()
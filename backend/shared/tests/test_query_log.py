@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from shared import db_stats, http_metrics
+from shared.db_stats import fingerprint_statement, instrument_engine
+from shared.http_metrics import add_metrics
+from shared.testing import assert_max_queries
+
+
+@pytest.fixture
+def engine():
+    eng = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    instrument_engine(eng)
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE authors (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO authors VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    return eng
+
+
+def _app(engine) -> FastAPI:
+    app = FastAPI()
+    add_metrics(app)
+
+    @app.get("/n-plus-one")
+    def n_plus_one():
+        with engine.connect() as conn:
+            ids = conn.execute(text("SELECT id FROM authors")).scalars().all()
+            names = [
+                conn.execute(text("SELECT name FROM authors WHERE id = :id"), {"id": i}).scalar()
+                for i in ids
+            ]
+        return {"names": names}
+
+    @app.get("/failing")
+    def failing():
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT missing FROM authors"))
+            return {"count": conn.execute(text("SELECT count(*) FROM authors")).scalar()}
+
+    return app
+
+
+def test_fingerprint_groups_parameters_and_in_lists():
+    a = fingerprint_statement("SELECT * FROM books WHERE id IN (%(id_1_1)s, %(id_1_2)s) LIMIT 10")
+    b = fingerprint_statement("SELECT *  FROM books\nWHERE id IN ($1) LIMIT 50")
+    assert a == b == "SELECT * FROM books WHERE id IN (...) LIMIT ?"
+    assert fingerprint_statement("SELECT x::text FROM t WHERE name = 'o''hara'") == (
+        "SELECT x::text FROM t WHERE name = ?"
+    )
+
+
+def test_server_timing_header_reports_queries(engine, monkeypatch):
+    monkeypatch.setattr(http_metrics, "SERVER_TIMING", True)
+    res = TestClient(_app(engine)).get("/n-plus-one")
+    assert res.status_code == 200
+    timing = res.headers["server-timing"]
+    assert 'desc="4 queries"' in timing and "app;dur=" in timing
+
+    monkeypatch.setattr(http_metrics, "SERVER_TIMING", False)
+    assert "server-timing" not in TestClient(_app(engine)).get("/n-plus-one").headers
+
+
+def test_failed_statement_leaves_no_timing_state_on_the_connection(engine, monkeypatch):
+    monkeypatch.setattr(http_metrics, "SERVER_TIMING", True)
+    client = TestClient(_app(engine))
+    with engine.connect() as conn:
+        info_before = dict(conn.info)
+    for _ in range(3):
+        res = client.get("/failing")
+        assert res.json() == {"count": 3}
+        assert 'desc="1 queries"' in res.headers["server-timing"]
+    with engine.connect() as conn:
+        assert dict(conn.info) == info_before
+
+
+def test_slow_request_logged_with_fingerprints(engine, monkeypatch, caplog):
+    monkeypatch.setattr(db_stats, "SLOW_REQUEST_QUERIES", 3)
+    with caplog.at_level(logging.WARNING, logger=db_stats.logger.name):
+        TestClient(_app(engine)).get("/n-plus-one")
+    (record,) = [r for r in caplog.records if "Slow request" in r.getMessage()]
+    assert "3x" in record.getMessage()
+    assert "SELECT name FROM authors WHERE id = ?" in record.getMessage()
+
+
+def test_assert_max_queries(engine):
+    client = TestClient(_app(engine))
+    with assert_max_queries(engine, 4):
+        client.get("/n-plus-one")
+    with pytest.raises(AssertionError, match="3x SELECT name FROM authors"):
+        with assert_max_queries(engine, 2):
+            client.get("/n-plus-one")
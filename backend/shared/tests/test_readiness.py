@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from shared import readiness as readiness_module
+from shared.readiness import add_readiness
+
+
+def test_ready_flips_once_checks_pass(monkeypatch):
+    monkeypatch.setattr(readiness_module, "READINESS_RETRY_SECONDS", 0.01)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("not yet")
+
+    app = FastAPI()
+    add_readiness(app, {"redis": flaky, "database": lambda: None})
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    with TestClient(app) as client:
+        # The app serves while its dependencies are still connecting.
+        assert client.get("/health").status_code == 200
+        deadline = time.monotonic() + 5
+        while (res := client.get("/ready")).status_code != 200 and time.monotonic() < deadline:
+            body = res.json()
+            assert res.status_code == 503 and body["status"] == "starting"
+            time.sleep(0.01)
+        assert res.status_code == 200
+        checks = res.json()["checks"]
+        assert checks["redis"]["attempts"] == 3 and checks["redis"]["error"] is None
+        assert checks["database"]["ready"] is True
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from shared import redis_client
+
+
+class _FakePipeline:
+    def __init__(self, redis: "_FakeRedis"):
+        self.redis = redis
+        self.queued: list[tuple] = []
+
+    def setex(self, key, ttl, value):
+        self.queued.append((key, ttl, value))
+
+    def execute(self):
+        self.redis.round_trips += 1
+        for key, ttl, value in self.queued:
+            self.redis.store[key] = value
+            self.redis.ttls[key] = ttl
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+        self.round_trips = 0
+        self.calls = 0
+        self.down = False
+
+    def _call(self):
+        self.calls += 1
+        if self.down:
+            raise RedisConnectionError("redis down")
+        self.round_trips += 1
+
+    def get(self, key):
+        self._call()
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self._call()
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+    def mget(self, keys):
+        self._call()
+        return [self.store.get(k) for k in keys]
+
+    def pipeline(self, transaction=True):
+        if self.down:
+            raise RedisConnectionError("redis down")
+        return _FakePipeline(self)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = _FakeRedis()
+    monkeypatch.setattr(redis_client, "get_redis", lambda: redis)
+    monkeypatch.setattr(
+        redis_client,
+        "cache_breaker",
+        redis_client.CircuitBreaker(failure_threshold=3, reset_seconds=60),
+    )
+    return redis
+
+
+def test_mset_and_mget_batch_in_one_round_trip(fake_redis):
+    redis_client.cache_mset({"a": "1", "b": "2"}, ttl_seconds=30)
+    assert fake_redis.round_trips == 1
+    assert fake_redis.ttls == {"cache:a": 30, "cache:b": 30}
+
+    assert redis_client.cache_mget(["a", "missing", "b"]) == ["1", None, "2"]
+    assert fake_redis.round_trips == 2
+
+
+def test_breaker_opens_and_short_circuits_cache_calls(fake_redis):
+    fake_redis.down = True
+    for _ in range(3):
+        assert redis_client.cache_get("k") is None
+    assert redis_client.cache_breaker.is_open
+    calls = fake_redis.calls
+
+    assert redis_client.cache_get("k") is None
+    redis_client.cache_set("k", "v", ttl_seconds=10)
+    assert redis_client.cache_mget(["a", "b"]) == [None, None]
+    assert fake_redis.calls == calls
+
+
+def test_breaker_half_open_trial_closes_on_success(fake_redis, monkeypatch):
+    fake_redis.down = True
+    for _ in range(3):
+        redis_client.cache_get("k")
+    fake_redis.down = False
+    fake_redis.store["cache:k"] = "v"
+    clock = redis_client.time.monotonic() + 61
+    monkeypatch.setattr(redis_client.time, "monotonic", lambda: clock)
+
+    assert redis_client.cache_get("k") == "v"
+    assert not redis_client.cache_breaker.is_open
+
+
+def test_token_helpers_still_raise_when_redis_is_down(fake_redis):
+    fake_redis.down = True
+    with pytest.raises(RedisConnectionError):
+        redis_client.is_refresh_token_valid("user", "token")
+
+
+def test_commands_are_timed_per_command():
+    client = redis_client._TimedRedis(host="127.0.0.1", port=1, socket_connect_timeout=0.05)
+    with pytest.raises(RedisConnectionError):
+        client.get("k")
+    labels = [s["labels"]["command"] for s in redis_client.REDIS_COMMAND_SECONDS.snapshot()]
+    assert "GET" in labels